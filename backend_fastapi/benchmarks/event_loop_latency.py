@@ -0,0 +1,148 @@
+"""
+Event Loop Latency Benchmark
+============================
+
+Load test for the execution pools (models/execution_pools.py).
+
+A synthetic CPU-bound "analysis" runs for --seconds while /health and a
+light endpoint are probed concurrently. The analysis runs three ways:
+
+- inline:  blocking work directly in an async handler (the old pattern)
+- thread:  the same work in the 'analytics' thread pool (@offload)
+- process: the same work in the 'analytics_process' pool (run_in_pool)
+
+Inline work freezes the event loop, so every probe waits for the analysis
+to finish. Offloaded work leaves the event loop free; the process pool
+also removes GIL contention.
+
+Usage:
+    cd backend_fastapi
+    python benchmarks/event_loop_latency.py --seconds 10
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Query
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from execution_pools import get_execution_pools, offload, run_in_pool
+
+
+def burn_cpu(seconds: float) -> int:
+    """Pure-Python busy loop (holds the GIL) standing in for an analysis run."""
+    deadline = time.perf_counter() + seconds
+    iterations = 0
+    while time.perf_counter() < deadline:
+        iterations += sum(i * i for i in range(200)) % 7 + 1
+    return iterations
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.get("/light")
+    async def light():
+        return {"values": [i * 0.5 for i in range(100)]}
+
+    @app.get("/analysis/inline")
+    async def analysis_inline(seconds: float = Query(10.0)):
+        return {"iterations": burn_cpu(seconds)}
+
+    @app.get("/analysis/thread")
+    @offload("analytics")
+    def analysis_thread(seconds: float = Query(10.0)):
+        return {"iterations": burn_cpu(seconds)}
+
+    @app.get("/analysis/process")
+    async def analysis_process(seconds: float = Query(10.0)):
+        return {"iterations": await run_in_pool("analytics_process", burn_cpu, seconds)}
+
+    return app
+
+
+async def probe(client: httpx.AsyncClient, path: str, stop: asyncio.Event, interval: float):
+    """
+    Request a path on a fixed schedule until stopped; return latencies in ms.
+
+    Latency is measured from the scheduled send time, so time spent waiting
+    for a blocked event loop counts (no coordinated omission).
+    """
+    latencies = []
+    scheduled = time.perf_counter()
+    while not stop.is_set():
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(1000 * (time.perf_counter() - scheduled))
+        scheduled += interval
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+    return latencies
+
+
+def summarize(latencies):
+    if not latencies:
+        return "no samples"
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    return (f"n={len(ordered):4d}  p50={statistics.median(ordered):9.2f} ms  "
+            f"p95={p95:9.2f} ms  max={ordered[-1]:9.2f} ms")
+
+
+async def run_mode(client: httpx.AsyncClient, mode: str, seconds: float, interval: float):
+    stop = asyncio.Event()
+    probes = [asyncio.create_task(probe(client, path, stop, interval)) for path in ("/health", "/light")]
+    # Let the probes start before the analysis is submitted
+    await asyncio.sleep(0.2)
+
+    start = time.perf_counter()
+    response = await client.get(f"/analysis/{mode}", params={"seconds": seconds})
+    response.raise_for_status()
+    analysis_seconds = time.perf_counter() - start
+
+    # Give probes delayed by a blocked loop the chance to record that delay
+    await asyncio.sleep(4 * interval)
+    stop.set()
+    health, light = await asyncio.gather(*probes)
+    print(f"\n[{mode}] analysis took {analysis_seconds:.2f}s")
+    print(f"  /health  {summarize(health)}")
+    print(f"  /light   {summarize(light)}")
+
+
+async def main(seconds: float, interval: float, modes):
+    app = build_app()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        # Warm up the process pool so worker start-up is not measured
+        if "process" in modes:
+            await client.get("/analysis/process", params={"seconds": 0.01})
+        for mode in modes:
+            await run_mode(client, mode, seconds, interval)
+
+    print("\nPool statistics:")
+    for name, stats in get_execution_pools().get_stats().items():
+        if stats["submitted"]:
+            print(f"  {name:18s} submitted={stats['submitted']} max_pending={stats['max_pending']} "
+                  f"avg_latency_ms={stats['avg_latency_ms']}")
+    get_execution_pools().shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure event loop latency during a long analysis")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of the synthetic analysis")
+    parser.add_argument("--interval", type=float, default=0.05, help="Pause between probe requests")
+    parser.add_argument("--modes", nargs="+", default=["inline", "thread", "process"],
+                        choices=["inline", "thread", "process"])
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.interval, args.modes))
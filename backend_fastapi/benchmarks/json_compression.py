@@ -0,0 +1,179 @@
+"""
+JSON Serialization and Compression Benchmark
+============================================
+
+Bytes on the wire and milliseconds per request for the heaviest payload
+shapes of the API, before and after models/json_responses.py and
+models/response_compression.py:
+
+- dispatch: an 8760-hour x carriers DataFrame serialized as records
+  (as /pypsa/dispatch-analysis and serialize_dataframe_efficiently do)
+- profile: hourly load profile rows (as /full-load-profile returns)
+
+Old path: df.replace(inf) + df.where(notna) + to_dict, then FastAPI's
+jsonable_encoder and json.dumps, uncompressed.
+New path: to_dict, then the orjson-based serializer (NaN/Inf -> null)
+through FastJSONRoute, with gzip/brotli negotiated by CompressionMiddleware.
+
+Usage:
+    cd backend_fastapi
+    python benchmarks/json_compression.py --years 1 --carriers 12 --repeat 5
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+from fastapi import APIRouter, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import ORJSON_AVAILABLE, FastJSONRoute, NumpyJSONResponse, dumps
+from response_compression import BROTLI_AVAILABLE, CompressionMiddleware, compress_body
+
+
+def make_dispatch(hours: int, carriers: int) -> pd.DataFrame:
+    """Synthetic dispatch table with a few NaN/Inf values."""
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2025-04-01", periods=hours, freq="h")
+    df = pd.DataFrame(
+        rng.gamma(2.0, 150.0, size=(hours, carriers)),
+        index=index,
+        columns=[f"carrier_{i}" for i in range(carriers)]
+    )
+    df.iloc[::97, 0] = np.nan
+    df.iloc[::331, 1] = np.inf
+    df.index.name = "snapshot"
+    return df.reset_index()
+
+
+def make_profile(hours: int) -> pd.DataFrame:
+    """Synthetic hourly load profile."""
+    rng = np.random.default_rng(1)
+    index = pd.date_range("2024-04-01", periods=hours, freq="h")
+    return pd.DataFrame({
+        "DateTime": index,
+        "Demand_MW": np.round(3000 + 800 * rng.random(hours), 3),
+        "Fiscal_Year": np.where(index.month >= 4, index.year + 1, index.year),
+        "Month": index.month,
+    })
+
+
+def old_records(df: pd.DataFrame):
+    df = df.replace([float("inf"), float("-inf")], None)
+    df = df.where(df.notna(), None)
+    return df.to_dict("records")
+
+
+def build_app(dispatch: pd.DataFrame, profile: pd.DataFrame, new: bool) -> FastAPI:
+    """The two payloads served the old way or the new way."""
+    if new:
+        app = FastAPI(default_response_class=NumpyJSONResponse)
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+        router = APIRouter(route_class=FastJSONRoute)
+        records = lambda df: df.to_dict("records")
+    else:
+        app = FastAPI()
+        router = APIRouter()
+        records = old_records
+
+    @router.get("/dispatch")
+    async def get_dispatch():
+        return {"success": True, "data": records(dispatch)}
+
+    @router.get("/profile")
+    async def get_profile():
+        rows = profile.astype({"DateTime": str}).to_dict("records")
+        return {"success": True, "data": rows}
+
+    app.include_router(router)
+    return app
+
+
+def time_call(fn, repeat: int):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(timings)
+
+
+async def measure_endpoint(app: FastAPI, path: str, accept_encoding: str, repeat: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        timings = []
+        wire_bytes = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = await client.get(path, headers={"Accept-Encoding": accept_encoding})
+            timings.append((time.perf_counter() - start) * 1000)
+            wire_bytes = int(response.headers.get("content-length", len(response.content)))
+            response.raise_for_status()
+        return wire_bytes, statistics.median(timings), response.headers.get("content-encoding", "identity")
+
+
+def serializer_table(name: str, df: pd.DataFrame, repeat: int):
+    def old():
+        return JSONResponse(jsonable_encoder({"data": old_records(df)})).body
+
+    def new():
+        return dumps({"data": df.to_dict("records")})
+
+    old_body, old_ms = time_call(old, repeat)
+    new_body, new_ms = time_call(new, repeat)
+    print(f"\n[{name}] serialization ({len(df)} rows x {df.shape[1]} columns)")
+    print(f"  old  replace/where + jsonable_encoder + json.dumps  {len(old_body):>11,d} B  {old_ms:8.1f} ms")
+    print(f"  new  to_dict + {'orjson' if ORJSON_AVAILABLE else 'json'} serializer"
+          f"{'':18s}{len(new_body):>11,d} B  {new_ms:8.1f} ms  ({old_ms / new_ms:.1f}x faster)")
+
+    encodings = ["gzip"] + (["br"] if BROTLI_AVAILABLE else [])
+    for encoding in encodings:
+        compressed, ms = time_call(lambda: compress_body(new_body, encoding), repeat)
+        print(f"  {encoding:4s} compressed{'':34s}{len(compressed):>11,d} B  {ms:8.1f} ms  "
+              f"({len(new_body) / len(compressed):.1f}x smaller)")
+
+
+async def endpoint_table(dispatch: pd.DataFrame, profile: pd.DataFrame, repeat: int):
+    old_app = build_app(dispatch, profile, new=False)
+    new_app = build_app(dispatch, profile, new=True)
+    accept = "gzip, br" if BROTLI_AVAILABLE else "gzip"
+    print("\nEnd-to-end (ASGI, median per request)")
+    for path in ("/dispatch", "/profile"):
+        old_bytes, old_ms, _ = await measure_endpoint(old_app, path, accept, repeat)
+        new_bytes, new_ms, encoding = await measure_endpoint(new_app, path, accept, repeat)
+        print(f"  {path:10s} old {old_bytes:>11,d} B {old_ms:8.1f} ms | new ({encoding}) "
+              f"{new_bytes:>10,d} B {new_ms:8.1f} ms | saved {old_bytes - new_bytes:,d} B, {old_ms - new_ms:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure JSON serialization and compression savings")
+    parser.add_argument("--years", type=int, default=1, help="Years of hourly data per payload")
+    parser.add_argument("--carriers", type=int, default=12, help="Dispatch columns")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per measurement")
+    args = parser.parse_args()
+
+    hours = 8760 * args.years
+    dispatch = make_dispatch(hours, args.carriers)
+    profile = make_profile(hours)
+    print(f"orjson: {'yes' if ORJSON_AVAILABLE else 'no (stdlib fallback)'}, "
+          f"brotli: {'yes' if BROTLI_AVAILABLE else 'no (gzip only)'}")
+
+    serializer_table("dispatch", dispatch, args.repeat)
+    serializer_table("profile", profile, args.repeat)
+    asyncio.run(endpoint_table(dispatch, profile, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,10 +17,13 @@ Migrated: FastAPI (Python)
 Maintained: 100% API compatibility with existing frontend
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+from pathlib import Path
 import logging
+import sys
 
 # Import route modules
 from routers import (
@@ -40,9 +43,16 @@ from routers import (
     pypsa_comprehensive_routes,
     pypsa_plot_routes,
     pypsa_multi_period_routes,
-    pypsa_model_routes
+    pypsa_model_routes,
+    job_routes
 )
 
+sys.path.append(str(Path(__file__).parent / "models"))
+from execution_pools import PoolSaturatedError, get_execution_pools
+from project_watcher import stop_watching
+from json_responses import NumpyJSONResponse
+from response_compression import CompressionMiddleware
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -65,6 +75,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("🛑 Shutting down KSEB FastAPI Backend...")
+    stop_watching()
+    get_execution_pools().shutdown(wait=False)
 
 
 # Initialize FastAPI application
@@ -74,6 +86,7 @@ app = FastAPI(
     version="2.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=NumpyJSONResponse,
     lifespan=lifespan
 )
 
@@ -87,6 +100,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON/text responses of 1 KB and more (gzip, or brotli when available)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, error: PoolSaturatedError):
+    """Answer requests that find their execution pool full with 503."""
+    logger.warning(f"⚠️ {error}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"Server busy ({error.pool_name}); please retry shortly."},
+        headers={"Retry-After": "5"}
+    )
+
+
 # Register all route modules under /project prefix
 # This maintains compatibility with the existing frontend
 app.include_router(project_routes.router, prefix="/project", tags=["Project Management"])
@@ -106,6 +134,7 @@ app.include_router(pypsa_comprehensive_routes.router, prefix="/project", tags=["
 app.include_router(pypsa_plot_routes.router, prefix="/project", tags=["PyPSA Visualizations"])
 app.include_router(pypsa_multi_period_routes.router, prefix="/project", tags=["PyPSA Multi-Period"])
 app.include_router(pypsa_model_routes.router, prefix="/project", tags=["PyPSA Model"])
+app.include_router(job_routes.router, prefix="/project", tags=["Background Jobs"])
 
 
 @app.get("/", tags=["Root"])
@@ -136,6 +165,18 @@ async def health_check():
     return {"status": "healthy", "service": "kseb-fastapi-backend"}
 
 
+@app.get("/health/pools", tags=["Health"])
+async def execution_pool_stats():
+    """
+    Queue depth and timing metrics of the execution pools that run
+    blocking work (workbook IO, network loading, analytics).
+
+    Returns:
+        dict: Per-pool statistics
+    """
+    return {"success": True, "pools": get_execution_pools().get_stats()}
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,184 @@
+"""
+Availability Profiles
+=====================
+
+Per-technology availability profiles (P_max_pu / P_min_pu input sheets)
+aligned to model snapshots.
+
+The input sheets hold one row per technology and one column per timestamp,
+usually a single reference year of hourly values. Model snapshots cover
+other years (a single fiscal year, or several investment periods). A
+profile is parsed once per run into a float32 array and aligned to a whole
+snapshot set in one vectorized step:
+
+- snapshots inside the profile's time span take the value at the latest
+  profile timestamp at or before them (forward fill, as before)
+- snapshots outside it are moved into the profile's year cycle by month,
+  day and time of day, so every modelled year sees the reference year's
+  shape; Feb 29 maps to Feb 28 when the reference year has no leap day
+- snapshots that still find no value, and missing values, get the
+  profile's default (1.0 for P_max_pu, 0.0 for P_min_pu)
+
+Features:
+- float32 matrices (half the memory of float64 frames)
+- One alignment per snapshot set, cached and shared by every builder step
+- Column selection by technology for expanding to individual generators
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import hashlib
+import logging
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+_SECONDS_PER_DAY = 86400
+
+
+def _cycle_key(timestamps: pd.DatetimeIndex) -> np.ndarray:
+    """Sortable (month, day, time of day) key of timestamps."""
+    seconds = (timestamps - timestamps.normalize()).total_seconds().to_numpy()
+    return (timestamps.month.to_numpy() * 32 + timestamps.day.to_numpy()) * _SECONDS_PER_DAY + seconds
+
+
+def align_to_cycle(timestamps, cycle_start) -> pd.DatetimeIndex:
+    """
+    Timestamps moved into the one-year cycle starting at ``cycle_start``.
+
+    Month, day and time of day are kept; the year becomes the cycle's
+    start year, or the next one for dates before the start's month/day.
+    Feb 29 becomes Feb 28 in years without a leap day.
+
+    Parameters
+    ----------
+    timestamps : array-like of datetime
+        Timestamps to move
+    cycle_start : datetime
+        First timestamp of the reference cycle (e.g. 2025-04-01 00:00)
+
+    Returns
+    -------
+    pd.DatetimeIndex
+        Aligned timestamps, same length and order as the input
+    """
+    timestamps = pd.DatetimeIndex(timestamps)
+    cycle_start = pd.Timestamp(cycle_start)
+    start_key = _cycle_key(pd.DatetimeIndex([cycle_start]))[0]
+
+    years = cycle_start.year + (_cycle_key(timestamps) < start_key).astype(np.int64)
+    months = timestamps.month.to_numpy()
+    days = timestamps.day.to_numpy()
+    leap = (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+    days = np.where((months == 2) & (days == 29) & ~leap, 28, days)
+
+    dates = pd.to_datetime(pd.DataFrame({'year': years, 'month': months, 'day': days}))
+    return pd.DatetimeIndex(dates + (timestamps - timestamps.normalize()))
+
+
+class AvailabilityProfiles:
+    """
+    Technology profiles of one input sheet, aligned to snapshot sets.
+
+    Parameters
+    ----------
+    sheet : pd.DataFrame
+        Input sheet: a 'name' column (technology) and one column per
+        timestamp
+    default : float
+        Value for snapshots or entries without data
+    label : str
+        Sheet label used in log messages
+    """
+
+    def __init__(self, sheet: pd.DataFrame, default: float, label: str = "profile"):
+        self.default = float(default)
+        self.label = label
+
+        table = sheet.set_index('name').T
+        table = table.loc[:, ~table.columns.duplicated()]
+        times = pd.to_datetime(table.index)
+        order = np.argsort(times.to_numpy(), kind='stable')
+
+        self.technologies = pd.Index(table.columns)
+        self.times = times.to_numpy()[order]
+        self.values = (table.apply(pd.to_numeric, errors='coerce')
+                       .to_numpy(dtype=np.float32)[order])
+        if len(self.times) > 1:
+            self.step = np.median(np.diff(self.times))
+        else:
+            self.step = np.timedelta64(1, 'h')
+        self._aligned: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.technologies)
+
+    def positions(self, timestamps) -> np.ndarray:
+        """
+        Profile row used for each timestamp (-1 where none applies).
+
+        Forward fill inside the profile's span, calendar alignment into the
+        profile's first year outside it.
+        """
+        timestamps = pd.DatetimeIndex(timestamps)
+        if len(self.times) == 0:
+            return np.full(len(timestamps), -1, dtype=np.int64)
+
+        first, end = self.times[0], self.times[-1] + self.step
+        targets = timestamps.to_numpy().astype(self.times.dtype)
+        outside = (targets < first) | (targets >= end)
+        if outside.any():
+            aligned = align_to_cycle(timestamps[outside], pd.Timestamp(first))
+            targets = targets.copy()
+            targets[outside] = aligned.to_numpy().astype(self.times.dtype)
+
+        rows = np.searchsorted(self.times, targets, side='right') - 1
+        rows[(targets < first) | (targets >= end)] = -1
+        return rows
+
+    def matrix(self, timestamps) -> np.ndarray:
+        """
+        Profile values for a snapshot set (snapshots x technologies, float32).
+
+        The alignment is computed once per distinct snapshot set; callers
+        get the shared array and must not modify it.
+        """
+        timestamps = pd.DatetimeIndex(timestamps)
+        key = hashlib.blake2b(timestamps.asi8.tobytes(), digest_size=16).hexdigest()
+        aligned = self._aligned.get(key)
+        if aligned is None:
+            rows = self.positions(timestamps)
+            aligned = np.full((len(timestamps), len(self.technologies)), self.default, dtype=np.float32)
+            found = rows >= 0
+            aligned[found] = self.values[rows[found]]
+            aligned[np.isnan(aligned)] = self.default
+            aligned.setflags(write=False)
+            self._aligned[key] = aligned
+            logger.debug(f"Aligned {self.label} to {len(timestamps)} snapshots "
+                         f"({int((~found).sum())} without profile data)")
+        return aligned
+
+    def select(self, timestamps, technologies) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Profile columns for a list of component technologies.
+
+        Parameters
+        ----------
+        timestamps : array-like of datetime
+            Snapshot timestamps
+        technologies : array-like
+            Technology of each component
+
+        Returns
+        -------
+        tuple
+            (mask of components that have a profile,
+             snapshots x those components float32 array)
+        """
+        columns = self.technologies.get_indexer(pd.Index(technologies))
+        has_profile = columns >= 0
+        return has_profile, self.matrix(timestamps)[:, columns[has_profile]]
@@ -0,0 +1,156 @@
+"""
+Columnar Request Payloads
+=========================
+
+Alternative, column-oriented encoding for tabular request data that is
+accepted alongside the row format (List[Dict[str, Any]]):
+
+    {"columns": ["Year", "Electricity", "GDP"],
+     "values": {"Year": [2019, 2020], "Electricity": [1.0, 2.0], "GDP": [3.0, null]}}
+
+or an Arrow IPC stream, base64 encoded:
+
+    {"arrowIpc": "<base64>"}
+
+Each column is validated once (type and length) and converted to a typed
+NumPy array, instead of Pydantic validating every row dict and the engine
+rebuilding and coercing DataFrames cell by cell.
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import base64
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+
+def _column_array(values: list) -> np.ndarray:
+    """Typed array for one column: float64 when every value is numeric/null, else object."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.asarray(values, dtype=object)
+
+
+class ColumnarData(BaseModel):
+    """Column-oriented table: column names plus one value list per column, or Arrow IPC bytes."""
+
+    columns: Optional[List[str]] = Field(None, description="Ordered column names")
+    values: Optional[Dict[str, Any]] = Field(None, description="Column name -> list of values")
+    arrowIpc: Optional[str] = Field(None, description="Base64 encoded Arrow IPC stream")
+
+    _arrays: Dict[str, np.ndarray] = PrivateAttr(default_factory=dict)
+
+    @model_validator(mode='after')
+    def _validate_columns(self):
+        if self.arrowIpc is not None:
+            self._load_arrow()
+        if self.columns is None or self.values is None:
+            raise ValueError("Columnar data requires 'columns' and 'values' (or 'arrowIpc')")
+        if len(set(self.columns)) != len(self.columns):
+            raise ValueError("Duplicate column names in columnar data")
+
+        missing = [c for c in self.columns if c not in self.values]
+        if missing:
+            raise ValueError(f"Columns without values: {missing}")
+
+        length = None
+        arrays = {}
+        for column in self.columns:
+            col_values = self.values[column]
+            if not isinstance(col_values, list):
+                raise ValueError(f"Values of column '{column}' must be a list")
+            if length is None:
+                length = len(col_values)
+            elif len(col_values) != length:
+                raise ValueError(
+                    f"Column '{column}' has {len(col_values)} values, expected {length}"
+                )
+            arrays[column] = _column_array(col_values)
+        self._arrays = arrays
+        return self
+
+    def _load_arrow(self):
+        if not ARROW_AVAILABLE:
+            raise ValueError("Arrow IPC payloads require pyarrow to be installed")
+        try:
+            buffer = base64.b64decode(self.arrowIpc)
+            table = pa.ipc.open_stream(buffer).read_all()
+        except Exception as e:
+            raise ValueError(f"Invalid Arrow IPC payload: {e}")
+        self.columns = list(table.column_names)
+        self.values = {name: table.column(name).to_pylist() for name in self.columns}
+        self.arrowIpc = None
+
+    def __len__(self) -> int:
+        if not self.columns:
+            return 0
+        return len(self._arrays[self.columns[0]])
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Typed column arrays (float64 for numeric columns, object otherwise)."""
+        return self._arrays
+
+    def is_numeric(self, column: str) -> bool:
+        """Whether every non-null value of the column is numeric."""
+        return self._arrays[column].dtype == np.float64
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame built directly from the typed column arrays."""
+        return pd.DataFrame({c: self._arrays[c] for c in self.columns}, columns=self.columns)
+
+    def to_payload(self) -> Dict[str, Any]:
+        """Plain {'columns', 'values'} dict for JSON configuration files."""
+        return {"columns": list(self.columns), "values": {c: self.values[c] for c in self.columns}}
+
+
+TableData = Union[List[Dict[str, Any]], ColumnarData]
+
+
+def table_length(data: TableData) -> int:
+    """Number of rows in a row-list or columnar table."""
+    return len(data)
+
+
+def table_columns(data: TableData) -> Dict[str, list]:
+    """
+    Column name -> list of values for either payload format.
+
+    Row payloads take their column order from the first row (missing keys
+    become None), matching how the row-based endpoints behave.
+    """
+    if isinstance(data, ColumnarData):
+        return {c: data.values[c] for c in data.columns}
+    if not data:
+        return {}
+    keys = list(data[0].keys())
+    return {key: [row.get(key) for row in data] for key in keys}
+
+
+def table_to_frame(data: TableData) -> pd.DataFrame:
+    """DataFrame for either payload format."""
+    if isinstance(data, ColumnarData):
+        return data.to_frame()
+    return pd.DataFrame(data)
+
+
+def table_to_config(data: TableData):
+    """JSON-serialisable form to hand to a subprocess (rows stay rows)."""
+    if isinstance(data, ColumnarData):
+        return data.to_payload()
+    return data
+
+
+def is_columnar_payload(data: Any) -> bool:
+    """Whether a plain (already JSON-decoded) value is a {'columns', 'values'} table."""
+    return isinstance(data, dict) and 'columns' in data and 'values' in data
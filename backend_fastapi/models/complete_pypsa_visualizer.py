@@ -20,6 +20,8 @@ from typing import Dict, List, Optional, Union, Any, Tuple
 from datetime import datetime
 from pathlib import Path
 
+from downsampling import envelope_indices
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -102,7 +104,8 @@ class CompletePyPSAVisualizer:
                      stacked: bool = True,
                      show_storage: bool = True,
                      show_load: bool = True,
-                     period: Optional[int] = None) -> go.Figure:
+                     period: Optional[int] = None,
+                     max_points: Optional[int] = None) -> go.Figure:
         """
         Complete dispatch plot with all filters.
 
@@ -124,6 +127,8 @@ class CompletePyPSAVisualizer:
             Show load line
         period : int, optional
             For multi-period, filter by period (e.g., year)
+        max_points : int, optional
+            Downsample the traces to at most this many time points
 
         Returns
         -------
@@ -227,6 +232,9 @@ class CompletePyPSAVisualizer:
                     line=dict(color='black', width=2.5, dash='solid')
                 ))
 
+        if max_points:
+            self._downsample_traces(fig, len(time_index), max_points)
+
         fig.update_layout(
             title=f'Power System Dispatch ({resolution})',
             xaxis_title='Time',
@@ -899,6 +907,39 @@ class CompletePyPSAVisualizer:
                         line=dict(width=1, color='#005B5B')
                     ))
 
+    def _downsample_traces(self, fig, n_points: int, max_points: int):
+        """
+        Cut the traces of a time series figure to shared time points.
+
+        Points are chosen from the min/max envelope of the stack top (sum
+        of stacked traces) and of every unstacked line, so stacked areas
+        stay aligned and peaks remain visible. Traces of another length
+        are left unchanged.
+        """
+        if n_points <= max_points:
+            return
+
+        traces = [t for t in fig.data if t.y is not None and len(t.y) == n_points]
+        if not traces:
+            return
+
+        stack_top = np.zeros(n_points)
+        references = []
+        for trace in traces:
+            values = pd.to_numeric(pd.Series(np.asarray(trace.y)), errors='coerce').to_numpy(dtype=float)
+            if trace.stackgroup:
+                stack_top += np.nan_to_num(values)
+            else:
+                references.append(values)
+        if any(t.stackgroup for t in traces):
+            references.insert(0, stack_top)
+
+        positions = envelope_indices(np.column_stack(references), max_points)
+        for trace in traces:
+            trace.y = np.asarray(trace.y)[positions]
+            if trace.x is not None and len(trace.x) == n_points:
+                trace.x = np.asarray(trace.x)[positions]
+
     def _get_load_data(self, time_index, resolution, period):
         """Get load data."""
         if not hasattr(self.n, 'loads_t'):
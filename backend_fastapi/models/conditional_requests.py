@@ -0,0 +1,143 @@
+"""
+Conditional Requests
+====================
+
+ETag validation for read-only endpoints.
+
+Responses of the read endpoints are pure functions of some project files
+(a load profile workbook, a network file, a scenario folder) and of the
+request's query parameters. The ETag dependency below derives a validator
+from exactly those inputs, before the handler runs:
+
+- a request whose If-None-Match matches gets 304 Not Modified without the
+  workbook or network ever being opened;
+- otherwise the handler runs as usual and the response carries the ETag
+  (and ``Cache-Control: no-cache``, so clients always revalidate instead
+  of trusting a blind max-age).
+
+Usage in a router:
+
+    profile_etag = Depends(FileETag(project_files("results/load_profiles/{profileName}.xlsx")))
+
+    @router.get("/full-load-profile", dependencies=[profile_etag])
+
+Features:
+- Weak ETags (identical for gzip, brotli and identity bodies)
+- Handles ``*``, lists and weak/strong forms in If-None-Match
+- No ETag when the source files are missing (the handler reports 404)
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import logging
+from pathlib import Path
+from typing import Callable, Iterable, Mapping, Optional
+
+from fastapi import HTTPException, Request, Response
+
+from file_fingerprints import paths_digest
+
+logger = logging.getLogger(__name__)
+
+# Bump when response formats change, so clients drop validators of old payloads
+ETAG_VERSION = "1"
+
+
+def compute_etag(paths: Iterable, scope: str, params: Iterable = ()) -> Optional[str]:
+    """
+    Weak ETag for a response derived from files and request parameters.
+
+    Parameters
+    ----------
+    paths : iterable of str or Path
+        Files or directories the response is computed from
+    scope : str
+        Request path (distinguishes endpoints over the same files)
+    params : iterable
+        (name, value) query parameters
+
+    Returns
+    -------
+    str or None
+        ETag header value, or None if none of the paths exists
+    """
+    digest = paths_digest(paths, extra=[ETAG_VERSION, scope, *sorted(params)])
+    return f'W/"{digest}"' if digest else None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class FileETag:
+    """
+    FastAPI dependency answering conditional GETs from file fingerprints.
+
+    Parameters
+    ----------
+    resolve_paths : callable
+        Maps the request's path and query parameters to the files or
+        directories the response depends on. A missing parameter
+        (KeyError) disables the ETag for that request.
+    cache_control : str
+        Cache-Control value sent with ETagged responses
+    """
+
+    def __init__(self, resolve_paths: Callable[[Mapping[str, str]], Iterable[Path]],
+                 cache_control: str = "no-cache"):
+        self.resolve_paths = resolve_paths
+        self.cache_control = cache_control
+
+    async def __call__(self, request: Request, response: Response) -> Optional[str]:
+        params = {**request.query_params, **request.path_params}
+        try:
+            paths = list(self.resolve_paths(params))
+            etag = compute_etag(paths, request.url.path, request.query_params.multi_items())
+        except (KeyError, TypeError, ValueError, OSError):
+            return None
+        if etag is None:
+            return None
+
+        headers = {"ETag": etag, "Cache-Control": self.cache_control}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers=headers)
+
+        response.headers.update(headers)
+        return etag
+
+
+def project_files(*templates: str) -> Callable[[Mapping[str, str]], list]:
+    """
+    Path resolver for files or folders under the project root.
+
+    Templates are '/'-separated paths relative to ``projectPath``;
+    ``{param}`` placeholders are filled from the request parameters.
+
+        project_files("results/load_profiles/{profileName}.xlsx")
+    """
+    def resolve(params: Mapping[str, str]) -> list:
+        root = Path(params["projectPath"])
+        paths = []
+        for template in templates:
+            path = root
+            for part in template.split("/"):
+                component = part.format(**params)
+                if not component or ".." in component or "/" in component or "\\" in component:
+                    raise ValueError(f"Invalid path component: {component}")
+                path = path / component
+            paths.append(path)
+        return paths
+    return resolve
@@ -0,0 +1,202 @@
+"""
+Correlation Engine
+==================
+
+Vectorized pairwise-complete correlation for the correlation analysis
+endpoints.
+
+Columns are coerced once into a float matrix with NaN for missing values.
+Pearson coefficients for all variable pairs then come from a handful of
+masked matrix products: for every pair only the rows where both variables
+are present are used, without materialising per-pair value lists.
+
+Features:
+- Numeric column detection for row and columnar payloads
+- Pairwise-complete Pearson for all pairs at once (symmetric, one pass)
+- Spearman rank correlation on request (columns ranked once)
+- Correlation of every variable against a single target column
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+from typing import Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from columnar_payload import ColumnarData, table_columns
+
+CORRELATION_METHODS = ('pearson', 'spearman')
+
+
+def _numeric_column(values: List[Any]):
+    """Float array (NaN for nulls) if every non-null value converts to float, else None."""
+    arr = np.asarray(values, dtype=object)
+    present = np.array([v is not None for v in values], dtype=bool)
+    out = np.full(len(arr), np.nan)
+    try:
+        out[present] = arr[present].astype(float)
+    except (ValueError, TypeError):
+        return None
+    return out
+
+
+def numeric_matrix(data) -> Tuple[List[str], np.ndarray]:
+    """
+    Numeric columns of a table as a float matrix.
+
+    Parameters
+    ----------
+    data : list of dict or ColumnarData
+        Request table; a column is numeric when all its non-null values
+        convert to float
+
+    Returns
+    -------
+    (list of str, np.ndarray)
+        Numeric column names in column order and the (n, k) matrix with
+        NaN for missing values
+    """
+    names, columns = [], []
+    if isinstance(data, ColumnarData):
+        arrays = data.arrays()
+        for name in data.columns:
+            if data.is_numeric(name):
+                names.append(name)
+                columns.append(arrays[name])
+    else:
+        for name, values in table_columns(data).items():
+            column = _numeric_column(values)
+            if column is not None:
+                names.append(name)
+                columns.append(column)
+
+    if not columns:
+        return names, np.empty((len(data), 0))
+    return names, np.column_stack(columns).astype(float)
+
+
+def pairwise_pearson(X: np.ndarray, Y: np.ndarray = None) -> np.ndarray:
+    """
+    Pairwise-complete Pearson correlation between the columns of X and Y.
+
+    For each pair (i, j) only rows where both X[:, i] and Y[:, j] are
+    present are used. Pairs with fewer than two common rows or zero
+    variance get 0.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        (n, k) matrix with NaN for missing values
+    Y : np.ndarray, optional
+        (n, m) matrix; defaults to X
+
+    Returns
+    -------
+    np.ndarray
+        (k, m) correlation matrix
+    """
+    X = np.asarray(X, dtype=float)
+    Y = X if Y is None else np.asarray(Y, dtype=float)
+
+    # Correlation is shift invariant: centring each column first keeps the
+    # raw-moment sums below well conditioned (e.g. for Year columns)
+    def centred(M):
+        mask = ~np.isnan(M)
+        means = np.where(mask, M, 0.0).sum(axis=0) / np.maximum(mask.sum(axis=0), 1)
+        return np.where(mask, M - means, 0.0), mask.astype(float)
+
+    Zx, Mx = centred(X)
+    Zy, My = (Zx, Mx) if Y is X else centred(Y)
+
+    n = Mx.T @ My                       # common rows per pair
+    sx = Zx.T @ My                      # sum of x over common rows
+    sy = Mx.T @ Zy                      # sum of y over common rows
+    sxx = (Zx * Zx).T @ My
+    syy = Mx.T @ (Zy * Zy)
+    sxy = Zx.T @ Zy
+
+    numerator = n * sxy - sx * sy
+    var_x = n * sxx - sx * sx
+    var_y = n * syy - sy * sy
+    with np.errstate(invalid='ignore', divide='ignore'):
+        denominator = np.sqrt(np.clip(var_x, 0.0, None) * np.clip(var_y, 0.0, None))
+        # Treat variances at rounding-noise level as zero
+        scale = np.maximum(n * sxx, 1e-300) * np.maximum(n * syy, 1e-300)
+        valid = (n >= 2) & (denominator > 0) & (denominator * denominator > 1e-24 * scale)
+        r = np.where(valid, numerator / np.where(valid, denominator, 1.0), 0.0)
+    return np.clip(r, -1.0, 1.0)
+
+
+def _rank_columns(X: np.ndarray) -> np.ndarray:
+    """Average ranks per column, NaN kept."""
+    return pd.DataFrame(X).rank(method='average').to_numpy(dtype=float)
+
+
+def pairwise_spearman(X: np.ndarray, Y: np.ndarray = None) -> np.ndarray:
+    """
+    Spearman rank correlation with pairwise-complete rows.
+
+    Each column is ranked once over its own present values (average ranks
+    for ties) and the ranks are correlated with pairwise_pearson. Without
+    missing values this is exactly Spearman's rho; with missing values the
+    ranks are not recomputed per pair, which keeps the cost at a few matrix
+    products instead of one ranking per variable pair.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        (n, k) matrix with NaN for missing values
+    Y : np.ndarray, optional
+        (n, m) matrix; defaults to X
+
+    Returns
+    -------
+    np.ndarray
+        (k, m) correlation matrix
+    """
+    ranks_x = _rank_columns(np.asarray(X, dtype=float))
+    if Y is None:
+        return pairwise_pearson(ranks_x)
+    return pairwise_pearson(ranks_x, _rank_columns(np.asarray(Y, dtype=float)))
+
+
+def correlation_matrix(X: np.ndarray, method: str = 'pearson') -> np.ndarray:
+    """
+    Correlation of all column pairs of X.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        (n, k) matrix with NaN for missing values
+    method : str
+        'pearson' or 'spearman'
+
+    Returns
+    -------
+    np.ndarray
+        Symmetric (k, k) matrix
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unsupported correlation method '{method}'. Use one of {list(CORRELATION_METHODS)}")
+    if method == 'spearman':
+        return pairwise_spearman(X)
+    return pairwise_pearson(X)
+
+
+def correlation_with(X: np.ndarray, target: np.ndarray, method: str = 'pearson') -> np.ndarray:
+    """
+    Correlation of every column of X with a single target column.
+
+    Returns
+    -------
+    np.ndarray
+        (k,) correlations
+    """
+    if method not in CORRELATION_METHODS:
+        raise ValueError(f"Unsupported correlation method '{method}'. Use one of {list(CORRELATION_METHODS)}")
+    target = np.asarray(target, dtype=float).reshape(-1, 1)
+    if method == 'spearman':
+        return pairwise_spearman(X, target)[:, 0]
+    return pairwise_pearson(X, target)[:, 0]
@@ -0,0 +1,280 @@
+"""
+Downsampling
+============
+
+Point reduction for long time series sent to charts.
+
+Hourly profiles and dispatch results have 8,760 points per year (131,400
+for a 15-year horizon), far more than a chart has pixels. These functions
+pick a subset of row positions that keeps the visual shape, peaks
+included, so endpoints can return a few thousand points instead.
+
+Methods:
+- LTTB (largest-triangle-three-buckets) for single lines, with a
+  vectorized min/max preselection (MinMaxLTTB), so the sequential LTTB
+  pass only visits a few candidates per output point
+- Min/max envelope for several series that must share one index
+  (stacked areas, multi-bus price lines): every bucket keeps the rows
+  where each reference series reaches its minimum and maximum
+
+All selections are sorted row positions that always include the first
+and last row; NaN values are never preferred over real ones.
+
+Features:
+- Works on numpy arrays, pandas DataFrames and column dicts
+- Numeric or datetime64 x values (irregular spacing supported by LTTB)
+- Milliseconds for a million points
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import warnings
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Candidates preselected per output point before the LTTB pass
+MINMAX_RATIO = 4
+
+METHODS = ('lttb', 'envelope', 'range')
+
+
+def _as_float(values) -> np.ndarray:
+    """Values as float64 (datetime64 as seconds since the first value)."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        nanoseconds = values.astype('datetime64[ns]').astype(np.int64)
+        return (nanoseconds - nanoseconds[0]) / 1e9
+    return values.astype(np.float64, copy=False)
+
+
+def _bucket_extremes(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Positions of the minimum and maximum of each bucket of ``y[1:-1]``.
+
+    Buckets hold an equal number of rows (the last one may be shorter);
+    the result contains positions into ``y``, unsorted and possibly
+    repeated. Works on views, copying only when NaNs must be masked.
+    """
+    interior = y[1:-1]
+    size = -(-len(interior) // n_buckets)
+    n_full = len(interior) // size
+
+    if np.isnan(interior).any():
+        high = np.where(np.isnan(interior), -np.inf, interior)
+        low = np.where(np.isnan(interior), np.inf, interior)
+    else:
+        high = low = interior
+
+    offsets = np.arange(n_full) * size + 1
+    picked = [
+        high[:n_full * size].reshape(n_full, size).argmax(axis=1) + offsets,
+        low[:n_full * size].reshape(n_full, size).argmin(axis=1) + offsets,
+    ]
+    if n_full * size < len(interior):
+        tail = n_full * size
+        picked.append(np.array([high[tail:].argmax() + tail + 1, low[tail:].argmin() + tail + 1]))
+    return np.concatenate(picked)
+
+
+def minmax_indices(y, n_out: int) -> np.ndarray:
+    """
+    Positions of bucket minima and maxima of one series.
+
+    Parameters
+    ----------
+    y : array-like
+        Series values
+    n_out : int
+        Maximum number of positions to return (at least 4)
+
+    Returns
+    -------
+    np.ndarray
+        Sorted unique positions, including the first and last row
+    """
+    y = _as_float(y)
+    n = len(y)
+    if n <= n_out:
+        return np.arange(n)
+    n_buckets = max((n_out - 2) // 2, 1)
+    picked = _bucket_extremes(y, n_buckets)
+    return np.unique(np.concatenate([[0, n - 1], picked]))
+
+
+def envelope_indices(values, n_out: int) -> np.ndarray:
+    """
+    Shared positions keeping the min/max envelope of several series.
+
+    Each reference series (column) contributes its bucket minimum and
+    maximum; the union is returned, so all series can be cut to the same
+    rows. For stacked areas pass the stack top (row total) and any line
+    drawn over it; for lines on one axis pass the series themselves or
+    their row-wise max and min.
+
+    Parameters
+    ----------
+    values : array-like
+        1-D series or 2-D array (rows x reference series)
+    n_out : int
+        Maximum number of positions to return
+
+    Returns
+    -------
+    np.ndarray
+        Sorted unique positions, including the first and last row
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        return minmax_indices(values, n_out)
+    n, k = values.shape
+    if n <= n_out:
+        return np.arange(n)
+    n_buckets = max((n_out - 2) // (2 * max(k, 1)), 1)
+    columns = np.asfortranarray(_as_float(values))
+    picked = [_bucket_extremes(columns[:, j], n_buckets) for j in range(k)]
+    return np.unique(np.concatenate([[0, n - 1]] + picked))
+
+
+def lttb_indices(y, n_out: int, x=None) -> np.ndarray:
+    """
+    Largest-triangle-three-buckets selection for one line.
+
+    The series is first reduced to MINMAX_RATIO candidates per output
+    point with vectorized bucket extremes; LTTB then keeps, per bucket,
+    the candidate forming the largest triangle with the previously kept
+    point and the average of the next bucket.
+
+    Parameters
+    ----------
+    y : array-like
+        Series values
+    n_out : int
+        Number of positions to return (at least 3)
+    x : array-like, optional
+        Numeric or datetime64 x values (row positions if omitted)
+
+    Returns
+    -------
+    np.ndarray
+        Sorted positions, including the first and last row
+    """
+    y = _as_float(y)
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64) if x is None else _as_float(x)
+
+    candidates = minmax_indices(y, n_out * MINMAX_RATIO) if n > n_out * MINMAX_RATIO else np.arange(n)
+    inner = candidates[1:-1]
+    n_buckets = n_out - 2
+    if len(inner) <= n_buckets:
+        return candidates
+
+    # Candidate buckets and their x/y averages (the "third" triangle vertex)
+    bounds = np.linspace(0, len(inner), n_buckets + 1).astype(np.int64)
+    cx, cy = x[inner], y[inner]
+    valid = ~np.isnan(cy)
+    counts = np.add.reduceat(valid.astype(np.int64), bounds[:-1])
+    sum_x = np.add.reduceat(np.where(valid, cx, 0.0), bounds[:-1])
+    sum_y = np.add.reduceat(np.where(valid, cy, 0.0), bounds[:-1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_x = np.where(counts > 0, sum_x / counts, cx[bounds[:-1]])
+        avg_y = np.where(counts > 0, sum_y / counts, np.nan)
+    avg_x = np.append(avg_x, x[-1])
+    avg_y = np.append(avg_y, y[-1])
+
+    cx_list, cy_list, bounds_list = cx.tolist(), cy.tolist(), bounds.tolist()
+    avg_x_list, avg_y_list = avg_x.tolist(), avg_y.tolist()
+    selected = [0]
+    ax, ay = float(x[0]), float(y[0])
+    for b in range(n_buckets):
+        start, stop = bounds_list[b], bounds_list[b + 1]
+        bx, by = avg_x_list[b + 1], avg_y_list[b + 1]
+        best, best_area = start, -1.0
+        for i in range(start, stop):
+            area = abs((ax - bx) * (cy_list[i] - ay) - (ax - cx_list[i]) * (by - ay))
+            if area > best_area:
+                best, best_area = i, area
+        selected.append(best + 1)
+        ax, ay = cx_list[best], cy_list[best]
+        if ay != ay:
+            # Kept a NaN (whole bucket missing); anchor on the bucket average instead
+            ay = avg_y_list[b] if avg_y_list[b] == avg_y_list[b] else 0.0
+    selected.append(len(candidates) - 1)
+    return candidates[np.asarray(selected)]
+
+
+def downsample_frame(df: pd.DataFrame, max_points: Optional[int], columns: Optional[Sequence[str]] = None,
+                     method: str = 'envelope', x=None) -> pd.DataFrame:
+    """
+    Rows of a DataFrame selected for charting.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Time series, one row per timestamp
+    max_points : int or None
+        Maximum rows to keep (no reduction if None or not exceeded)
+    columns : sequence of str, optional
+        Reference columns driving the selection (all numeric if None)
+    method : str
+        'envelope' (min/max of each reference column), 'range' (row-wise
+        max and min across the reference columns, for many lines on one
+        axis) or 'lttb' (first reference column)
+    x : array-like, optional
+        x values for LTTB (row positions if omitted)
+
+    Returns
+    -------
+    pd.DataFrame
+        Selected rows in their original order
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}'. Available: {list(METHODS)}")
+    if not max_points or len(df) <= max_points:
+        return df
+    reference = df[list(columns)] if columns else df.select_dtypes(include='number')
+    if reference.shape[1] == 0:
+        return df.iloc[np.linspace(0, len(df) - 1, max_points).astype(np.int64)]
+    values = reference.to_numpy(dtype=np.float64, na_value=np.nan)
+    if method == 'lttb':
+        positions = lttb_indices(values[:, 0], max_points, x)
+    elif method == 'range':
+        with np.errstate(all='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN rows
+            band = np.column_stack([np.nanmax(values, axis=1), np.nanmin(values, axis=1)])
+        positions = envelope_indices(band, max_points)
+    else:
+        positions = envelope_indices(values, max_points)
+    return df.iloc[positions]
+
+
+def downsample_columns(data: Dict[str, np.ndarray], max_points: Optional[int], value_column: str,
+                       x_column: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Columnar time series reduced with LTTB on one value column.
+
+    Parameters
+    ----------
+    data : dict
+        Column name -> equally long np.ndarray
+    max_points : int or None
+        Maximum rows to keep (no reduction if None or not exceeded)
+    value_column : str
+        Column the line shape is taken from
+    x_column : str, optional
+        Numeric or datetime column used as x (row positions if omitted)
+
+    Returns
+    -------
+    dict
+        The same columns, cut to the selected rows
+    """
+    if not max_points or value_column not in data or len(data[value_column]) <= max_points:
+        return data
+    x = data[x_column] if x_column and x_column in data else None
+    positions = lttb_indices(data[value_column], max_points, x)
+    return {name: values[positions] for name, values in data.items()}
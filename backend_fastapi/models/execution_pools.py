@@ -0,0 +1,379 @@
+"""
+Execution Pools
+===============
+
+Bounded worker pools for blocking work done on behalf of API requests.
+
+Route handlers are async, but much of their work is synchronous: openpyxl
+and pandas workbook reads, pypsa.Network loads, analysis runs and figure
+building. Run inline, any of these blocks the event loop and with it every
+other request, including /health and SSE keep-alives. Handlers hand such
+work to one of the named pools below instead, so the event loop only
+awaits results.
+
+Pools:
+- excel_io: threads for workbook reads/writes (openpyxl, pandas)
+- network_io: threads for loading PyPSA network files
+- analytics: threads for analysis and plotting on in-process (cached)
+  networks
+- analytics_process: processes for self-contained, CPU-bound analysis
+  (arguments and results must be picklable; workers keep their own caches)
+- compression: threads for gzip/brotli compression of large response bodies
+- precompute: a single thread warming caches after project files change
+
+Features:
+- Separately sized pools (overridable with KSEB_POOL_<NAME>_WORKERS)
+- Optional queue limit per pool; a full pool raises PoolSaturatedError
+  (answered with 503 by the application)
+- Per-pool queue depth, active workers, high-water marks and wait/run
+  time metrics
+- ``run_in_pool`` coroutine and ``offload`` decorator for route handlers
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when a pool's queue limit is reached."""
+
+    def __init__(self, pool_name: str, pending: int):
+        super().__init__(f"Execution pool '{pool_name}' is saturated ({pending} tasks pending)")
+        self.pool_name = pool_name
+        self.pending = pending
+
+
+@dataclass
+class PoolConfig:
+    """Size and queue limit of one execution pool."""
+    name: str
+    kind: str  # 'thread' or 'process'
+    max_workers: int
+    max_pending: Optional[int] = None
+    description: str = ""
+
+
+def _total_cpus() -> int:
+    """Number of CPUs usable by this process."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_pool_configs(total_cpus: int) -> Dict[str, PoolConfig]:
+    """
+    Default pool sizes for a machine.
+
+    Parameters
+    ----------
+    total_cpus : int
+        CPUs available to the backend
+
+    Returns
+    -------
+    dict
+        Mapping of pool name to PoolConfig
+    """
+    configs = {
+        'excel_io': PoolConfig(
+            name='excel_io', kind='thread',
+            max_workers=max(2, min(8, total_cpus)), max_pending=256,
+            description='Workbook reads and writes'
+        ),
+        'network_io': PoolConfig(
+            name='network_io', kind='thread',
+            max_workers=max(2, min(4, total_cpus // 2)), max_pending=64,
+            description='PyPSA network file loading'
+        ),
+        'analytics': PoolConfig(
+            name='analytics', kind='thread',
+            max_workers=max(2, min(4, total_cpus // 2)), max_pending=128,
+            description='Analysis and plotting on cached networks'
+        ),
+        'analytics_process': PoolConfig(
+            name='analytics_process', kind='process',
+            max_workers=max(1, min(4, total_cpus // 2)), max_pending=32,
+            description='Self-contained CPU-bound analysis'
+        ),
+        # No queue limit: compression runs in middleware, after the handler succeeded
+        'compression': PoolConfig(
+            name='compression', kind='thread',
+            max_workers=max(1, min(4, total_cpus // 2)),
+            description='Compression of large response bodies'
+        ),
+        # One worker: warming caches after file changes must not compete with requests
+        'precompute': PoolConfig(
+            name='precompute', kind='thread',
+            max_workers=1, max_pending=64,
+            description='Cache warm-up after project file changes'
+        ),
+    }
+    for config in configs.values():
+        override = os.environ.get(f"KSEB_POOL_{config.name.upper()}_WORKERS")
+        if override:
+            try:
+                config.max_workers = max(1, int(override))
+            except ValueError:
+                logger.warning(f"Ignoring invalid worker count for pool '{config.name}': {override}")
+    return configs
+
+
+class ExecutionPool:
+    """
+    A bounded thread or process pool with queue metrics.
+
+    The underlying executor is created on first use.
+    """
+
+    def __init__(self, config: PoolConfig):
+        self.config = config
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._stats = {
+            'submitted': 0,
+            'started': 0,
+            'completed': 0,
+            'failed': 0,
+            'rejected': 0,
+            'max_pending': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'total_run_seconds': 0.0,
+        }
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.config.kind == 'process':
+                    # spawn: never fork a process that is running threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.config.max_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.config.max_workers,
+                        thread_name_prefix=f"pool-{self.config.name}"
+                    )
+                logger.info(f"Execution pool '{self.config.name}' started "
+                            f"({self.config.kind}, {self.config.max_workers} workers)")
+            return self._executor
+
+    def _started(self, submitted_at: float):
+        wait = time.monotonic() - submitted_at
+        with self._lock:
+            self._active += 1
+            self._stats['started'] += 1
+            self._stats['total_wait_seconds'] += wait
+            self._stats['max_wait_seconds'] = max(self._stats['max_wait_seconds'], wait)
+
+    def _timed(self, fn: Callable, submitted_at: float) -> Callable:
+        """Wrap a thread-pool task so the pool knows when it leaves the queue."""
+        def call(*args, **kwargs):
+            self._started(submitted_at)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+        return call
+
+    def _finished(self, future: Future, submitted_at: float):
+        elapsed = time.monotonic() - submitted_at
+        with self._lock:
+            self._pending -= 1
+            self._stats['total_run_seconds'] += elapsed
+            if future.cancelled() or future.exception() is not None:
+                self._stats['failed'] += 1
+            else:
+                self._stats['completed'] += 1
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Submit a callable to the pool.
+
+        Raises
+        ------
+        PoolSaturatedError
+            If the pool's queue limit is reached
+        """
+        with self._lock:
+            if self.config.max_pending is not None and self._pending >= self.config.max_pending:
+                self._stats['rejected'] += 1
+                raise PoolSaturatedError(self.config.name, self._pending)
+            self._pending += 1
+            self._stats['submitted'] += 1
+            self._stats['max_pending'] = max(self._stats['max_pending'], self._pending)
+
+        submitted_at = time.monotonic()
+        task = fn if self.config.kind == 'process' else self._timed(fn, submitted_at)
+        try:
+            try:
+                future = self._get_executor().submit(task, *args, **kwargs)
+            except BrokenProcessPool:
+                logger.error(f"Execution pool '{self.config.name}' was broken; restarting it")
+                with self._lock:
+                    self._executor = None
+                future = self._get_executor().submit(task, *args, **kwargs)
+        except BaseException:
+            # Not queued (the retry on a restarted pool included): release the slot
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(lambda f: self._finished(f, submitted_at))
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a callable in the pool and await its result."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and timing metrics of the pool."""
+        with self._lock:
+            pending = self._pending
+            if self.config.kind == 'thread':
+                active = self._active
+            else:
+                # Process workers cannot report back cheaply; estimate from pending tasks
+                active = min(pending, self.config.max_workers)
+            started = self._stats['started']
+            finished = self._stats['completed'] + self._stats['failed']
+            return {
+                'name': self.config.name,
+                'kind': self.config.kind,
+                'description': self.config.description,
+                'max_workers': self.config.max_workers,
+                'max_queue': self.config.max_pending,
+                'running': self._executor is not None,
+                'active': active,
+                'queued': max(pending - active, 0),
+                'pending': pending,
+                'submitted': self._stats['submitted'],
+                'completed': self._stats['completed'],
+                'failed': self._stats['failed'],
+                'rejected': self._stats['rejected'],
+                'max_pending': self._stats['max_pending'],
+                'avg_wait_ms': (round(1000 * self._stats['total_wait_seconds'] / started, 2)
+                                if self.config.kind == 'thread' and started else None),
+                'max_wait_ms': (round(1000 * self._stats['max_wait_seconds'], 2)
+                                if self.config.kind == 'thread' else None),
+                'avg_latency_ms': round(1000 * self._stats['total_run_seconds'] / finished, 2) if finished else None,
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the pool's workers (a later submit starts a new executor)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+
+class ExecutionPools:
+    """The set of named execution pools of the backend."""
+
+    def __init__(self, configs: Optional[Dict[str, PoolConfig]] = None):
+        configs = configs or default_pool_configs(_total_cpus())
+        self._pools = {name: ExecutionPool(config) for name, config in configs.items()}
+
+    def get(self, name: str) -> ExecutionPool:
+        """
+        Get a pool by name.
+
+        Raises
+        ------
+        KeyError
+            If no pool with that name exists
+        """
+        try:
+            return self._pools[name]
+        except KeyError:
+            raise KeyError(f"Unknown execution pool '{name}'. Available: {list(self._pools)}")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Metrics of every pool."""
+        return {name: pool.get_stats() for name, pool in self._pools.items()}
+
+    def shutdown(self, wait: bool = True):
+        """Stop all pools."""
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+
+
+_global_pools: Optional[ExecutionPools] = None
+_global_pools_lock = threading.Lock()
+
+
+def get_execution_pools() -> ExecutionPools:
+    """Get the global execution pools."""
+    global _global_pools
+    with _global_pools_lock:
+        if _global_pools is None:
+            _global_pools = ExecutionPools()
+        return _global_pools
+
+
+async def run_in_pool(pool_name: str, fn: Callable, *args, **kwargs) -> Any:
+    """
+    Run a blocking callable in a named pool and await its result.
+
+    Parameters
+    ----------
+    pool_name : str
+        'excel_io', 'network_io', 'analytics', 'analytics_process' or
+        'compression'
+    fn : callable
+        Function to run; for the process pool it must be importable
+        (module-level) and its arguments and result picklable
+
+    Returns
+    -------
+    Any
+        The callable's return value; exceptions are re-raised
+    """
+    return await get_execution_pools().get(pool_name).run(fn, *args, **kwargs)
+
+
+def offload(pool_name: str) -> Callable:
+    """
+    Decorator turning a blocking route handler into an async one that runs
+    in a named thread pool.
+
+    The wrapped handler keeps its signature, so FastAPI resolves its query,
+    body and Response parameters as before. Use it on plain ``def``
+    handlers whose whole body is blocking work:
+
+        @router.get("/pypsa/energy-mix")
+        @offload("analytics")
+        def get_energy_mix(...):
+            ...
+    """
+    def decorator(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            raise TypeError(f"offload() expects a blocking function, got coroutine function {fn.__name__}")
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await run_in_pool(pool_name, fn, *args, **kwargs)
+        return wrapper
+    return decorator
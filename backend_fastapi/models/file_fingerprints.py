@@ -0,0 +1,212 @@
+"""
+File Fingerprints
+=================
+
+Cheap change detection for the files behind API responses.
+
+A fingerprint is the (mtime_ns, size) pair of a file, taken with a single
+stat call. Every writer in the backend replaces or rewrites whole files,
+so a changed file always has a different fingerprint; an unchanged one
+can safely reuse anything derived from it: HTTP validators (ETags), parsed
+workbooks, loaded networks or analysis results.
+
+Features:
+- ``file_fingerprint``: fingerprint of one file (None if missing)
+- ``paths_digest``: stable digest over files and directory trees plus
+  extra key parts (e.g. query parameters)
+- ``FingerprintCache``: thread-safe LRU of derived results, each entry
+  valid only while its source files keep their fingerprints
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Fingerprint = Tuple[int, int]
+
+
+def file_fingerprint(path) -> Optional[Fingerprint]:
+    """
+    (mtime_ns, size) of a file.
+
+    Parameters
+    ----------
+    path : str or Path
+        File path
+
+    Returns
+    -------
+    tuple or None
+        Fingerprint, or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def tree_fingerprints(path) -> List[Tuple[str, int, int]]:
+    """
+    Fingerprints of a file, or of a directory and everything below it.
+
+    Directory entries are included (their mtime changes when files are
+    added, removed or renamed); hidden entries such as ``.cache`` sidecar
+    folders are skipped.
+
+    Returns
+    -------
+    list of tuple
+        (relative path, mtime_ns, size), sorted; empty if the path is missing
+    """
+    root = Path(path)
+    try:
+        stat = root.stat()
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    entries = [('.', stat.st_mtime_ns, stat.st_size if not root.is_dir() else 0)]
+    if not root.is_dir():
+        return entries
+
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    if entry.name.startswith('.') or entry.name.startswith('~$'):
+                        continue
+                    try:
+                        entry_stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    relative = os.path.relpath(entry.path, root)
+                    if entry.is_dir():
+                        entries.append((relative, entry_stat.st_mtime_ns, 0))
+                        pending.append(Path(entry.path))
+                    else:
+                        entries.append((relative, entry_stat.st_mtime_ns, entry_stat.st_size))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    entries.sort()
+    return entries
+
+
+def paths_digest(paths: Iterable, extra: Iterable[Hashable] = ()) -> Optional[str]:
+    """
+    Digest over the fingerprints of files/directories and extra key parts.
+
+    Parameters
+    ----------
+    paths : iterable of str or Path
+        Files or directory trees the result depends on
+    extra : iterable
+        Further key parts (request path, query parameters, versions)
+
+    Returns
+    -------
+    str or None
+        Hex digest, or None if none of the paths exists
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    found = False
+    for path in paths:
+        entries = tree_fingerprints(path)
+        found = found or bool(entries)
+        digest.update(f"{Path(path).resolve()}\0".encode())
+        for relative, mtime_ns, size in entries:
+            digest.update(f"{relative}\0{mtime_ns}\0{size}\0".encode())
+        digest.update(b"\1")
+    if not found:
+        return None
+    for part in extra:
+        digest.update(f"{part!r}\0".encode())
+    return digest.hexdigest()
+
+
+class FingerprintCache:
+    """
+    Thread-safe LRU cache of results derived from files.
+
+    An entry is returned only while every source file still has the
+    fingerprint it had when the result was computed, so callers never see
+    results of an older file version.
+    """
+
+    def __init__(self, name: str, max_entries: int = 16):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[Tuple, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'evictions': 0}
+
+    @staticmethod
+    def fingerprints(sources: Iterable) -> Tuple:
+        """Current fingerprints of the source files (take them before computing)."""
+        return tuple((str(source), file_fingerprint(source)) for source in sources)
+
+    def get(self, key: Hashable, sources: Iterable) -> Optional[Any]:
+        """Cached result for key, or None if missing or out of date."""
+        fingerprints = self.fingerprints(sources)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if entry[0] != fingerprints:
+                del self._entries[key]
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[1]
+
+    def put(self, key: Hashable, sources: Iterable, value: Any, fingerprints: Optional[Tuple] = None):
+        """
+        Store a result.
+
+        Pass the fingerprints taken before computing the result when the
+        sources may change meanwhile; the entry then goes stale at once.
+        """
+        fingerprints = fingerprints if fingerprints is not None else self.fingerprints(sources)
+        with self._lock:
+            self._entries[key] = (fingerprints, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_or_compute(self, key: Hashable, sources: Iterable, compute: Callable[[], Any]) -> Any:
+        """Cached result for key, computing and storing it if needed."""
+        sources = list(sources)
+        value = self.get(key, sources)
+        if value is not None:
+            return value
+        fingerprints = self.fingerprints(sources)
+        value = compute()
+        self.put(key, sources, value, fingerprints=fingerprints)
+        return value
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one entry, or all entries if key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry count and hit/miss statistics."""
+        with self._lock:
+            return {'name': self.name, 'entries': len(self._entries),
+                    'max_entries': self.max_entries, **self._stats}
@@ -0,0 +1,456 @@
+"""
+Rolling-Origin Forecast Backtesting
+===================================
+
+Evaluates the forecasting models (WAM, SLR, MLR, TimeSeries) by rolling
+the forecast origin through history: for every cut year from the first
+origin onward the models are fitted on data up to the cut and scored on
+the following years.
+
+All origins of a sector are solved together. Training windows are
+expressed as row masks, so every regression becomes one batched
+least-squares solve over (origins x rows x features), and WAM growth
+rates for every origin come from one rolling weighted mean. Fitted
+parameters are cached per origin, keyed by a fingerprint of the data and
+model settings, so repeated backtests (e.g. while comparing horizons) do
+not refit.
+
+Differences to forecasting.py: regressions always fit an intercept (no
+GridSearchCV). MLR independent variables are extrapolated from data up to
+the origin, exactly as a live forecast would have to.
+
+Usage (benchmark / CLI):
+    python forecast_backtest.py --config backtest.json [--repeat 5] [--output report.json]
+    python forecast_backtest.py --synthetic 20 --repeat 5
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import sys
+import json
+import time
+import hashlib
+import argparse
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from forecast_vectorized import (
+    DEFAULT_COVID_YEARS,
+    prepare_sector_frame,
+    wam_growth_series,
+    rolling_weighted_means,
+    batched_lstsq,
+    add_intercept,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKTEST_MODELS = ('WAM', 'SLR', 'MLR', 'TimeSeries')
+
+
+class BacktestModelCache:
+    """
+    Thread-safe LRU cache of fitted parameters per forecast origin.
+
+    Entries map a fingerprint of (sector data, model, settings) to a dict of
+    origin -> fitted parameters.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._cache.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def put(self, key: str, fitted: Dict):
+        with self._lock:
+            self._cache[key] = fitted
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'size': len(self._cache), 'max_size': self.max_size, **self._stats}
+
+
+_model_cache = BacktestModelCache()
+
+
+def get_backtest_cache() -> BacktestModelCache:
+    """Get the global backtest model cache."""
+    return _model_cache
+
+
+def _fingerprint(*parts) -> str:
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            digest.update(np.ascontiguousarray(part).tobytes())
+        else:
+            digest.update(repr(part).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _batched_trend(years: np.ndarray, Y: np.ndarray, masks: np.ndarray,
+                   future_years: np.ndarray) -> np.ndarray:
+    """
+    Linear trend extrapolation of every column for every origin at once.
+
+    Parameters
+    ----------
+    years : (n,) observation years
+    Y : (n, k) observations, NaN for missing
+    masks : (O, n) rows available at each origin
+    future_years : (O, h) years to predict per origin
+
+    Returns
+    -------
+    np.ndarray
+        (O, h, k) predictions clipped at zero (0 where < 2 points)
+    """
+    valid = masks[:, :, None] & ~np.isnan(Y)[None, :, :]             # (O, n, k)
+    x = years[None, :, None]
+    count = valid.sum(axis=1)                                          # (O, k)
+    safe = np.maximum(count, 1)
+    mean_x = np.where(valid, x, 0.0).sum(axis=1) / safe
+    mean_y = np.where(valid, Y[None], 0.0).sum(axis=1) / safe
+    dx = np.where(valid, x - mean_x[:, None, :], 0.0)
+    dy = np.where(valid, Y[None] - mean_y[:, None, :], 0.0)
+    sxx = (dx * dx).sum(axis=1)
+    slope = np.divide((dx * dy).sum(axis=1), sxx, out=np.zeros_like(sxx), where=sxx > 0)
+    intercept = mean_y - slope * mean_x
+    preds = intercept[:, None, :] + slope[:, None, :] * future_years[:, :, None]
+    preds = np.where((count < 2)[:, None, :], 0.0, preds)
+    return np.maximum(preds, 0.0)
+
+
+def _origin_layout(years: np.ndarray, origins: np.ndarray, horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Target years per origin (O, h) and their row index in the data (-1 if absent)."""
+    targets = origins[:, None] + np.arange(1, horizon + 1)[None, :]
+    lookup = {int(y): i for i, y in enumerate(years)}
+    rows = np.vectorize(lambda y: lookup.get(int(y), -1))(targets) if targets.size else targets
+    return targets, rows
+
+
+def _fit_regression(X: np.ndarray, y: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    """Intercept + X least squares for every origin; masked rows do not contribute."""
+    design = add_intercept(X)                                          # (n, p)
+    Xm = design[None, :, :] * masks[:, :, None]                        # (O, n, p)
+    ym = y[None, :] * masks                                            # (O, n)
+    return batched_lstsq(Xm, ym)                                       # (O, p)
+
+
+def backtest_sector(df: pd.DataFrame, origins: np.ndarray, horizon: int, models: Sequence[str],
+                    wam_window: int, independent_vars: Sequence[str], exclude_covid: bool,
+                    covid_years: Sequence[int], cache: Optional[BacktestModelCache] = None) -> Dict:
+    """
+    Rolling-origin backtest of one sector.
+
+    Returns
+    -------
+    dict
+        model -> {'predictions': (O, h) array, 'fit_seconds': float, 'cached': bool}
+        plus 'targets' (O, h) years and 'actuals' (O, h) values (NaN where unknown)
+    """
+    years = df['Year'].values.astype(float)
+    values = df['Electricity'].values.astype(float)
+    covid_mask = np.isin(years, list(covid_years)) if exclude_covid else np.zeros(len(years), dtype=bool)
+    targets, rows = _origin_layout(years, origins, horizon)
+    actuals = np.where(rows >= 0, values[np.clip(rows, 0, None)], np.nan)
+    actuals = np.where(np.isin(targets, list(covid_years)) & exclude_covid, np.nan, actuals)
+
+    upto = years[None, :] <= origins[:, None]                           # (O, n) rows known at origin
+    train_masks = upto & ~covid_mask[None, :]
+    out = {'targets': targets, 'actuals': actuals}
+    data_key = _fingerprint(years, values, origins, horizon, exclude_covid, tuple(covid_years))
+    variables = [v for v in independent_vars if v in df.columns and v not in ('Year', 'Electricity')]
+    # Coerce like the MLR path (non-numeric entries become gaps); columns
+    # without any numeric value cannot be regressed on and are dropped
+    X_frame = df[variables].apply(pd.to_numeric, errors='coerce')
+    unusable = [v for v in variables if X_frame[v].isna().all()]
+    if unusable:
+        logger.warning(f"Backtest ignores non-numeric independent variables: {unusable}")
+        variables = [v for v in variables if v not in unusable]
+    X_obs = X_frame[variables].to_numpy(dtype=float) if variables else years[:, None]
+
+    for model in models:
+        start = time.perf_counter()
+        if model == 'WAM':
+            key = _fingerprint(data_key, model, wam_window)
+        elif model == 'MLR':
+            key = _fingerprint(data_key, model, tuple(variables), X_obs)
+        else:
+            key = _fingerprint(data_key, model)
+
+        fitted = cache.get(key) if cache is not None else None
+        cached = fitted is not None
+
+        if model == 'WAM':
+            if fitted is None:
+                rates, rate_years = wam_growth_series(years, values, exclude_covid, covid_years)
+                growth = rolling_weighted_means(rates, wam_window) if len(rates) else rates
+                # Position of the last growth rate known at each origin
+                pos = np.searchsorted(rate_years, origins, side='right') - 1
+                g = np.where(pos >= 0, growth[np.clip(pos, 0, None)] if len(growth) else np.nan, np.nan)
+                last_idx = np.where(train_masks, np.arange(len(years))[None, :], -1).max(axis=1)
+                last_value = np.where(last_idx >= 0, values[np.clip(last_idx, 0, None)], np.nan)
+                last_year = np.where(last_idx >= 0, years[np.clip(last_idx, 0, None)], np.nan)
+                fitted = {'growth': g, 'last_value': last_value, 'last_year': last_year}
+            steps = targets - fitted['last_year'][:, None]
+            preds = fitted['last_value'][:, None] * (1.0 + fitted['growth'][:, None]) ** steps
+
+        elif model in ('SLR', 'TimeSeries'):
+            masks = train_masks if model == 'SLR' else upto
+            if fitted is None:
+                fitted = {'beta': _fit_regression(years[:, None], values, masks.astype(float)),
+                          'n_train': masks.sum(axis=1)}
+            beta = fitted['beta']
+            preds = beta[:, [0]] + beta[:, [1]] * targets
+            preds = np.where(fitted['n_train'][:, None] >= 2, np.maximum(preds, 0.0), np.nan)
+
+        elif model == 'MLR':
+            if fitted is None:
+                # Fill gaps with the training mean of each origin (as prepare_ml_data does)
+                m = train_masks[:, :, None] & ~np.isnan(X_obs)[None]
+                col_mean = np.where(m, X_obs[None], 0.0).sum(axis=1) / np.maximum(m.sum(axis=1), 1)
+                X_filled = np.where(np.isnan(X_obs)[None], col_mean[:, None, :], X_obs[None])  # (O, n, k)
+                design = add_intercept(X_filled) * train_masks[:, :, None]
+                beta = batched_lstsq(design, values[None, :] * train_masks)
+                fitted = {'beta': beta, 'n_train': train_masks.sum(axis=1)}
+            if variables:
+                X_future = _batched_trend(years, X_obs, upto, targets.astype(float))   # (O, h, k)
+            else:
+                X_future = targets[:, :, None].astype(float)
+            preds = np.einsum('ohk,ok->oh', add_intercept(X_future), fitted['beta'])
+            preds = np.where(fitted['n_train'][:, None] >= 2, np.maximum(preds, 0.0), np.nan)
+        else:
+            raise ValueError(f"Unsupported backtest model: {model}")
+
+        if cache is not None and not cached:
+            cache.put(key, fitted)
+        out[model] = {'predictions': preds, 'fit_seconds': time.perf_counter() - start, 'cached': cached}
+
+    return out
+
+
+def _accuracy(predictions: np.ndarray, actuals: np.ndarray) -> Dict:
+    """MAE / RMSE / MAPE / bias over all scored points, overall and per horizon step."""
+    valid = ~np.isnan(predictions) & ~np.isnan(actuals)
+    err = np.where(valid, predictions - actuals, 0.0)
+    ape = np.where(valid & (actuals != 0), np.abs(err) / np.where(actuals == 0, 1, np.abs(actuals)), 0.0)
+    n_ape = (valid & (actuals != 0)).sum(axis=0)
+
+    def summarize(e, a, n, n_a):
+        if n == 0:
+            return {'n': 0, 'MAE': None, 'RMSE': None, 'MAPE (%)': None, 'Bias': None}
+        return {
+            'n': int(n),
+            'MAE': round(float(np.abs(e).sum() / n), 4),
+            'RMSE': round(float(np.sqrt((e ** 2).sum() / n)), 4),
+            'MAPE (%)': round(float(a.sum() / n_a * 100), 4) if n_a else None,
+            'Bias': round(float(e.sum() / n), 4),
+        }
+
+    overall = summarize(err, ape, valid.sum(), n_ape.sum())
+    per_horizon = [dict(horizon=h + 1, **summarize(err[:, h], ape[:, h], valid[:, h].sum(), n_ape[h]))
+                   for h in range(predictions.shape[1])]
+    return {'overall': overall, 'by_horizon': per_horizon}
+
+
+def run_backtest(sectors: Dict[str, Dict], models: Sequence[str] = BACKTEST_MODELS,
+                 horizon: int = 3, min_train_years: int = 5, first_origin: Optional[int] = None,
+                 exclude_covid: bool = True, covid_years: Optional[Sequence[int]] = None,
+                 use_cache: bool = True, include_predictions: bool = False) -> Dict:
+    """
+    Run a rolling-origin backtest for every sector and model.
+
+    Parameters
+    ----------
+    sectors : dict
+        Sector name -> {'data': rows/columns, 'mlrParameters': [...], 'wamWindow': int}
+    models : sequence of str
+        Models to evaluate
+    horizon : int
+        Forecast steps scored per origin
+    min_train_years : int
+        Minimum number of training observations before the first origin
+    first_origin : int, optional
+        First cut year (overrides min_train_years when later)
+    exclude_covid : bool
+        Exclude COVID years from training and scoring
+    covid_years : sequence of int, optional
+        COVID years
+    use_cache : bool
+        Reuse fitted parameters per origin from the global cache
+    include_predictions : bool
+        Include per-origin predictions in the report
+
+    Returns
+    -------
+    dict
+        Per-sector accuracy, per-model accuracy and runtime, best model per sector
+    """
+    unknown = [m for m in models if m not in BACKTEST_MODELS]
+    if unknown:
+        raise ValueError(f"Unsupported backtest models: {unknown}")
+    if horizon < 1:
+        raise ValueError("horizon must be at least 1")
+
+    covid_years = list(covid_years or DEFAULT_COVID_YEARS)
+    cache = get_backtest_cache() if use_cache else None
+    start = time.perf_counter()
+
+    sector_reports = {}
+    runtime = {m: 0.0 for m in models}
+    pooled = {m: ([], []) for m in models}
+
+    for sector_name, config in sectors.items():
+        df = prepare_sector_frame(config['data'])
+        years = df['Year'].values.astype(int)
+        train_years = years[~np.isin(years, covid_years)] if exclude_covid else years
+        if len(train_years) <= min_train_years:
+            sector_reports[sector_name] = {'status': 'skipped',
+                                           'reason': f"Needs more than {min_train_years} training years"}
+            continue
+        earliest = int(train_years[min_train_years - 1])
+        if first_origin is not None:
+            earliest = max(earliest, int(first_origin))
+        origins = years[(years >= earliest) & (years < years.max())]
+        if exclude_covid:
+            origins = origins[~np.isin(origins, covid_years)]
+        if len(origins) == 0:
+            sector_reports[sector_name] = {'status': 'skipped', 'reason': 'No forecast origins'}
+            continue
+
+        result = backtest_sector(df, origins.astype(float), horizon, models,
+                                 int(config.get('wamWindow', 10) or 10),
+                                 config.get('mlrParameters', []) or [],
+                                 exclude_covid, covid_years, cache)
+
+        model_reports = {}
+        for model in models:
+            preds = result[model]['predictions']
+            runtime[model] += result[model]['fit_seconds']
+            pooled[model][0].append(preds)
+            pooled[model][1].append(result['actuals'])
+            report = {**_accuracy(preds, result['actuals']),
+                      'fit_seconds': round(result[model]['fit_seconds'], 6),
+                      'cached': result[model]['cached']}
+            if include_predictions:
+                report['predictions'] = [[None if np.isnan(v) else round(float(v), 4) for v in row]
+                                         for row in preds]
+            model_reports[model] = report
+
+        scored = {m: r['overall']['MAPE (%)'] for m, r in model_reports.items()
+                  if r['overall']['MAPE (%)'] is not None}
+        sector_reports[sector_name] = {
+            'status': 'completed',
+            'origins': origins.astype(int).tolist(),
+            'models': model_reports,
+            'best_model': min(scored, key=scored.get) if scored else None,
+        }
+        if include_predictions:
+            sector_reports[sector_name]['targets'] = result['targets'].astype(int).tolist()
+
+    model_summary = {}
+    for model in models:
+        preds, actuals = pooled[model]
+        accuracy = _accuracy(np.vstack(preds), np.vstack(actuals)) if preds else None
+        model_summary[model] = {
+            'accuracy': accuracy['overall'] if accuracy else None,
+            'runtime_seconds': round(runtime[model], 6),
+        }
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Backtest of {len(sectors)} sectors x {len(models)} models finished in {elapsed:.3f}s")
+    return {
+        'sectors': sector_reports,
+        'models': model_summary,
+        'settings': {'horizon': horizon, 'min_train_years': min_train_years, 'first_origin': first_origin,
+                     'exclude_covid': exclude_covid, 'covid_years': covid_years},
+        'elapsed_seconds': round(elapsed, 6),
+        'cache': cache.get_stats() if cache is not None else None,
+    }
+
+
+def _synthetic_sectors(n_sectors: int, n_years: int = 25, seed: int = 0) -> Dict[str, Dict]:
+    """Random but plausible sector histories for benchmarking."""
+    rng = np.random.default_rng(seed)
+    years = np.arange(2024 - n_years + 1, 2025)
+    sectors = {}
+    for i in range(n_sectors):
+        growth = 1 + rng.uniform(0.01, 0.08, n_years)
+        gdp = 100 * np.cumprod(1 + rng.uniform(0.03, 0.07, n_years))
+        sectors[f"Sector_{i + 1}"] = {
+            'data': {'Year': years.tolist(),
+                     'Electricity': (1000 * np.cumprod(growth)).tolist(),
+                     'GDP': gdp.tolist()},
+            'mlrParameters': ['GDP'],
+            'wamWindow': 5,
+        }
+    return sectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest / forecasting benchmark")
+    parser.add_argument('--config', help="JSON file: {sectors: [{name, data, mlrParameters, wamWindow}], ...}")
+    parser.add_argument('--synthetic', type=int, default=0, help="Benchmark on N synthetic sectors")
+    parser.add_argument('--repeat', type=int, default=1, help="Repeat runs (cache cleared each time)")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            raw = json.load(f)
+        sectors = {s['name']: s for s in raw.get('sectors', [])}
+        options = {k: raw[k] for k in ('models', 'horizon', 'min_train_years', 'first_origin',
+                                       'exclude_covid') if k in raw}
+    elif args.synthetic:
+        sectors, options = _synthetic_sectors(args.synthetic), {}
+    else:
+        parser.error("either --config or --synthetic is required")
+
+    timings = []
+    report = None
+    for _ in range(max(1, args.repeat)):
+        get_backtest_cache().clear()
+        report = run_backtest(sectors, **options)
+        timings.append(report['elapsed_seconds'])
+    report['benchmark'] = {
+        'runs': len(timings),
+        'min_seconds': round(min(timings), 6),
+        'median_seconds': round(float(np.median(timings)), 6),
+        'max_seconds': round(max(timings), 6),
+    }
+
+    output = json.dumps(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    main()
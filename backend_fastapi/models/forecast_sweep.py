@@ -0,0 +1,293 @@
+"""
+Forecast Sensitivity Sweep
+==========================
+
+Evaluates the demand forecasting models over a grid of scenario
+parameters in one pass:
+
+- WAM window sizes
+- COVID-year exclusion on/off
+- MLR independent-variable subsets
+- Target years
+
+Instead of one forecasting.py subprocess (with GridSearchCV and Excel
+output) per combination, every sector is evaluated with batched array
+operations: WAM growth rates for all windows come from one vectorized
+weighted mean, regressions for all variable subsets of the same size are
+solved on one stacked design matrix, and target years only truncate the
+shared forecast horizon.
+
+Differences to forecasting.py: regressions always fit an intercept (no
+GridSearchCV), and user-supplied future values of independent variables
+are used directly instead of being re-extrapolated.
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from forecast_vectorized import (
+    DEFAULT_COVID_YEARS,
+    prepare_sector_frame,
+    wam_growth_series,
+    tail_weighted_means,
+    compound_paths,
+    batched_lstsq,
+    add_intercept,
+    linear_trend_forecast,
+)
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SWEEP_MODELS = ('WAM', 'MLR', 'SLR')
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _sweep_sector(df: pd.DataFrame, horizon_years: np.ndarray, wam_windows: Sequence[int],
+                  exclude_covid: bool, variable_sets: List[List[str]], models: Sequence[str],
+                  covid_years: Sequence[int]) -> List[Dict]:
+    """
+    Evaluate all model/parameter combinations of one sector for one COVID option.
+
+    Returns a list of blocks {model, window, variables, values (k, h)} where
+    values holds one forecast path per parameter value over horizon_years.
+    """
+    blocks = []
+    training = df[~df['Year'].isin(covid_years)] if exclude_covid else df
+    if training.empty:
+        return blocks
+    last_year = training['Year'].max()
+    history = df[df['Year'] <= last_year]
+    future = horizon_years[horizon_years > last_year]
+    n_future = len(future)
+    if n_future == 0:
+        return blocks
+    # Horizon offset: forecasts start right after the last historical year
+    offset = len(horizon_years) - n_future
+
+    def pad(paths: np.ndarray) -> np.ndarray:
+        out = np.full(paths.shape[:-1] + (len(horizon_years),), np.nan)
+        out[..., offset:] = paths
+        return out
+
+    if 'WAM' in models and wam_windows:
+        rates, _ = wam_growth_series(history['Year'].values, history['Electricity'].values,
+                                     exclude_covid, covid_years)
+        if len(rates):
+            windows = np.asarray(wam_windows, dtype=int)
+            growth = tail_weighted_means(rates, windows)
+            last_value = training.loc[training['Year'] == last_year, 'Electricity'].values[0]
+            paths = compound_paths(last_value, growth, n_future)
+            for window, path in zip(windows, pad(paths)):
+                blocks.append({'model': 'WAM', 'window': int(window), 'variables': '', 'values': path})
+
+    years = training['Year'].values.astype(float)
+    y = training['Electricity'].values.astype(float)
+    if len(training) >= 2 and 'SLR' in models:
+        X = add_intercept(years[:, None])
+        beta = batched_lstsq(X, y)
+        preds = np.maximum(add_intercept(future[:, None].astype(float)) @ beta, 0.0)
+        blocks.append({'model': 'SLR', 'window': None, 'variables': 'Year', 'values': pad(preds)})
+
+    if len(training) >= 2 and 'MLR' in models and variable_sets:
+        candidates = sorted({v for subset in variable_sets for v in subset if v in df.columns
+                             and v not in ('Year', 'Electricity')
+                             and pd.api.types.is_numeric_dtype(df[v])})
+        column_index = {v: i for i, v in enumerate(['Year'] + candidates)}
+
+        # Shared design matrices: training rows and future rows over all candidates
+        X_train = np.column_stack([years] + [training[v].values.astype(float) for v in candidates])
+        col_means = np.nanmean(X_train, axis=0)
+        X_train = np.where(np.isnan(X_train), np.nan_to_num(col_means), X_train)
+
+        X_future = np.empty((n_future, len(candidates) + 1))
+        X_future[:, 0] = future
+        if candidates:
+            trend = linear_trend_forecast(df['Year'].values,
+                                          df[candidates].values.astype(float), future)
+            provided = df.set_index('Year')[candidates].reindex(future).values.astype(float)
+            X_future[:, 1:] = np.where(np.isnan(provided), trend, provided)
+
+        # Group subsets by size so each group is one batched solve
+        by_size: Dict[int, List[List[str]]] = {}
+        for subset in variable_sets:
+            valid = [v for v in subset if v in column_index and v != 'Year'] or ['Year']
+            by_size.setdefault(len(valid), []).append(valid)
+
+        for size, subsets in by_size.items():
+            idx = np.array([[column_index[v] for v in subset] for subset in subsets])  # (S, size)
+            Xs = add_intercept(X_train[:, idx].transpose(1, 0, 2))                     # (S, n, size+1)
+            beta = batched_lstsq(Xs, y)                                                 # (S, size+1)
+            Xf = add_intercept(X_future[:, idx].transpose(1, 0, 2))                    # (S, h, size+1)
+            preds = np.maximum(np.einsum('shp,sp->sh', Xf, beta), 0.0)
+            for subset, path in zip(subsets, pad(preds)):
+                blocks.append({'model': 'MLR', 'window': None, 'variables': '+'.join(subset),
+                               'values': path})
+
+    return blocks
+
+
+def run_sweep(sectors: Dict[str, object], target_years: Sequence[int],
+              wam_windows: Sequence[int] = (3, 5, 7, 10),
+              exclude_covid_options: Sequence[bool] = (True, False),
+              variable_sets: Optional[List[List[str]]] = None,
+              models: Sequence[str] = SWEEP_MODELS,
+              percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+              covid_years: Optional[Sequence[int]] = None) -> Dict:
+    """
+    Run a forecast sensitivity sweep over all parameter combinations.
+
+    Parameters
+    ----------
+    sectors : dict
+        Sector name -> raw sector data (rows or columns with Year, Electricity, ...)
+    target_years : sequence of int
+        Target years to evaluate
+    wam_windows : sequence of int
+        WAM window sizes (each >= 2)
+    exclude_covid_options : sequence of bool
+        COVID exclusion choices
+    variable_sets : list of list of str, optional
+        MLR independent-variable subsets
+    models : sequence of str
+        Models to include ('WAM', 'MLR', 'SLR')
+    percentiles : sequence of float
+        Fan-chart percentiles
+    covid_years : sequence of int, optional
+        Years treated as COVID years
+
+    Returns
+    -------
+    dict
+        'grid' (long DataFrame, one row per combination and year),
+        'fan_charts' (per sector percentiles per year), 'summary'
+    """
+    start = time.time()
+    if not target_years:
+        raise ValueError("At least one target year is required")
+    if any(int(w) < 2 for w in wam_windows):
+        raise ValueError("WAM window sizes must be at least 2")
+    unknown = [m for m in models if m not in SWEEP_MODELS]
+    if unknown:
+        raise ValueError(f"Unsupported sweep models: {unknown}")
+
+    covid_years = list(covid_years or DEFAULT_COVID_YEARS)
+    target_years = sorted({int(t) for t in target_years})
+    variable_sets = [list(s) for s in (variable_sets or []) if s is not None]
+
+    grid_frames = []
+    fan_charts = {}
+    combinations = 0
+
+    for sector_name, data in sectors.items():
+        df = prepare_sector_frame(data)
+        first_year = int(df['Year'].min())
+        horizon_years = np.arange(first_year, max(target_years) + 1)
+
+        paths, labels = [], []
+        for exclude_covid in exclude_covid_options:
+            for block in _sweep_sector(df, horizon_years, wam_windows, bool(exclude_covid),
+                                       variable_sets, models, covid_years):
+                paths.append(block['values'])
+                labels.append((block['model'], block['window'], block['variables'], bool(exclude_covid)))
+
+        if not paths:
+            logger.warning(f"Sweep: no forecastable combinations for sector {sector_name}")
+            continue
+
+        base = np.vstack(paths)                                     # (B, H)
+        target_arr = np.asarray(target_years)
+        # Each target year truncates the shared horizon
+        cut = horizon_years[None, None, :] > target_arr[None, :, None]
+        values = np.where(cut, np.nan, base[:, None, :])           # (B, T, H)
+        values = values.reshape(-1, len(horizon_years))
+        combinations += values.shape[0]
+
+        future_mask = ~np.all(np.isnan(values), axis=0)
+        fan_years = horizon_years[future_mask]
+        fan_values = values[:, future_mask]
+        with np.errstate(all='ignore'):
+            bands = np.nanpercentile(fan_values, percentiles, axis=0)
+        fan_charts[sector_name] = {
+            'years': fan_years.astype(int).tolist(),
+            'percentiles': {f"P{p:g}": np.round(band, 4).tolist() for p, band in zip(percentiles, bands)},
+            'min': np.round(np.nanmin(fan_values, axis=0), 4).tolist(),
+            'max': np.round(np.nanmax(fan_values, axis=0), 4).tolist(),
+            'combinations': int(values.shape[0]),
+        }
+
+        # Long, columnar grid: one row per (combination, year) with a value
+        combo_model, combo_window, combo_vars, combo_covid = (np.array(x, dtype=object) for x in zip(*labels))
+        b_idx, t_idx, h_idx = np.nonzero(~np.isnan(values.reshape(len(labels), len(target_years), -1)))
+        grid_frames.append(pd.DataFrame({
+            'sector': sector_name,
+            'model': combo_model[b_idx],
+            'wam_window': combo_window[b_idx],
+            'mlr_variables': combo_vars[b_idx],
+            'exclude_covid': combo_covid[b_idx].astype(bool),
+            'target_year': target_arr[t_idx],
+            'year': horizon_years[h_idx],
+            'electricity': values.reshape(len(labels), len(target_years), -1)[b_idx, t_idx, h_idx],
+        }))
+
+    grid = pd.concat(grid_frames, ignore_index=True) if grid_frames else pd.DataFrame(
+        columns=['sector', 'model', 'wam_window', 'mlr_variables', 'exclude_covid',
+                 'target_year', 'year', 'electricity'])
+    elapsed = time.time() - start
+    logger.info(f"Sweep evaluated {combinations} combinations for {len(fan_charts)} sectors in {elapsed:.3f}s")
+
+    return {
+        'grid': grid,
+        'fan_charts': fan_charts,
+        'summary': {
+            'sectors': len(fan_charts),
+            'combinations': combinations,
+            'grid_rows': int(len(grid)),
+            'elapsed_seconds': round(elapsed, 4),
+        }
+    }
+
+
+def write_sweep_grid(grid: pd.DataFrame, output_dir: Path, name: str) -> Path:
+    """
+    Write the full sweep grid to a columnar file.
+
+    Parquet is used when pyarrow is installed, otherwise a compressed CSV.
+
+    Parameters
+    ----------
+    grid : pd.DataFrame
+        Long sweep grid from run_sweep
+    output_dir : Path
+        Directory for sweep outputs
+    name : str
+        File stem
+
+    Returns
+    -------
+    Path
+        Written file path
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if PARQUET_AVAILABLE:
+        path = output_dir / f"{name}.parquet"
+        grid.to_parquet(path, index=False)
+    else:
+        path = output_dir / f"{name}.csv.gz"
+        grid.to_csv(path, index=False, compression='gzip')
+    logger.info(f"Sweep grid written to {path}")
+    return path
@@ -0,0 +1,282 @@
+"""
+Vectorized Forecasting Primitives
+=================================
+
+NumPy building blocks shared by the batch forecasting tools (sensitivity
+sweeps, bootstrap intervals and backtesting). They reproduce the maths of
+the per-sector models in forecasting.py, but evaluate many parameter
+combinations, resamples or forecast origins as single array operations
+instead of refitting sklearn estimators in Python loops.
+
+Features:
+- Annualised growth rates and the WAM linearly weighted growth mean,
+  for many window sizes at once or rolling over every forecast origin
+- Batched ordinary least squares on stacked design matrices
+- Masked per-column linear trend extrapolation for independent variables
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_COVID_YEARS = [2020, 2021, 2022]
+
+
+def sector_data_frame(data) -> pd.DataFrame:
+    """
+    Build a DataFrame from any supported sector data encoding.
+
+    Accepts a DataFrame, a list of row dicts, a columnar payload
+    ({'columns': [...], 'values': {col: [...]}}) or a plain column dict.
+    Columnar inputs are turned into columns directly, without row objects.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data.copy()
+    if isinstance(data, dict) and 'columns' in data and 'values' in data:
+        return pd.DataFrame({c: data['values'][c] for c in data['columns']}, columns=data['columns'])
+    if hasattr(data, 'to_frame'):
+        return data.to_frame()
+    return pd.DataFrame(data)
+
+
+def prepare_sector_frame(data) -> pd.DataFrame:
+    """
+    Coerce raw sector data to a clean, year-sorted numeric frame.
+
+    Mirrors forecasting.prepare_sector_data: columns that are fully
+    non-numeric are kept as-is, rows without Year/Electricity are dropped.
+
+    Parameters
+    ----------
+    data : list of dict, columnar payload, dict of columns or DataFrame
+        Sector data as sent by the frontend
+
+    Returns
+    -------
+    pd.DataFrame
+        Frame sorted by Year with numeric columns
+    """
+    df = sector_data_frame(data)
+    if 'Year' not in df.columns or 'Electricity' not in df.columns:
+        raise ValueError("Missing required columns (Year, Electricity)")
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        numeric = pd.to_numeric(df[col], errors='coerce')
+        if col in ('Year', 'Electricity') or not numeric.isna().all():
+            df[col] = numeric
+    df = df.dropna(subset=['Year', 'Electricity'])
+    if df.empty:
+        raise ValueError("No valid rows (Year, Electricity)")
+    return df.sort_values('Year').reset_index(drop=True)
+
+
+def growth_rates(years: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Annualised growth between consecutive observations.
+
+    Parameters
+    ----------
+    years : np.ndarray
+        Sorted observation years
+    values : np.ndarray
+        Observed values
+
+    Returns
+    -------
+    np.ndarray
+        Growth rates; the first element (and invalid ratios) are NaN
+    """
+    years = np.asarray(years, dtype=float)
+    values = np.asarray(values, dtype=float)
+    rates = np.full(len(values), np.nan)
+    if len(values) > 1:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates[1:] = (values[1:] / values[:-1]) ** (1.0 / (years[1:] - years[:-1])) - 1.0
+        rates[~np.isfinite(rates)] = np.nan
+    return rates
+
+
+def wam_growth_series(years: np.ndarray, values: np.ndarray, exclude_covid: bool,
+                      covid_years: Optional[Iterable[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Growth rates used by the WAM model, after COVID filtering.
+
+    Matches forecasting.weighted_average_forecast: rates are computed on the
+    full series first, then observations in COVID years are removed.
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray)
+        Valid growth rates and the years they end in
+    """
+    years = np.asarray(years, dtype=float)
+    rates = growth_rates(years, values)
+    keep = np.ones(len(years), dtype=bool)
+    if exclude_covid:
+        keep &= ~np.isin(years, list(covid_years or DEFAULT_COVID_YEARS))
+    keep &= ~np.isnan(rates)
+    return rates[keep], years[keep]
+
+
+def tail_weighted_means(rates: np.ndarray, windows: Iterable[int]) -> np.ndarray:
+    """
+    WAM growth rate for many window sizes at once.
+
+    For a window w the most recent rate gets weight w and the oldest rate in
+    the window weight 1 (windows longer than the series are truncated). All
+    windows are evaluated from two cumulative sums.
+
+    Parameters
+    ----------
+    rates : np.ndarray
+        Valid growth rates in chronological order
+    windows : iterable of int
+        Window sizes
+
+    Returns
+    -------
+    np.ndarray
+        Weighted growth rate per window (NaN if no rates)
+    """
+    windows = np.asarray(list(windows), dtype=int)
+    m = len(rates)
+    if m == 0:
+        return np.full(len(windows), np.nan)
+    recent_first = np.asarray(rates, dtype=float)[::-1]
+    lag = np.arange(m)
+    s1 = np.cumsum(recent_first)
+    s2 = np.cumsum(lag * recent_first)
+    w = np.clip(windows, 1, m)
+    return (w * s1[w - 1] - s2[w - 1]) / (w * (w + 1) / 2.0)
+
+
+def rolling_weighted_means(rates: np.ndarray, window: int) -> np.ndarray:
+    """
+    WAM growth rate ending at every position of a rate series.
+
+    Element t is the weighted mean of rates[max(0, t-window+1):t+1] with
+    linear weights, i.e. the growth rate WAM would use with data up to t.
+
+    Parameters
+    ----------
+    rates : np.ndarray
+        Valid growth rates in chronological order
+    window : int
+        Window size
+
+    Returns
+    -------
+    np.ndarray
+        Rolling weighted mean, same length as rates
+    """
+    rates = np.asarray(rates, dtype=float)
+    m = len(rates)
+    if m == 0:
+        return rates
+    padded = np.concatenate([np.zeros(window - 1), rates])
+    frames = np.lib.stride_tricks.sliding_window_view(padded, window)  # (m, window)
+    available = np.minimum(np.arange(1, m + 1), window)                 # valid rates per frame
+    k = np.arange(window)[None, :]
+    weights = np.clip(k - (window - available[:, None]) + 1, 0, None).astype(float)
+    return (frames * weights).sum(axis=1) / weights.sum(axis=1)
+
+
+def compound_paths(last_value: float, rates: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    Compound a starting value forward for each growth rate.
+
+    Parameters
+    ----------
+    last_value : float or np.ndarray
+        Last observed value (scalar or broadcastable to rates)
+    rates : np.ndarray
+        Growth rates, any shape
+    horizon : int
+        Number of future years
+
+    Returns
+    -------
+    np.ndarray
+        Paths with shape rates.shape + (horizon,)
+    """
+    steps = np.arange(1, horizon + 1)
+    rates = np.asarray(rates, dtype=float)
+    return np.asarray(last_value, dtype=float)[..., None] * (1.0 + rates[..., None]) ** steps
+
+
+def batched_lstsq(X: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Least-squares coefficients for a stack of design matrices.
+
+    Uses the batched pseudo-inverse, so rank deficient designs (constant
+    columns, zero-masked rows) are handled like sklearn's lstsq.
+
+    Parameters
+    ----------
+    X : np.ndarray
+        Design matrices, shape (..., n, p)
+    y : np.ndarray
+        Targets, shape (..., n) or (..., n, k)
+
+    Returns
+    -------
+    np.ndarray
+        Coefficients, shape (..., p) or (..., p, k)
+    """
+    pinv = np.linalg.pinv(np.asarray(X, dtype=float))
+    y = np.asarray(y, dtype=float)
+    if y.ndim == X.ndim - 1:
+        return (pinv @ y[..., None])[..., 0]
+    return pinv @ y
+
+
+def add_intercept(X: np.ndarray) -> np.ndarray:
+    """Prepend a column of ones to the last-but-one axis layout (..., n, p)."""
+    ones = np.ones(X.shape[:-1] + (1,))
+    return np.concatenate([ones, X], axis=-1)
+
+
+def linear_trend_forecast(years: np.ndarray, Y: np.ndarray, future_years: np.ndarray) -> np.ndarray:
+    """
+    Extrapolate every column of Y with its own linear trend on Year.
+
+    Equivalent to forecasting.time_series_forecast applied per column,
+    including dropping missing values per column and clipping at zero,
+    but computed for all columns in closed form.
+
+    Parameters
+    ----------
+    years : np.ndarray
+        Observation years, shape (n,)
+    Y : np.ndarray
+        Observations with NaN for missing values, shape (n, k)
+    future_years : np.ndarray
+        Years to predict, shape (h,)
+
+    Returns
+    -------
+    np.ndarray
+        Predictions, shape (h, k); columns with fewer than two points are 0
+    """
+    years = np.asarray(years, dtype=float)[:, None]
+    Y = np.asarray(Y, dtype=float)
+    if Y.ndim == 1:
+        Y = Y[:, None]
+    mask = ~np.isnan(Y)
+    count = mask.sum(axis=0)
+    safe = np.maximum(count, 1)
+    mean_x = (years * mask).sum(axis=0) / safe
+    mean_y = np.where(mask, Y, 0.0).sum(axis=0) / safe
+    dx = np.where(mask, years - mean_x, 0.0)
+    dy = np.where(mask, Y - mean_y, 0.0)
+    sxx = (dx * dx).sum(axis=0)
+    slope = np.divide((dx * dy).sum(axis=0), sxx, out=np.zeros_like(sxx), where=sxx > 0)
+    intercept = mean_y - slope * mean_x
+    preds = intercept + slope * np.asarray(future_years, dtype=float)[:, None]
+    preds[:, count < 2] = 0.0
+    return np.maximum(preds, 0.0)
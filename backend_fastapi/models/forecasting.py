@@ -19,11 +19,14 @@ from sklearn.linear_model import LinearRegression
 from sklearn.model_selection import GridSearchCV, TimeSeriesSplit
 import xlsxwriter
 from sklearn.svm import SVR
+from forecast_vectorized import wam_growth_series, compound_paths, sector_data_frame
 warnings.filterwarnings('ignore')
 CONFIG = {}
 TOTAL_STEPS = 0
 CURRENT_STEP = 0
 DEFAULT_CV_SPLITS = 3  # Default number of cross-validation splits for time series
+DEFAULT_BOOTSTRAP_SAMPLES = 1000
+DEFAULT_INTERVAL_PERCENTILES = [10, 90]
 
 
 # ------------------------------------------------------------------------------
@@ -153,6 +156,10 @@ def load_config(path):
         config.setdefault('covid_years', [2020, 2021, 2022])
         config.setdefault('output_format', 'excel')
         config.setdefault('include_charts', True)
+        config['prediction_intervals'] = bool(raw.get('predictionIntervals', raw.get('prediction_intervals', False)))
+        config['bootstrap_samples'] = int(raw.get('bootstrapSamples', raw.get('bootstrap_samples', DEFAULT_BOOTSTRAP_SAMPLES)))
+        config['interval_percentiles'] = raw.get('intervalPercentiles', raw.get('interval_percentiles', DEFAULT_INTERVAL_PERCENTILES))
+        config['bootstrap_seed'] = raw.get('bootstrapSeed', raw.get('bootstrap_seed', 42))
 
         # sectors section: convert array → dict keyed by name
         sectors_in = raw.get('sectors', [])
@@ -199,26 +206,31 @@ def validate_sector_data(sector_name, sector_config):
     if 'data' not in sector_config:
         raise ValueError(f"No data provided for sector {sector_name}")
     data = sector_config['data']
-    if not isinstance(data, list) or len(data) == 0:
+    # Rows (list of dicts) or columnar payload ({"columns": [...], "values": {...}})
+    if isinstance(data, dict) and 'columns' in data and 'values' in data:
+        df = sector_data_frame(data)
+    elif isinstance(data, list):
+        df = pd.DataFrame(data)
+    else:
+        raise ValueError(f"Invalid data format for sector {sector_name}")
+    if len(df) == 0:
         raise ValueError(f"Invalid or empty data for sector {sector_name}")
-    df = pd.DataFrame(data)
     if 'Year' not in df.columns or 'Electricity' not in df.columns:
         raise ValueError(f"Missing required columns (Year, Electricity) in sector {sector_name}")
     if df['Year'].isnull().any():
         log_warning(f"Sector {sector_name} has missing Year values")
     if df['Electricity'].isnull().any():
         log_warning(f"Sector {sector_name} has missing Electricity values")
-    return True
+    return df
 
 
 def prepare_sector_data(sector_name, sector_config):
     try:
-        validate_sector_data(sector_name, sector_config)
-        data = sector_config['data']
-        df = pd.DataFrame(data)
+        df = validate_sector_data(sector_name, sector_config)
         
         for col in df.columns:
-            if col != 'Year':
+            # Columnar payloads arrive already typed; only coerce object columns
+            if col != 'Year' and not pd.api.types.is_numeric_dtype(df[col]):
                 numeric_series = pd.to_numeric(df[col], errors='coerce')
                 if not numeric_series.isna().all():
                     df[col] = numeric_series
@@ -391,7 +403,99 @@ def time_series_forecast(df, col, target_year):
         return np.zeros(max(0, int(target_year) - 2023))
 
 
-def save_results(sector_name, main_df, result_df_final, models, forecast_path):
+# ------------------------------------------------------------------------------
+# Bootstrap prediction intervals
+# ------------------------------------------------------------------------------
+def residual_bootstrap_paths(X, y, X_future, fit_intercept, n_samples, rng):
+    """Residual bootstrap of a linear regression: all resamples in one matrix solve.
+
+    Refits the least-squares coefficients on y_hat + resampled residuals for every
+    draw at once (pseudo-inverse times a (n, B) target matrix) and adds a resampled
+    residual to each future prediction. Returns an array of shape (B, h).
+    """
+    X = np.asarray(X, dtype=float)
+    X_future = np.asarray(X_future, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if fit_intercept:
+        X = np.column_stack([np.ones(len(X)), X])
+        X_future = np.column_stack([np.ones(len(X_future)), X_future])
+    n, p = X.shape
+    pinv = np.linalg.pinv(X)
+    fitted = X @ (pinv @ y)
+    residuals = y - fitted
+    # Inflate residuals for the degrees of freedom used by the fit
+    if n > p:
+        residuals = residuals * np.sqrt(n / (n - p))
+    y_star = fitted[:, None] + residuals[rng.integers(0, n, size=(n, n_samples))]   # (n, B)
+    betas = pinv @ y_star                                                            # (p, B)
+    noise = residuals[rng.integers(0, n, size=(len(X_future), n_samples))]           # (h, B)
+    return (X_future @ betas + noise).T
+
+
+def wam_bootstrap_paths(df, horizon, window_size, exclude_covid, n_samples, rng):
+    """Growth-rate bootstrap for WAM: resample the window's growth rates with replacement.
+
+    Returns an array of shape (B, horizon).
+    """
+    covid_years = CONFIG.get('covid_years', [2020, 2021, 2022])
+    rates, _ = wam_growth_series(df['Year'].values, df['Electricity'].values, exclude_covid, covid_years)
+    window = min(window_size, len(rates))
+    if window == 0:
+        raise ValueError("No valid growth rates for WAM")
+    tail = rates[-window:]
+    weights = np.arange(1, window + 1) / np.arange(1, window + 1).sum()
+    draws = tail[rng.integers(0, window, size=(n_samples, window))] @ weights       # (B,)
+    history = df[~df['Year'].isin(covid_years)] if exclude_covid else df
+    last_value = history.loc[history['Year'] == history['Year'].max(), 'Electricity'].values[0]
+    return compound_paths(last_value, draws, horizon)
+
+
+def compute_prediction_intervals(models, models_to_use, X, y, X_slr, X_future, mlr_vars,
+                                 main_df, last_historical_year, future_years, parameters, exclude_covid):
+    """Compute bootstrap percentile bands per model for one sector.
+
+    Returns (intervals_df, intervals_json) where intervals_df has one row per future
+    year and <Model>_P<p> columns, and intervals_json maps model -> {years, P<p>: [...]}.
+    """
+    n_samples = max(1, int(CONFIG.get('bootstrap_samples', DEFAULT_BOOTSTRAP_SAMPLES)))
+    percentiles = [float(p) for p in CONFIG.get('interval_percentiles', DEFAULT_INTERVAL_PERCENTILES)]
+    rng = np.random.default_rng(CONFIG.get('bootstrap_seed', 42))
+    horizon = len(future_years)
+    future_year_arr = np.asarray(future_years, dtype=float).reshape(-1, 1)
+    historical = main_df[main_df['Year'] <= last_historical_year]
+
+    samples = {}
+    if 'MLR' in models and 'MLR' in models_to_use:
+        X_pred = X_future[mlr_vars] if all(v in X_future.columns for v in mlr_vars) else X_future[['Year']]
+        samples['MLR'] = residual_bootstrap_paths(X, y, X_pred.fillna(0), models['MLR'].fit_intercept,
+                                                  n_samples, rng)
+    if 'SLR' in models and 'SLR' in models_to_use:
+        samples['SLR'] = residual_bootstrap_paths(X_slr, y, future_year_arr, models['SLR'].fit_intercept,
+                                                  n_samples, rng)
+    if 'WAM' in models_to_use:
+        w = parameters.get('WAM', {}).get('window_size', 10)
+        samples['WAM'] = wam_bootstrap_paths(historical[['Year', 'Electricity']].dropna(), horizon, w,
+                                             exclude_covid, n_samples, rng)
+    if 'TimeSeries' in models_to_use:
+        ts_df = historical[['Year', 'Electricity']].dropna()
+        if len(ts_df) >= 2:
+            samples['TimeSeries'] = residual_bootstrap_paths(ts_df[['Year']].values, ts_df['Electricity'].values,
+                                                             future_year_arr, True, n_samples, rng)
+
+    intervals_df = pd.DataFrame({'Year': future_years})
+    intervals_json = {}
+    for model_name, paths in samples.items():
+        bands = np.percentile(np.maximum(paths, 0), percentiles, axis=0)
+        intervals_json[model_name] = {'years': [int(yr) for yr in future_years]}
+        for p, band in zip(percentiles, bands):
+            label = f"P{p:g}"
+            intervals_df[f"{model_name}_{label}"] = band
+            intervals_json[model_name][label] = [round(float(v), 4) for v in band]
+    log_info(f"Bootstrap intervals ({n_samples} draws) for models: {list(samples)}")
+    return intervals_df, intervals_json
+
+
+def save_results(sector_name, main_df, result_df_final, models, forecast_path, intervals_df=None):
     output_dir = Path(forecast_path)
     output_dir.mkdir(parents=True, exist_ok=True)
     file_path = output_dir / f"{sector_name}.xlsx"
@@ -409,6 +513,8 @@ def save_results(sector_name, main_df, result_df_final, models, forecast_path):
             pd.DataFrame([{'Model': k, 'Type': type(v).__name__, 'Parameters': str(v.get_params())}
                           for k, v in models.items()]).to_excel(writer, sheet_name='Models', index=False)
         pd.DataFrame([stats]).to_excel(writer, sheet_name='Statistics', index=False)
+        if intervals_df is not None and len(intervals_df.columns) > 1:
+            intervals_df.to_excel(writer, sheet_name='Prediction_Intervals', index=False)
     log_info(f"Results saved to {file_path}")
     return str(file_path)
 
@@ -443,6 +549,7 @@ def process_sector(sector_name, sector_config, step_offset, total_steps, progres
                               [m for m in models_to_use if m in {'MLR', 'SLR'}])
 
         future_years = list(range(int(last_historical_year) + 1, target_year + 1))
+        intervals_df, intervals_json = None, {}
         if not future_years:
             log_info("No future years to forecast")
             result_df = main_df[['Year', 'Electricity']].rename(columns={'Electricity': 'User Data'})
@@ -477,6 +584,12 @@ def process_sector(sector_name, sector_config, step_offset, total_steps, progres
             if 'TimeSeries' in models_to_use:
                 ts = time_series_forecast(main_df[main_df['Year'] <= last_historical_year], 'Electricity', target_year)
                 result_future['TimeSeries'] = np.maximum(ts[:len(future_years)], 0)
+            if CONFIG.get('prediction_intervals') and not has_user_future:
+                if progress_reporter:
+                    progress_reporter.update_sector_progress(70, "Bootstrapping prediction intervals", "Prediction Intervals")
+                intervals_df, intervals_json = compute_prediction_intervals(
+                    models, models_to_use, X, y, X_slr, X_future, mlr_vars, main_df,
+                    last_historical_year, future_years, parameters, exclude_covid)
             if len(result_future.columns) > 2:
                 result_future = result_future.drop('User Data', axis=1)
             historical = main_df[main_df['Year'] <= last_historical_year]
@@ -499,14 +612,16 @@ def process_sector(sector_name, sector_config, step_offset, total_steps, progres
             progress_reporter.update_sector_progress(90, "Saving results", "Results Export")
         output_file = save_results(sector_name, main_df, result_df,
                                    models if not has_user_future else {},
-                                   CONFIG.get('forecast_path', CONFIG['scenario_name']))
+                                   CONFIG.get('forecast_path', CONFIG['scenario_name']),
+                                   intervals_df)
         
         if progress_reporter:
             progress_reporter.update_sector_progress(100, "Sector completed", "Completed")
         return dict(sector=sector_name, status="completed",
                     models_used=['User Data'] if has_user_future else models_to_use,
                     forecast_years=len(future_years) if not has_user_future else 0,
-                    output_file=output_file, evaluation=evaluation, data_points=len(main_df))
+                    output_file=output_file, evaluation=evaluation, data_points=len(main_df),
+                    prediction_intervals=intervals_json)
     except Exception as e:
         log_error(f"Error processing sector {sector_name}: {e}")
         emit_progress({"type": "sector_failed", "sector": sector_name, "error": str(e),
@@ -578,7 +693,8 @@ def main():
                  results=results,
                  output_directory=CONFIG.get('forecast_path', CONFIG['scenario_name']),
                  timestamp=datetime.now().isoformat())
-    print(json.dumps(final, indent=2))
+    # Single line so the API can pick it up as the last stdout line
+    print(json.dumps(final))
     sys.stdout.flush()
     sys.exit(0 if len(failed) == 0 else 1)
 
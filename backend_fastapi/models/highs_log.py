@@ -0,0 +1,257 @@
+"""
+HiGHS Log Tail
+==============
+
+Solver progress events parsed from a HiGHS log file while a solve runs.
+
+HiGHS reports its iterations only in its log. A background thread follows
+the log file (``log_file`` solver option) during a solve and turns the
+iteration lines into events:
+
+    simplex   "  1234   1.2345678901e+06 Pr: 12(3.4e+02); Du: 0(1e-09) 5s"
+    ipm       "   12   1.2e-03 4.5e-05   1.23456789e+06 1.23456780e+06  3.1e-01  4.20s"
+    mip       " T  1023   45   12  0.00%   1.2e+06   1.3e+06   7.69% ... 12.3s"
+    status    "Model   status      : Optimal"
+    objective "Objective value     :  1.2345678901e+06"
+
+Events are dicts with the algorithm, iteration, objective and elapsed solver
+time where the line holds them. Iteration events are throttled; status and
+objective events always pass.
+
+Features:
+- Regex parsers for simplex, interior point and branch-and-bound lines
+- Follows the log from HiGHS reopening (truncating) it for the solve, and
+  any later truncation
+- Non-finite values (infinite MIP bounds and gaps) reported as None
+- Throttled callback from a daemon thread; callback errors never reach the solve
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_FLOAT = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|[-+]?inf'
+
+_SIMPLEX = re.compile(
+    rf'^\s*(?P<iteration>\d+)\s+(?P<objective>{_FLOAT})\s+'
+    rf'(?:(?P<phase>Ph1|Pr|Du):.*?)?\s*(?P<elapsed>\d+(?:\.\d+)?)s\s*$'
+)
+_IPM = re.compile(
+    rf'^\s*(?P<iteration>\d+)\*?\s+(?P<primal_residual>{_FLOAT})\s+(?P<dual_residual>{_FLOAT})\s+'
+    rf'(?P<objective>{_FLOAT})\s+(?P<dual_objective>{_FLOAT})\s+(?P<mu>{_FLOAT})\s+'
+    rf'(?P<elapsed>\d+(?:\.\d+)?)s\s*$'
+)
+_MIP = re.compile(
+    rf'^\s*[A-Z]?\s+(?P<nodes>\d+)\s+(?P<queue>\d+)\s+(?P<solved>\d+)\s+(?P<explored>{_FLOAT})%\s+'
+    rf'(?P<dual_bound>{_FLOAT})\s+(?P<objective>{_FLOAT})\s+(?P<gap>{_FLOAT}|Large)%?\s+.*?'
+    rf'(?P<elapsed>\d+(?:\.\d+)?)s\s*$'
+)
+_STATUS = re.compile(r'^\s*Model\s+status\s*:\s*(?P<status>.+?)\s*$')
+_OBJECTIVE = re.compile(rf'^\s*Objective value\s*:\s*(?P<objective>{_FLOAT})\s*$')
+_IPM_HEADER = re.compile(r'^\s*Iter\s+P\.res\s+D\.res')
+_SIMPLEX_HEADER = re.compile(r'^\s*Iteration\s+Objective')
+
+
+def _number(text: str) -> Optional[float]:
+    """Float of a log field; None for missing and non-finite values (e.g. 'inf' bounds)"""
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def parse_highs_line(line: str, algorithm: Optional[str] = None) -> Optional[Dict]:
+    """
+    Progress event of one HiGHS log line, or None for other lines.
+
+    Parameters
+    ----------
+    line : str
+        Log line
+    algorithm : str, optional
+        Algorithm of the table the line belongs to ('simplex' or 'ipm'),
+        from the last table header seen; decides between the simplex and
+        IPM patterns when both could match
+
+    Returns
+    -------
+    dict or None
+        Event with 'kind' ('iteration', 'status' or 'objective') and the
+        values the line holds
+    """
+    match = _STATUS.match(line)
+    if match:
+        return {'kind': 'status', 'status': match.group('status')}
+    match = _OBJECTIVE.match(line)
+    if match:
+        return {'kind': 'objective', 'objective': _number(match.group('objective'))}
+
+    if algorithm != 'simplex':
+        match = _IPM.match(line)
+        if match:
+            return {'kind': 'iteration', 'algorithm': 'ipm',
+                    'iteration': int(match.group('iteration')),
+                    'objective': _number(match.group('objective')),
+                    'dual_objective': _number(match.group('dual_objective')),
+                    'primal_residual': _number(match.group('primal_residual')),
+                    'dual_residual': _number(match.group('dual_residual')),
+                    'elapsed_seconds': _number(match.group('elapsed'))}
+    match = _SIMPLEX.match(line)
+    if match and (algorithm == 'simplex' or match.group('phase')):
+        return {'kind': 'iteration', 'algorithm': 'simplex',
+                'iteration': int(match.group('iteration')),
+                'objective': _number(match.group('objective')),
+                'phase': match.group('phase'),
+                'elapsed_seconds': _number(match.group('elapsed'))}
+    match = _MIP.match(line)
+    if match:
+        return {'kind': 'iteration', 'algorithm': 'mip',
+                'iteration': int(match.group('nodes')),
+                'objective': _number(match.group('objective')),
+                'dual_bound': _number(match.group('dual_bound')),
+                'gap_pct': _number(match.group('gap')),
+                'elapsed_seconds': _number(match.group('elapsed'))}
+    return None
+
+
+class HighsLogTail:
+    """
+    Follow a HiGHS log file in a background thread and report progress events.
+
+    Use as a context manager around a solve::
+
+        with HighsLogTail(log_file, on_event):
+            network.optimize.solve_model(...)
+
+    Parameters
+    ----------
+    log_file : str or Path
+        Log file HiGHS writes to
+    on_event : callable
+        Called with each event dict (from the tail thread)
+    min_interval : float
+        Minimum seconds between two iteration events
+    poll_interval : float
+        Seconds between checks for new log lines
+    """
+
+    def __init__(self, log_file, on_event: Callable[[Dict], None],
+                 min_interval: float = 1.0, poll_interval: float = 0.25):
+        self.log_file = Path(log_file)
+        self.on_event = on_event
+        self.min_interval = min_interval
+        self.poll_interval = poll_interval
+        self.events = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._offset = 0
+        self._start_stamp = None
+        self._reopened = False
+        self._partial = ''
+        self._algorithm: Optional[str] = None
+        self._last_emit = 0.0
+        self._skipped: Optional[Dict] = None
+
+    def __enter__(self) -> 'HighsLogTail':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        """
+        Start following the log.
+
+        HiGHS truncates its log file when a solve opens it, so the file is
+        read from the beginning once it differs from the (previous solve's)
+        file seen here at start.
+        """
+        self._start_stamp = self._stamp()
+        self._offset, self._partial, self._reopened = 0, '', self._start_stamp is None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"highs-log-{self.log_file.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Read the remaining lines and stop the thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self._read()
+        self._read(final=True)
+
+    def _stamp(self):
+        """(inode, mtime, size) of the log file, or None if it does not exist"""
+        try:
+            stat = self.log_file.stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _read(self, final: bool = False):
+        """Parse lines appended since the last read"""
+        stamp = self._stamp()
+        if stamp is None:
+            return
+        if not self._reopened:
+            if stamp == self._start_stamp:
+                return  # still the previous solve's log
+            self._reopened = True
+        size = stamp[2]
+        if size < self._offset:
+            # HiGHS reopened (truncated) the log for a new solve
+            self._offset, self._partial = 0, ''
+        if size == self._offset and not final:
+            return
+        try:
+            with open(self.log_file, 'rb') as f:
+                f.seek(self._offset)
+                text = f.read().decode('utf-8', errors='replace')
+                self._offset = f.tell()
+        except OSError:
+            return
+
+        lines = (self._partial + text).split('\n')
+        self._partial = '' if final else lines.pop()
+        for line in lines:
+            if _IPM_HEADER.match(line):
+                self._algorithm = 'ipm'
+            elif _SIMPLEX_HEADER.match(line):
+                self._algorithm = 'simplex'
+            event = parse_highs_line(line, self._algorithm)
+            if event is not None:
+                self._emit(event)
+        if final and self._skipped is not None:
+            # The last iteration always gets reported
+            self._emit(self._skipped, force=True)
+
+    def _emit(self, event: Dict, force: bool = False):
+        now = time.monotonic()
+        if event['kind'] == 'iteration' and not force and now - self._last_emit < self.min_interval:
+            self._skipped = event
+            return
+        if event['kind'] == 'iteration':
+            self._last_emit, self._skipped = now, None
+        elif self._skipped is not None:
+            # Report the solve's last iteration before its final status
+            self._emit(self._skipped, force=True)
+        self.events += 1
+        try:
+            self.on_event(event)
+        except Exception as e:
+            logger.debug(f"Solver progress listener failed: {e}")
@@ -0,0 +1,272 @@
+"""
+Input Workbook Cache
+====================
+
+Parsed, cached view of a project's inputs/input_demand_file.xlsx.
+
+The workbook is opened once in read-only mode and every sheet is read in a
+single pass. While reading, every '~'-prefixed marker cell is recorded, so
+marker lookups ('~consumption_sectors', '~Econometric_Parameters',
+'~Solar_share', ...) no longer rescan the sheets. The parsed workbook is
+cached per file and reused until the file's mtime or size changes.
+
+Features:
+- Marker index: marker -> (sheet, row, col), 1-based like openpyxl
+- Raw cell values per sheet and header-keyed records / typed DataFrames
+- Case-insensitive sheet lookup
+- Thread-safe LRU cache validated by file fingerprint
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import openpyxl
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+INPUT_WORKBOOK_RELATIVE_PATH = Path("inputs") / "input_demand_file.xlsx"
+MARKER_PREFIX = "~"
+
+
+class ParsedWorkbook:
+    """
+    All cell values and marker positions of one workbook.
+
+    Parameters
+    ----------
+    file_path : Path
+        Workbook path
+    fingerprint : tuple
+        (mtime_ns, size) of the file when it was parsed
+    """
+
+    def __init__(self, file_path: Path, fingerprint: Tuple[int, int]):
+        self.file_path = Path(file_path)
+        self.fingerprint = fingerprint
+        self.sheet_names: List[str] = []
+        self.markers: Dict[str, List[Tuple[str, int, int]]] = {}
+        self._rows: Dict[str, List[tuple]] = {}
+        self._records: Dict[str, List[Dict[str, Any]]] = {}
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, file_path: Path) -> "ParsedWorkbook":
+        """
+        Read every sheet of a workbook in one read-only pass.
+
+        Parameters
+        ----------
+        file_path : Path
+            Workbook path
+
+        Returns
+        -------
+        ParsedWorkbook
+            Parsed workbook with marker index
+        """
+        stat = Path(file_path).stat()
+        parsed = cls(file_path, (stat.st_mtime_ns, stat.st_size))
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for sheet_name in workbook.sheetnames:
+                sheet = workbook[sheet_name]
+                if not hasattr(sheet, "iter_rows"):
+                    continue  # chart sheets
+                rows = []
+                for row_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+                    rows.append(row)
+                    for col_idx, value in enumerate(row, start=1):
+                        if isinstance(value, str) and value.strip().startswith(MARKER_PREFIX):
+                            key = value.strip().lower()
+                            parsed.markers.setdefault(key, []).append((sheet_name, row_idx, col_idx))
+                parsed.sheet_names.append(sheet_name)
+                parsed._rows[sheet_name] = rows
+        finally:
+            workbook.close()
+        return parsed
+
+    # ------------------------------------------------------------------
+    # Sheets and cells
+    # ------------------------------------------------------------------
+
+    def find_sheet(self, sheet_name: str) -> Optional[str]:
+        """Actual name of a sheet matched case-insensitively, or None."""
+        lower_case_name = sheet_name.lower()
+        for name in self.sheet_names:
+            if name.lower() == lower_case_name:
+                return name
+        return None
+
+    def rows(self, sheet_name: str) -> List[tuple]:
+        """Raw row tuples of a sheet (values only)."""
+        return self._rows.get(sheet_name, [])
+
+    def max_row(self, sheet_name: str) -> int:
+        return len(self.rows(sheet_name))
+
+    def max_column(self, sheet_name: str) -> int:
+        return max((len(row) for row in self.rows(sheet_name)), default=0)
+
+    def cell(self, sheet_name: str, row: int, column: int) -> Any:
+        """Value of a cell (1-based), None outside the used range."""
+        rows = self.rows(sheet_name)
+        if row < 1 or row > len(rows):
+            return None
+        values = rows[row - 1]
+        if column < 1 or column > len(values):
+            return None
+        return values[column - 1]
+
+    def headers(self, sheet_name: str) -> List[Any]:
+        """First row of a sheet."""
+        rows = self.rows(sheet_name)
+        return list(rows[0]) if rows else []
+
+    # ------------------------------------------------------------------
+    # Markers
+    # ------------------------------------------------------------------
+
+    def find_marker(self, marker: str, sheet_name: Optional[str] = None) -> Optional[Tuple[int, int]]:
+        """
+        Position of the first occurrence of a marker.
+
+        Parameters
+        ----------
+        marker : str
+            Marker text, e.g. '~Solar_share' (case-insensitive)
+        sheet_name : str, optional
+            Restrict the lookup to one sheet
+
+        Returns
+        -------
+        tuple or None
+            (row, col), 1-based
+        """
+        for sheet, row, col in self.markers.get(marker.strip().lower(), []):
+            if sheet_name is None or sheet == sheet_name:
+                return (row, col)
+        return None
+
+    # ------------------------------------------------------------------
+    # Tables
+    # ------------------------------------------------------------------
+
+    def records(self, sheet_name: str) -> List[Dict[str, Any]]:
+        """
+        Rows below the header row as dicts keyed by header.
+
+        Matches dict(zip(headers, row)) on the raw rows.
+        """
+        with self._lock:
+            cached = self._records.get(sheet_name)
+            if cached is None:
+                rows = self.rows(sheet_name)
+                headers = list(rows[0]) if rows else []
+                cached = [dict(zip(headers, row)) for row in rows[1:]]
+                self._records[sheet_name] = cached
+            return cached
+
+    def frame(self, sheet_name: str) -> pd.DataFrame:
+        """
+        Sheet as a typed DataFrame (first row as header).
+
+        Empty header cells are dropped; numeric columns are converted to
+        numeric dtypes, other columns are left as objects.
+        """
+        with self._lock:
+            cached = self._frames.get(sheet_name)
+            if cached is None:
+                rows = self.rows(sheet_name)
+                headers = list(rows[0]) if rows else []
+                keep = [i for i, h in enumerate(headers) if h is not None and str(h).strip() != ""]
+                data = {}
+                for i in keep:
+                    column = pd.Series([row[i] if i < len(row) else None for row in rows[1:]], dtype=object)
+                    numeric = pd.to_numeric(column, errors="coerce")
+                    data[headers[i]] = numeric if numeric.notna().sum() == column.notna().sum() else column
+                cached = pd.DataFrame(data)
+                self._frames[sheet_name] = cached
+            return cached
+
+
+class InputWorkbookCache:
+    """Thread-safe LRU cache of parsed workbooks, validated by file mtime and size."""
+
+    def __init__(self, max_workbooks: int = 8):
+        self.max_workbooks = max_workbooks
+        self._workbooks: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "loads": 0}
+
+    def get(self, file_path) -> ParsedWorkbook:
+        """
+        Get a parsed workbook, re-reading it if the file changed.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the workbook does not exist
+        """
+        file_path = Path(file_path)
+        stat = file_path.stat()
+        fingerprint = (stat.st_mtime_ns, stat.st_size)
+        key = str(file_path.resolve())
+
+        with self._lock:
+            parsed = self._workbooks.get(key)
+            if parsed is not None and parsed.fingerprint == fingerprint:
+                self._workbooks.move_to_end(key)
+                self._stats["hits"] += 1
+                return parsed
+
+            start = time.time()
+            parsed = ParsedWorkbook.load(file_path)
+            self._workbooks[key] = parsed
+            self._workbooks.move_to_end(key)
+            while len(self._workbooks) > self.max_workbooks:
+                self._workbooks.popitem(last=False)
+            self._stats["loads"] += 1
+            logger.info(f"Parsed {file_path.name} ({len(parsed.sheet_names)} sheets, "
+                        f"{len(parsed.markers)} markers) in {time.time() - start:.3f}s")
+            return parsed
+
+    def invalidate(self, file_path=None):
+        """Drop one cached workbook, or all of them."""
+        with self._lock:
+            if file_path is None:
+                self._workbooks.clear()
+            else:
+                self._workbooks.pop(str(Path(file_path).resolve()), None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"workbooks": len(self._workbooks), "max_workbooks": self.max_workbooks, **self._stats}
+
+
+_workbook_cache = InputWorkbookCache()
+
+
+def get_input_workbook_cache() -> InputWorkbookCache:
+    """Get the global input workbook cache."""
+    return _workbook_cache
+
+
+def get_input_workbook(project_path) -> ParsedWorkbook:
+    """
+    Parsed input_demand_file.xlsx of a project.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the project has no input demand workbook
+    """
+    return _workbook_cache.get(Path(project_path) / INPUT_WORKBOOK_RELATIVE_PATH)
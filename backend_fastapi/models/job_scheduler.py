@@ -0,0 +1,572 @@
+"""
+Background Job Scheduler
+========================
+
+Local admission control for the heavy background jobs started by the API
+(demand forecasts, load profile generation and PyPSA optimizations).
+
+Every job belongs to a job class. Each class has its own CPU and memory
+budget, so a burst of optimizations cannot starve the machine, and a
+priority, so interactive forecasts are started ahead of batch
+optimizations. Jobs that do not fit into the budget are queued and their
+queue position is reported on the job's own event queue, which the routes'
+SSE endpoints read by job id (a second submission never takes over the
+stream of a job that is still queued or running).
+
+Features:
+- Per-class CPU and memory budgets plus a machine-wide budget
+- Priority queue (lower value runs first, FIFO within a priority)
+- Per-job asyncio event queue, filled thread-safely from worker threads
+- Queue position notifications for waiting jobs
+- Cancellation of queued and running jobs (running subprocesses are terminated)
+- Job statistics for monitoring
+- Finished jobs kept for an hour (at most the last 200), then forgotten
+
+This scheduler is deliberately single-process: state lives in memory of the
+FastAPI worker and is lost on restart.
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import os
+import time
+import asyncio
+import uuid
+import heapq
+import itertools
+import threading
+import subprocess
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Finished jobs stay visible (list_jobs, SSE replay of their queued events)
+# for this long, and only this many of them are kept
+FINISHED_JOB_TTL_SECONDS = 3600.0
+MAX_FINISHED_JOBS = 200
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation has been requested."""
+
+
+@dataclass
+class JobClass:
+    """Resource budget and scheduling priority for a class of jobs."""
+    name: str
+    priority: int
+    cpu_budget: int
+    memory_budget_mb: int
+    default_cpus: int = 1
+    default_memory_mb: int = 1024
+
+
+def _total_memory_mb() -> int:
+    """Physical memory of the machine in MB (falls back to 8 GB)."""
+    try:
+        return int(os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / (1024 * 1024))
+    except (AttributeError, ValueError, OSError):
+        return 8192
+
+
+def _total_cpus() -> int:
+    """Number of CPUs usable by this process."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def default_job_classes(total_cpus: int, total_memory_mb: int) -> Dict[str, JobClass]:
+    """
+    Build the default job classes for a machine.
+
+    Parameters
+    ----------
+    total_cpus : int
+        CPUs available to the backend
+    total_memory_mb : int
+        Memory available to the backend in MB
+
+    Returns
+    -------
+    dict
+        Mapping of class name to JobClass
+    """
+    return {
+        # Interactive: small, short-lived, always ahead of batch work
+        'forecast': JobClass(
+            name='forecast', priority=0,
+            cpu_budget=max(2, total_cpus // 4),
+            memory_budget_mb=max(1024, total_memory_mb // 4),
+            default_cpus=1, default_memory_mb=1024
+        ),
+        'profile': JobClass(
+            name='profile', priority=5,
+            cpu_budget=max(1, total_cpus // 4),
+            memory_budget_mb=max(2048, int(total_memory_mb * 0.3)),
+            default_cpus=1, default_memory_mb=2048
+        ),
+        # Batch: solver-bound, one large job at a time on small machines
+        'pypsa_model': JobClass(
+            name='pypsa_model', priority=10,
+            cpu_budget=max(1, total_cpus // 2),
+            memory_budget_mb=max(4096, total_memory_mb // 2),
+            default_cpus=max(1, total_cpus // 2),
+            default_memory_mb=max(4096, total_memory_mb // 4)
+        ),
+    }
+
+
+class Job:
+    """A unit of background work tracked by the scheduler."""
+
+    def __init__(self, job_class: JobClass, target: Callable[['Job'], Any], name: str,
+                 priority: int, cpus: int, memory_mb: int,
+                 on_event: Optional[Callable[[Dict], None]] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.job_class = job_class
+        self.target = target
+        self.name = name or job_class.name
+        self.priority = priority
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self.on_event = on_event
+
+        self.state = 'queued'
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+        self._process: Optional[subprocess.Popen] = None
+
+        # SSE event queue of this job, bound to the event loop of the
+        # request that submitted it (None when submitted outside a loop)
+        self.events: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach_process(self, process: subprocess.Popen):
+        """Register the subprocess doing the work so cancellation can terminate it."""
+        self._process = process
+        if self.cancel_event.is_set():
+            self._terminate_process()
+
+    def is_cancelled(self) -> bool:
+        """Whether cancellation has been requested."""
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation has been requested."""
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+    def publish(self, event: Dict):
+        """Put an event on the job's event queue; safe to call from any thread."""
+        if self.events is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self.events.put_nowait, event)
+        except RuntimeError:
+            # Event loop closed (server shutting down): nobody is listening
+            pass
+
+    def emit(self, event: Dict):
+        """Publish a scheduler event and pass it to the job owner, never raising."""
+        self.publish(event)
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(event)
+        except Exception as e:
+            logger.warning(f"Job {self.id} event callback failed: {e}")
+
+    def _terminate_process(self):
+        process = self._process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        except Exception as e:
+            logger.warning(f"Failed to terminate process for job {self.id}: {e}")
+
+    def to_dict(self) -> Dict:
+        """Serializable job summary."""
+        return {
+            'jobId': self.id,
+            'jobClass': self.job_class.name,
+            'name': self.name,
+            'state': self.state,
+            'priority': self.priority,
+            'cpus': self.cpus,
+            'memoryMb': self.memory_mb,
+            'submittedAt': self.submitted_at,
+            'startedAt': self.started_at,
+            'finishedAt': self.finished_at,
+            'error': self.error,
+        }
+
+
+class JobScheduler:
+    """
+    Thread-safe priority scheduler with per-class resource budgets.
+
+    Jobs run in their own daemon thread once admitted. A job is admitted when
+    its CPU and memory reservation fits both its class budget and the
+    machine-wide budget. Dispatch is strict by priority across the machine
+    budget and head-of-line within a class, so a large waiting job is not
+    overtaken forever by small jobs of the same class.
+    """
+
+    def __init__(self, job_classes: Optional[Dict[str, JobClass]] = None,
+                 total_cpus: Optional[int] = None, total_memory_mb: Optional[int] = None,
+                 finished_job_ttl: float = FINISHED_JOB_TTL_SECONDS,
+                 max_finished_jobs: int = MAX_FINISHED_JOBS):
+        """
+        Initialize the scheduler.
+
+        Parameters
+        ----------
+        job_classes : dict, optional
+            Job class definitions; defaults to default_job_classes()
+        total_cpus : int, optional
+            Machine-wide CPU budget; defaults to the usable CPU count
+        total_memory_mb : int, optional
+            Machine-wide memory budget; defaults to physical memory
+        finished_job_ttl : float
+            Seconds a finished job is kept before it is forgotten
+        max_finished_jobs : int
+            Maximum number of finished jobs kept (oldest forgotten first)
+        """
+        self.total_cpus = total_cpus or _total_cpus()
+        self.total_memory_mb = total_memory_mb or _total_memory_mb()
+        self.job_classes = job_classes or default_job_classes(self.total_cpus, self.total_memory_mb)
+        self.finished_job_ttl = finished_job_ttl
+        self.max_finished_jobs = max_finished_jobs
+
+        self._lock = threading.RLock()
+        self._pending: List = []  # heap of (priority, seq, job)
+        self._seq = itertools.count()
+        self._running: Dict[str, Job] = {}
+        self._jobs: Dict[str, Job] = {}
+
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'max_queue_length': 0,
+            'pruned': 0,
+        }
+
+        logger.info(
+            f"JobScheduler initialized: cpus={self.total_cpus}, memory={self.total_memory_mb}MB, "
+            f"classes={list(self.job_classes)}"
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def cpu_budget(self, job_class: str) -> int:
+        """CPU budget of a job class (upper bound for a single job's threads)."""
+        return self._get_class(job_class).cpu_budget
+
+    def submit(self, job_class: str, target: Callable[[Job], Any], name: str = '',
+               priority: Optional[int] = None, cpus: Optional[int] = None,
+               memory_mb: Optional[int] = None,
+               on_event: Optional[Callable[[Dict], None]] = None) -> Job:
+        """
+        Submit a job for execution.
+
+        Parameters
+        ----------
+        job_class : str
+            One of the configured job classes ('forecast', 'profile', 'pypsa_model')
+        target : callable
+            Function called with the Job once admitted; runs in a worker thread
+        name : str, optional
+            Human readable job name
+        priority : int, optional
+            Overrides the class priority (lower runs first)
+        cpus : int, optional
+            CPU reservation, clamped to the class budget
+        memory_mb : int, optional
+            Memory reservation in MB, clamped to the class budget
+        on_event : callable, optional
+            Also receives the scheduler events ('queued', 'started',
+            'cancelled'), after they were put on the job's event queue
+
+        Returns
+        -------
+        Job
+            The submitted job
+        """
+        cls = self._get_class(job_class)
+        cpus = max(1, min(cpus or cls.default_cpus, cls.cpu_budget, self.total_cpus))
+        memory_mb = max(1, min(memory_mb or cls.default_memory_mb,
+                               cls.memory_budget_mb, self.total_memory_mb))
+        job = Job(cls, target, name, cls.priority if priority is None else priority,
+                  cpus, memory_mb, on_event)
+        try:
+            job._loop = asyncio.get_running_loop()
+            job.events = asyncio.Queue()
+        except RuntimeError:
+            pass  # not submitted from a request: no event queue
+
+        with self._lock:
+            self._prune_locked()
+            self._jobs[job.id] = job
+            heapq.heappush(self._pending, (job.priority, next(self._seq), job))
+            self._stats['submitted'] += 1
+            self._stats['max_queue_length'] = max(self._stats['max_queue_length'], len(self._pending))
+            self._dispatch_locked()
+            if job.state == 'queued':
+                logger.info(f"Job {job.id} ({job.name}) queued at position {self._position_locked(job)}")
+
+        self._notify_queue_positions()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Parameters
+        ----------
+        job_id : str
+            Job identifier
+
+        Returns
+        -------
+        bool
+            True if the job was found and still active
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in ('queued', 'running'):
+                return False
+
+            job.cancel_event.set()
+
+            if job.state == 'queued':
+                self._pending = [entry for entry in self._pending if entry[2] is not job]
+                heapq.heapify(self._pending)
+                self._finish_locked(job, 'cancelled')
+                queued_cancel = True
+            else:
+                queued_cancel = False
+
+        logger.info(f"Job {job_id} cancellation requested")
+        if queued_cancel:
+            job.emit({'type': 'cancelled', 'jobId': job.id})
+            job.done_event.set()
+            self._notify_queue_positions()
+        else:
+            # Running: terminate the attached subprocess; in-process jobs
+            # observe cancel_event via check_cancelled()
+            job._terminate_process()
+        return True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, job_id: Optional[str], job_class: str) -> Optional[Job]:
+        """
+        Job of a class by id, or the most recently submitted job of the class.
+
+        Parameters
+        ----------
+        job_id : str, optional
+            Job identifier; the newest job of the class when not given
+        job_class : str
+            Job class the job must belong to
+
+        Returns
+        -------
+        Job or None
+            None if there is no such job
+        """
+        with self._lock:
+            if job_id:
+                job = self._jobs.get(job_id)
+                return job if job is not None and job.job_class.name == job_class else None
+            # _jobs keeps submission order
+            return next((job for job in reversed(list(self._jobs.values()))
+                         if job.job_class.name == job_class), None)
+
+    def list_jobs(self, active_only: bool = False) -> List[Dict]:
+        """List jobs, newest first."""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.submitted_at, reverse=True)
+            result = []
+            for job in jobs:
+                if active_only and job.state not in ('queued', 'running'):
+                    continue
+                info = job.to_dict()
+                if job.state == 'queued':
+                    info['queuePosition'] = self._position_locked(job)
+                result.append(info)
+            return result
+
+    def get_stats(self) -> Dict:
+        """Get scheduler statistics and current resource usage."""
+        with self._lock:
+            usage = {}
+            for name, cls in self.job_classes.items():
+                running = [j for j in self._running.values() if j.job_class.name == name]
+                usage[name] = {
+                    'priority': cls.priority,
+                    'cpu_budget': cls.cpu_budget,
+                    'memory_budget_mb': cls.memory_budget_mb,
+                    'cpus_in_use': sum(j.cpus for j in running),
+                    'memory_in_use_mb': sum(j.memory_mb for j in running),
+                    'running': len(running),
+                    'queued': sum(1 for _, _, j in self._pending if j.job_class.name == name),
+                }
+            return {
+                'total_cpus': self.total_cpus,
+                'total_memory_mb': self.total_memory_mb,
+                'running': len(self._running),
+                'queued': len(self._pending),
+                'classes': usage,
+                **self._stats,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _get_class(self, job_class: str) -> JobClass:
+        if job_class not in self.job_classes:
+            raise ValueError(f"Unknown job class: {job_class}")
+        return self.job_classes[job_class]
+
+    def _usage_locked(self, class_name: Optional[str] = None):
+        running = self._running.values()
+        if class_name is not None:
+            running = [j for j in running if j.job_class.name == class_name]
+        return sum(j.cpus for j in running), sum(j.memory_mb for j in running)
+
+    def _fits_locked(self, job: Job):
+        """Return (fits_class, fits_machine) for a job."""
+        class_cpus, class_mem = self._usage_locked(job.job_class.name)
+        total_cpus, total_mem = self._usage_locked()
+        fits_class = (class_cpus + job.cpus <= job.job_class.cpu_budget and
+                      class_mem + job.memory_mb <= job.job_class.memory_budget_mb)
+        fits_machine = (total_cpus + job.cpus <= self.total_cpus and
+                        total_mem + job.memory_mb <= self.total_memory_mb)
+        return fits_class, fits_machine
+
+    def _dispatch_locked(self):
+        """Start every queued job that fits, in priority order."""
+        blocked_classes = set()
+        for entry in sorted(self._pending):
+            job = entry[2]
+            if job.job_class.name in blocked_classes:
+                continue
+            fits_class, fits_machine = self._fits_locked(job)
+            if fits_class and fits_machine:
+                self._start_locked(job)
+            elif not fits_machine:
+                # Higher priority work is waiting for machine resources:
+                # do not let lower priority jobs take them.
+                break
+            else:
+                blocked_classes.add(job.job_class.name)
+        self._pending = [entry for entry in self._pending if entry[2].state == 'queued']
+        heapq.heapify(self._pending)
+
+    def _start_locked(self, job: Job):
+        job.state = 'running'
+        job.started_at = time.time()
+        self._running[job.id] = job
+        logger.info(f"Job {job.id} ({job.name}) started: cpus={job.cpus}, memory={job.memory_mb}MB")
+        job.emit({'type': 'started', 'jobId': job.id, 'waitSeconds': round(job.started_at - job.submitted_at, 2)})
+        thread = threading.Thread(target=self._run, args=(job,), name=f"job-{job.id}", daemon=True)
+        thread.start()
+
+    def _run(self, job: Job):
+        state = 'completed'
+        try:
+            job.result = job.target(job)
+            if job.is_cancelled():
+                state = 'cancelled'
+        except JobCancelled:
+            state = 'cancelled'
+        except Exception as e:
+            state = 'cancelled' if job.is_cancelled() else 'failed'
+            job.error = str(e)
+            logger.error(f"Job {job.id} ({job.name}) failed: {e}")
+        finally:
+            with self._lock:
+                self._running.pop(job.id, None)
+                self._finish_locked(job, state)
+                self._dispatch_locked()
+            # The cancelled event goes out before done_event fires, so owners
+            # that report the end of a job on done_event report it last
+            if state == 'cancelled':
+                job.emit({'type': 'cancelled', 'jobId': job.id})
+            job.done_event.set()
+            self._notify_queue_positions()
+
+    def _finish_locked(self, job: Job, state: str):
+        """Record a job's final state; the caller sets done_event after its last event."""
+        job.state = state
+        job.finished_at = time.time()
+        self._stats[state] += 1
+        self._prune_locked()
+
+    def _prune_locked(self):
+        """Forget finished jobs older than the TTL and beyond the newest max_finished_jobs."""
+        finished = sorted((job for job in self._jobs.values() if job.finished_at is not None),
+                          key=lambda j: j.finished_at, reverse=True)
+        cutoff = time.time() - self.finished_job_ttl
+        for index, job in enumerate(finished):
+            if index >= self.max_finished_jobs or job.finished_at < cutoff:
+                del self._jobs[job.id]
+                self._stats['pruned'] += 1
+
+    def _position_locked(self, job: Job) -> int:
+        for position, entry in enumerate(sorted(self._pending), start=1):
+            if entry[2] is job:
+                return position
+        return 0
+
+    def _notify_queue_positions(self):
+        """Report the current queue position to every waiting job."""
+        with self._lock:
+            ordered = [entry[2] for entry in sorted(self._pending)]
+        queue_length = len(ordered)
+        for position, job in enumerate(ordered, start=1):
+            job.emit({
+                'type': 'queued',
+                'jobId': job.id,
+                'queuePosition': position,
+                'queueLength': queue_length,
+            })
+
+
+# Global scheduler instance shared by all routes
+_global_scheduler: Optional[JobScheduler] = None
+_global_scheduler_lock = threading.Lock()
+
+
+def get_job_scheduler() -> JobScheduler:
+    """Get the global job scheduler instance."""
+    global _global_scheduler
+    with _global_scheduler_lock:
+        if _global_scheduler is None:
+            _global_scheduler = JobScheduler()
+        return _global_scheduler
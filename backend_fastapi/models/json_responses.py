@@ -0,0 +1,229 @@
+"""
+JSON Responses
+==============
+
+Fast, numpy/pandas-aware JSON serialization for API responses.
+
+By default FastAPI passes every returned dict through jsonable_encoder,
+which walks and copies each nested object, and then through json.dumps,
+which rejects NaN/Inf. Routes therefore had to scrub DataFrames
+(replace inf, where notna) before returning them. This module serializes
+the handler's return value in one pass with orjson instead:
+
+- numpy arrays and scalars are written natively
+- pandas DataFrames (as records), Series, Index and Timestamps are
+  converted on the fly
+- NaN, Inf and NaT become null
+
+When orjson is not installed, a pure-Python sanitizing pass plus json.dumps
+produces the same output (slower).
+
+Features:
+- ``dumps``: bytes for any payload the API returns
+- ``NumpyJSONResponse``: response class (application default)
+- ``FastJSONRoute``: route class that serializes return values directly,
+  bypassing jsonable_encoder, while keeping status codes, headers set on
+  an injected Response and background tasks
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import asyncio
+import dataclasses
+import datetime
+import decimal
+import enum
+import functools
+import inspect
+import json
+import math
+import uuid
+from pathlib import PurePath
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _default(obj: Any) -> Any:
+    """Convert objects the fast serializer does not know natively."""
+    if isinstance(obj, pd.DataFrame):
+        return obj.to_dict('records')
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return obj.tolist()
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode='json')
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, PurePath):
+        return str(obj)
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _sanitize(obj: Any) -> Any:
+    """Plain-Python copy of a payload: NaN/Inf -> None, str keys, known types converted."""
+    if obj is None or isinstance(obj, (str, bool, int)):
+        return obj.value if isinstance(obj, enum.Enum) else obj
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {_key(k): _sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(v) for v in obj]
+    if isinstance(obj, enum.Enum):
+        return _sanitize(obj.value)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return None if obj is pd.NaT else obj.isoformat()
+    if isinstance(obj, np.datetime64):
+        return None if np.isnat(obj) else str(obj.astype('datetime64[us]'))
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    return _sanitize(_default(obj))
+
+
+def _key(key: Any) -> str:
+    """Dict key as JSON object key (the same text orjson writes for non-str keys)."""
+    if isinstance(key, str):
+        return key
+    if isinstance(key, np.generic):
+        key = key.item()
+    if isinstance(key, bool):
+        return 'true' if key else 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, enum.Enum):
+        return _key(key.value)
+    if isinstance(key, (datetime.datetime, datetime.date, datetime.time)):
+        return key.isoformat()
+    return str(key)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize an API payload to compact UTF-8 JSON.
+
+    Parameters
+    ----------
+    content : Any
+        Dicts, lists, scalars, numpy arrays/scalars, pandas objects,
+        pydantic models, dates, paths, ...
+
+    Returns
+    -------
+    bytes
+        JSON document; NaN, Inf and NaT are written as null
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. numpy scalar dict keys; normalise in Python and retry
+            return orjson.dumps(_sanitize(content), option=_ORJSON_OPTIONS)
+    return json.dumps(_sanitize(content), ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+class EncodedJSON(str):
+    """
+    A payload that is already serialized.
+
+    jsonable_encoder returns str instances unchanged, so a handler result
+    wrapped in EncodedJSON passes through FastAPI's serialization step in
+    constant time and NumpyJSONResponse writes it as is.
+    """
+
+
+class NumpyJSONResponse(JSONResponse):
+    """JSON response rendered with the numpy/pandas-aware serializer."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, EncodedJSON):
+            return content.encode("utf-8")
+        return dumps(content)
+
+
+def _encode_result(result: Any) -> Any:
+    if isinstance(result, Response):
+        return result
+    return EncodedJSON(dumps(result).decode("utf-8"))
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Route class that serializes handler results with ``dumps``.
+
+    Routes with a response model (explicit or from a return annotation)
+    are left to FastAPI's validation and serialization. Returned Response
+    objects are passed through.
+
+    Use it as the route class of a router:
+
+        router = APIRouter(route_class=FastJSONRoute)
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        response_model = kwargs.get("response_model")
+        has_response_model = (
+            not isinstance(response_model, DefaultPlaceholder) and response_model is not None
+        ) or _has_return_annotation(endpoint)
+        if not has_response_model:
+            endpoint = _encoding_endpoint(endpoint)
+            if isinstance(kwargs.get("response_class"), DefaultPlaceholder):
+                kwargs["response_class"] = NumpyJSONResponse
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _has_return_annotation(endpoint: Callable[..., Any]) -> bool:
+    annotation = inspect.signature(endpoint).return_annotation
+    return annotation is not inspect.Signature.empty and annotation is not None
+
+
+def _encoding_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap an endpoint so its result is serialized once, keeping its signature."""
+    if getattr(endpoint, "__encodes_json__", False):
+        # Already wrapped (include_router re-creates routes from their endpoints)
+        return endpoint
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            return _encode_result(await endpoint(*args, **kwargs))
+        async_wrapper.__encodes_json__ = True
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        return _encode_result(endpoint(*args, **kwargs))
+    sync_wrapper.__encodes_json__ = True
+    return sync_wrapper
@@ -2248,6 +2248,14 @@ def main():
                 if pattern_info:
                     pd.DataFrame(pattern_info).to_excel(writer, sheet_name='Pattern_Info', index=False)
         
+        # Metadata sidecar (fiscal years, coverage, per-year peak/energy) so the
+        # API can list the profile's years without re-reading the workbook
+        try:
+            from profile_metadata import write_profile_metadata
+            write_profile_metadata(project_path, scenario_name, profile_df)
+        except Exception as e:
+            print(f"Warning: could not write profile metadata sidecar: {e}", file=sys.stderr)
+        
         progress.complete_process("Generation completed successfully")
         
         # Prepare result
@@ -0,0 +1,455 @@
+"""
+Load Profile Store
+==================
+
+Columnar, fiscal-year partitioned storage of generated hourly load
+profiles (results/load_profiles/<profile>.xlsx, sheet 'Load_Profile').
+
+The Load_Profile sheet is converted once into one NumPy .npz file per
+fiscal year under results/load_profiles/.cache/<profile>/, with a manifest
+describing columns and per-partition row counts, months and date ranges.
+Queries prune partitions using the manifest (fiscal year, month and date
+range predicates) and only load and filter the partitions they need.
+
+Features:
+- Lazy conversion on first access, rebuilt when the workbook's mtime or
+  size changes
+- Predicate pushdown for fiscal years, months / seasons and date ranges
+- Server-side aggregations: daily peak, hourly mean by month, load
+  duration curve
+- Columnar results (column name -> array)
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT_VERSION = 1
+CACHE_DIRNAME = ".cache"
+MANIFEST_FILENAME = "manifest.json"
+PROFILE_SHEET = "Load_Profile"
+DEFAULT_VALUE_COLUMN = "Demand_MW"
+
+SEASON_MONTHS = {
+    'Monsoon': [7, 8, 9],
+    'Post-monsoon': [10, 11],
+    'Winter': [12, 1, 2],
+    'Summer': [3, 4, 5, 6]
+}
+
+AGGREGATIONS = ('daily_peak', 'hourly_mean_by_month', 'load_duration_curve')
+
+
+def _excel_datetimes(values: pd.Series) -> pd.Series:
+    """DateTime column as datetime64; Excel serial numbers use the 1899-12-30 epoch."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    numeric = pd.to_numeric(values, errors='coerce')
+    if numeric.notna().any() and numeric.notna().sum() == values.notna().sum():
+        return pd.to_datetime(numeric, unit='D', origin='1899-12-30')
+    return pd.to_datetime(values, errors='coerce')
+
+
+def _column_kind(series: pd.Series) -> str:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    if pd.api.types.is_bool_dtype(series):
+        return 'int'
+    if pd.api.types.is_integer_dtype(series):
+        return 'int'
+    if pd.api.types.is_numeric_dtype(series):
+        return 'float'
+    return 'category'
+
+
+class LoadProfileStore:
+    """
+    Partitioned store of one load profile.
+
+    Parameters
+    ----------
+    project_path : str or Path
+        Project root directory
+    profile_name : str
+        Profile name (workbook stem)
+    """
+
+    def __init__(self, project_path, profile_name: str):
+        self.profile_name = profile_name
+        self.source_path = Path(project_path) / "results" / "load_profiles" / f"{profile_name}.xlsx"
+        self.cache_dir = Path(project_path) / "results" / "load_profiles" / CACHE_DIRNAME / profile_name
+        self._lock = threading.Lock()
+        self._manifest: Optional[Dict] = None
+        self._partitions: OrderedDict = OrderedDict()
+        self.max_cached_partitions = 32
+
+    # ------------------------------------------------------------------
+    # Build / validation
+    # ------------------------------------------------------------------
+
+    def _source_fingerprint(self) -> Dict[str, int]:
+        stat = self.source_path.stat()
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def _read_manifest(self) -> Optional[Dict]:
+        manifest_path = self.cache_dir / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Unreadable load profile manifest {manifest_path}: {e}")
+            return None
+
+    def manifest(self) -> Dict:
+        """
+        Current manifest, converting the workbook first if needed.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the profile workbook does not exist
+        KeyError
+            If the workbook has no Load_Profile sheet or Fiscal_Year column
+        """
+        fingerprint = self._source_fingerprint()
+        with self._lock:
+            if self._manifest is None or self._manifest.get('source') != fingerprint:
+                manifest = self._read_manifest()
+                if (manifest is None or manifest.get('source') != fingerprint
+                        or manifest.get('format_version') != STORE_FORMAT_VERSION):
+                    manifest = self._build(fingerprint)
+                self._manifest = manifest
+                self._partitions.clear()
+            return self._manifest
+
+    def _build(self, fingerprint: Dict[str, int]) -> Dict:
+        """Convert the Load_Profile sheet into per-fiscal-year partitions."""
+        start = time.time()
+        try:
+            df = pd.read_excel(self.source_path, sheet_name=PROFILE_SHEET, engine='openpyxl')
+        except ValueError as e:
+            raise KeyError(f"Sheet '{PROFILE_SHEET}' not found.") from e
+        if 'Fiscal_Year' not in df.columns:
+            raise KeyError("Column 'Fiscal_Year' not found in Load_Profile sheet.")
+
+        df = df.loc[:, [c for c in df.columns if not str(c).startswith('Unnamed:')]]
+        if 'DateTime' in df.columns:
+            df['DateTime'] = _excel_datetimes(df['DateTime'])
+        fiscal_years = pd.to_numeric(df['Fiscal_Year'], errors='coerce')
+        df = df[fiscal_years.notna()].copy()
+        df['Fiscal_Year'] = fiscal_years[fiscal_years.notna()].astype(np.int64)
+
+        columns = [{'name': str(c), 'kind': _column_kind(df[c])} for c in df.columns]
+        token = f"{fingerprint['mtime_ns']:x}{fingerprint['size']:x}"
+        tmp_dir = self.cache_dir.with_name(f"{self.cache_dir.name}.tmp{os.getpid()}_{threading.get_ident()}")
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+        tmp_dir.mkdir(parents=True)
+
+        partitions = {}
+        for fy, part in df.groupby('Fiscal_Year', sort=True):
+            arrays = {}
+            for column in columns:
+                name, kind = column['name'], column['kind']
+                values = part[name]
+                if kind == 'datetime':
+                    arrays[name] = values.to_numpy(dtype='datetime64[s]')
+                elif kind == 'int':
+                    arrays[name] = values.to_numpy(dtype=np.int64)
+                elif kind == 'float':
+                    arrays[name] = values.to_numpy(dtype=np.float64)
+                else:
+                    codes, categories = pd.factorize(values, use_na_sentinel=True)
+                    arrays[f"{name}__codes"] = codes.astype(np.int32)
+                    arrays[f"{name}__categories"] = np.asarray([str(c) for c in categories], dtype=str)
+            file_name = f"fy{int(fy)}_{token}.npz"
+            np.savez(tmp_dir / file_name, **arrays)
+
+            entry = {'file': file_name, 'rows': int(len(part))}
+            if 'Month' in part.columns:
+                entry['months'] = sorted(int(m) for m in pd.to_numeric(part['Month'], errors='coerce').dropna().unique())
+            if 'DateTime' in part.columns and part['DateTime'].notna().any():
+                entry['start'] = str(part['DateTime'].min().to_datetime64().astype('datetime64[s]'))
+                entry['end'] = str(part['DateTime'].max().to_datetime64().astype('datetime64[s]'))
+            partitions[str(int(fy))] = entry
+
+        manifest = {
+            'format_version': STORE_FORMAT_VERSION,
+            'profile': self.profile_name,
+            'source': fingerprint,
+            'columns': columns,
+            'partitions': partitions,
+            'built_at': time.time(),
+        }
+        with open(tmp_dir / MANIFEST_FILENAME, 'w') as f:
+            json.dump(manifest, f)
+
+        # Swap the new partition set in
+        if self.cache_dir.exists():
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.replace(tmp_dir, self.cache_dir)
+        logger.info(f"Load profile store built for '{self.profile_name}': {len(df)} rows, "
+                    f"{len(partitions)} fiscal years in {time.time() - start:.2f}s")
+        return manifest
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _load_partition(self, fiscal_year: str, manifest: Dict) -> Dict[str, np.ndarray]:
+        key = (fiscal_year, manifest['partitions'][fiscal_year]['file'])
+        with self._lock:
+            cached = self._partitions.get(key)
+            if cached is not None:
+                self._partitions.move_to_end(key)
+                return cached
+
+        with np.load(self.cache_dir / key[1], allow_pickle=False) as npz:
+            raw = {name: npz[name] for name in npz.files}
+        arrays = {}
+        for column in manifest['columns']:
+            name = column['name']
+            if column['kind'] == 'category':
+                arrays[name] = (raw[f"{name}__codes"], raw[f"{name}__categories"])
+            else:
+                arrays[name] = raw[name]
+
+        with self._lock:
+            self._partitions[key] = arrays
+            while len(self._partitions) > self.max_cached_partitions:
+                self._partitions.popitem(last=False)
+        return arrays
+
+    def fiscal_years(self) -> List[int]:
+        """Fiscal years present in the profile."""
+        return sorted(int(fy) for fy in self.manifest()['partitions'])
+
+    def columns(self) -> List[str]:
+        """Column names of the profile."""
+        return [c['name'] for c in self.manifest()['columns']]
+
+    def scan(self, fiscal_years: Optional[Iterable[int]] = None, months: Optional[Sequence[int]] = None,
+             start: Optional[np.datetime64] = None, end: Optional[np.datetime64] = None,
+             columns: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Filtered columns of the profile.
+
+        Partitions are pruned with the manifest before anything is loaded;
+        row filters are applied to the loaded partitions only.
+
+        Parameters
+        ----------
+        fiscal_years : iterable of int, optional
+            Fiscal years to read (all if None)
+        months : sequence of int, optional
+            Calendar months to keep
+        start, end : np.datetime64, optional
+            DateTime range, start inclusive, end exclusive
+        columns : sequence of str, optional
+            Columns to return (all if None)
+
+        Returns
+        -------
+        dict
+            'columns' (names), 'data' (name -> np.ndarray; category columns
+            as object arrays with None for missing) and 'partitions_read'
+
+        Raises
+        ------
+        ValueError
+            On unknown columns, or a month filter on a profile without a
+            Month column
+        """
+        manifest = self.manifest()
+        kinds = {c['name']: c['kind'] for c in manifest['columns']}
+        names = list(kinds) if not columns else list(columns)
+        unknown = [c for c in names if c not in kinds]
+        if unknown:
+            raise ValueError(f"Unknown columns: {unknown}")
+
+        if months and 'Month' not in kinds:
+            raise ValueError("Month/season filters need a Month column, which this profile does not have")
+
+        needed = list(names)
+        if months and 'Month' not in needed:
+            needed.append('Month')
+        if (start is not None or end is not None) and 'DateTime' in kinds and 'DateTime' not in needed:
+            needed.append('DateTime')
+
+        wanted_years = None if fiscal_years is None else {str(int(fy)) for fy in fiscal_years}
+        month_set = set(int(m) for m in months) if months else None
+
+        selected = []
+        for fy, entry in sorted(manifest['partitions'].items(), key=lambda item: int(item[0])):
+            if wanted_years is not None and fy not in wanted_years:
+                continue
+            if month_set is not None and 'months' in entry and not month_set.intersection(entry['months']):
+                continue
+            if start is not None and 'end' in entry and np.datetime64(entry['end']) < start:
+                continue
+            if end is not None and 'start' in entry and np.datetime64(entry['start']) >= end:
+                continue
+            selected.append(fy)
+
+        pieces = {name: [] for name in names}
+        for fy in selected:
+            part = self._load_partition(fy, manifest)
+            n_rows = manifest['partitions'][fy]['rows']
+            mask = np.ones(n_rows, dtype=bool)
+            if month_set is not None and 'Month' in part:
+                mask &= np.isin(part['Month'], list(month_set))
+            if start is not None and 'DateTime' in part:
+                mask &= part['DateTime'] >= start
+            if end is not None and 'DateTime' in part:
+                mask &= part['DateTime'] < end
+            for name in names:
+                if kinds[name] == 'category':
+                    codes, categories = part[name]
+                    picked = codes[mask]
+                    values = np.empty(len(picked), dtype=object)
+                    present = picked >= 0
+                    values[present] = categories[picked[present]].astype(object)
+                    values[~present] = None
+                    pieces[name].append(values)
+                else:
+                    pieces[name].append(part[name][mask])
+
+        data = {}
+        for name in names:
+            if pieces[name]:
+                data[name] = np.concatenate(pieces[name])
+            else:
+                dtype = {'datetime': 'datetime64[s]', 'int': np.int64, 'float': np.float64}.get(kinds[name], object)
+                data[name] = np.empty(0, dtype=dtype)
+        return {'columns': names, 'data': data, 'partitions_read': selected}
+
+
+def aggregate(data: Dict[str, np.ndarray], aggregation: str, value_column: str = DEFAULT_VALUE_COLUMN) -> Dict:
+    """
+    Server-side aggregation of scanned profile columns.
+
+    Parameters
+    ----------
+    data : dict
+        Columns from LoadProfileStore.scan (needs DateTime and the value column)
+    aggregation : str
+        'daily_peak' (peak and peak hour per day), 'hourly_mean_by_month'
+        (mean per calendar month and hour) or 'load_duration_curve' (values
+        sorted descending with exceedance percentage)
+    value_column : str
+        Demand column to aggregate
+
+    Returns
+    -------
+    dict
+        'columns' and 'data' (name -> np.ndarray)
+    """
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"Unsupported aggregation '{aggregation}'. Use one of {list(AGGREGATIONS)}")
+    values = np.asarray(data[value_column], dtype=float)
+
+    if aggregation == 'load_duration_curve':
+        curve = np.sort(values[~np.isnan(values)])[::-1]
+        exceedance = np.arange(1, len(curve) + 1) / max(len(curve), 1) * 100.0
+        return {'columns': ['percentExceedance', value_column],
+                'data': {'percentExceedance': exceedance, value_column: curve}}
+
+    stamps = np.asarray(data['DateTime'], dtype='datetime64[s]')
+    valid = ~np.isnat(stamps) & ~np.isnan(values)
+    stamps, values = stamps[valid], values[valid]
+
+    if aggregation == 'daily_peak':
+        days = stamps.astype('datetime64[D]')
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        # Sort by (day, value) so the last row of each day is its peak
+        order = np.lexsort((values, inverse))
+        last = np.r_[np.nonzero(np.diff(inverse[order]))[0], len(order) - 1] if len(order) else np.array([], dtype=int)
+        peak_rows = order[last]
+        peak_hours = ((stamps[peak_rows] - days[peak_rows]) // np.timedelta64(1, 'h')).astype(np.int64)
+        return {'columns': ['date', 'peak', 'peakHour'],
+                'data': {'date': unique_days, 'peak': values[peak_rows], 'peakHour': peak_hours}}
+
+    # hourly_mean_by_month
+    months = stamps.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    hours = (stamps - stamps.astype('datetime64[D]')) // np.timedelta64(1, 'h')
+    slot = (months - 1) * 24 + hours.astype(np.int64)
+    sums = np.bincount(slot, weights=values, minlength=12 * 24)
+    counts = np.bincount(slot, minlength=12 * 24)
+    present = counts > 0
+    month_idx, hour_idx = np.divmod(np.nonzero(present)[0], 24)
+    return {'columns': ['month', 'hour', 'mean'],
+            'data': {'month': month_idx + 1, 'hour': hour_idx, 'mean': sums[present] / counts[present]}}
+
+
+def to_json_columns(data: Dict[str, np.ndarray]) -> Dict[str, list]:
+    """
+    Column arrays as JSON-ready lists (NaN as None).
+
+    Datetimes are written as "YYYY-MM-DD HH:MM:SS" (dates as "YYYY-MM-DD"),
+    the format the load profile endpoints have always served.
+    """
+    out = {}
+    for name, values in data.items():
+        if np.issubdtype(values.dtype, np.datetime64):
+            if values.dtype == np.dtype('datetime64[D]'):
+                text = np.datetime_as_string(values, unit='D')
+            else:
+                text = np.char.replace(np.datetime_as_string(values.astype('datetime64[s]'), unit='s'), 'T', ' ')
+            out[name] = [None if v == 'NaT' else v for v in text.tolist()]
+        elif values.dtype.kind == 'f':
+            out[name] = np.where(np.isnan(values), None, values).tolist() if np.isnan(values).any() else values.tolist()
+        else:
+            out[name] = values.tolist()
+    return out
+
+
+_stores: Dict[str, LoadProfileStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_load_profile_store(project_path, profile_name: str) -> LoadProfileStore:
+    """Get the store of a profile (one instance per profile workbook)."""
+    key = str((Path(project_path) / "results" / "load_profiles" / f"{profile_name}.xlsx").resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = LoadProfileStore(project_path, profile_name)
+            _stores[key] = store
+        return store
+
+
+def release_load_profile_store(project_path, profile_name: str, remove_cache: bool = False):
+    """
+    Forget the store of a profile (e.g. after its workbook was deleted).
+
+    Parameters
+    ----------
+    project_path : str or Path
+        Project root directory
+    profile_name : str
+        Profile name (workbook stem)
+    remove_cache : bool
+        Also delete the profile's columnar cache folder
+    """
+    key = str((Path(project_path) / "results" / "load_profiles" / f"{profile_name}.xlsx").resolve())
+    with _stores_lock:
+        _stores.pop(key, None)
+    if remove_cache:
+        shutil.rmtree(Path(project_path) / "results" / "load_profiles" / CACHE_DIRNAME / profile_name,
+                      ignore_errors=True)
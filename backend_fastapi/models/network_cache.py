@@ -9,6 +9,8 @@ for subsequent requests to the same network file.
 Features:
 - LRU (Least Recently Used) cache eviction
 - Configurable cache size and TTL
+- Entries validated against the file fingerprint (mtime, size), so a
+  rewritten network file is never served from a stale entry
 - Thread-safe operations
 - Cache statistics tracking
 - Manual cache invalidation
@@ -25,6 +27,8 @@ from pathlib import Path
 from collections import OrderedDict
 import logging
 
+from file_fingerprints import Fingerprint, file_fingerprint
+
 logger = logging.getLogger(__name__)
 
 
@@ -50,8 +54,8 @@ class NetworkCache:
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
 
-        # Cache storage: {filepath: (network, timestamp)}
-        self._cache: OrderedDict[str, Tuple[pypsa.Network, float]] = OrderedDict()
+        # Cache storage: {filepath: (network, timestamp, fingerprint)}
+        self._cache: OrderedDict[str, Tuple[pypsa.Network, float, Optional[Fingerprint]]] = OrderedDict()
 
         # Thread lock for thread-safe operations
         self._lock = threading.Lock()
@@ -61,14 +65,16 @@ class NetworkCache:
             'hits': 0,
             'misses': 0,
             'evictions': 0,
-            'invalidations': 0
+            'invalidations': 0,
+            'stale': 0
         }
 
         logger.info(f"NetworkCache initialized: max_size={max_size}, ttl={ttl_seconds}s")
 
     def get(self, filepath: str) -> Optional[pypsa.Network]:
         """
-        Get a network from cache if available and not expired.
+        Get a network from cache if available, not expired and the file
+        is unchanged since it was loaded.
 
         Parameters
         ----------
@@ -80,16 +86,26 @@ class NetworkCache:
         pypsa.Network or None
             Cached network if available and fresh, None otherwise
         """
-        with self._lock:
-            filepath_str = str(Path(filepath).resolve())
+        filepath_str = str(Path(filepath).resolve())
+        current_fingerprint = file_fingerprint(filepath_str)
 
+        with self._lock:
             if filepath_str not in self._cache:
                 self._stats['misses'] += 1
                 logger.debug(f"Cache MISS: {filepath_str}")
                 return None
 
+            network, timestamp, fingerprint = self._cache[filepath_str]
+
+            # Check if the file was rewritten (or removed) since it was loaded
+            if fingerprint != current_fingerprint:
+                del self._cache[filepath_str]
+                self._stats['stale'] += 1
+                self._stats['misses'] += 1
+                logger.info(f"Cache STALE: {filepath_str} changed on disk")
+                return None
+
             # Check if expired
-            network, timestamp = self._cache[filepath_str]
             age = time.time() - timestamp
 
             if age > self.ttl_seconds:
@@ -107,7 +123,7 @@ class NetworkCache:
 
             return network
 
-    def put(self, filepath: str, network: pypsa.Network):
+    def put(self, filepath: str, network: pypsa.Network, fingerprint: Optional[Fingerprint] = None):
         """
         Add a network to the cache.
 
@@ -117,9 +133,14 @@ class NetworkCache:
             Path to network file
         network : pypsa.Network
             Network object to cache
+        fingerprint : tuple, optional
+            File fingerprint taken before loading (current one if None)
         """
+        filepath_str = str(Path(filepath).resolve())
+        if fingerprint is None:
+            fingerprint = file_fingerprint(filepath_str)
+
         with self._lock:
-            filepath_str = str(Path(filepath).resolve())
 
             # Remove oldest if at capacity
             if filepath_str not in self._cache and len(self._cache) >= self.max_size:
@@ -130,7 +151,7 @@ class NetworkCache:
                 logger.debug(f"Cache EVICTED: {oldest_key}")
 
             # Add/update cache entry
-            self._cache[filepath_str] = (network, time.time())
+            self._cache[filepath_str] = (network, time.time(), fingerprint)
 
             # Move to end (most recently used)
             if len(self._cache) > 1:
@@ -183,6 +204,7 @@ class NetworkCache:
                 'hit_rate_percent': round(hit_rate, 2),
                 'evictions': self._stats['evictions'],
                 'invalidations': self._stats['invalidations'],
+                'stale': self._stats['stale'],
                 'total_requests': total_requests
             }
 
@@ -199,7 +221,7 @@ class NetworkCache:
             current_time = time.time()
             cached_files = []
 
-            for filepath, (_, timestamp) in self._cache.items():
+            for filepath, (_, timestamp, _) in self._cache.items():
                 age = current_time - timestamp
                 cached_files.append({
                     'filepath': filepath,
@@ -224,8 +246,9 @@ def load_network_cached(filepath: str) -> pypsa.Network:
     """
     Load a PyPSA network with caching.
 
-    This function first checks the cache. If not found or expired,
-    it loads from file and caches the result.
+    This function first checks the cache. If not found, expired or the
+    file changed since it was cached, it loads from file and caches the
+    result.
 
     Parameters
     ----------
@@ -264,13 +287,15 @@ def load_network_cached(filepath: str) -> pypsa.Network:
     logger.info(f"Loading network from file: {filepath}")
     start_time = time.time()
 
+    # Fingerprint before reading: a write during the load leaves a stale entry, not a wrong one
+    fingerprint = file_fingerprint(filepath)
     network = pypsa.Network(filepath.as_posix())
 
     load_time = time.time() - start_time
     logger.info(f"Network loaded in {load_time:.2f}s: {filepath}")
 
     # Add to cache
-    cache.put(str(filepath), network)
+    cache.put(str(filepath), network, fingerprint=fingerprint)
 
     return network
 
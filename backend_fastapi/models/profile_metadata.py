@@ -0,0 +1,433 @@
+"""
+Profile Metadata Sidecars
+=========================
+
+Small JSON summaries of hourly demand workbooks, kept next to the source
+file, so fiscal-year listings do not have to read 70k-100k+ hourly rows.
+
+Two kinds of workbook are summarised:
+- inputs/load_curve_template.xlsx (sheet 'Past_Hourly_Demand', columns
+  date / time / demand) -> inputs/.load_curve_template.metadata.json
+- results/load_profiles/<profile>.xlsx (sheet 'Load_Profile', columns
+  DateTime / Demand_MW / Fiscal_Year) ->
+  results/load_profiles/.<profile>.metadata.json
+
+The profile generator writes the sidecar right after saving a profile.
+Otherwise it is built lazily on first access. A sidecar records the
+(mtime_ns, size) of its source and is rebuilt when the workbook changes,
+so lookups cost one stat() plus an in-memory dict access.
+
+Features:
+- Fiscal year coverage (Apr-Mar) and row counts
+- Missing-hour counts per fiscal year (distinct hours vs. hours in the year)
+- Per-year peak demand, peak time and energy
+- Thread-safe in-memory cache validated by file fingerprint
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from datetime import time as time_of_day
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+METADATA_FORMAT_VERSION = 1
+TEMPLATE_RELATIVE_PATH = Path("inputs") / "load_curve_template.xlsx"
+TEMPLATE_SHEET = "Past_Hourly_Demand"
+PROFILE_SHEET = "Load_Profile"
+
+
+def template_metadata_path(project_path) -> Path:
+    """Sidecar path of a project's load curve template."""
+    source = Path(project_path) / TEMPLATE_RELATIVE_PATH
+    return source.with_name(f".{source.stem}.metadata.json")
+
+
+def profile_metadata_path(project_path, profile_name: str) -> Path:
+    """Sidecar path of a generated load profile."""
+    return Path(project_path) / "results" / "load_profiles" / f".{profile_name}.metadata.json"
+
+
+def _fingerprint(file_path: Path) -> Dict[str, int]:
+    stat = Path(file_path).stat()
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+
+def fiscal_year_of(value: datetime) -> int:
+    """Fiscal year (Apr-Mar cycle) a date belongs to, e.g. 2024-04-01 -> 2025."""
+    return value.year + 1 if value.month >= 4 else value.year
+
+
+def hours_in_fiscal_year(fiscal_year: int) -> int:
+    """Number of hours from 1 April of the previous year to 1 April."""
+    return int((datetime(fiscal_year, 4, 1) - datetime(fiscal_year - 1, 4, 1)).total_seconds() // 3600)
+
+
+def summarize_years(timestamps: np.ndarray, demand: np.ndarray, fiscal_years: np.ndarray) -> Dict[str, Dict[str, Any]]:
+    """
+    Per fiscal year statistics of an hourly series.
+
+    Parameters
+    ----------
+    timestamps : np.ndarray
+        datetime64 timestamps (NaT allowed)
+    demand : np.ndarray
+        Demand values in MW (NaN allowed)
+    fiscal_years : np.ndarray
+        Integer fiscal year of every row
+
+    Returns
+    -------
+    dict
+        'FY<year>' -> rows, hours, expectedHours, missingHours, start, end,
+        peakMW, peakTime, energyMWh
+    """
+    timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+    demand = np.asarray(demand, dtype=float)
+    fiscal_years = np.asarray(fiscal_years, dtype=np.int64)
+    hours = timestamps.astype('datetime64[h]')
+
+    stats = {}
+    order = np.argsort(fiscal_years, kind='stable')
+    years, starts = np.unique(fiscal_years[order], return_index=True)
+    for fy, rows in zip(years, np.split(order, starts[1:])):
+        fy = int(fy)
+        year_hours = hours[rows]
+        year_hours = year_hours[~np.isnat(year_hours)]
+        distinct_hours = int(np.unique(year_hours).size)
+        expected = hours_in_fiscal_year(fy)
+        values = demand[rows]
+        present = ~np.isnan(values)
+
+        entry = {
+            'rows': int(rows.size),
+            'hours': distinct_hours,
+            'expectedHours': expected,
+            'missingHours': max(expected - distinct_hours, 0),
+            'start': str(year_hours.min().astype('datetime64[s]')) if year_hours.size else None,
+            'end': str(year_hours.max().astype('datetime64[s]')) if year_hours.size else None,
+            'peakMW': None,
+            'peakTime': None,
+            'energyMWh': float(values[present].sum()) if present.any() else None,
+        }
+        if present.any():
+            peak_row = rows[present][int(np.argmax(values[present]))]
+            entry['peakMW'] = float(demand[peak_row])
+            if not np.isnat(timestamps[peak_row]):
+                entry['peakTime'] = str(timestamps[peak_row])
+        stats[f"FY{fy}"] = entry
+    return stats
+
+
+def _metadata(kind: str, source: Dict[str, int], rows: int, year_stats: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        'formatVersion': METADATA_FORMAT_VERSION,
+        'kind': kind,
+        'source': source,
+        'rows': rows,
+        'years': sorted(year_stats, key=lambda fy: int(fy[2:])),
+        'yearStats': year_stats,
+        'builtAt': time.time(),
+    }
+
+
+# ----------------------------------------------------------------------
+# Load curve template
+# ----------------------------------------------------------------------
+
+def _parse_template_date(value) -> Optional[datetime]:
+    """Date cell as datetime; strings must be ISO formatted."""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def _time_offset(value) -> timedelta:
+    """Time-of-day cell as an offset from midnight (zero when absent)."""
+    if isinstance(value, time_of_day):
+        return timedelta(hours=value.hour, minutes=value.minute, seconds=value.second)
+    if isinstance(value, timedelta):
+        return value
+    if isinstance(value, datetime):
+        return timedelta(hours=value.hour, minutes=value.minute, seconds=value.second)
+    if isinstance(value, str) and value.strip():
+        try:
+            parsed = time_of_day.fromisoformat(value.strip())
+            return timedelta(hours=parsed.hour, minutes=parsed.minute, seconds=parsed.second)
+        except ValueError:
+            pass
+    return timedelta(0)
+
+
+def build_template_metadata(file_path) -> Dict[str, Any]:
+    """
+    Summarise the Past_Hourly_Demand sheet of a load curve template.
+
+    Fiscal years follow the date column only (as the base-year picker
+    always has); hourly timestamps combine the date and time columns.
+
+    Raises
+    ------
+    KeyError
+        If the sheet or its 'date' column is missing
+    """
+    file_path = Path(file_path)
+    source = _fingerprint(file_path)
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet_name = next((name for name in workbook.sheetnames if name.lower() == TEMPLATE_SHEET.lower()), None)
+        if not sheet_name:
+            raise KeyError(f"Sheet '{TEMPLATE_SHEET}' not found.")
+        row_iter = workbook[sheet_name].iter_rows(values_only=True)
+        headers = list(next(row_iter, ()) or ())
+        rows = list(row_iter)
+    finally:
+        workbook.close()
+
+    if not rows:
+        return _metadata('load_curve_template', source, 0, {})
+
+    def column_index(name: str) -> Optional[int]:
+        return next((i for i, h in enumerate(headers) if isinstance(h, str) and h.lower() == name), None)
+
+    date_idx = column_index('date')
+    if date_idx is None:
+        raise KeyError(f"Column 'date' not found in '{TEMPLATE_SHEET}' sheet.")
+    time_idx = column_index('time')
+    demand_idx = column_index('demand')
+
+    timestamps, demand, fiscal_years = [], [], []
+    for row in rows:
+        parsed_date = _parse_template_date(row[date_idx] if date_idx < len(row) else None)
+        if parsed_date is None:
+            continue
+        stamp = parsed_date
+        if time_idx is not None and time_idx < len(row) and row[time_idx] is not None:
+            stamp = datetime.combine(parsed_date.date(), datetime.min.time()) + _time_offset(row[time_idx])
+        value = row[demand_idx] if demand_idx is not None and demand_idx < len(row) else None
+        timestamps.append(np.datetime64(stamp.replace(tzinfo=None), 's'))
+        demand.append(value if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan)
+        fiscal_years.append(fiscal_year_of(parsed_date))
+
+    year_stats = summarize_years(np.array(timestamps, dtype='datetime64[s]'), np.array(demand, dtype=float),
+                                 np.array(fiscal_years, dtype=np.int64))
+    return _metadata('load_curve_template', source, len(rows), year_stats)
+
+
+# ----------------------------------------------------------------------
+# Generated load profiles
+# ----------------------------------------------------------------------
+
+def profile_metadata_from_frame(profile_df: pd.DataFrame, source: Dict[str, int]) -> Dict[str, Any]:
+    """
+    Summarise a Load_Profile frame (DateTime, Demand_MW, Fiscal_Year).
+
+    Rows without a Fiscal_Year are counted but not assigned to a year.
+    """
+    if 'Fiscal_Year' not in profile_df.columns:
+        return _metadata('load_profile', source, len(profile_df), {})
+
+    fiscal_years = pd.to_numeric(profile_df['Fiscal_Year'], errors='coerce')
+    keep = fiscal_years.notna().to_numpy()
+    if 'DateTime' in profile_df.columns:
+        timestamps = pd.to_datetime(profile_df['DateTime'], errors='coerce').to_numpy(dtype='datetime64[s]')
+    else:
+        timestamps = np.full(len(profile_df), np.datetime64('NaT'), dtype='datetime64[s]')
+    if 'Demand_MW' in profile_df.columns:
+        demand = pd.to_numeric(profile_df['Demand_MW'], errors='coerce').to_numpy(dtype=float)
+    else:
+        demand = np.full(len(profile_df), np.nan)
+
+    year_stats = summarize_years(timestamps[keep], demand[keep],
+                                 fiscal_years.to_numpy(dtype=float)[keep].astype(np.int64))
+    return _metadata('load_profile', source, len(profile_df), year_stats)
+
+
+def build_profile_metadata(file_path) -> Dict[str, Any]:
+    """
+    Summarise the Load_Profile sheet of a generated profile workbook.
+
+    Raises
+    ------
+    KeyError
+        If the workbook has no Load_Profile sheet
+    """
+    file_path = Path(file_path)
+    source = _fingerprint(file_path)
+    try:
+        profile_df = pd.read_excel(
+            file_path, sheet_name=PROFILE_SHEET, engine='openpyxl',
+            usecols=lambda column: column in ('DateTime', 'Demand_MW', 'Fiscal_Year')
+        )
+    except ValueError as e:
+        raise KeyError(f"Sheet '{PROFILE_SHEET}' not found.") from e
+    return profile_metadata_from_frame(profile_df, source)
+
+
+# ----------------------------------------------------------------------
+# Sidecar files and cache
+# ----------------------------------------------------------------------
+
+def _write_sidecar(sidecar_path: Path, metadata: Dict[str, Any]):
+    """Write a sidecar atomically; failures are logged, not raised."""
+    tmp_path = sidecar_path.with_name(f"{sidecar_path.name}.tmp{os.getpid()}_{threading.get_ident()}")
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, sidecar_path)
+    except OSError as e:
+        logger.warning(f"Could not write metadata sidecar {sidecar_path}: {e}")
+        tmp_path.unlink(missing_ok=True)
+
+
+def _read_sidecar(sidecar_path: Path) -> Optional[Dict[str, Any]]:
+    if not sidecar_path.exists():
+        return None
+    try:
+        with open(sidecar_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Unreadable metadata sidecar {sidecar_path}: {e}")
+        return None
+
+
+def write_profile_metadata(project_path, profile_name: str, profile_df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Write the sidecar of a profile that was just saved (used by the generator).
+
+    Parameters
+    ----------
+    project_path : str or Path
+        Project root directory
+    profile_name : str
+        Profile name (workbook stem)
+    profile_df : pd.DataFrame
+        The frame written to the Load_Profile sheet
+
+    Returns
+    -------
+    dict
+        The metadata written
+    """
+    source_path = Path(project_path) / "results" / "load_profiles" / f"{profile_name}.xlsx"
+    metadata = profile_metadata_from_frame(profile_df, _fingerprint(source_path))
+    _write_sidecar(profile_metadata_path(project_path, profile_name), metadata)
+    _metadata_cache.invalidate(profile_metadata_path(project_path, profile_name))
+    return metadata
+
+
+class ProfileMetadataCache:
+    """Thread-safe in-memory cache of sidecars, validated by source fingerprint."""
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "sidecar_reads": 0, "builds": 0}
+
+    def get(self, source_path: Path, sidecar_path: Path, builder) -> Dict[str, Any]:
+        """
+        Metadata of a source workbook.
+
+        Served from memory when the source fingerprint matches, else from
+        the sidecar on disk, else rebuilt with ``builder(source_path)`` and
+        written back.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the source workbook does not exist
+        """
+        source = _fingerprint(source_path)
+        key = str(Path(sidecar_path).resolve())
+
+        def is_current(metadata: Optional[Dict[str, Any]]) -> bool:
+            return (metadata is not None and metadata.get('source') == source
+                    and metadata.get('formatVersion') == METADATA_FORMAT_VERSION)
+
+        with self._lock:
+            metadata = self._entries.get(key)
+            if is_current(metadata):
+                self._stats["hits"] += 1
+                return metadata
+
+            metadata = _read_sidecar(sidecar_path)
+            if is_current(metadata):
+                self._stats["sidecar_reads"] += 1
+            else:
+                start = time.time()
+                metadata = builder(source_path)
+                _write_sidecar(sidecar_path, metadata)
+                self._stats["builds"] += 1
+                logger.info(f"Metadata sidecar built for {Path(source_path).name} "
+                            f"({metadata['rows']} rows, {len(metadata['years'])} fiscal years) "
+                            f"in {time.time() - start:.2f}s")
+            self._entries[key] = metadata
+            return metadata
+
+    def invalidate(self, sidecar_path=None):
+        """Drop one cached entry, or all of them."""
+        with self._lock:
+            if sidecar_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(Path(sidecar_path).resolve()), None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), **self._stats}
+
+
+_metadata_cache = ProfileMetadataCache()
+
+
+def get_profile_metadata_cache() -> ProfileMetadataCache:
+    """Get the global metadata sidecar cache."""
+    return _metadata_cache
+
+
+def get_template_metadata(project_path) -> Dict[str, Any]:
+    """
+    Metadata of a project's load_curve_template.xlsx.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the template does not exist
+    KeyError
+        If the Past_Hourly_Demand sheet or its date column is missing
+    """
+    return _metadata_cache.get(Path(project_path) / TEMPLATE_RELATIVE_PATH,
+                               template_metadata_path(project_path), build_template_metadata)
+
+
+def get_profile_metadata(project_path, profile_name: str) -> Dict[str, Any]:
+    """
+    Metadata of a generated load profile.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the profile workbook does not exist
+    KeyError
+        If the workbook has no Load_Profile sheet
+    """
+    source_path = Path(project_path) / "results" / "load_profiles" / f"{profile_name}.xlsx"
+    return _metadata_cache.get(source_path, profile_metadata_path(project_path, profile_name),
+                               build_profile_metadata)
@@ -0,0 +1,416 @@
+"""
+Project Catalog
+===============
+
+Lightweight SQLite catalog of demand forecast scenarios, stored inside the
+project at results/.catalog.sqlite.
+
+The routes that write scenario output (forecast runs, consolidation and
+T&D loss saving) update the catalog, so the scenario listing endpoints are
+indexed lookups instead of directory walks and workbook header reads.
+
+Features:
+- Per scenario: target year, metadata, completion status, consolidated flag
+  and saved T&D losses
+- Per sector workbook: available models (Results header) and file
+  fingerprint (mtime_ns, size); unchanged workbooks are never re-opened
+- Lazy bootstrap scan for projects created before the catalog existed
+- Listings are plain catalog queries, kept current by the write hooks and
+  the project watcher; a scenario lookup revalidates that scenario's folder
+  against the stored fingerprints (stat calls only)
+- Refreshes without an explicit status keep a running, failed or cancelled
+  status; only the forecast run hooks set it
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import openpyxl
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILENAME = ".catalog.sqlite"
+CONSOLIDATED_FILE_STEM = "Consolidated_Results"
+SCHEMA_VERSION = "1"
+# Statuses set by the forecast run hooks that file changes must not override
+KEPT_STATUSES = ("running", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    name TEXT PRIMARY KEY,
+    target_year INTEGER,
+    status TEXT NOT NULL DEFAULT 'unknown',
+    has_consolidated INTEGER NOT NULL DEFAULT 0,
+    meta_json TEXT,
+    td_losses_json TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sector_files (
+    scenario TEXT NOT NULL,
+    sector TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    models_json TEXT NOT NULL,
+    PRIMARY KEY (scenario, sector)
+);
+CREATE TABLE IF NOT EXISTS catalog_info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def read_results_models(file_path: Path) -> List[str]:
+    """
+    Model names from the 'Results' sheet header of a sector workbook.
+
+    Parameters
+    ----------
+    file_path : Path
+        Sector result workbook
+
+    Returns
+    -------
+    list of str
+        Header names excluding 'Year' and 'Time Series'; empty without a Results sheet
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if 'Results' not in workbook.sheetnames:
+            return []
+        headers = next(workbook['Results'].iter_rows(min_row=1, max_row=1, values_only=True), ()) or ()
+        return [h for h in headers if h and str(h).lower() not in ['year', 'time series']]
+    finally:
+        workbook.close()
+
+
+class ProjectCatalog:
+    """
+    Scenario catalog of one project.
+
+    Parameters
+    ----------
+    project_path : str or Path
+        Project root directory
+    """
+
+    def __init__(self, project_path):
+        self.project_path = Path(project_path)
+        self.forecasts_path = self.project_path / "results" / "demand_forecasts"
+        self.db_path = self.project_path / "results" / CATALOG_FILENAME
+        self._lock = threading.RLock()
+        self._initialized = False
+        self._bootstrapped = False
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            conn.execute("INSERT OR IGNORE INTO catalog_info (key, value) VALUES ('schema_version', ?)",
+                         (SCHEMA_VERSION,))
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        if not self.db_path.parent.exists():
+            # No results folder yet: nothing to list, and nothing is created on reads
+            return []
+        self.ensure_bootstrapped()
+        with self._lock:
+            conn = self._connect()
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+
+    def ensure_bootstrapped(self):
+        """Scan all scenario folders once if the catalog has never been populated."""
+        if self._bootstrapped:
+            return
+        with self._lock:
+            conn = self._connect()
+            try:
+                done = conn.execute("SELECT value FROM catalog_info WHERE key = 'bootstrapped'").fetchone()
+            finally:
+                conn.close()
+            if not done:
+                start = time.time()
+                self.rebuild()
+                logger.info(f"Project catalog bootstrapped for {self.project_path} in {time.time() - start:.3f}s")
+            self._bootstrapped = True
+
+    def rebuild(self):
+        """Rescan every scenario folder and drop catalog entries without a folder."""
+        with self._lock:
+            names = []
+            if self.forecasts_path.exists():
+                names = [item.name for item in self.forecasts_path.iterdir() if item.is_dir()]
+            for name in names:
+                self.refresh_scenario(name)
+
+            conn = self._connect()
+            try:
+                with conn:
+                    known = [row['name'] for row in conn.execute("SELECT name FROM scenarios")]
+                    for name in set(known) - set(names):
+                        conn.execute("DELETE FROM scenarios WHERE name = ?", (name,))
+                        conn.execute("DELETE FROM sector_files WHERE scenario = ?", (name,))
+                    conn.execute("INSERT OR REPLACE INTO catalog_info (key, value) VALUES ('bootstrapped', ?)",
+                                 (str(time.time()),))
+            finally:
+                conn.close()
+
+    # ------------------------------------------------------------------
+    # Updates (called by the routes that write scenario output)
+    # ------------------------------------------------------------------
+
+    def refresh_scenario(self, name: str, status: Optional[str] = None):
+        """
+        Update the catalog entry of one scenario from its folder.
+
+        Only sector workbooks whose fingerprint changed are opened (header
+        row only). A missing folder removes the scenario from the catalog.
+
+        Parameters
+        ----------
+        name : str
+            Scenario name
+        status : str, optional
+            New completion status ('running', 'completed', 'failed',
+            'cancelled'). When not given, a running, failed or cancelled
+            status is kept (only the forecast run hooks change it) and any
+            other status is derived from scenario_meta.json
+        """
+        scenario_path = self.forecasts_path / name
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    if not scenario_path.is_dir():
+                        conn.execute("DELETE FROM scenarios WHERE name = ?", (name,))
+                        conn.execute("DELETE FROM sector_files WHERE scenario = ?", (name,))
+                        return
+
+                    stored = {
+                        row['sector']: row for row in conn.execute(
+                            "SELECT sector, mtime_ns, size FROM sector_files WHERE scenario = ?", (name,))
+                    }
+                    seen = set()
+                    for file in scenario_path.glob("*.xlsx"):
+                        sector = file.stem
+                        if sector == CONSOLIDATED_FILE_STEM or sector.startswith("~$"):
+                            continue
+                        stat = file.stat()
+                        seen.add(sector)
+                        previous = stored.get(sector)
+                        if previous and previous['mtime_ns'] == stat.st_mtime_ns and previous['size'] == stat.st_size:
+                            continue
+                        try:
+                            models = read_results_models(file)
+                        except Exception as e:
+                            logger.error(f"Error reading {file}: {e}")
+                            models = []
+                        conn.execute(
+                            "INSERT OR REPLACE INTO sector_files (scenario, sector, mtime_ns, size, models_json) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (name, sector, stat.st_mtime_ns, stat.st_size, json.dumps(models))
+                        )
+                    for sector in set(stored) - seen:
+                        conn.execute("DELETE FROM sector_files WHERE scenario = ? AND sector = ?", (name, sector))
+
+                    meta = None
+                    meta_path = scenario_path / "scenario_meta.json"
+                    if meta_path.exists():
+                        try:
+                            with open(meta_path, 'r') as f:
+                                meta = json.load(f)
+                        except Exception as e:
+                            logger.error(f"Could not parse {meta_path}: {e}")
+
+                    current = conn.execute("SELECT status FROM scenarios WHERE name = ?", (name,)).fetchone()
+                    if status is None:
+                        if current is not None and current['status'] in KEPT_STATUSES:
+                            status = current['status']
+                        elif meta is not None:
+                            status = "completed"
+                        elif current is not None:
+                            status = current['status']
+                        else:
+                            status = "unknown"
+
+                    target_year = meta.get('targetYear') if isinstance(meta, dict) else None
+                    conn.execute(
+                        "INSERT INTO scenarios (name, target_year, status, has_consolidated, meta_json, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET target_year = excluded.target_year, "
+                        "status = excluded.status, has_consolidated = excluded.has_consolidated, "
+                        "meta_json = excluded.meta_json, updated_at = excluded.updated_at",
+                        (name, target_year, status,
+                         int((scenario_path / f"{CONSOLIDATED_FILE_STEM}.xlsx").exists()),
+                         json.dumps(meta) if meta is not None else None, time.time())
+                    )
+            finally:
+                conn.close()
+
+    def set_td_losses(self, name: str, loss_points: List[Dict[str, Any]]):
+        """Record saved T&D loss points for a scenario."""
+        self.refresh_scenario(name)
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute("UPDATE scenarios SET td_losses_json = ?, updated_at = ? WHERE name = ?",
+                                 (json.dumps(loss_points), time.time(), name))
+            finally:
+                conn.close()
+
+    # ------------------------------------------------------------------
+    # Revalidation (stat calls only; entries that differ are refreshed)
+    # ------------------------------------------------------------------
+
+    def _scenario_is_stale(self, name: str, entry: Optional[sqlite3.Row],
+                           sectors: Dict[str, sqlite3.Row]) -> bool:
+        """Whether a scenario folder differs from its catalog entry."""
+        scenario_path = self.forecasts_path / name
+        if not scenario_path.is_dir():
+            return entry is not None
+        if entry is None:
+            return True
+
+        on_disk = {}
+        for file in scenario_path.glob("*.xlsx"):
+            if file.stem == CONSOLIDATED_FILE_STEM or file.stem.startswith("~$"):
+                continue
+            stat = file.stat()
+            on_disk[file.stem] = (stat.st_mtime_ns, stat.st_size)
+        stored = {sector: (row['mtime_ns'], row['size']) for sector, row in sectors.items()}
+        if on_disk != stored:
+            return True
+
+        if bool(entry['has_consolidated']) != (scenario_path / f"{CONSOLIDATED_FILE_STEM}.xlsx").exists():
+            return True
+        meta_path = scenario_path / "scenario_meta.json"
+        if not meta_path.exists():
+            return entry['meta_json'] is not None
+        return entry['meta_json'] is None or meta_path.stat().st_mtime > entry['updated_at']
+
+    def _revalidate(self, name: str):
+        """Refresh the catalog entry of one scenario if its files changed since it was recorded."""
+        if not self.db_path.parent.exists():
+            return
+        self.ensure_bootstrapped()
+        with self._lock:
+            conn = self._connect()
+            try:
+                entry = conn.execute("SELECT * FROM scenarios WHERE name = ?", (name,)).fetchone()
+                sectors = {
+                    row['sector']: row for row in conn.execute(
+                        "SELECT sector, mtime_ns, size FROM sector_files WHERE scenario = ?", (name,))
+                }
+            finally:
+                conn.close()
+
+            try:
+                stale = self._scenario_is_stale(name, entry, sectors)
+            except OSError:
+                stale = True  # a file vanished while checking
+            if stale:
+                logger.debug(f"Catalog entry of scenario '{name}' changed on disk, refreshing")
+                self.refresh_scenario(name)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def list_scenarios(self) -> List[str]:
+        """All scenario names."""
+        return [row['name'] for row in self._query("SELECT name FROM scenarios ORDER BY name")]
+
+    def list_consolidated_scenarios(self) -> List[str]:
+        """Scenario names that have a Consolidated_Results workbook."""
+        return [row['name'] for row in self._query(
+            "SELECT name FROM scenarios WHERE has_consolidated = 1 ORDER BY name")]
+
+    def get_scenario(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Catalog entry of a scenario.
+
+        Returns
+        -------
+        dict or None
+            name, targetYear, status, hasConsolidated, meta, tdLosses,
+            updatedAt; None if the scenario is unknown
+        """
+        self._revalidate(name)
+        rows = self._query("SELECT * FROM scenarios WHERE name = ?", (name,))
+        if not rows:
+            return None
+        row = rows[0]
+        return {
+            "name": row['name'],
+            "targetYear": row['target_year'],
+            "status": row['status'],
+            "hasConsolidated": bool(row['has_consolidated']),
+            "meta": json.loads(row['meta_json']) if row['meta_json'] else None,
+            "tdLosses": json.loads(row['td_losses_json']) if row['td_losses_json'] else None,
+            "updatedAt": row['updated_at'],
+        }
+
+    def lookup_scenario(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Catalog entry of a scenario, indexing its folder first if the
+        scenario is not catalogued yet (e.g. written by an older version).
+        """
+        # get_scenario revalidates, which indexes uncatalogued folders too
+        return self.get_scenario(name)
+
+    def get_models(self, name: str) -> Dict[str, List[str]]:
+        """Sector name -> model names for a scenario."""
+        self._revalidate(name)
+        return {
+            row['sector']: json.loads(row['models_json']) for row in self._query(
+                "SELECT sector, models_json FROM sector_files WHERE scenario = ? ORDER BY sector", (name,))
+        }
+
+    def get_sectors(self, name: str) -> List[str]:
+        """Sector names of a scenario (excluding the consolidated workbook)."""
+        return list(self.get_models(name).keys())
+
+
+_catalogs: Dict[str, ProjectCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_project_catalog(project_path) -> ProjectCatalog:
+    """Get the catalog of a project (one instance per project directory)."""
+    key = str(Path(project_path).resolve())
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = ProjectCatalog(project_path)
+            _catalogs[key] = catalog
+        return catalog
+
+
+def refresh_scenario_safely(project_path, name: str, status: Optional[str] = None):
+    """Refresh a catalog entry, logging instead of raising (used after writes)."""
+    try:
+        get_project_catalog(project_path).refresh_scenario(name, status=status)
+    except Exception as e:
+        logger.error(f"Failed to update project catalog for scenario '{name}': {e}")
@@ -0,0 +1,543 @@
+"""
+Project Watcher
+===============
+
+Cache invalidation and warm-up driven by changes to project files.
+
+The backend keeps many results derived from project files: parsed input
+workbooks, scenario result indexes, the scenario catalog, columnar load
+profile partitions, metadata sidecars, loaded networks and their analysis
+results. Each of them checks its file fingerprint on access, but none of
+them learns about a change until the next request pays for the rebuild,
+and entries of deleted files linger until they are evicted.
+
+A ProjectWatcher follows the ``inputs/`` and ``results/`` folders of the
+open project. When a file settles after a change it runs the rules
+registered for its path:
+
+- ``invalidate`` (synchronous): drop the in-memory and on-disk entries
+  derived from the file
+- ``precompute`` (queued on the 'precompute' pool): rebuild them, so the
+  first request after a forecast run, profile generation or optimization
+  is already fast
+
+Rules are registered with ``on_change``; the rules of the caches in this
+folder are registered below, routers add their own (e.g. network analysis
+results in pypsa_comprehensive_routes).
+
+Backends:
+- watchdog (inotify/FSEvents/ReadDirectoryChangesW) when installed
+- polling of file fingerprints otherwise (or with KSEB_PROJECT_WATCHER=poll)
+
+KSEB_PROJECT_WATCHER=off disables watching; every cache keeps validating
+fingerprints on access. The one exception is the scenario listing of the
+project catalog, which then only learns of scenario folders added or removed
+outside the API when they are looked up.
+
+Features:
+- Changes are handled once a file has been quiet for ``settle_seconds``
+  (workbook and NetCDF writers touch files several times)
+- One rule call per rule scope and batch (e.g. per scenario folder)
+- Optional per-scope precompute delay: a rule can wait until its scope has
+  been quiet for a while, so files written one after another (per-year
+  networks of one run) lead to a single precompute
+- Hidden entries (``.cache``, sidecars, the catalog) and Office lock files
+  are ignored, so the watcher's own writes never trigger it
+- Per-watcher statistics
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from execution_pools import PoolSaturatedError, get_execution_pools
+from file_fingerprints import tree_fingerprints
+from input_workbook_cache import get_input_workbook, get_input_workbook_cache
+from load_profile_store import get_load_profile_store, release_load_profile_store
+from profile_metadata import (
+    get_profile_metadata,
+    get_profile_metadata_cache,
+    get_template_metadata,
+    profile_metadata_path,
+    template_metadata_path
+)
+from project_catalog import refresh_scenario_safely
+from scenario_results_index import get_scenario_results_cache
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+WATCHED_FOLDERS = ("inputs", "results")
+MAX_WATCHED_PROJECTS = 4
+
+ChangeHandler = Callable[[Path, Path], Any]
+
+
+@dataclass
+class ChangeRule:
+    """Handlers run for changed files matching a path pattern."""
+    name: str
+    pattern: str
+    invalidate: Optional[ChangeHandler] = None
+    precompute: Optional[ChangeHandler] = None
+    scope_parts: Optional[int] = None
+    precompute_delay: float = 0.0
+
+
+_rules: List[ChangeRule] = []
+_rules_lock = threading.Lock()
+
+
+def on_change(name: str, pattern: str, invalidate: Optional[ChangeHandler] = None,
+              precompute: Optional[ChangeHandler] = None, scope_parts: Optional[int] = None,
+              precompute_delay: float = 0.0):
+    """
+    Register handlers for changed project files.
+
+    Parameters
+    ----------
+    name : str
+        Rule name (registering a name again replaces the rule)
+    pattern : str
+        '/'-separated glob relative to the project root; ``*`` matches
+        within one path component, ``**`` any number of components
+    invalidate : callable, optional
+        ``invalidate(project_path, path)``, run by the watcher thread
+    precompute : callable, optional
+        ``precompute(project_path, path)``, queued on the 'precompute' pool
+        when the path still exists
+    scope_parts : int, optional
+        Call the handlers with the first ``scope_parts`` components of the
+        changed path (once per batch), e.g. 3 for a scenario folder under
+        results/demand_forecasts
+    precompute_delay : float
+        Seconds without further changes in the scope before the precompute
+        handler is queued; every change in the scope restarts the wait
+    """
+    rule = ChangeRule(name, pattern, invalidate, precompute, scope_parts, precompute_delay)
+    with _rules_lock:
+        _rules[:] = [existing for existing in _rules if existing.name != name]
+        _rules.append(rule)
+
+
+def _match_parts(parts: Tuple[str, ...], pattern: Tuple[str, ...]) -> bool:
+    if not pattern:
+        return not parts
+    if pattern[0] == "**":
+        return any(_match_parts(parts[i:], pattern[1:]) for i in range(len(parts) + 1))
+    return bool(parts) and fnmatchcase(parts[0], pattern[0]) and _match_parts(parts[1:], pattern[1:])
+
+
+def path_matches(relative: str, pattern: str) -> bool:
+    """Whether a '/'-separated relative path matches a rule pattern."""
+    return _match_parts(tuple(relative.split("/")), tuple(pattern.split("/")))
+
+
+def is_ignored(relative: str) -> bool:
+    """Hidden entries, Office lock files and temporary files never trigger rules."""
+    return any(part.startswith(".") or part.startswith("~$") or part.endswith(".tmp")
+               for part in relative.split("/"))
+
+
+def _watcher_mode() -> str:
+    mode = os.environ.get("KSEB_PROJECT_WATCHER", "auto").strip().lower()
+    return mode if mode in ("auto", "poll", "off") else "auto"
+
+
+class ProjectWatcher:
+    """
+    Watches one project's inputs/ and results/ folders.
+
+    Parameters
+    ----------
+    project_path : str or Path
+        Project root directory
+    poll_interval : float
+        Seconds between polls (and between checks for settled changes)
+    settle_seconds : float
+        Quiet time after the last change of a file before it is handled
+    precompute : bool
+        Queue the rules' precompute handlers after invalidation
+    use_watchdog : bool, optional
+        Force (True) or disable (False) the watchdog backend; by default it
+        is used when installed
+    """
+
+    def __init__(self, project_path, poll_interval: float = 2.0, settle_seconds: float = 1.0,
+                 precompute: bool = True, use_watchdog: Optional[bool] = None):
+        self.project_path = Path(project_path).resolve()
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.precompute = precompute
+        if use_watchdog is None:
+            use_watchdog = WATCHDOG_AVAILABLE and _watcher_mode() != "poll"
+        self.backend = "watchdog" if use_watchdog and WATCHDOG_AVAILABLE else "polling"
+
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self._queued: set = set()
+        self._delayed: Dict[Tuple[str, str], threading.Timer] = {}
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self._stats = {'changes': 0, 'batches': 0, 'invalidations': 0, 'precomputes_queued': 0,
+                       'precomputes_done': 0, 'errors': 0, 'last_change': None}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start watching (no-op if already running)."""
+        if self._thread is not None:
+            return
+        if self.backend == "watchdog":
+            self._observer = Observer()
+            handler = _WatchdogHandler(self)
+            for folder in WATCHED_FOLDERS:
+                path = self.project_path / folder
+                if path.is_dir():
+                    self._observer.schedule(handler, str(path), recursive=True)
+            self._observer.daemon = True
+            self._observer.start()
+        self._thread = threading.Thread(target=self._run, name=f"project-watcher-{self.project_path.name}",
+                                        daemon=True)
+        self._thread.start()
+        logger.info(f"Watching project {self.project_path} ({self.backend})")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop watching; pending changes are dropped."""
+        self._stop.set()
+        with self._lock:
+            for timer in self._delayed.values():
+                timer.cancel()
+            self._delayed.clear()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info(f"Stopped watching project {self.project_path}")
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ------------------------------------------------------------------
+    # Change detection
+    # ------------------------------------------------------------------
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Fingerprints of every watched file and folder, keyed by relative path."""
+        snapshot = {}
+        for folder in WATCHED_FOLDERS:
+            for relative, mtime_ns, size in tree_fingerprints(self.project_path / folder):
+                key = folder if relative == "." else f"{folder}/{Path(relative).as_posix()}"
+                snapshot[key] = (mtime_ns, size)
+        return snapshot
+
+    def _poll(self):
+        snapshot = self._scan()
+        previous, self._snapshot = self._snapshot, snapshot
+        changed = [path for path in snapshot.keys() | previous.keys()
+                   if snapshot.get(path) != previous.get(path)]
+        if changed:
+            self.notify(changed)
+
+    def notify(self, paths: Iterable):
+        """
+        Report changed paths (relative to the project root, or absolute).
+
+        Used by the backends; writers inside the backend may call it too,
+        so their changes are handled without waiting for the next poll.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for path in paths:
+                path = Path(path)
+                if path.is_absolute():
+                    try:
+                        path = path.resolve().relative_to(self.project_path)
+                    except ValueError:
+                        continue
+                relative = path.as_posix()
+                if is_ignored(relative):
+                    continue
+                self._pending[relative] = now
+                self._pending.move_to_end(relative)
+                self._stats['changes'] += 1
+                self._stats['last_change'] = time.time()
+
+    def _settled(self) -> List[str]:
+        cutoff = time.monotonic() - self.settle_seconds
+        with self._lock:
+            settled = [path for path, changed_at in self._pending.items() if changed_at <= cutoff]
+            for path in settled:
+                del self._pending[path]
+        return settled
+
+    def _run(self):
+        if self.backend == "polling":
+            # Initial scan off the caller's thread (start() is called from request handlers)
+            self._snapshot = self._scan()
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if self.backend == "polling":
+                    self._poll()
+                settled = self._settled()
+                if settled:
+                    self.dispatch(settled)
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.error(f"Project watcher error for {self.project_path}: {e}", exc_info=True)
+
+    # ------------------------------------------------------------------
+    # Rule dispatch
+    # ------------------------------------------------------------------
+
+    def dispatch(self, paths: Iterable[str]):
+        """
+        Run the matching rules for a batch of changed relative paths.
+
+        Invalidation runs immediately; precompute handlers are queued on the
+        'precompute' pool, at most once per rule and scope at a time.
+        """
+        with _rules_lock:
+            rules = list(_rules)
+        calls: "OrderedDict[Tuple[str, str], ChangeRule]" = OrderedDict()
+        for relative in paths:
+            for rule in rules:
+                if path_matches(relative, rule.pattern):
+                    scope = relative
+                    if rule.scope_parts:
+                        scope = "/".join(relative.split("/")[:rule.scope_parts])
+                    calls[(rule.name, scope)] = rule
+        if not calls:
+            return
+        self._stats['batches'] += 1
+
+        for (name, scope), rule in calls.items():
+            target = self.project_path / scope
+            if rule.invalidate is not None:
+                try:
+                    rule.invalidate(self.project_path, target)
+                    self._stats['invalidations'] += 1
+                    logger.debug(f"Watcher rule '{name}' invalidated {scope}")
+                except Exception as e:
+                    self._stats['errors'] += 1
+                    logger.warning(f"Watcher rule '{name}' failed to invalidate {scope}: {e}")
+            if self.precompute and rule.precompute is not None and target.exists():
+                if rule.precompute_delay > 0:
+                    self._delay_precompute(rule, scope, target)
+                else:
+                    self._queue_precompute(rule, scope, target)
+
+    def _delay_precompute(self, rule: ChangeRule, scope: str, target: Path):
+        """Queue a precompute once the scope has been quiet for the rule's delay."""
+        key = (rule.name, scope)
+
+        def fire():
+            with self._lock:
+                if self._delayed.get(key) is not timer:
+                    return
+                del self._delayed[key]
+            if not self._stop.is_set() and target.exists():
+                self._queue_precompute(rule, scope, target)
+
+        timer = threading.Timer(rule.precompute_delay, fire)
+        timer.daemon = True
+        with self._lock:
+            previous = self._delayed.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._delayed[key] = timer
+        timer.start()
+
+    def _queue_precompute(self, rule: ChangeRule, scope: str, target: Path):
+        key = (rule.name, scope)
+        with self._lock:
+            if key in self._queued:
+                return
+            self._queued.add(key)
+
+        def run():
+            with self._lock:
+                self._queued.discard(key)
+            if self._stop.is_set() or not target.exists():
+                return
+            start = time.time()
+            try:
+                rule.precompute(self.project_path, target)
+                self._stats['precomputes_done'] += 1
+                logger.info(f"Watcher rule '{rule.name}' precomputed {scope} in {time.time() - start:.2f}s")
+            except Exception as e:
+                self._stats['errors'] += 1
+                logger.warning(f"Watcher rule '{rule.name}' failed to precompute {scope}: {e}")
+
+        try:
+            get_execution_pools().get("precompute").submit(run)
+            self._stats['precomputes_queued'] += 1
+        except (PoolSaturatedError, RuntimeError) as e:
+            with self._lock:
+                self._queued.discard(key)
+            logger.warning(f"Skipped precompute of {scope}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Backend, pending changes and handler statistics."""
+        with self._lock:
+            return {'project_path': str(self.project_path), 'backend': self.backend,
+                    'running': self.running, 'pending': len(self._pending),
+                    'delayed_precomputes': len(self._delayed),
+                    'precompute': self.precompute, **self._stats}
+
+
+if WATCHDOG_AVAILABLE:
+    class _WatchdogHandler(FileSystemEventHandler):
+        """Forwards watchdog events to a ProjectWatcher."""
+
+        def __init__(self, watcher: ProjectWatcher):
+            super().__init__()
+            self.watcher = watcher
+
+        def on_any_event(self, event):
+            if event.event_type in ("opened", "closed_no_write"):
+                return
+            paths = [event.src_path]
+            if getattr(event, "dest_path", None):
+                paths.append(event.dest_path)
+            self.watcher.notify(os.fsdecode(path) for path in paths)
+
+
+# ----------------------------------------------------------------------
+# Watcher registry (one watcher per open project)
+# ----------------------------------------------------------------------
+
+_watchers: "OrderedDict[str, ProjectWatcher]" = OrderedDict()
+_watchers_lock = threading.Lock()
+
+
+def watch_project(project_path, **kwargs) -> Optional[ProjectWatcher]:
+    """
+    Start watching a project (idempotent).
+
+    Only the MAX_WATCHED_PROJECTS most recently opened projects are
+    watched; older watchers are stopped.
+
+    Returns
+    -------
+    ProjectWatcher or None
+        The project's watcher, or None if watching is disabled
+    """
+    if _watcher_mode() == "off":
+        return None
+    key = str(Path(project_path).resolve())
+    stopped = []
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is None or not watcher.running:
+            watcher = ProjectWatcher(key, **kwargs)
+            watcher.start()
+            _watchers[key] = watcher
+        _watchers.move_to_end(key)
+        while len(_watchers) > MAX_WATCHED_PROJECTS:
+            stopped.append(_watchers.popitem(last=False)[1])
+    for old in stopped:
+        old.stop()
+    return watcher
+
+
+def get_project_watcher(project_path) -> Optional[ProjectWatcher]:
+    """The watcher of a project, if it is being watched."""
+    with _watchers_lock:
+        return _watchers.get(str(Path(project_path).resolve()))
+
+
+def stop_watching(project_path=None):
+    """Stop the watcher of one project, or all watchers."""
+    with _watchers_lock:
+        if project_path is None:
+            watchers = list(_watchers.values())
+            _watchers.clear()
+        else:
+            watcher = _watchers.pop(str(Path(project_path).resolve()), None)
+            watchers = [watcher] if watcher else []
+    for watcher in watchers:
+        watcher.stop()
+
+
+def get_watcher_stats() -> List[Dict[str, Any]]:
+    """Statistics of every active watcher."""
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+    return [watcher.get_stats() for watcher in watchers]
+
+
+# ----------------------------------------------------------------------
+# Rules of the caches in this folder
+# ----------------------------------------------------------------------
+
+def _input_workbook_changed(project_path: Path, path: Path):
+    get_input_workbook_cache().invalidate(path)
+
+
+def _warm_input_workbook(project_path: Path, path: Path):
+    get_input_workbook(project_path)
+
+
+def _template_changed(project_path: Path, path: Path):
+    get_profile_metadata_cache().invalidate(template_metadata_path(project_path))
+    if not path.exists():
+        template_metadata_path(project_path).unlink(missing_ok=True)
+
+
+def _warm_template(project_path: Path, path: Path):
+    get_template_metadata(project_path)
+
+
+def _load_profile_changed(project_path: Path, path: Path):
+    sidecar_path = profile_metadata_path(project_path, path.stem)
+    get_profile_metadata_cache().invalidate(sidecar_path)
+    if not path.exists():
+        release_load_profile_store(project_path, path.stem, remove_cache=True)
+        sidecar_path.unlink(missing_ok=True)
+
+
+def _warm_load_profile(project_path: Path, path: Path):
+    get_profile_metadata(project_path, path.stem)
+    get_load_profile_store(project_path, path.stem).manifest()
+
+
+def _scenario_changed(project_path: Path, path: Path):
+    get_scenario_results_cache().invalidate(path)
+    refresh_scenario_safely(project_path, path.name)
+
+
+def _warm_scenario(project_path: Path, path: Path):
+    if path.is_dir():
+        get_scenario_results_cache().get(path)
+
+
+on_change("input_workbook", "inputs/input_demand_file.xlsx",
+          invalidate=_input_workbook_changed, precompute=_warm_input_workbook)
+on_change("load_curve_template", "inputs/load_curve_template.xlsx",
+          invalidate=_template_changed, precompute=_warm_template)
+on_change("load_profile", "results/load_profiles/*.xlsx",
+          invalidate=_load_profile_changed, precompute=_warm_load_profile)
+on_change("forecast_scenario", "results/demand_forecasts/*/**",
+          invalidate=_scenario_changed, precompute=_warm_scenario, scope_parts=3)
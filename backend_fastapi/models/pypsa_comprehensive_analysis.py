@@ -46,6 +46,8 @@ from pathlib import Path
 from datetime import datetime
 import json
 
+from downsampling import envelope_indices
+
 # Configure logging and warnings
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -1794,10 +1796,18 @@ class PyPSASingleNetworkAnalyzer:
             "variable_capacity": variable_capacity
         }
 
-    def get_dispatch_analysis(self):
+    def get_dispatch_analysis(self, max_points: Optional[int] = None):
         """
         Get time series data for dispatch analysis, including generation by carrier,
         storage charge/discharge, and load.
+
+        Parameters
+        ----------
+        max_points : int, optional
+            Downsample to at most this many snapshots. The rows are chosen
+            from the min/max envelope of total generation (the top of the
+            stacked areas), load and storage charging, so all series keep
+            a shared time axis and their peaks.
         """
         is_solved = (
             hasattr(self.network, 'generators_t') and 'p' in self.network.generators_t and
@@ -1833,6 +1843,14 @@ class PyPSASingleNetworkAnalyzer:
         dispatch_df['storage_discharge'] = storage_discharge
         dispatch_df['load'] = load
 
+        if max_points and len(dispatch_df) > max_points:
+            reference = np.column_stack([
+                gen_by_carrier.sum(axis=1).to_numpy(dtype=float),
+                dispatch_df['load'].to_numpy(dtype=float),
+                dispatch_df['storage_charge'].to_numpy(dtype=float)
+            ])
+            dispatch_df = dispatch_df.iloc[envelope_indices(reference, max_points)]
+
         # Reshape for response
         time_series_list = []
         for timestamp, row in dispatch_df.iterrows():
@@ -1853,3 +1871,35 @@ class PyPSASingleNetworkAnalyzer:
             "carriers": carriers,
             "duration_hours": len(self.network.snapshots)
         }
+
+
+# =============================================================================
+# PROCESS POOL ENTRY POINT
+# =============================================================================
+
+def analyze_network_file(network_path: str) -> Dict[str, Any]:
+    """
+    Load a network file and run all analyses.
+
+    Module-level so it can run in the 'analytics_process' execution pool:
+    it takes a path and returns plain, picklable results. Each worker
+    process keeps its own network cache.
+
+    Args:
+        network_path: Path to the .nc network file
+
+    Returns:
+        dict: Results of PyPSASingleNetworkAnalyzer.run_all_analyses()
+
+    Raises:
+        FileNotFoundError: If the network file doesn't exist
+        ValueError: If the file is not a .nc network or could not be loaded
+    """
+    from network_cache import load_network_cached
+
+    network = load_network_cached(str(network_path))
+    if network is None:
+        raise ValueError(f"Failed to load network: {network_path}")
+
+    logger.info(f"Network loaded successfully. Snapshots: {len(network.snapshots)}")
+    return PyPSASingleNetworkAnalyzer(network).run_all_analyses()
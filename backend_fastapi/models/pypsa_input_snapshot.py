@@ -0,0 +1,262 @@
+"""
+PyPSA Input Snapshot
+====================
+
+Single-pass loading of PyPSA_Input_Data.xlsx with a typed on-disk snapshot.
+
+The model run needs about eighteen sheets of the input workbook. Reading
+them with one ``pd.read_excel`` call each reopens and re-parses the whole
+workbook every time. Here the workbook is opened once and every required
+sheet is parsed from that single handle; the resulting frames are then
+written to a snapshot folder keyed by the SHA-256 of the workbook bytes:
+
+    <input folder>/.cache/pypsa_inputs/<sha256>/
+        manifest.json        sheets, shapes, dtypes, parse timings
+        <n>.pkl              one pickled DataFrame per sheet
+
+Reruns with an unchanged workbook (same bytes, whatever its mtime) load the
+snapshot and skip Excel parsing entirely. Pickled frames keep the exact
+dtypes and column labels read_excel produced (e.g. integer year columns of
+the Demand sheet, mixed-type marker tables of the Settings sheet), so the
+model sees identical inputs either way.
+
+Features:
+- One workbook open for all sheets, with per-sheet parse timings
+- Optional sheets (e.g. 'Custom days') loaded in the same pass when present
+- Content-addressed snapshots; the newest few are kept per input folder
+- Atomic snapshot writes; unreadable or incompatible snapshots are
+  ignored and rebuilt
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_DIRNAME = Path(".cache") / "pypsa_inputs"
+MANIFEST_FILENAME = "manifest.json"
+MAX_SNAPSHOTS = 3
+
+
+@dataclass
+class InputSheets:
+    """Parsed sheets of an input workbook and how they were obtained."""
+    frames: Dict[str, pd.DataFrame]
+    sha256: str
+    source: str  # 'workbook' or 'snapshot'
+    timings: Dict[str, float] = field(default_factory=dict)
+    total_seconds: float = 0.0
+
+
+def workbook_sha256(file_path) -> str:
+    """SHA-256 of a file's bytes, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_root(file_path) -> Path:
+    """Folder holding the snapshots of a workbook's input folder."""
+    return Path(file_path).parent / SNAPSHOT_DIRNAME
+
+
+def read_sheets(file_path, sheets: Iterable[str], optional_sheets: Iterable[str] = ()) -> InputSheets:
+    """
+    Parse several sheets from one open workbook.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        Workbook path
+    sheets : iterable of str
+        Required sheet names
+    optional_sheets : iterable of str
+        Sheets parsed only if the workbook has them
+
+    Returns
+    -------
+    InputSheets
+        Frames by sheet name, with per-sheet parse timings
+
+    Raises
+    ------
+    KeyError
+        If a required sheet is missing
+    """
+    start = time.perf_counter()
+    frames, timings = {}, {}
+    with pd.ExcelFile(file_path, engine='openpyxl') as workbook:
+        available = set(workbook.sheet_names)
+        missing = [name for name in sheets if name not in available]
+        if missing:
+            raise KeyError(f"Sheets not found in {Path(file_path).name}: {missing}")
+        timings['open'] = time.perf_counter() - start
+
+        wanted = list(sheets) + [name for name in optional_sheets if name in available]
+        for name in wanted:
+            sheet_start = time.perf_counter()
+            frames[name] = workbook.parse(sheet_name=name)
+            timings[name] = time.perf_counter() - sheet_start
+
+    return InputSheets(frames=frames, sha256='', source='workbook', timings=timings,
+                       total_seconds=time.perf_counter() - start)
+
+
+class InputSnapshotStore:
+    """Content-addressed snapshots of parsed input workbooks."""
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._lock = threading.Lock()
+
+    def load(self, file_path, sha256: str, sheets: Iterable[str]) -> Optional[InputSheets]:
+        """
+        Frames of a workbook version, or None if no usable snapshot exists.
+
+        A snapshot is usable when it was written by this format version and
+        pandas major version and holds every requested sheet.
+        """
+        start = time.perf_counter()
+        folder = snapshot_root(file_path) / sha256
+        manifest_path = folder / MANIFEST_FILENAME
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if (manifest.get('format_version') != SNAPSHOT_FORMAT_VERSION
+                    or manifest.get('pandas_major') != pd.__version__.split('.')[0]):
+                return None
+            entries = manifest['sheets']
+            if any(name not in entries for name in sheets):
+                return None
+            frames, timings = {}, {}
+            for name, entry in entries.items():
+                sheet_start = time.perf_counter()
+                frames[name] = pd.read_pickle(folder / entry['file'])
+                timings[name] = time.perf_counter() - sheet_start
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable input snapshot {folder}: {e}")
+            return None
+
+        os.utime(manifest_path)  # mark as recently used for pruning
+        return InputSheets(frames=frames, sha256=sha256, source='snapshot', timings=timings,
+                           total_seconds=time.perf_counter() - start)
+
+    def save(self, file_path, parsed: InputSheets):
+        """Write a snapshot of parsed sheets (atomically) and prune old ones."""
+        root = snapshot_root(file_path)
+        folder = root / parsed.sha256
+        tmp_dir = root / f"{parsed.sha256}.tmp{os.getpid()}_{threading.get_ident()}"
+        with self._lock:
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            tmp_dir.mkdir(parents=True)
+
+            entries = {}
+            for position, (name, frame) in enumerate(parsed.frames.items()):
+                file_name = f"{position}.pkl"
+                frame.to_pickle(tmp_dir / file_name)
+                entries[name] = {
+                    'file': file_name,
+                    'rows': int(frame.shape[0]),
+                    'columns': int(frame.shape[1]),
+                    'dtypes': sorted({str(dtype) for dtype in frame.dtypes}),
+                    'parse_seconds': round(parsed.timings.get(name, 0.0), 4),
+                }
+            manifest = {
+                'format_version': SNAPSHOT_FORMAT_VERSION,
+                'pandas_major': pd.__version__.split('.')[0],
+                'workbook': Path(file_path).name,
+                'sha256': parsed.sha256,
+                'sheets': entries,
+                'built_at': time.time(),
+            }
+            with open(tmp_dir / MANIFEST_FILENAME, 'w') as f:
+                json.dump(manifest, f, indent=2)
+
+            if folder.exists():
+                shutil.rmtree(folder, ignore_errors=True)
+            os.replace(tmp_dir, folder)
+            self._prune(root)
+
+    def _prune(self, root: Path):
+        """Keep the most recently used snapshots only."""
+        snapshots = [item for item in root.iterdir()
+                     if item.is_dir() and (item / MANIFEST_FILENAME).exists()]
+        snapshots.sort(key=lambda item: (item / MANIFEST_FILENAME).stat().st_mtime, reverse=True)
+        for stale in snapshots[self.max_snapshots:]:
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+_snapshot_store = InputSnapshotStore()
+
+
+def get_input_snapshot_store() -> InputSnapshotStore:
+    """Get the global input snapshot store."""
+    return _snapshot_store
+
+
+def load_input_sheets(file_path, sheets: Iterable[str], optional_sheets: Iterable[str] = (),
+                      use_snapshot: bool = True) -> InputSheets:
+    """
+    Sheets of an input workbook, from its snapshot when the bytes are unchanged.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        Workbook path
+    sheets : iterable of str
+        Required sheet names
+    optional_sheets : iterable of str
+        Sheets loaded only if the workbook has them
+    use_snapshot : bool
+        Read and write snapshots (False always parses the workbook)
+
+    Returns
+    -------
+    InputSheets
+        Frames by sheet name; ``source`` tells whether Excel was parsed
+
+    Raises
+    ------
+    FileNotFoundError
+        If the workbook does not exist
+    KeyError
+        If a required sheet is missing
+    """
+    sheets, optional_sheets = list(sheets), list(optional_sheets)
+    if not use_snapshot:
+        return read_sheets(file_path, sheets, optional_sheets)
+
+    hash_start = time.perf_counter()
+    sha256 = workbook_sha256(file_path)
+    hash_seconds = time.perf_counter() - hash_start
+
+    parsed = _snapshot_store.load(file_path, sha256, sheets)
+    if parsed is None:
+        parsed = read_sheets(file_path, sheets, optional_sheets)
+        parsed.sha256 = sha256
+        try:
+            _snapshot_store.save(file_path, parsed)
+        except Exception as e:
+            logger.warning(f"Could not write input snapshot for {Path(file_path).name}: {e}")
+    parsed.timings = {'hash': hash_seconds, **parsed.timings}
+    parsed.total_seconds += hash_seconds
+    return parsed
@@ -0,0 +1,270 @@
+"""
+Response Compression
+====================
+
+Content-negotiated gzip/brotli compression of API responses.
+
+Dispatch, load profile and analysis payloads are several MB of JSON with
+highly repetitive keys and numbers; compressed they shrink by roughly an
+order of magnitude. This ASGI middleware compresses a response when:
+
+- the client accepts gzip or br (Accept-Encoding, q-values honoured),
+- its content type is textual (JSON, text, JavaScript, XML, SVG, CSV),
+- it is at least ``minimum_size`` bytes, and
+- it is not already encoded.
+
+Server-Sent Events (text/event-stream) are never buffered or compressed,
+so progress streams keep flushing event by event. Brotli is used when the
+optional ``brotli`` package is installed and the client prefers or
+equally accepts it; otherwise gzip.
+
+Features:
+- Pure ASGI (no per-request Response rebuilding)
+- Streaming bodies compressed chunk by chunk
+- Large bodies compressed in the 'compression' execution pool so the event
+  loop is not blocked
+- ``Vary: Accept-Encoding`` on every compressible response
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import gzip
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from execution_pools import run_in_pool
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Compress whole bodies above this size off the event loop
+THREAD_MINIMUM_SIZE = 256 * 1024
+
+
+def is_compressible(content_type: str) -> bool:
+    """Whether a response of this content type should be compressed."""
+    media_type = content_type.partition(";")[0].strip().lower()
+    if media_type == "text/event-stream":
+        return False
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith("+json")
+    )
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header.
+
+    Parameters
+    ----------
+    accept_encoding : str
+        Header value, e.g. ``"gzip, deflate, br;q=0.9"``
+
+    Returns
+    -------
+    str or None
+        'br', 'gzip' or None (send uncompressed)
+    """
+    if not accept_encoding:
+        return None
+
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    candidates = (["br"] if BROTLI_AVAILABLE else []) + ["gzip"]
+    best, best_quality = None, 0.0
+    for coding in candidates:
+        quality = qualities.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class _Encoder:
+    """Incremental gzip or brotli encoder."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + (self._compressor.finish() if final else self._compressor.flush())
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    """
+    Compress a complete body.
+
+    Parameters
+    ----------
+    body : bytes
+        Uncompressed body
+    encoding : str
+        'gzip' or 'br'
+
+    Returns
+    -------
+    bytes
+        Compressed body
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing textual responses with gzip or brotli.
+
+    Parameters
+    ----------
+    app : ASGIApp
+        Wrapped application
+    minimum_size : int
+        Bodies smaller than this are sent uncompressed
+    gzip_level : int
+        zlib compression level (1-9)
+    brotli_quality : int
+        Brotli quality (0-11); 4 compresses better than gzip -6 at a
+        similar speed
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await _CompressingResponder(self, encoding)(scope, receive, send)
+
+
+class _CompressingResponder:
+    """Per-request state of CompressionMiddleware."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.encoder: Optional[_Encoder] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or not is_compressible(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                await self.send(message)
+            else:
+                # Hold the start message until the first body chunk decides the headers
+                self.start_message = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            if more_body:
+                self.encoder = _Encoder(self.encoding, self.middleware.gzip_level,
+                                        self.middleware.brotli_quality)
+                body = self.encoder.compress(body, final=False)
+                if "content-length" in headers:
+                    del headers["content-length"]
+            else:
+                body = await self._compress_whole(body)
+                headers["content-length"] = str(len(body))
+            headers["content-encoding"] = self.encoding
+
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        # Later chunks of a streaming body
+        await self.send({
+            "type": "http.response.body",
+            "body": self.encoder.compress(body, final=not more_body),
+            "more_body": more_body,
+        })
+
+    async def _compress_whole(self, body: bytes) -> bytes:
+        args = (body, self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await run_in_pool("compression", compress_body, *args)
+        return compress_body(*args)
@@ -0,0 +1,406 @@
+"""
+Scenario Results Index
+======================
+
+In-memory, columnar index of the per-sector forecast results of a demand
+scenario, used to consolidate sector forecasts without re-opening every
+sector workbook on each request.
+
+Each sector workbook ('Results' sheet) is read once into a long frame with
+one row per (year, sector, model). Consolidation for a model selection is
+then a pivot plus a few array operations over that frame.
+
+Features:
+- Lazy build on first access per scenario folder
+- Invalidation by file fingerprint (mtime_ns, size); only changed sector
+  workbooks are re-read
+- Vectorized gross / net / on-grid consolidation with T&D losses
+  interpolated over the year range
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CONSOLIDATED_FILE_STEM = 'Consolidated_Results'
+RESULTS_SHEET = 'Results'
+DEFAULT_TD_LOSS = 0.10  # 10%
+NON_MODEL_COLUMNS = ('year', 'time series')
+INDEX_COLUMNS = ['year', 'sector', 'model', 'value']
+
+
+def is_solar_sector(sector_name: str) -> bool:
+    """Whether a sector is a solar generation sector (name contains 'solar')."""
+    return 'solar' in sector_name.lower()
+
+
+def _file_fingerprint(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _coerce_year(value) -> Optional[int]:
+    """Year cell as int, or None for empty/invalid cells (a year of 0 counts as empty)."""
+    if not value:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def read_sector_results(file_path: Path) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Read the 'Results' sheet of one sector workbook into long format.
+
+    Parameters
+    ----------
+    file_path : Path
+        Sector result workbook
+
+    Returns
+    -------
+    (pd.DataFrame, list of str)
+        Long frame with columns year, model, value (one row per non-empty
+        cell; the last row wins for repeated years) and the model names in
+        sheet column order
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        if RESULTS_SHEET not in workbook.sheetnames:
+            return pd.DataFrame(columns=['year', 'model', 'value']), []
+        rows = workbook[RESULTS_SHEET].iter_rows(values_only=True)
+        headers = list(next(rows, None) or [])
+        body = [row for row in rows if row is not None]
+    finally:
+        workbook.close()
+
+    models = [h for h in headers if h and str(h).lower() not in NON_MODEL_COLUMNS]
+    if 'Year' not in headers or not body:
+        return pd.DataFrame(columns=['year', 'model', 'value']), models
+
+    width = len(headers)
+    table = pd.DataFrame([tuple(row[:width]) + (None,) * (width - len(row)) for row in body],
+                         columns=range(width))
+    years = table[headers.index('Year')].map(_coerce_year)
+    valid = years.notna().to_numpy()
+
+    frames = []
+    for col_idx, header in enumerate(headers):
+        if header not in models:
+            continue
+        values = pd.to_numeric(table[col_idx], errors='coerce').to_numpy(dtype=float)
+        keep = valid & ~np.isnan(values)
+        frames.append(pd.DataFrame({
+            'year': years[keep].astype(int).to_numpy(),
+            'model': header,
+            'value': values[keep],
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['year', 'model', 'value']), models
+    long = pd.concat(frames, ignore_index=True)
+    long = long.drop_duplicates(subset=['year', 'model'], keep='last')
+    return long.reset_index(drop=True), models
+
+
+class ScenarioResultsIndex:
+    """
+    Columnar results of all sector workbooks of one scenario.
+
+    Attributes
+    ----------
+    sectors : list of str
+        Sector names (workbook stems, excluding the consolidated workbook)
+    models_by_sector : dict
+        Sector name -> model names from the Results sheet header
+    frame : pd.DataFrame
+        Long frame with columns year, sector, model, value
+    """
+
+    def __init__(self, scenario_path: Path):
+        self.scenario_path = Path(scenario_path)
+        self.sectors: List[str] = []
+        self.models_by_sector: Dict[str, List[str]] = {}
+        self.frame = pd.DataFrame(columns=INDEX_COLUMNS)
+        self.built_at: Optional[float] = None
+        self._fingerprints: Dict[str, Tuple[int, int]] = {}
+        self._sector_frames: Dict[str, pd.DataFrame] = {}
+
+    def sector_files(self) -> List[Path]:
+        """Sector workbooks currently in the scenario folder (directory order)."""
+        return [f for f in self.scenario_path.glob("*.xlsx") if f.stem != CONSOLIDATED_FILE_STEM]
+
+    def is_current(self, files: Optional[List[Path]] = None) -> bool:
+        """Whether every sector workbook still matches the indexed fingerprint."""
+        files = self.sector_files() if files is None else files
+        try:
+            current = {f.stem: _file_fingerprint(f) for f in files}
+        except OSError:
+            return False
+        return self.built_at is not None and current == self._fingerprints
+
+    def refresh(self, files: Optional[List[Path]] = None) -> bool:
+        """
+        Bring the index up to date, re-reading only changed workbooks.
+
+        Returns
+        -------
+        bool
+            True if anything was re-read or removed
+        """
+        files = self.sector_files() if files is None else files
+        changed = False
+        fingerprints = {}
+        sector_frames = {}
+        models_by_sector = {}
+
+        for file in files:
+            sector = file.stem
+            try:
+                fingerprint = _file_fingerprint(file)
+            except OSError:
+                continue
+            fingerprints[sector] = fingerprint
+            if self._fingerprints.get(sector) == fingerprint and sector in self._sector_frames:
+                sector_frames[sector] = self._sector_frames[sector]
+                models_by_sector[sector] = self.models_by_sector.get(sector, [])
+                continue
+
+            changed = True
+            try:
+                long, models = read_sector_results(file)
+            except Exception as e:
+                logger.error(f"Error reading sector {sector}: {e}")
+                long, models = pd.DataFrame(columns=['year', 'model', 'value']), []
+            sector_frames[sector] = long.assign(sector=sector)[INDEX_COLUMNS]
+            models_by_sector[sector] = models
+
+        if set(fingerprints) != set(self._fingerprints):
+            changed = True
+
+        self.sectors = list(fingerprints)
+        self.models_by_sector = models_by_sector
+        self._fingerprints = fingerprints
+        self._sector_frames = sector_frames
+        if changed or self.built_at is None:
+            non_empty = [f for f in sector_frames.values() if not f.empty]
+            self.frame = (pd.concat(non_empty, ignore_index=True) if non_empty
+                          else pd.DataFrame(columns=INDEX_COLUMNS))
+        self.built_at = time.time()
+        return changed
+
+    def selection_matrix(self, selections: Dict[str, str], years: np.ndarray) -> np.ndarray:
+        """
+        Selected model values as a (year, sector) matrix.
+
+        Parameters
+        ----------
+        selections : dict
+            Sector name -> selected model
+        years : np.ndarray
+            Years (rows of the result)
+
+        Returns
+        -------
+        np.ndarray
+            Shape (len(years), len(self.sectors)); NaN where a sector has no
+            selection or no value for the year
+        """
+        matrix = np.full((len(years), len(self.sectors)), np.nan)
+        if self.frame.empty or not selections:
+            return matrix
+        chosen = pd.DataFrame({'sector': list(selections.keys()),
+                               'model': list(selections.values())})
+        selected = self.frame.merge(chosen, on=['sector', 'model'], how='inner')
+        if selected.empty:
+            return matrix
+        wide = selected.pivot(index='year', columns='sector', values='value')
+        wide = wide.reindex(index=years, columns=self.sectors)
+        return np.array(wide.to_numpy(dtype=float), copy=True)
+
+
+def td_loss_fractions(years: Sequence[int], loss_points: Iterable[Tuple[float, float]]) -> np.ndarray:
+    """
+    T&D loss fraction per year by linear interpolation between loss points.
+
+    Years outside the configured points take the nearest point's loss; with
+    no points the default of 10% applies.
+
+    Parameters
+    ----------
+    years : sequence of int
+        Target years
+    loss_points : iterable of (year, loss percent)
+        Configured T&D loss points
+
+    Returns
+    -------
+    np.ndarray
+        Loss fractions (e.g. 0.10 for 10%)
+    """
+    points = sorted(loss_points, key=lambda p: p[0])
+    years = np.asarray(years, dtype=float)
+    if not points:
+        return np.full(len(years), DEFAULT_TD_LOSS)
+    xp = np.array([p[0] for p in points], dtype=float)
+    fp = np.array([p[1] for p in points], dtype=float)
+    return np.interp(years, xp, fp) / 100.0
+
+
+def consolidate(index: ScenarioResultsIndex, selections: Dict[str, str], start_year: int,
+                end_year: int, demand_type: str = "gross",
+                solar_shares: Optional[Dict[str, float]] = None,
+                td_loss_points: Iterable[Tuple[float, float]] = ()) -> List[Dict]:
+    """
+    Consolidate the selected sector models into yearly totals.
+
+    Parameters
+    ----------
+    index : ScenarioResultsIndex
+        Up-to-date scenario index
+    selections : dict
+        Sector name -> selected model
+    start_year, end_year : int
+        Inclusive year range
+    demand_type : str
+        'gross' (sum plus T&D losses), 'net' (solar share removed from
+        non-solar sectors) or 'onGrid' (net plus T&D losses)
+    solar_shares : dict, optional
+        Sector name -> solar share percentage (net and onGrid)
+    td_loss_points : iterable of (year, loss percent)
+        T&D loss configuration
+
+    Returns
+    -------
+    list of dict
+        One row per year: Year, one column per sector (None when missing),
+        then the totals columns for the demand type
+    """
+    years = np.arange(start_year, end_year + 1)
+    sectors = index.sectors
+    values = index.selection_matrix(selections, years)
+
+    solar = np.array([is_solar_sector(s) for s in sectors], dtype=bool)
+    values[:, solar] = np.abs(values[:, solar])
+
+    columns: Dict[str, np.ndarray] = {}
+    if demand_type == "gross":
+        gross_total = np.nansum(values, axis=1)
+        td_percentage = td_loss_fractions(years, td_loss_points)
+        td_losses = gross_total * (td_percentage / (1 - td_percentage))
+        columns = {
+            'Gross Total': gross_total,
+            'T&D Loss (%)': td_percentage,
+            'T&D Losses': td_losses,
+            'Total': gross_total + td_losses,
+        }
+    elif demand_type in ("net", "onGrid"):
+        shares = solar_shares or {}
+        factors = np.array([1.0 if is_solar else 1.0 - shares.get(s, 0.0) / 100.0
+                            for s, is_solar in zip(sectors, solar)])
+        values = values * factors
+        net_total = np.nansum(values, axis=1)
+        if demand_type == "net":
+            columns = {'Total': net_total}
+        else:
+            td_percentage = td_loss_fractions(years, td_loss_points)
+            td_losses = net_total * (td_percentage / (1 - td_percentage))
+            columns = {
+                'Net Total': net_total,
+                'T&D Loss (%)': td_percentage,
+                'T&D Losses': td_losses,
+                'Total': net_total + td_losses,
+            }
+
+    # Assemble rows column-wise; NaN (no selection/value) becomes None
+    sector_values = values.astype(object)
+    sector_values[np.isnan(values)] = None
+    rows = []
+    total_names = list(columns)
+    total_values = [columns[name].tolist() for name in total_names]
+    for i, year in enumerate(years.tolist()):
+        row = {'Year': year}
+        row.update(zip(sectors, sector_values[i].tolist()))
+        for name, col in zip(total_names, total_values):
+            row[name] = col[i]
+        rows.append(row)
+    return rows
+
+
+class ScenarioResultsCache:
+    """Thread-safe LRU cache of scenario indexes keyed by scenario folder."""
+
+    def __init__(self, max_scenarios: int = 32):
+        self.max_scenarios = max_scenarios
+        self._indexes: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'builds': 0}
+
+    def get(self, scenario_path: Path) -> ScenarioResultsIndex:
+        """
+        Get the index of a scenario folder, building or refreshing it if needed.
+
+        Parameters
+        ----------
+        scenario_path : Path
+            results/demand_forecasts/<scenario> folder
+
+        Returns
+        -------
+        ScenarioResultsIndex
+            Index matching the current sector workbooks
+        """
+        key = str(Path(scenario_path).resolve())
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = ScenarioResultsIndex(Path(scenario_path))
+                self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            while len(self._indexes) > self.max_scenarios:
+                self._indexes.popitem(last=False)
+
+            files = index.sector_files()
+            if index.is_current(files):
+                self._stats['hits'] += 1
+                return index
+
+            start = time.time()
+            index.refresh(files)
+            self._stats['builds'] += 1
+            logger.info(f"Indexed scenario results {scenario_path} "
+                        f"({len(index.sectors)} sectors, {len(index.frame)} values) in {time.time() - start:.3f}s")
+            return index
+
+    def invalidate(self, scenario_path: Optional[Path] = None):
+        """Drop one scenario index, or all of them."""
+        with self._lock:
+            if scenario_path is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(str(Path(scenario_path).resolve()), None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {'scenarios': len(self._indexes), 'max_scenarios': self.max_scenarios, **self._stats}
+
+
+_results_cache = ScenarioResultsCache()
+
+
+def get_scenario_results_cache() -> ScenarioResultsCache:
+    """Get the global scenario results cache."""
+    return _results_cache
@@ -0,0 +1,584 @@
+"""
+Snapshot Clustering
+===================
+
+Time-series aggregation of model years into representative days or weeks.
+
+A year of hourly demand and availability (P_max_pu) profiles is cut into
+periods of 24 or 168 hours. Each period becomes one feature vector (demand
+plus every varying profile, min-max scaled) and the periods are grouped
+into N clusters, by k-medoids or by Ward hierarchical clustering. A cluster
+is represented by its medoid, a real period of the year, so representative
+snapshots keep their actual timestamps, demand and profile values.
+
+    snapshot weight (objective, generators) = periods in the cluster
+    snapshot weight (stores)                = 1 hour
+
+The periods with the highest demand peaks can be kept as clusters of their
+own, so the peak the capacity has to cover is never averaged away.
+
+Storage chronology across the year is kept with linked typical periods
+(Kotzur et al., 2018): each original period carries a state of charge at
+its start, which moves by the net charge of its representative period,
+and stays within [0, e_nom] together with the largest and smallest
+in-period excursion of that representative. ``linked_storage_constraints``
+adds these constraints to a PyPSA model as ``extra_functionality``.
+
+Features:
+- k-medoids (Voronoi iteration, k-medoids++ start) or Ward hierarchical
+  clustering (scipy; falls back to k-medoids without it)
+- Extreme peak periods kept as their own representatives
+- Aggregation error report (demand RMSE, energy, peak and duration curve
+  errors, profile RMSE)
+- Solve-time history per project for comparing clustered, myopic and
+  full runs (file-locked, so parallel year processes can record together)
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+try:
+    import msvcrt
+    MSVCRT_AVAILABLE = True
+except ImportError:
+    MSVCRT_AVAILABLE = False
+
+try:
+    from scipy.cluster.hierarchy import fcluster, linkage
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PERIOD_HOURS = {'day': 24, 'week': 168}
+CLUSTERING_METHODS = ('kmedoids', 'hierarchical')
+SOLVE_HISTORY_FILENAME = "solve_times.json"
+
+
+@dataclass
+class ClusteringResult:
+    """Representative periods of one model year."""
+    period_hours: int
+    method: str
+    period_starts: pd.DatetimeIndex   # start of every original period
+    sequence: np.ndarray              # cluster of every original period, chronological
+    representatives: np.ndarray       # original period of each cluster, chronological
+    weights: np.ndarray               # number of original periods per cluster
+    peak_clusters: List[int]          # clusters kept for extreme peak periods
+    positions: np.ndarray             # hour positions (in the year) of the representative snapshots
+    snapshots: pd.DatetimeIndex       # representative snapshots, in cluster order
+    error: Dict[str, float] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def n_clusters(self) -> int:
+        return len(self.representatives)
+
+    @property
+    def snapshot_weights(self) -> np.ndarray:
+        """Objective weight of every representative snapshot."""
+        return np.repeat(self.weights, self.period_hours)
+
+    def summary(self) -> Dict[str, Any]:
+        """JSON-serializable description of the aggregation."""
+        return {
+            'method': self.method,
+            'period_hours': self.period_hours,
+            'periods': len(self.sequence),
+            'clusters': self.n_clusters,
+            'peak_clusters': [int(c) for c in self.peak_clusters],
+            'snapshots': len(self.snapshots),
+            'representatives': [str(self.period_starts[p].date()) for p in self.representatives],
+            'weights': [round(float(w), 4) for w in self.weights],
+            'error': self.error,
+            'seconds': round(self.seconds, 3),
+        }
+
+
+def _squared_distances(features: np.ndarray) -> np.ndarray:
+    """Pairwise squared Euclidean distances between rows."""
+    norms = np.einsum('ij,ij->i', features, features)
+    distances = norms[:, None] + norms[None, :] - 2.0 * features @ features.T
+    return np.maximum(distances, 0.0)
+
+
+def _medoids_of(distances: np.ndarray, labels: np.ndarray, k: int) -> np.ndarray:
+    """Member of each cluster with the smallest total distance to the others."""
+    medoids = np.empty(k, dtype=np.int64)
+    for cluster in range(k):
+        members = np.flatnonzero(labels == cluster)
+        medoids[cluster] = members[np.argmin(distances[np.ix_(members, members)].sum(axis=1))]
+    return medoids
+
+
+def kmedoids(features: np.ndarray, k: int, max_iter: int = 100, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    k-medoids clustering by Voronoi iteration.
+
+    Parameters
+    ----------
+    features : np.ndarray
+        One row per period
+    k : int
+        Number of clusters (at most the number of rows)
+    max_iter : int
+        Iteration limit
+    seed : int
+        Seed of the k-medoids++ start (results are reproducible)
+
+    Returns
+    -------
+    tuple
+        (cluster label of every row, row index of every cluster's medoid)
+    """
+    distances = _squared_distances(features)
+    n = len(features)
+    rng = np.random.default_rng(seed)
+
+    # k-medoids++: start from the most central row, then sample far-away rows
+    medoids = [int(np.argmin(distances.sum(axis=1)))]
+    while len(medoids) < k:
+        nearest = distances[:, medoids].min(axis=1)
+        total = nearest.sum()
+        if total <= 0:
+            remaining = np.setdiff1d(np.arange(n), medoids)
+            medoids.extend(int(i) for i in remaining[:k - len(medoids)])
+            break
+        medoids.append(int(rng.choice(n, p=nearest / total)))
+    medoids = np.array(medoids, dtype=np.int64)
+
+    for _ in range(max_iter):
+        labels = np.argmin(distances[:, medoids], axis=1)
+        labels[medoids] = np.arange(k)
+        updated = _medoids_of(distances, labels, k)
+        if np.array_equal(np.sort(updated), np.sort(medoids)):
+            break
+        medoids = updated
+
+    labels = np.argmin(distances[:, medoids], axis=1)
+    labels[medoids] = np.arange(k)
+    return labels, medoids
+
+
+def hierarchical(features: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ward hierarchical clustering with medoid representatives.
+
+    Returns
+    -------
+    tuple
+        (cluster label of every row, row index of every cluster's medoid)
+    """
+    if not SCIPY_AVAILABLE:
+        logger.warning("scipy is not installed, using k-medoids instead of hierarchical clustering")
+        return kmedoids(features, k)
+
+    tree = linkage(features, method='ward')
+    _, labels = np.unique(fcluster(tree, t=k, criterion='maxclust'), return_inverse=True)
+    return labels, _medoids_of(_squared_distances(features), labels, labels.max() + 1)
+
+
+def _scaled(values: np.ndarray) -> np.ndarray:
+    """Min-max scaling per column; constant columns become zero."""
+    low, high = values.min(axis=0), values.max(axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    return (values - low) / span
+
+
+def aggregation_error(demand: np.ndarray, profiles: np.ndarray, reconstructed_demand: np.ndarray,
+                      reconstructed_profiles: np.ndarray) -> Dict[str, float]:
+    """
+    Error of representing a year by its representative periods.
+
+    Parameters
+    ----------
+    demand, reconstructed_demand : np.ndarray
+        Hourly demand of the year and the demand of each hour's
+        representative
+    profiles, reconstructed_profiles : np.ndarray
+        Hourly profiles (hours x technologies), same pairing
+
+    Returns
+    -------
+    dict
+        Percentages relative to the actual demand (mean, total or peak);
+        profile errors in per unit
+    """
+    mean, total, peak = demand.mean(), demand.sum(), demand.max()
+
+    def pct(value, reference):
+        return round(float(100.0 * value / reference), 4) if reference else 0.0
+
+    error = {
+        'demand_rmse_pct': pct(np.sqrt(np.mean((reconstructed_demand - demand) ** 2)), mean),
+        'demand_energy_error_pct': pct(reconstructed_demand.sum() - total, total),
+        'peak_demand_error_pct': pct(reconstructed_demand.max() - peak, peak),
+        'duration_curve_rmse_pct': pct(
+            np.sqrt(np.mean((np.sort(reconstructed_demand) - np.sort(demand)) ** 2)), mean
+        ),
+    }
+    if profiles.shape[1]:
+        error['profile_rmse_pu'] = round(float(np.sqrt(np.mean((reconstructed_profiles - profiles) ** 2))), 6)
+        error['profile_energy_error_pu'] = round(
+            float(np.abs(reconstructed_profiles.mean(axis=0) - profiles.mean(axis=0)).max()), 6
+        )
+    return error
+
+
+def cluster_year(timestamps, demand, profiles: Optional[np.ndarray] = None, n_clusters: int = 12,
+                 period: str = 'day', method: str = 'kmedoids', keep_peak_periods: int = 1,
+                 seed: int = 0) -> ClusteringResult:
+    """
+    Representative periods of one year of hourly data.
+
+    Parameters
+    ----------
+    timestamps : array-like of datetime
+        Hourly timestamps of the year
+    demand : array-like
+        Demand of every hour
+    profiles : np.ndarray, optional
+        Availability of every hour (hours x technologies); constant
+        columns are ignored
+    n_clusters : int
+        Representative periods, including the kept peak periods
+    period : str
+        'day' (24 h) or 'week' (168 h)
+    method : str
+        'kmedoids' or 'hierarchical'
+    keep_peak_periods : int
+        Periods with the highest demand peak kept as their own cluster
+    seed : int
+        Seed of the k-medoids start
+
+    Returns
+    -------
+    ClusteringResult
+        Clusters ordered chronologically by their representative period
+
+    Raises
+    ------
+    ValueError
+        For an unknown period or method, or fewer hours than one period
+    """
+    start = time.perf_counter()
+    if period not in PERIOD_HOURS:
+        raise ValueError(f"Unknown clustering period '{period}'. Use one of {list(PERIOD_HOURS)}")
+    if method not in CLUSTERING_METHODS:
+        raise ValueError(f"Unknown clustering method '{method}'. Use one of {list(CLUSTERING_METHODS)}")
+
+    hours = PERIOD_HOURS[period]
+    timestamps = pd.DatetimeIndex(timestamps)
+    demand = np.asarray(demand, dtype=float)
+    profiles = np.empty((len(demand), 0)) if profiles is None else np.asarray(profiles, dtype=float)
+    profiles = profiles[:, profiles.min(axis=0) < profiles.max(axis=0)] if len(profiles) else profiles
+
+    n_full = len(demand) // hours
+    if n_full == 0:
+        raise ValueError(f"Need at least {hours} hours to cluster by {period}, got {len(demand)}")
+    leftover = len(demand) - n_full * hours
+
+    # Demand and the varying profiles get equal say in the distance
+    scaled_demand = _scaled(demand[:, None])
+    scaled_profiles = _scaled(profiles) / np.sqrt(profiles.shape[1]) if profiles.shape[1] else profiles
+    scaled = np.hstack([scaled_demand, scaled_profiles])
+    features = scaled[:n_full * hours].reshape(n_full, hours * scaled.shape[1])
+
+    # Extreme periods first, then cluster the rest
+    k = max(1, min(int(n_clusters), n_full))
+    n_peaks = max(0, min(int(keep_peak_periods), k - 1))
+    period_peaks = demand[:n_full * hours].reshape(n_full, hours).max(axis=1)
+    peak_periods = np.argsort(-period_peaks, kind='stable')[:n_peaks]
+    rest = np.setdiff1d(np.arange(n_full), peak_periods)
+
+    k_rest = min(k - n_peaks, len(rest))
+    if k_rest == len(rest):
+        labels, medoids = np.arange(len(rest)), np.arange(len(rest))
+    elif method == 'hierarchical':
+        labels, medoids = hierarchical(features[rest], k_rest)
+    else:
+        labels, medoids = kmedoids(features[rest], k_rest, seed=seed)
+
+    sequence = np.empty(n_full, dtype=np.int64)
+    sequence[rest] = labels
+    sequence[peak_periods] = np.arange(len(medoids), len(medoids) + n_peaks)
+    representatives = np.concatenate([rest[medoids], peak_periods])
+
+    # Chronological cluster order
+    order = np.argsort(representatives, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    representatives, sequence = representatives[order], rank[sequence]
+    peak_clusters = sorted(int(rank[len(medoids) + i]) for i in range(n_peaks))
+
+    weights = np.bincount(sequence, minlength=len(representatives)).astype(float)
+    if leftover:
+        # A trailing partial period joins the cluster closest on its hours
+        tail = scaled[n_full * hours:].ravel()
+        width = leftover * scaled.shape[1]
+        candidates = features[representatives][:, :width]
+        nearest = int(np.argmin(((candidates - tail) ** 2).sum(axis=1)))
+        weights[nearest] += leftover / hours
+        sequence = np.append(sequence, nearest)
+
+    positions = (representatives[:, None] * hours + np.arange(hours)).ravel()
+    period_starts = timestamps[::hours][:len(sequence)]
+
+    # Every hour of the year replaced by the same hour of its representative
+    offsets = np.arange(len(demand)) % hours
+    source = representatives[sequence[np.arange(len(demand)) // hours]] * hours + offsets
+    error = aggregation_error(demand, profiles, demand[source], profiles[source])
+
+    result = ClusteringResult(
+        period_hours=hours,
+        method=method if method != 'hierarchical' or SCIPY_AVAILABLE else 'kmedoids',
+        period_starts=period_starts,
+        sequence=sequence,
+        representatives=representatives,
+        weights=weights,
+        peak_clusters=peak_clusters,
+        positions=positions,
+        snapshots=timestamps[positions],
+        error=error,
+        seconds=time.perf_counter() - start,
+    )
+    logger.debug(f"Clustered {len(sequence)} {period}s into {result.n_clusters} representatives "
+                 f"in {result.seconds:.3f}s: {error}")
+    return result
+
+
+# ----------------------------------------------------------------------
+# Linked typical periods for storage
+# ----------------------------------------------------------------------
+
+def prepare_linked_stores(network, multi_period: bool = False) -> pd.Index:
+    """
+    Prepare a network's stores for linked typical periods.
+
+    The energy level PyPSA chains through the concatenated representative
+    periods becomes a relative level: it starts at zero, is not cyclic and
+    gets wide bounds. The real [0, e_nom] bounds and the cyclic condition
+    then apply to the linked state of charge instead.
+
+    Returns
+    -------
+    pd.Index
+        Names of the linked stores
+    """
+    stores = network.stores
+    if len(stores) == 0:
+        return pd.Index([], name='Store')
+    span = float(len(network.snapshots))
+    network.stores['e_initial'] = 0.0
+    network.stores['e_cyclic'] = False
+    network.stores['e_min_pu'] = -span
+    network.stores['e_max_pu'] = span
+    if multi_period:
+        network.stores['e_cyclic_per_period'] = False
+        network.stores['e_initial_per_period'] = True
+    return pd.Index(stores.index, name='Store')
+
+
+def linked_storage_constraints(blocks: Sequence[Tuple[int, ClusteringResult]], stores: pd.Index,
+                               cyclic: bool) -> Callable:
+    """
+    ``extra_functionality`` adding linked typical period storage constraints.
+
+    Parameters
+    ----------
+    blocks : sequence of (int, ClusteringResult)
+        Position of each year's first representative snapshot in the
+        network snapshots, and the year's clustering
+    stores : pd.Index
+        Stores to link (see ``prepare_linked_stores``)
+    cyclic : bool
+        State of charge at the end of each year equals its start
+
+    Returns
+    -------
+    callable
+        ``extra_functionality(network, snapshots)`` for network.optimize
+    """
+    def extra_functionality(network, snapshots):
+        if len(stores) == 0:
+            return
+        for number, (offset, result) in enumerate(blocks):
+            _add_linked_storage(network, stores, offset, result, cyclic, f"Store-linked_{number}")
+
+    return extra_functionality
+
+
+def _add_linked_storage(network, stores: pd.Index, offset: int, result: ClusteringResult,
+                        cyclic: bool, prefix: str):
+    """Linking constraints of one year's representative periods."""
+    import xarray as xr
+
+    m = network.model
+    k, hours = result.n_clusters, result.period_hours
+    n_periods = len(result.sequence)
+    clusters = pd.RangeIndex(k, name='cluster')
+    periods = pd.RangeIndex(n_periods, name='period')
+
+    e = m['Store-e'].sel(Store=list(stores)).isel(snapshot=np.arange(offset, offset + k * hours))
+
+    # Gather matrices over the year's representative snapshots (positional)
+    cluster_of = np.repeat(np.arange(k), hours)
+    last = np.zeros((k, k * hours))
+    last[np.arange(k), np.arange(k) * hours + hours - 1] = 1.0
+    before = np.zeros((k, k * hours))
+    before[np.arange(1, k), np.arange(1, k) * hours - 1] = 1.0  # the first period starts from zero
+    member = np.zeros((k * hours, k))
+    member[np.arange(k * hours), cluster_of] = 1.0
+    assigned = np.zeros((n_periods, k))
+    assigned[np.arange(n_periods), result.sequence] = 1.0
+
+    last = xr.DataArray(last, dims=('cluster', 'snapshot'), coords={'cluster': clusters})
+    before = xr.DataArray(before, dims=('cluster', 'snapshot'), coords={'cluster': clusters})
+    member = xr.DataArray(member, dims=('snapshot', 'cluster'), coords={'cluster': clusters})
+    assigned = xr.DataArray(assigned, dims=('period', 'cluster'), coords={'period': periods, 'cluster': clusters})
+
+    # Level before each representative period, its net charge and its excursions
+    start = m.add_variables(coords=[clusters, stores], name=f"{prefix}-start")
+    delta = m.add_variables(coords=[clusters, stores], name=f"{prefix}-delta")
+    upper = m.add_variables(lower=0, coords=[clusters, stores], name=f"{prefix}-upper")
+    lower = m.add_variables(upper=0, coords=[clusters, stores], name=f"{prefix}-lower")
+
+    m.add_constraints(start - (e * before).sum('snapshot') == 0, name=f"{prefix}-start")
+    m.add_constraints(delta - (e * last).sum('snapshot') + start == 0, name=f"{prefix}-delta")
+    m.add_constraints(e - (start * member).sum('cluster') - (upper * member).sum('cluster') <= 0,
+                      name=f"{prefix}-upper")
+    m.add_constraints(e - (start * member).sum('cluster') - (lower * member).sum('cluster') >= 0,
+                      name=f"{prefix}-lower")
+
+    # State of charge at the start of every original period
+    fixed_start = np.full((n_periods, len(stores)), np.inf)
+    if not cyclic:
+        fixed_start[0] = 0.0
+    soc = m.add_variables(lower=0, upper=xr.DataArray(fixed_start, coords=[periods, stores]),
+                          coords=[periods, stores], name=f"{prefix}-soc")
+
+    following = xr.DataArray(np.arange(n_periods) < n_periods - 1 if not cyclic else np.ones(n_periods, bool),
+                             coords=[periods])
+    m.add_constraints(soc.roll(period=-1) - soc - (delta * assigned).sum('cluster') == 0,
+                      name=f"{prefix}-soc", mask=following)
+    m.add_constraints(soc + (lower * assigned).sum('cluster') >= 0, name=f"{prefix}-soc_lower")
+
+    peak = soc + (upper * assigned).sum('cluster')
+    extendable = stores[network.stores.loc[stores, 'e_nom_extendable'].to_numpy(dtype=bool)]
+    fixed = stores.difference(extendable)
+    if len(extendable):
+        e_nom = m['Store-e_nom'].sel({'Store-ext': list(extendable)}).rename({'Store-ext': 'Store'})
+        m.add_constraints(peak.sel(Store=list(extendable)) - e_nom <= 0, name=f"{prefix}-soc_upper_ext")
+    if len(fixed):
+        e_nom = xr.DataArray(network.stores.loc[fixed, 'e_nom'].to_numpy(dtype=float),
+                             coords=[pd.Index(fixed, name='Store')])
+        m.add_constraints(peak.sel(Store=list(fixed)) <= e_nom, name=f"{prefix}-soc_upper_fixed")
+
+
+# ----------------------------------------------------------------------
+# Solve-time history
+# ----------------------------------------------------------------------
+
+_history_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _history_file_lock(path: Path):
+    """
+    Exclusive lock on the history file across processes (workers of a
+    parallel single-year run record into the same file), held through a
+    sidecar lock file. Without fcntl or msvcrt only threads are serialized.
+    """
+    with _history_lock, open(path.with_suffix('.lock'), 'a+b') as lock_file:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif MSVCRT_AVAILABLE:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if FCNTL_AVAILABLE:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif MSVCRT_AVAILABLE:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def record_solve_time(log_dir, key: str, mode: str, seconds: float, snapshots: int,
+                      peak_memory_mb: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Record a solve time and compare other runs with the last full one.
+
+    Parameters
+    ----------
+    log_dir : str or Path
+        Project Logs folder
+    key : str
+        Model identity (model type and years)
+    mode : str
+        'full' (perfect foresight, all hourly snapshots), 'clustered',
+        'reduced' (other snapshot selections), or one of them prefixed with
+        'myopic' for rolling-horizon runs
+    seconds : float
+        Total solver time of the run
+    snapshots : int
+        Snapshots of the solved network(s)
+    peak_memory_mb : float, optional
+        Peak resident memory while building and solving
+
+    Returns
+    -------
+    dict
+        The recorded entry, plus ``full_run``, ``solve_time_reduction_pct``
+        and ``peak_memory_reduction_pct`` when a full run of the same model
+        is on record
+    """
+    path = Path(log_dir) / SOLVE_HISTORY_FILENAME
+    entry = {'seconds': round(float(seconds), 3), 'snapshots': int(snapshots), 'recorded_at': time.time()}
+    if peak_memory_mb is not None:
+        entry['peak_memory_mb'] = round(float(peak_memory_mb), 1)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _history_file_lock(path):
+        try:
+            with open(path, 'r') as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = {}
+        history.setdefault(key, {})[mode] = entry
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+        with open(tmp_path, 'w') as f:
+            json.dump(history, f, indent=2)
+        os.replace(tmp_path, path)
+
+    report = dict(entry)
+    full = history[key].get('full')
+    if mode != 'full' and full:
+        report['full_run'] = full
+        if full['seconds'] > 0:
+            report['solve_time_reduction_pct'] = round(100.0 * (1 - entry['seconds'] / full['seconds']), 2)
+        if full.get('peak_memory_mb') and 'peak_memory_mb' in entry:
+            report['peak_memory_reduction_pct'] = round(
+                100.0 * (1 - entry['peak_memory_mb'] / full['peak_memory_mb']), 2
+            )
+    return report
@@ -0,0 +1,311 @@
+"""
+Solver Tuning
+=============
+
+HiGHS settings chosen from model statistics, and a benchmark that compares
+settings on a saved network.
+
+Which HiGHS algorithm is fastest depends on the model. Dual simplex is
+hard to beat on small LPs and is the only algorithm that profits from a
+warm-start basis; on large LPs (many snapshots, many periods) the interior
+point method scales much better, and it only needs a crossover when a basis
+or a vertex solution is wanted. Threads beyond the available cores only add
+contention, and HiGHS gains little from more than a handful of them.
+
+    choose_solver_options(stats, cpus)   settings for one solve
+    benchmark_network(path, ...)         solve a network under a settings
+                                         matrix and record the timings
+
+A benchmark writes solver_benchmark.json (every run plus the best setting);
+a model configured with ``solver_settings='pinned'`` reads the best setting
+back instead of choosing adaptively.
+
+Features:
+- Model statistics from the built linopy model (variables, constraints,
+  integer variables), with a size estimate from the network as fallback
+- Named solver profiles (simplex, parallel simplex, IPM, IPM + crossover)
+- Thread counts capped to the cores this process may use
+- Benchmark records of build time, solve time, peak memory and objective
+- Peak resident memory measurement (Linux /proc, getrusage elsewhere)
+
+Author: KSEB Analytics Team
+Date: 2026-10-18
+"""
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_FILENAME = "solver_benchmark.json"
+
+# Model size thresholds (LP variables) for the adaptive choice
+SMALL_MODEL_VARIABLES = 200_000
+LARGE_MODEL_VARIABLES = 2_000_000
+
+# HiGHS rarely gains from more threads than this
+MAX_USEFUL_THREADS = 16
+
+# Relative objective difference within which two benchmark runs agree
+OBJECTIVE_TOLERANCE = 1e-4
+
+SOLVER_PROFILES: Dict[str, Dict] = {
+    'simplex': {'solver': 'simplex', 'simplex_strategy': 1, 'parallel': 'off', 'presolve': 'on'},
+    'simplex_parallel': {'solver': 'simplex', 'simplex_strategy': 2, 'parallel': 'on', 'presolve': 'on'},
+    'ipm': {'solver': 'ipm', 'run_crossover': 'off', 'parallel': 'on', 'presolve': 'on'},
+    'ipm_crossover': {'solver': 'ipm', 'run_crossover': 'on', 'parallel': 'on', 'presolve': 'on'},
+}
+
+
+@dataclass
+class ModelStats:
+    """Size of an optimization model"""
+    variables: int
+    constraints: int
+    snapshots: int
+    integer: bool = False
+    estimated: bool = False
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary"""
+        return asdict(self)
+
+
+def available_cores() -> int:
+    """Cores this process may run on (its CPU affinity where supported)"""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except (AttributeError, OSError):
+        return max(1, os.cpu_count() or 1)
+
+
+def model_stats(network) -> ModelStats:
+    """
+    Statistics of a network's built linopy model.
+
+    Falls back to an estimate from the network's components (one variable
+    per snapshot and dispatchable component, one balance constraint per
+    snapshot and bus) when no model is built or linopy's counters fail.
+    """
+    snapshots = len(network.snapshots)
+    model = getattr(network, 'model', None)
+    if model is not None:
+        try:
+            variables = model.variables
+            integer = len(variables.binaries) > 0 or len(variables.integers) > 0
+            return ModelStats(variables=int(model.nvars), constraints=int(model.ncons),
+                              snapshots=snapshots, integer=integer)
+        except Exception as e:
+            logger.debug(f"Model statistics unavailable, estimating from the network: {e}")
+
+    dispatchable = sum(len(getattr(network, name, ())) for name in
+                       ('generators', 'storage_units', 'stores', 'links', 'lines'))
+    committable = bool(len(network.generators)) and bool(network.generators['committable'].astype(bool).any())
+    return ModelStats(variables=snapshots * max(1, dispatchable),
+                      constraints=snapshots * max(1, len(network.buses) + dispatchable),
+                      snapshots=snapshots, integer=committable, estimated=True)
+
+
+def choose_solver_options(stats: ModelStats, cpus: int, needs_basis: bool = False,
+                          warm_start: bool = False) -> Dict:
+    """
+    HiGHS settings for a model of the given size.
+
+    Parameters
+    ----------
+    stats : ModelStats
+        Model size
+    cpus : int
+        Cores the solve may use
+    needs_basis : bool
+        The solve must leave a basis (e.g. to warm-start a later stage)
+    warm_start : bool
+        The solve starts from a basis of an earlier, similar model
+
+    Returns
+    -------
+    dict
+        HiGHS options (algorithm, crossover, parallelism, presolve, threads)
+    """
+    cpus = max(1, min(cpus, MAX_USEFUL_THREADS))
+    if stats.integer:
+        # Branch and bound: HiGHS picks the LP algorithm of the nodes itself
+        options = {'solver': 'choose', 'parallel': 'on', 'presolve': 'on', 'threads': cpus}
+    elif warm_start:
+        # Only simplex uses a starting basis; presolve would discard it
+        options = {**SOLVER_PROFILES['simplex'], 'presolve': 'off', 'threads': 1}
+    elif stats.variables < SMALL_MODEL_VARIABLES:
+        options = {**SOLVER_PROFILES['simplex'], 'threads': 1}
+    elif stats.variables < LARGE_MODEL_VARIABLES and needs_basis:
+        options = {**SOLVER_PROFILES['simplex_parallel'], 'threads': min(cpus, 8)}
+    else:
+        profile = 'ipm_crossover' if needs_basis else 'ipm'
+        options = {**SOLVER_PROFILES[profile], 'threads': cpus}
+    return options
+
+
+def default_benchmark_path(network_path) -> Path:
+    """
+    Where a benchmark of a network is recorded.
+
+    Networks exported by a model run (results/pypsa_optimization/<scenario>/)
+    record into the project's Logs folder, where pinned settings are read
+    from; other networks record next to the network file.
+    """
+    path = Path(network_path).resolve()
+    if path.parent.parent.name == 'pypsa_optimization' and path.parent.parent.parent.name == 'results':
+        return path.parents[3] / 'Logs' / BENCHMARK_FILENAME
+    return path.with_name(BENCHMARK_FILENAME)
+
+
+def load_pinned_options(benchmark_file) -> Optional[Dict]:
+    """Best settings recorded by a benchmark, or None if there is no usable record"""
+    try:
+        with open(benchmark_file, 'r') as f:
+            best = json.load(f).get('best')
+    except (OSError, ValueError):
+        return None
+    if not best or not isinstance(best.get('options'), dict):
+        return None
+    return dict(best['options'])
+
+
+def reset_peak_memory():
+    """Start a new peak resident memory measurement (Linux; no-op elsewhere)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def peak_memory_mb() -> Optional[float]:
+    """Peak resident memory since the last reset_peak_memory (or process start)"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _pick_best(runs: List[Dict]) -> Optional[Dict]:
+    """Fastest run (build + solve) whose objective agrees with the best objective found"""
+    solved = [run for run in runs if run['status'] == 'ok' and run['objective'] is not None]
+    if not solved:
+        return None
+    reference = min(run['objective'] for run in solved)
+    scale = max(1.0, abs(reference))
+    agreeing = [run for run in solved if abs(run['objective'] - reference) <= OBJECTIVE_TOLERANCE * scale]
+    best = min(agreeing, key=lambda run: run['build_seconds'] + run['solve_seconds'])
+    return {'profile': best['profile'], 'options': best['options'],
+            'build_seconds': best['build_seconds'], 'solve_seconds': best['solve_seconds'],
+            'peak_memory_mb': best['peak_memory_mb']}
+
+
+def benchmark_network(network_path, profiles: Optional[Iterable[str]] = None,
+                      threads: Optional[Iterable[int]] = None, output_file=None,
+                      solver_log_dir=None) -> Dict:
+    """
+    Solve a saved network under a matrix of HiGHS settings.
+
+    Each setting loads the network afresh, builds its model and solves it;
+    build time, solve time, peak resident memory and objective are recorded.
+    Single-threaded profiles ('simplex') run once, whatever the thread list.
+
+    Parameters
+    ----------
+    network_path : str or Path
+        Network file (.nc) with its inputs, e.g. one exported by a model run
+    profiles : iterable of str, optional
+        Names from SOLVER_PROFILES (default: all)
+    threads : iterable of int, optional
+        Thread counts to try (default: 1, 4 and the available cores);
+        counts above the available cores are dropped
+    output_file : str or Path, optional
+        Benchmark record (default: default_benchmark_path)
+    solver_log_dir : str or Path, optional
+        Folder for one HiGHS log per run (default: no log files)
+
+    Returns
+    -------
+    dict
+        The benchmark record: network, runs and the best setting
+
+    Raises
+    ------
+    ValueError
+        If a profile name is unknown
+    """
+    import pypsa
+
+    profiles = list(profiles or SOLVER_PROFILES)
+    unknown = [name for name in profiles if name not in SOLVER_PROFILES]
+    if unknown:
+        raise ValueError(f"Unknown solver profiles {unknown}; choose from {sorted(SOLVER_PROFILES)}")
+    cores = available_cores()
+    thread_counts = sorted({count for count in (threads or (1, 4, cores)) if 1 <= count <= cores}) or [1]
+
+    matrix = []
+    for name in profiles:
+        counts = [1] if SOLVER_PROFILES[name].get('parallel') == 'off' else thread_counts
+        matrix.extend((name, count) for count in counts)
+
+    runs = []
+    for number, (name, count) in enumerate(matrix, 1):
+        options = {**SOLVER_PROFILES[name], 'threads': count}
+        run = {'profile': name, 'threads': count, 'options': options, 'status': 'error',
+               'condition': None, 'objective': None, 'build_seconds': None,
+               'solve_seconds': None, 'peak_memory_mb': None}
+        logger.info(f"Benchmark run {number}/{len(matrix)}: {name}, {count} thread(s)")
+
+        network = pypsa.Network(str(network_path))
+        solver_options = {**options, 'log_to_console': False}
+        if solver_log_dir is not None:
+            Path(solver_log_dir).mkdir(parents=True, exist_ok=True)
+            solver_options['log_file'] = str(Path(solver_log_dir) / f"benchmark_{name}_{count}.log")
+        reset_peak_memory()
+        try:
+            start = time.perf_counter()
+            network.optimize.create_model()
+            run['build_seconds'] = round(time.perf_counter() - start, 3)
+
+            start = time.perf_counter()
+            status, condition = network.optimize.solve_model(solver_name='highs',
+                                                             solver_options=solver_options)
+            run['solve_seconds'] = round(time.perf_counter() - start, 3)
+            run.update(status=status, condition=str(condition))
+            if status == 'ok':
+                run['objective'] = float(network.objective)
+        except Exception as e:
+            run['condition'] = str(e)
+            logger.warning(f"Benchmark run {name}/{count} failed: {e}")
+        run['peak_memory_mb'] = round(peak_memory_mb() or 0.0, 1) or None
+        runs.append(run)
+        del network
+
+    record = {
+        'network': str(Path(network_path).resolve()),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'available_cores': cores,
+        'runs': runs,
+        'best': _pick_best(runs),
+    }
+
+    output_file = Path(output_file) if output_file else default_benchmark_path(network_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w') as f:
+        json.dump(record, f, indent=2)
+    logger.info(f"Solver benchmark written to {output_file}")
+    return record
@@ -9,18 +9,29 @@ Endpoints:
 - GET /project/profile-years - List fiscal years in profile
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends
 from pathlib import Path
 from typing import List
 import openpyxl
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from conditional_requests import FileETag, project_files
+from profile_metadata import get_profile_metadata
+from execution_pools import offload, run_in_pool
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Conditional GET: ETag from the load profile workbook
+profile_etag = Depends(FileETag(project_files("results/load_profiles/{profileName}.xlsx")))
 
 
-@router.get("/analysis-data")
-async def get_analysis_data(
+@router.get("/analysis-data", dependencies=[profile_etag])
+@offload("excel_io")
+def get_analysis_data(
     projectPath: str = Query(..., description="Project root path"),
     profileName: str = Query(..., description="Profile name"),
     sheetName: str = Query(..., description="Sheet name to read")
@@ -119,7 +130,7 @@ async def get_analysis_data(
         raise HTTPException(status_code=500, detail="An internal server error occurred.")
 
 
-@router.get("/profile-years")
+@router.get("/profile-years", dependencies=[profile_etag])
 async def get_profile_years(
     projectPath: str = Query(..., description="Project root path"),
     profileName: str = Query(..., description="Profile name")
@@ -127,6 +138,9 @@ async def get_profile_years(
     """
     Extract unique fiscal years from a load profile.
 
+    Answered from the profile's metadata sidecar instead of reading the
+    whole Load_Profile sheet.
+
     Args:
         projectPath: Project root directory
         profileName: Name of the profile (without .xlsx)
@@ -143,35 +157,15 @@ async def get_profile_years(
         if not file_path.exists():
             raise HTTPException(status_code=404, detail="Profile file not found.")
 
-        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        sheet_name = 'Load_Profile'
-
-        if sheet_name not in workbook.sheetnames:
-            workbook.close()
-            raise HTTPException(status_code=404, detail="Sheet 'Load_Profile' not found.")
-
-        # Read data
-        headers = [cell.value for cell in next(workbook[sheet_name].iter_rows(min_row=1, max_row=1))]
-        json_data = []
-        for row in workbook[sheet_name].iter_rows(min_row=2, values_only=True):
-            row_dict = dict(zip(headers, row))
-            json_data.append(row_dict)
-
-        workbook.close()
-
-        # Extract unique years
-        unique_years = sorted(set(
-            row['Fiscal_Year'] for row in json_data
-            if row.get('Fiscal_Year') is not None
-        ))
-
-        # Format as FY{year}
-        formatted_years = [f"FY{int(year)}" for year in unique_years]
+        # Served from the profile's metadata sidecar (written at generation time)
+        metadata = await run_in_pool("excel_io", get_profile_metadata, projectPath, profileName)
 
-        return {"success": True, "years": formatted_years}
+        return {"success": True, "years": metadata["years"]}
 
     except HTTPException:
         raise
+    except KeyError as error:
+        raise HTTPException(status_code=404, detail=str(error).strip("'\""))
     except Exception as error:
         logger.error(f"❌ Error in /profile-years for '{profileName}': {error}")
         raise HTTPException(status_code=500, detail="An error occurred.")
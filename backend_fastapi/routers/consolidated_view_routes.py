@@ -12,30 +12,20 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-import openpyxl
 import logging
+import sys
 
-logger = logging.getLogger(__name__)
-router = APIRouter()
+import pandas as pd
 
-def find_cell_position(worksheet, marker: str) -> Optional[tuple]:
-    """
-    Find a marker cell (like '~Solar_share').
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from input_workbook_cache import get_input_workbook
+from execution_pools import run_in_pool
+
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=FastJSONRoute)
 
-    Args:
-        worksheet: openpyxl worksheet
-        marker: Marker string to find
 
-    Returns:
-        Tuple of (row, col) if found, None otherwise
-    """
-    lower_marker = marker.lower()
-    for row_idx, row in enumerate(worksheet.iter_rows(values_only=True), start=1):
-        for col_idx, cell_value in enumerate(row, start=1):
-            if (isinstance(cell_value, str) and
-                cell_value.strip().lower() == lower_marker):
-                return (row_idx, col_idx)
-    return None
 class ConsolidatedElectricityRequest(BaseModel):
     """Request model for consolidated electricity view"""
     projectPath: str = Field(..., description="Project root path")
@@ -77,52 +67,37 @@ async def consolidated_electricity(request: ConsolidatedElectricityRequest):
                 detail="Excel file not found"
             )
 
-        # Load workbook
-        workbook = openpyxl.load_workbook(file_path, data_only=True)
+        # Parsed once per file version (read-only, single pass)
+        workbook = await run_in_pool("excel_io", get_input_workbook, project_path)
 
         year_wise = {}
         found_sectors = set()
 
         # Iterate through all sheets
-        for sheet_name in workbook.sheetnames:
-            sheet = workbook[sheet_name]
-
-            # Convert sheet to list of dicts
-            headers = [cell.value for cell in next(sheet.iter_rows(min_row=1, max_row=1))]
-            data = []
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                row_dict = dict(zip(headers, row))
-                data.append(row_dict)
+        for sheet_name in workbook.sheet_names:
+            frame = workbook.frame(sheet_name)
 
             # Check if sheet has Year and Electricity columns
-            has_year = any('Year' in headers or 'year' in headers)
-            has_electricity = any('Electricity' in headers or 'electricity' in headers)
+            year_col = 'Year' if 'Year' in frame.columns else ('year' if 'year' in frame.columns else None)
+            elec_col = ('Electricity' if 'Electricity' in frame.columns
+                        else ('electricity' if 'electricity' in frame.columns else None))
 
-            if not has_year or not has_electricity:
+            if year_col is None or elec_col is None:
                 continue
 
             sector = sheet_name.strip()
             found_sectors.add(sector)
 
-            # Process each row
-            for row in data:
-                year = row.get('Year') or row.get('year')
-                electricity = row.get('Electricity') or row.get('electricity')
-
-                if not year or year == '':
-                    continue
-
-                try:
-                    numeric_year = int(float(year))
-                except (ValueError, TypeError):
-                    continue
+            # Rows with a usable year (empty, zero and non-numeric years are skipped)
+            years = pd.to_numeric(frame[year_col], errors='coerce')
+            valid = years.notna() & (years != 0)
+            electricity = frame[elec_col].astype(object).where(frame[elec_col].notna(), None)
 
+            for numeric_year, value in zip(years[valid].astype(int), electricity[valid]):
                 if numeric_year not in year_wise:
                     year_wise[numeric_year] = {"Year": numeric_year}
 
-                year_wise[numeric_year][sector] = electricity
-
-        workbook.close()
+                year_wise[numeric_year][sector] = value
 
         # Maintain only valid sectors in the order received
         ordered_sectors = [s for s in sectors_order if s in found_sectors]
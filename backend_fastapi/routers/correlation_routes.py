@@ -2,7 +2,12 @@
 Correlation Analysis Routes
 ===========================
 
-Calculates Pearson correlation coefficients between variables.
+Calculates Pearson (or Spearman) correlation coefficients between variables.
+
+Data can be sent as an array of row objects or as a columnar payload
+({"columns": [...], "values": {col: [...]}} or Arrow IPC); both are
+processed column by column. Numeric columns are coerced once into a float
+matrix and all pairs are computed with pairwise-complete matrix products.
 
 Endpoints:
 - POST /project/correlation-matrix - Calculate correlation matrix for all numeric variables
@@ -11,69 +16,49 @@ Endpoints:
 
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any
-import math
+from pathlib import Path
+from typing import Optional
 import logging
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from columnar_payload import TableData, table_length
+from correlation_engine import CORRELATION_METHODS, numeric_matrix, correlation_matrix as compute_matrix, correlation_with
+from execution_pools import run_in_pool
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class CorrelationRequest(BaseModel):
     """Request model for correlation analysis"""
-    data: List[Dict[str, Any]] = Field(..., description="Array of data objects with numeric values")
+    data: TableData = Field(..., description="Array of data objects or columnar payload with numeric values")
+    method: Optional[str] = Field("pearson", description="Correlation method: 'pearson' or 'spearman'")
 
 
-def calculate_correlation(x_vals: List[float], y_vals: List[float]) -> float:
+def validate_method(method: Optional[str]) -> str:
     """
-    Calculate Pearson correlation coefficient.
+    Normalize the requested correlation method.
 
     Args:
-        x_vals: X variable values
-        y_vals: Y variable values
+        method: Requested method (None means Pearson)
 
     Returns:
-        Correlation coefficient (rounded to 4 decimals)
-    """
-    n = len(x_vals)
-    if n != len(y_vals) or n == 0:
-        return 0.0
-
-    sum_x = sum(x_vals)
-    sum_y = sum(y_vals)
-    sum_xy = sum(x * y for x, y in zip(x_vals, y_vals))
-    sum_x2 = sum(x * x for x in x_vals)
-    sum_y2 = sum(y * y for y in y_vals)
-
-    numerator = n * sum_xy - sum_x * sum_y
-    denominator = math.sqrt((n * sum_x2 - sum_x * sum_x) * (n * sum_y2 - sum_y * sum_y))
-
-    if denominator == 0:
-        return 0.0
-
-    return round(numerator / denominator, 4)
+        Lower-case method name
 
-
-def is_numeric_column(data: List[Dict[str, Any]], key: str) -> bool:
-    """
-    Check if a column contains numeric values.
-
-    Args:
-        data: Data array
-        key: Column key to check
-
-    Returns:
-        True if column is numeric, False otherwise
+    Raises:
+        HTTPException: 400 for unsupported methods
     """
-    for row in data:
-        value = row.get(key)
-        if value is None:
-            continue
-        try:
-            float(value)
-        except (ValueError, TypeError):
-            return False
-    return True
+    method = (method or "pearson").lower()
+    if method not in CORRELATION_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported correlation method '{method}'. Use one of {list(CORRELATION_METHODS)}."
+        )
+    return method
 
 
 @router.post("/correlation-matrix")
@@ -84,7 +69,7 @@ async def correlation_matrix(request: CorrelationRequest):
     Computes pairwise correlations between all numeric columns in the dataset.
 
     Args:
-        request: Data array
+        request: Data array and correlation method
 
     Returns:
         dict: Correlation matrix and list of variables
@@ -94,46 +79,28 @@ async def correlation_matrix(request: CorrelationRequest):
     """
     data = request.data
 
-    if not data or len(data) == 0:
+    if not data or table_length(data) == 0:
         raise HTTPException(
             status_code=400,
             detail="Invalid or empty data"
         )
 
-    # Identify numeric columns
-    numeric_keys = [
-        key for key in data[0].keys()
-        if is_numeric_column(data, key)
-    ]
+    method = validate_method(request.method)
+
+    # Identify numeric columns (coerced once into a float matrix)
+    numeric_keys, values = await run_in_pool("analytics", numeric_matrix, data)
 
     if len(numeric_keys) == 0:
         return {"matrix": [], "variables": []}
 
-    # Build correlation matrix
-    correlation_matrix_data = {}
-
-    for var1 in numeric_keys:
-        correlation_matrix_data[var1] = {}
-        for var2 in numeric_keys:
-            # Extract paired values (exclude nulls)
-            paired_data = {
-                'xVals': [],
-                'yVals': []
-            }
-
-            for row in data:
-                x = row.get(var1)
-                y = row.get(var2)
-                if x is not None and y is not None:
-                    try:
-                        paired_data['xVals'].append(float(x))
-                        paired_data['yVals'].append(float(y))
-                    except (ValueError, TypeError):
-                        continue
-
-            # Calculate correlation
-            corr = calculate_correlation(paired_data['xVals'], paired_data['yVals'])
-            correlation_matrix_data[var1][var2] = corr
+    # All pairs at once; large inputs run off the event loop
+    matrix = await run_in_pool("analytics", compute_matrix, values, method)
+    rounded = np.round(matrix, 4).tolist()
+
+    correlation_matrix_data = {
+        var1: dict(zip(numeric_keys, row))
+        for var1, row in zip(numeric_keys, rounded)
+    }
 
     # Format matrix as array of objects
     formatted_matrix = [
@@ -175,7 +142,7 @@ async def correlation(request: CorrelationRequest):
     Calculate correlation of all numeric variables against 'Electricity'.
 
     Args:
-        request: Data array
+        request: Data array and correlation method
 
     Returns:
         dict: List of correlations with strength classification
@@ -185,47 +152,29 @@ async def correlation(request: CorrelationRequest):
     """
     data = request.data
 
-    if not data or len(data) == 0:
+    if not data or table_length(data) == 0:
         raise HTTPException(
             status_code=400,
             detail="Invalid or empty data"
         )
 
-    # Identify numeric columns
-    numeric_keys = [
-        key for key in data[0].keys()
-        if is_numeric_column(data, key)
-    ]
+    method = validate_method(request.method)
+
+    # Identify numeric columns (coerced once into a float matrix)
+    numeric_keys, values = await run_in_pool("analytics", numeric_matrix, data)
 
     if 'Electricity' not in numeric_keys:
         return {"correlations": []}
 
     # Calculate correlations against Electricity
-    result = []
-    for key in numeric_keys:
-        if key == 'Electricity':
-            continue
-
-        # Extract paired values
-        paired_data = {
-            'xVals': [],
-            'yVals': []
-        }
-
-        for row in data:
-            x = row.get(key)
-            y = row.get('Electricity')
-            if x is not None and y is not None:
-                try:
-                    paired_data['xVals'].append(float(x))
-                    paired_data['yVals'].append(float(y))
-                except (ValueError, TypeError):
-                    continue
-
-        corr = calculate_correlation(paired_data['xVals'], paired_data['yVals'])
+    target_index = numeric_keys.index('Electricity')
+    others = [i for i in range(len(numeric_keys)) if i != target_index]
+    correlations = correlation_with(values[:, others], values[:, target_index], method)
 
+    result = []
+    for i, corr in zip(others, np.round(correlations, 4).tolist()):
         result.append({
-            "variable": key,
+            "variable": numeric_keys[i],
             "correlation": corr,
             "strength": get_strength(corr)
         })
@@ -4,12 +4,19 @@ Demand Forecasting Routes
 
 Handles demand forecasting execution with real-time progress via SSE.
 
+Forecast runs are submitted to the shared background job scheduler
+(models/job_scheduler.py) as interactive 'forecast' jobs, so they are
+admitted ahead of batch optimizations and queued when the CPU/memory
+budget is exhausted.
+
 Endpoints:
 - POST /project/forecast - Start forecasting process
-- GET /project/forecast-progress - Server-Sent Events for progress updates
+- GET /project/forecast-progress - Server-Sent Events for progress updates of a job
+- POST /project/forecast-sweep - Vectorized sensitivity sweep over forecast parameters
+- POST /project/forecast-backtest - Rolling-origin backtest of the forecasting models
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from pathlib import Path
@@ -20,12 +27,19 @@ import asyncio
 import logging
 import threading
 import queue
+import sys
 
-logger = logging.getLogger(__name__)
-router = APIRouter()
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from job_scheduler import get_job_scheduler, Job
+from forecast_sweep import run_sweep, write_sweep_grid, SWEEP_MODELS, DEFAULT_PERCENTILES
+from forecast_backtest import run_backtest, BACKTEST_MODELS
+from columnar_payload import TableData, table_to_config
+from project_catalog import refresh_scenario_safely
+from execution_pools import run_in_pool
 
-# Global queue for SSE events
-forecast_event_queue: asyncio.Queue = None
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class SectorConfig(BaseModel):
@@ -34,7 +48,7 @@ class SectorConfig(BaseModel):
     selectedMethods: List[str]
     mlrParameters: List[str]
     wamWindow: int
-    data: List[Dict[str, Any]]
+    data: TableData  # rows or columnar payload / Arrow IPC
 
 
 class ForecastRequest(BaseModel):
@@ -44,38 +58,87 @@ class ForecastRequest(BaseModel):
     targetYear: int = Field(..., description="Target forecast year")
     excludeCovidYears: bool = Field(..., description="Exclude COVID-19 years flag")
     sectors: List[SectorConfig] = Field(..., description="List of sector configurations")
+    predictionIntervals: bool = Field(False, description="Compute bootstrap P10/P90 prediction intervals")
+    bootstrapSamples: int = Field(1000, description="Number of bootstrap draws per model")
+
+
+class SweepSector(BaseModel):
+    """Historical data of a single sector for a sensitivity sweep"""
+    name: str
+    data: TableData
+
+
+class ForecastSweepRequest(BaseModel):
+    """Request model for a forecast sensitivity sweep"""
+    projectPath: str = Field(..., description="Project root path")
+    sweepName: str = Field("forecast_sweep", description="Name of the sweep output file")
+    sectors: List[SweepSector] = Field(..., description="Sector data to sweep")
+    targetYears: List[int] = Field(..., description="Target years to evaluate")
+    wamWindows: List[int] = Field([3, 5, 7, 10], description="WAM window sizes")
+    excludeCovidOptions: List[bool] = Field([True, False], description="COVID exclusion choices")
+    mlrVariableSets: List[List[str]] = Field([], description="MLR independent variable subsets")
+    models: List[str] = Field(list(SWEEP_MODELS), description="Models to include (WAM, MLR, SLR)")
+    percentiles: List[float] = Field(list(DEFAULT_PERCENTILES), description="Fan-chart percentiles")
+
+
+class BacktestSector(BaseModel):
+    """Historical data and model settings of a single sector for backtesting"""
+    name: str
+    data: TableData
+    mlrParameters: List[str] = []
+    wamWindow: int = 10
+
+
+class ForecastBacktestRequest(BaseModel):
+    """Request model for a rolling-origin backtest"""
+    sectors: List[BacktestSector] = Field(..., description="Sector data to backtest")
+    models: List[str] = Field(list(BACKTEST_MODELS), description="Models to evaluate")
+    horizon: int = Field(3, description="Forecast years scored per origin")
+    minTrainYears: int = Field(5, description="Minimum training years before the first origin")
+    firstOrigin: Optional[int] = Field(None, description="First cut year")
+    excludeCovidYears: bool = Field(True, description="Exclude COVID-19 years from training and scoring")
+    includePredictions: bool = Field(False, description="Include per-origin predictions")
 
 
 @router.get("/forecast-progress")
-async def forecast_progress():
+async def forecast_progress(
+    jobId: Optional[str] = Query(None, description="Forecast job id (default: the latest forecast job)")
+):
     """
     Server-Sent Events endpoint for real-time forecast progress.
 
     Streams progress events from the Python forecasting script to the frontend.
 
+    Args:
+        jobId: Job id returned by POST /forecast; the most recently
+            submitted forecast job when omitted
+
     Returns:
         StreamingResponse: SSE stream with progress events
 
     Event Types:
+    - queued: Job is waiting for resources (includes queuePosition)
+    - started: Job was admitted by the scheduler
     - progress: Ongoing progress update
     - sector_completed: Sector forecast completed
     - end: Forecasting process completed/failed
+
+    Raises:
+        HTTPException: 404 if there is no such forecast job
     """
-    global forecast_event_queue
+    job = get_job_scheduler().find(jobId, "forecast")
+    if job is None or job.events is None:
+        raise HTTPException(status_code=404, detail="Forecast job not found")
 
     async def event_generator():
-        """Generate SSE events from the queue"""
+        """Generate SSE events from the job's queue"""
         try:
-            # Initialize queue if not exists
-            if forecast_event_queue is None:
-                raise HTTPException(status_code=500, detail="Event queue not initialized")
-
             # Send keep-alive comments every 15 seconds
             while True:
                 try:
                     # Wait for event with timeout
                     event = await asyncio.wait_for(
-                        forecast_event_queue.get(),
+                        job.events.get(),
                         timeout=15.0
                     )
 
@@ -114,28 +177,23 @@ async def start_forecast(request: ForecastRequest):
     Start the demand forecasting process.
 
     Spawns a Python subprocess to run forecasting.py with the provided configuration.
-    Progress updates are sent via Server-Sent Events to /forecast-progress endpoint.
+    Progress updates are sent via Server-Sent Events to /forecast-progress?jobId=<jobId>.
 
     Args:
         request: Forecast configuration
 
     Returns:
-        dict: Success message (202 Accepted)
+        dict: Success message and scheduler job id (202 Accepted)
 
     Raises:
         HTTPException: 400 on invalid configuration
     """
-    global forecast_event_queue
-
     if not request.projectPath or not request.scenarioName:
         raise HTTPException(
             status_code=400,
             detail="Invalid configuration received."
         )
 
-    # Initialize event queue
-    forecast_event_queue = asyncio.Queue()
-
     # Create scenario results directory
     scenario_results_path = (
         Path(request.projectPath) / "results" / "demand_forecasts" / request.scenarioName
@@ -148,6 +206,8 @@ async def start_forecast(request: ForecastRequest):
         "target_year": request.targetYear,
         "exclude_covid": request.excludeCovidYears,
         "forecast_path": str(scenario_results_path),
+        "prediction_intervals": request.predictionIntervals,
+        "bootstrap_samples": request.bootstrapSamples,
         "sectors": {}
     }
 
@@ -159,57 +219,170 @@ async def start_forecast(request: ForecastRequest):
                 "MLR": {"independent_vars": sector.mlrParameters},
                 "WAM": {"window_size": sector.wamWindow}
             },
-            "data": sector.data
+            "data": table_to_config(sector.data)
         }
 
     # Write config to temporary file
     import time
     config_path = scenario_results_path / f"forecast_config.json"
     with open(config_path, 'w') as f:
-        json.dump(config_for_python, f, indent=2)
+        json.dump(config_for_python, f, separators=(",", ":"))
 
     logger.info(f"Python script config saved to: {config_path}")
 
-    # Start Python process in background
-    asyncio.create_task(run_forecast_process(config_path, forecast_event_queue))
+    # Submit Python process to the background job scheduler
+    refresh_scenario_safely(request.projectPath, request.scenarioName, status="running")
+    job = await run_forecast_process(config_path, request.scenarioName,
+                                     project_path=request.projectPath)
 
     return {
         "success": True,
-        "message": "Forecast process started."
+        "message": "Forecast process started." if job.state == "running" else "Forecast process queued.",
+        "jobId": job.id
+    }
+
+
+@router.post("/forecast-sweep")
+async def forecast_sweep(request: ForecastSweepRequest):
+    """
+    Evaluate all combinations of forecast parameters as one batched computation.
+
+    Every combination of WAM window, COVID exclusion, MLR variable subset and
+    target year is evaluated for each sector without spawning forecasting.py.
+    The full grid is written to results/forecast_sweeps/<sweepName>.parquet
+    (or .csv.gz when pyarrow is not installed).
+
+    Args:
+        request: Sweep configuration with parameter grids
+
+    Returns:
+        dict: Fan-chart percentiles per sector and year, grid file path and summary
+
+    Raises:
+        HTTPException: 400 on invalid grid, 500 on error
+    """
+    if not request.projectPath or not request.sectors:
+        raise HTTPException(status_code=400, detail="Project path and sector data are required.")
+
+    safe_name = "".join(c for c in request.sweepName if c.isalnum() or c in ("_", "-")) or "forecast_sweep"
+
+    def compute():
+        result = run_sweep(
+            {sector.name: sector.data for sector in request.sectors},
+            target_years=request.targetYears,
+            wam_windows=request.wamWindows,
+            exclude_covid_options=request.excludeCovidOptions,
+            variable_sets=request.mlrVariableSets,
+            models=request.models,
+            percentiles=request.percentiles
+        )
+        output_dir = Path(request.projectPath) / "results" / "forecast_sweeps"
+        grid_file = write_sweep_grid(result["grid"], output_dir, safe_name)
+        return result, grid_file
+
+    try:
+        result, grid_file = await run_in_pool("analytics", compute)
+        return {
+            "success": True,
+            "fanCharts": result["fan_charts"],
+            "gridFile": str(grid_file),
+            "summary": result["summary"]
+        }
+
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    except Exception as error:
+        logger.error(f"❌ Error running forecast sweep: {error}")
+        raise HTTPException(status_code=500, detail=f"Failed to run forecast sweep: {str(error)}")
+
+
+@router.post("/forecast-backtest")
+async def forecast_backtest(request: ForecastBacktestRequest):
+    """
+    Rolling-origin backtest of the forecasting models for every sector.
+
+    For every cut year from the first origin onward each model is fitted on
+    data up to the cut and scored on the following `horizon` years. Origins
+    are evaluated as one batched computation per sector and model.
+
+    Args:
+        request: Backtest configuration
+
+    Returns:
+        dict: Accuracy per sector/model/horizon, runtime per model and best model per sector
+
+    Raises:
+        HTTPException: 400 on invalid configuration, 500 on error
+    """
+    if not request.sectors:
+        raise HTTPException(status_code=400, detail="Sector data is required.")
+
+    sectors = {
+        sector.name: {"data": sector.data, "mlrParameters": sector.mlrParameters, "wamWindow": sector.wamWindow}
+        for sector in request.sectors
     }
 
+    try:
+        report = await run_in_pool(
+            "analytics", run_backtest,
+            sectors,
+            models=request.models,
+            horizon=request.horizon,
+            min_train_years=request.minTrainYears,
+            first_origin=request.firstOrigin,
+            exclude_covid=request.excludeCovidYears,
+            include_predictions=request.includePredictions
+        )
+        return {"success": True, **report}
+
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    except Exception as error:
+        logger.error(f"❌ Error running forecast backtest: {error}")
+        raise HTTPException(status_code=500, detail=f"Failed to run forecast backtest: {str(error)}")
 
-async def run_forecast_process(config_path: Path, event_queue: asyncio.Queue):
+
+async def run_forecast_process(config_path: Path, scenario_name: str = "",
+                               project_path: Optional[str] = None) -> Job:
     """
-    Run the Python forecasting script as a subprocess using synchronous subprocess.
+    Submit the Python forecasting script to the job scheduler.
+
+    The subprocess is started once the scheduler admits the job; its progress
+    and the scheduler events (queue position, start, cancellation) go to the
+    job's event queue.
 
     Args:
         config_path: Path to configuration JSON file
-        event_queue: Queue for sending SSE events
+        scenario_name: Scenario name used to label the job
+        project_path: Project root; when given, the project catalog entry of
+            the scenario is updated when the process ends
+
+    Returns:
+        Job: The scheduled job
     """
     python_script_path = Path(__file__).parent.parent / "models" / "forecasting.py"
     logger.info(f"Starting forecast process with script: {python_script_path}")
     logger.info(f"Config path: {config_path}")
 
-    def run_subprocess():
-        """Run the subprocess in a separate thread"""
+    def run_subprocess(job: Job):
+        """Run the subprocess in the scheduler's worker thread"""
         try:
             # Check if script exists
             if not python_script_path.exists():
-                asyncio.run(event_queue.put({
+                job.publish({
                     "status": "failed",
                     "error": f"Script not found: {python_script_path}",
                     "type": "end"
-                }))
+                })
                 return
 
             # Check if config exists
             if not config_path.exists():
-                asyncio.run(event_queue.put({
+                job.publish({
                     "status": "failed",
                     "error": f"Config not found: {config_path}",
                     "type": "end"
-                }))
+                })
                 return
 
             logger.info("Starting subprocess execution...")
@@ -224,6 +397,7 @@ async def run_forecast_process(config_path: Path, event_queue: asyncio.Queue):
                 bufsize=1   # Line buffered
             )
 
+            job.attach_process(process)
             logger.info(f"Subprocess started with PID: {process.pid}")
 
             # Read stdout and stderr in separate threads
@@ -241,7 +415,7 @@ async def run_forecast_process(config_path: Path, event_queue: asyncio.Queue):
                             if line.startswith('PROGRESS:'):
                                 try:
                                     progress_data = json.loads(line[9:])  # Remove 'PROGRESS:' prefix
-                                    asyncio.run(event_queue.put(progress_data))
+                                    job.publish(progress_data)
                                 except json.JSONDecodeError as e:
                                     logger.error(f"Failed to parse progress JSON: {e}")
                             else:
@@ -286,7 +460,13 @@ async def run_forecast_process(config_path: Path, event_queue: asyncio.Queue):
                 logger.error(f"Failed to delete temp config file: {e}")
 
             # Send final result
-            if process.returncode == 0:
+            if job.is_cancelled():
+                final_result = {
+                    "status": "cancelled",
+                    "message": "Forecast process was cancelled.",
+                    "type": "end"
+                }
+            elif process.returncode == 0:
                 try:
                     # Parse the final JSON output from the script
                     if final_output:
@@ -308,19 +488,39 @@ async def run_forecast_process(config_path: Path, event_queue: asyncio.Queue):
                     "type": "end"
                 }
 
-            asyncio.run(event_queue.put(final_result))
+            if project_path and scenario_name:
+                refresh_scenario_safely(project_path, scenario_name, status=final_result["status"])
+
+            job.publish(final_result)
 
         except Exception as e:
             logger.error(f"Error in subprocess thread: {e}")
             logger.error(f"Exception type: {type(e)}")
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
-            asyncio.run(event_queue.put({
+            if project_path and scenario_name:
+                refresh_scenario_safely(project_path, scenario_name, status="failed")
+            job.publish({
                 "status": "failed",
                 "error": f"Failed to start forecast process: {str(e)}",
                 "type": "end"
-            }))
+            })
+
+    def on_job_event(event: dict):
+        if event.get("type") == "cancelled" and job.started_at is None:
+            # Cancelled while still queued: the subprocess never ran
+            if project_path and scenario_name:
+                refresh_scenario_safely(project_path, scenario_name, status="cancelled")
+            job.publish({
+                "status": "cancelled",
+                "message": "Forecast process was cancelled.",
+                "type": "end"
+            })
 
-    # Start the subprocess in a separate thread
-    subprocess_thread = threading.Thread(target=run_subprocess, daemon=True)
-    subprocess_thread.start()
+    job = get_job_scheduler().submit(
+        "forecast",
+        run_subprocess,
+        name=f"forecast:{scenario_name}" if scenario_name else "forecast",
+        on_event=on_job_event
+    )
+    return job
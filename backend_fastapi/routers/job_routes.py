@@ -0,0 +1,99 @@
+"""
+Background Job Routes
+=====================
+
+Inspection and cancellation of jobs managed by the background job scheduler
+(forecasts, profile generation and PyPSA model runs).
+
+Endpoints:
+- GET /project/jobs - List scheduled jobs and scheduler resource usage
+- GET /project/jobs/{jobId} - Get a single job (including queue position)
+- POST /project/jobs/{jobId}/cancel - Cancel a queued or running job
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from pathlib import Path
+import asyncio
+import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from job_scheduler import get_job_scheduler
+
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=FastJSONRoute)
+
+
+@router.get("/jobs")
+async def list_jobs(activeOnly: bool = Query(False, description="Only queued and running jobs")):
+    """
+    List background jobs, newest first.
+
+    Args:
+        activeOnly: Only return queued and running jobs
+
+    Returns:
+        dict: Jobs and scheduler statistics
+    """
+    scheduler = get_job_scheduler()
+    return {
+        "success": True,
+        "jobs": scheduler.list_jobs(active_only=activeOnly),
+        "scheduler": scheduler.get_stats()
+    }
+
+
+@router.get("/jobs/{jobId}")
+async def get_job(jobId: str):
+    """
+    Get the state of a single background job.
+
+    Args:
+        jobId: Job identifier returned when the job was started
+
+    Returns:
+        dict: Job details
+
+    Raises:
+        HTTPException: 404 if the job is unknown
+    """
+    scheduler = get_job_scheduler()
+    for job in scheduler.list_jobs():
+        if job["jobId"] == jobId:
+            return {"success": True, "job": job}
+    raise HTTPException(status_code=404, detail=f"Job '{jobId}' not found.")
+
+
+@router.post("/jobs/{jobId}/cancel")
+async def cancel_job(jobId: str):
+    """
+    Cancel a queued or running background job.
+
+    Queued jobs are removed from the queue; running subprocesses are
+    terminated and in-process model runs stop at the next stage boundary.
+
+    Args:
+        jobId: Job identifier
+
+    Returns:
+        dict: Success status
+
+    Raises:
+        HTTPException: 404 if the job is unknown, 409 if it already finished
+    """
+    scheduler = get_job_scheduler()
+    job = scheduler.get(jobId)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{jobId}' not found.")
+
+    # Terminating a subprocess may block for a few seconds
+    cancelled = await asyncio.to_thread(scheduler.cancel, jobId)
+    if not cancelled:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job '{jobId}' has already finished ({job.state})."
+        )
+
+    logger.info(f"Cancellation requested for job {jobId} ({job.name})")
+    return {"success": True, "message": f"Cancellation requested for job '{jobId}'.", "jobId": jobId}
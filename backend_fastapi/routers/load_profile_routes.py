@@ -11,9 +11,13 @@ Endpoints:
 from fastapi import APIRouter, HTTPException, Query
 from pathlib import Path
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get("/load-profiles")
@@ -12,11 +12,16 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-import openpyxl
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from input_workbook_cache import get_input_workbook
+from execution_pools import run_in_pool
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class ExtractSectorDataRequest(BaseModel):
@@ -25,44 +30,6 @@ class ExtractSectorDataRequest(BaseModel):
     sectorName: str = Field(..., description="Sector name to extract")
 
 
-def find_sheet(workbook, sheet_name: str):
-    """
-    Find a sheet by case-insensitive name.
-
-    Args:
-        workbook: openpyxl workbook object
-        sheet_name: Sheet name to find
-
-    Returns:
-        Worksheet if found, None otherwise
-    """
-    lower_case_name = sheet_name.lower()
-    for name in workbook.sheetnames:
-        if name.lower() == lower_case_name:
-            return workbook[name]
-    return None
-
-
-def find_cell_position(worksheet, marker: str) -> Optional[tuple]:
-    """
-    Find a marker cell (like '~Consumption_Sectors' or '~Econometric_Parameters').
-
-    Args:
-        worksheet: openpyxl worksheet
-        marker: Marker string to find
-
-    Returns:
-        Tuple of (row, col) if found, None otherwise
-    """
-    lower_marker = marker.lower()
-    for row_idx, row in enumerate(worksheet.iter_rows(values_only=True), start=1):
-        for col_idx, cell_value in enumerate(row, start=1):
-            if (isinstance(cell_value, str) and
-                cell_value.strip().lower() == lower_marker):
-                return (row_idx, col_idx)
-    return None
-
-
 @router.post("/extract-sector-data")
 async def extract_sector_data(request: ExtractSectorDataRequest):
     """
@@ -101,12 +68,12 @@ async def extract_sector_data(request: ExtractSectorDataRequest):
                 detail="Excel file not found"
             )
 
-        # Load workbook
-        workbook = openpyxl.load_workbook(file_path, data_only=True)
+        # Parsed once per file version (read-only, single pass)
+        workbook = await run_in_pool("excel_io", get_input_workbook, project_path)
 
         # Find sheets (case-insensitive)
-        main_sheet = find_sheet(workbook, 'main')
-        econ_sheet = find_sheet(workbook, 'Economic_Indicators')
+        main_sheet = workbook.find_sheet('main')
+        econ_sheet = workbook.find_sheet('Economic_Indicators')
 
         if not main_sheet:
             logger.error("[extract-sector-data] Sheet 'main' not found in the workbook.")
@@ -123,7 +90,7 @@ async def extract_sector_data(request: ExtractSectorDataRequest):
             )
 
         # 1. Get sector-specific economic parameters from Main sheet
-        econ_param_marker = find_cell_position(main_sheet, '~Econometric_Parameters')
+        econ_param_marker = workbook.find_marker('~Econometric_Parameters', main_sheet)
         if not econ_param_marker:
             logger.error("[extract-sector-data] Marker '~Econometric_Parameters' not found in 'main' sheet.")
             raise HTTPException(
@@ -136,10 +103,10 @@ async def extract_sector_data(request: ExtractSectorDataRequest):
 
         # Find the sector column
         sector_column = None
-        max_col = main_sheet.max_column
+        max_col = workbook.max_column(main_sheet)
 
         for col in range(marker_col, max_col + 1):
-            cell_value = main_sheet.cell(row=headers_row, column=col).value
+            cell_value = workbook.cell(main_sheet, headers_row, col)
             if cell_value and str(cell_value).strip().lower() == sector_name.strip().lower():
                 sector_column = col
                 break
@@ -153,14 +120,14 @@ async def extract_sector_data(request: ExtractSectorDataRequest):
 
         # 2. Extract economic indicator names below this column
         indicators = []
-        for row in range(headers_row + 1, main_sheet.max_row + 1):
-            cell_value = main_sheet.cell(row=row, column=sector_column).value
+        for row in range(headers_row + 1, workbook.max_row(main_sheet) + 1):
+            cell_value = workbook.cell(main_sheet, row, sector_column)
             if not cell_value:
                 break
             indicators.append(cell_value)
 
         # 3. Read sector sheet for Year & Electricity
-        sector_sheet = find_sheet(workbook, sector_name)
+        sector_sheet = workbook.find_sheet(sector_name)
         if not sector_sheet:
             logger.error(f"[extract-sector-data] Sector data sheet for '{sector_name}' not found.")
             raise HTTPException(
@@ -168,19 +135,12 @@ async def extract_sector_data(request: ExtractSectorDataRequest):
                 detail=f"Sector sheet for '{sector_name}' not found"
             )
 
-        # Convert sector sheet to list of dicts
-        sector_data = []
-        headers = [cell.value for cell in next(sector_sheet.iter_rows(min_row=1, max_row=1))]
-        for row in sector_sheet.iter_rows(min_row=2, values_only=True):
-            row_dict = dict(zip(headers, row))
-            sector_data.append(row_dict)
+        sector_data = workbook.records(sector_sheet)
 
-        # 4. Collect economic values from Economic_Indicators sheet
-        econ_data = []
-        econ_headers = [cell.value for cell in next(econ_sheet.iter_rows(min_row=1, max_row=1))]
-        for row in econ_sheet.iter_rows(min_row=2, values_only=True):
-            row_dict = dict(zip(econ_headers, row))
-            econ_data.append(row_dict)
+        # 4. Index economic values from Economic_Indicators sheet by year (first row wins)
+        econ_by_year = {}
+        for econ_row in workbook.records(econ_sheet):
+            econ_by_year.setdefault(econ_row.get('Year') or econ_row.get('year'), econ_row)
 
         # 5. Merge data
         merged = []
@@ -189,10 +149,7 @@ async def extract_sector_data(request: ExtractSectorDataRequest):
             electricity = sector_row.get('Electricity') or sector_row.get('electricity')
 
             # Find matching economic data for this year
-            econ_row = next(
-                (e for e in econ_data if (e.get('Year') or e.get('year')) == year),
-                {}
-            )
+            econ_row = econ_by_year.get(year, {})
 
             obj = {"Year": year, "Electricity": electricity}
             for key in indicators:
@@ -200,8 +157,6 @@ async def extract_sector_data(request: ExtractSectorDataRequest):
 
             merged.append(obj)
 
-        workbook.close()
-
         return {"data": merged}
 
     except HTTPException:
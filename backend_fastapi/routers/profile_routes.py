@@ -8,8 +8,11 @@ Endpoints:
 - GET /project/available-base-years - List financial years from load curve template
 - GET /project/available-scenarios - List completed demand forecast scenarios
 - POST /project/generate-profile - Start profile generation process
-- GET /project/generation-status - Server-Sent Events for generation progress
+- GET /project/generation-status - Server-Sent Events for generation progress of a job
 - GET /project/check-profile-exists - Check if a profile file already exists
+
+Profile generation runs as a 'profile' job on the shared background job
+scheduler (models/job_scheduler.py).
 """
 
 import subprocess
@@ -18,35 +21,22 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from pathlib import Path
 from typing import Dict, Any, Optional
-from datetime import datetime
-import openpyxl
 import asyncio
 import json
 import logging
 import threading
 import queue
+import sys
 
-logger = logging.getLogger(__name__)
-router = APIRouter()
-
-# Global queue for SSE events
-profile_event_queue: asyncio.Queue = None
-
-
-def get_financial_year(date: datetime) -> str:
-    """
-    Calculate financial year from a date (Apr-Mar cycle).
-
-    Args:
-        date: Date object
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from job_scheduler import get_job_scheduler, Job
+from project_catalog import get_project_catalog
+from profile_metadata import get_template_metadata
+from execution_pools import run_in_pool
 
-    Returns:
-        Financial year string (e.g., 'FY2024')
-    """
-    year = date.year
-    month = date.month
-    financial_year = year + 1 if month >= 4 else year  # April is month 4
-    return f"FY{financial_year}"
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class ProfileConfiguration(BaseModel):
@@ -66,7 +56,8 @@ async def get_available_base_years(projectPath: str = Query(..., description="Pr
     """
     Extract unique financial years from the load curve template.
 
-    Reads the 'Past_Hourly_Demand' sheet and extracts FY values from dates.
+    Fiscal years come from the template's metadata sidecar, which summarises
+    the 'Past_Hourly_Demand' sheet once per template version.
 
     Args:
         projectPath: Project root directory
@@ -83,67 +74,15 @@ async def get_available_base_years(projectPath: str = Query(..., description="Pr
         if not file_path.exists():
             raise HTTPException(status_code=404, detail="load_curve_template.xlsx not found.")
 
-        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-
-        # Find sheet (case-insensitive)
-        sheet_name = next(
-            (name for name in workbook.sheetnames if name.lower() == 'past_hourly_demand'),
-            None
-        )
-
-        if not sheet_name:
-            workbook.close()
-            raise HTTPException(status_code=404, detail="Sheet 'Past_Hourly_Demand' not found.")
-
-        worksheet = workbook[sheet_name]
-
-        # Read data
-        headers = [cell.value for cell in next(worksheet.iter_rows(min_row=1, max_row=1))]
-        data = []
-        for row in worksheet.iter_rows(min_row=2, values_only=True):
-            row_dict = dict(zip(headers, row))
-            data.append(row_dict)
-
-        if len(data) == 0:
-            workbook.close()
-            return {"success": True, "years": []}
-
-        # Find date column (case-insensitive)
-        date_header = next(
-            (key for key in headers if key and key.lower() == 'date'),
-            None
-        )
-
-        if not date_header:
-            workbook.close()
-            raise HTTPException(status_code=404, detail="Column 'date' not found in 'Past_Hourly_Demand' sheet.")
+        # Served from the template's metadata sidecar (built once per file version)
+        metadata = await run_in_pool("excel_io", get_template_metadata, projectPath)
 
-        # Extract financial years
-        financial_years = set()
-        for row in data:
-            date_value = row.get(date_header)
-            if date_value:
-                # Handle both datetime objects and string dates
-                if isinstance(date_value, datetime):
-                    parsed_date = date_value
-                else:
-                    try:
-                        parsed_date = datetime.fromisoformat(str(date_value))
-                    except:
-                        continue
-
-                if parsed_date:
-                    financial_years.add(get_financial_year(parsed_date))
-
-        workbook.close()
-
-        # Sort years
-        sorted_years = sorted(financial_years, key=lambda x: int(x[2:]))  # Sort by year number
-
-        return {"success": True, "years": sorted_years}
+        return {"success": True, "years": metadata["years"]}
 
     except HTTPException:
         raise
+    except KeyError as error:
+        raise HTTPException(status_code=404, detail=str(error).strip("'\""))
     except Exception as error:
         logger.error(f"❌ Error fetching base years: {error}")
         raise HTTPException(status_code=500, detail="Internal server error while fetching base years.")
@@ -164,20 +103,10 @@ async def get_available_scenarios(projectPath: str = Query(..., description="Pro
         raise HTTPException(status_code=400, detail="Project path is required.")
 
     try:
-        scenarios_parent_path = Path(projectPath) / "results" / "demand_forecasts"
-
-        if not scenarios_parent_path.exists():
-            return {"success": True, "scenarios": []}
-
-        # Find directories with Consolidated_Results.xlsx
-        valid_scenarios = []
-        for item in scenarios_parent_path.iterdir():
-            if not item.is_dir():
-                continue
-
-            expected_file = item / "Consolidated_Results.xlsx"
-            if expected_file.exists():
-                valid_scenarios.append(item.name)
+        # Scenarios with Consolidated_Results.xlsx, from the project catalog
+        valid_scenarios = await run_in_pool(
+            "excel_io", get_project_catalog(projectPath).list_consolidated_scenarios
+        )
 
         return {"success": True, "scenarios": sorted(valid_scenarios)}
 
@@ -220,63 +149,64 @@ async def generate_profile(request: GenerateProfileRequest):
     Start load profile generation process.
 
     Spawns a Python subprocess to run load_profile_generation.py with the provided configuration.
-    Progress updates are sent via Server-Sent Events to /generation-status endpoint.
+    Progress updates are sent via Server-Sent Events to /generation-status?jobId=<jobId>.
 
     Args:
         request: Profile generation configuration
 
     Returns:
-        dict: Success message (202 Accepted)
+        dict: Success message and scheduler job id (202 Accepted)
     """
-    global profile_event_queue
-
     if not request.projectPath or not request.profileConfiguration:
         raise HTTPException(
             status_code=400,
             detail="Both 'projectPath' and 'profileConfiguration' are required in the request body."
         )
 
-    # Initialize event queue
-    profile_event_queue = asyncio.Queue()
-
     # Prepare full configuration
     full_config = {
         "project_path": request.projectPath,
         "profile_configuration": request.profileConfiguration
     }
 
-    # Start Python process in background
-    asyncio.create_task(run_profile_generation_process(full_config, profile_event_queue))
+    # Submit Python process to the background job scheduler
+    job = await run_profile_generation_process(full_config)
 
     return {
         "success": True,
-        "message": "Generation process started successfully."
+        "message": "Generation process started successfully." if job.state == "running"
+                   else "Generation process queued.",
+        "jobId": job.id
     }
 
 
-async def run_profile_generation_process(config: dict, event_queue: asyncio.Queue):
+async def run_profile_generation_process(config: dict) -> Job:
     """
-    Run the Python load profile generation script as a subprocess using threading.
+    Submit the Python load profile generation script to the job scheduler.
+
+    Its output and the scheduler events go to the job's event queue.
 
     Args:
         config: Configuration dictionary
-        event_queue: Queue for sending SSE events
+
+    Returns:
+        Job: The scheduled job
     """
     python_script_path = Path(__file__).parent.parent / "models" / "load_profile_generation.py"
     config_string = json.dumps(config)
     logger.info(f"Starting profile generation process with script: {python_script_path}")
     logger.info(f"Config: {config_string}")
 
-    def run_subprocess():
-        """Run the subprocess in a separate thread"""
+    def run_subprocess(job: Job):
+        """Run the subprocess in the scheduler's worker thread"""
         try:
             # Check if script exists
             if not python_script_path.exists():
-                asyncio.run(event_queue.put({
+                job.publish({
                     "type": "error",
                     "message": f"Script not found: {python_script_path}"
-                }))
-                asyncio.run(event_queue.put({"type": "done"}))
+                })
+                job.publish({"type": "done"})
                 return
 
             logger.info("Starting profile generation subprocess...")
@@ -291,6 +221,7 @@ async def run_profile_generation_process(config: dict, event_queue: asyncio.Queu
                 bufsize=1   # Line buffered
             )
 
+            job.attach_process(process)
             logger.info(f"Profile generation subprocess started with PID: {process.pid}")
 
             # Read stdout and stderr in separate threads
@@ -315,7 +246,7 @@ async def run_profile_generation_process(config: dict, event_queue: asyncio.Queu
                         if line:
                             logger.error(f"[Profile Generation STDERR]: {line}")
                             # Send stderr messages as log events
-                            asyncio.run(event_queue.put({"type": "log", "data": line}))
+                            job.publish({"type": "log", "data": line})
                 except Exception as e:
                     logger.error(f"Error reading profile generation stderr: {e}")
 
@@ -339,74 +270,100 @@ async def run_profile_generation_process(config: dict, event_queue: asyncio.Queu
             process.stderr.close()
 
             # Parse and send final result
-            if process.returncode == 0:
+            if job.is_cancelled():
+                job.publish({
+                    "type": "cancelled",
+                    "message": "Profile generation was cancelled."
+                })
+            elif process.returncode == 0:
                 try:
                     if final_json_output:
                         result = json.loads(final_json_output)
-                        asyncio.run(event_queue.put({"type": "result", "data": result}))
+                        job.publish({"type": "result", "data": result})
                     else:
-                        asyncio.run(event_queue.put({
+                        job.publish({
                             "type": "error",
                             "message": "No output received from profile generation script"
-                        }))
+                        })
                 except json.JSONDecodeError as e:
                     logger.error(f"Failed to parse profile generation output: {e}")
-                    asyncio.run(event_queue.put({
+                    job.publish({
                         "type": "error",
                         "message": f"Failed to parse profile generation output. Error: {str(e)}"
-                    }))
+                    })
             else:
-                asyncio.run(event_queue.put({
+                job.publish({
                     "type": "error",
                     "message": f"Profile generation script failed with exit code {process.returncode}. Check server logs for details."
-                }))
+                })
 
             # Signal completion
-            asyncio.run(event_queue.put({"type": "done"}))
+            job.publish({"type": "done"})
 
         except Exception as e:
             logger.error(f"Error in profile generation subprocess thread: {e}")
             logger.error(f"Exception type: {type(e)}")
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
-            asyncio.run(event_queue.put({
+            job.publish({
                 "type": "error",
                 "message": f"Failed to start profile generation process: {str(e)}"
-            }))
-            asyncio.run(event_queue.put({"type": "done"}))
-
-    # Start the subprocess in a separate thread
-    subprocess_thread = threading.Thread(target=run_subprocess, daemon=True)
-    subprocess_thread.start()
+            })
+            job.publish({"type": "done"})
+
+    def on_job_event(event: dict):
+        if event.get("type") == "cancelled" and job.started_at is None:
+            # Cancelled while still queued: the subprocess never ran
+            job.publish({"type": "done"})
+
+    profile_name = config.get("profile_configuration", {}).get("general", {}).get("profile_name", "")
+    job = get_job_scheduler().submit(
+        "profile",
+        run_subprocess,
+        name=f"profile:{profile_name}" if profile_name else "profile",
+        on_event=on_job_event
+    )
+    return job
 
 
 @router.get("/generation-status")
-async def generation_status():
+async def generation_status(
+    jobId: Optional[str] = Query(None, description="Profile job id (default: the latest profile job)")
+):
     """
     Server-Sent Events endpoint for real-time profile generation status.
 
     Streams progress events from the Python load profile generation script to the frontend.
 
+    Args:
+        jobId: Job id returned by POST /generate-profile; the most recently
+            submitted profile job when omitted
+
     Returns:
         StreamingResponse: SSE stream with status events
 
     Event Types:
+    - queued: Job is waiting for resources (includes queuePosition)
+    - started: Job was admitted by the scheduler
+    - cancelled: Job was cancelled
     - log: Progress log message
     - result: Final generation result
     - error: Error message
     - done: Process completed
+
+    Raises:
+        HTTPException: 404 if there is no such profile job
     """
-    global profile_event_queue
+    job = get_job_scheduler().find(jobId, "profile")
+    if job is None or job.events is None:
+        raise HTTPException(status_code=404, detail="Profile generation job not found")
 
     async def event_generator():
-        """Generate SSE events from the queue"""
+        """Generate SSE events from the job's queue"""
         try:
-            if profile_event_queue is None:
-                raise HTTPException(status_code=500, detail="Event queue not initialized")
-
             while True:
                 # Get event from queue
-                event = await profile_event_queue.get()
+                event = await job.events.get()
 
                 # Send event
                 yield f"data: {json.dumps(event)}\n\n"
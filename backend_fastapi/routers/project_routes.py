@@ -9,6 +9,7 @@ Endpoints:
 - POST /project/load - Load existing project
 - GET /project/check-directory - Validate directory path
 - GET /project/load-profiles - List all load profile files
+- GET /project/watch-status - File watchers driving cache invalidation
 """
 
 from fastapi import APIRouter, HTTPException, Query
@@ -19,9 +20,14 @@ import shutil
 from pathlib import Path
 from datetime import datetime
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from project_watcher import get_watcher_stats, watch_project
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 # Path to Excel templates
 SOURCE_INPUT_DIR = Path(__file__).parent.parent / "input"
@@ -76,6 +82,18 @@ def find_project_root(start_path: str, max_depth: int = 5) -> Optional[str]:
     return None
 
 
+def start_project_watcher(project_path) -> None:
+    """
+    Watch a project's inputs/ and results/ so caches follow file changes.
+
+    Failures are logged only: caches still validate fingerprints on access.
+    """
+    try:
+        watch_project(project_path)
+    except Exception as error:
+        logger.warning(f"⚠️ Could not watch project {project_path}: {error}")
+
+
 @router.post("/create", status_code=201)
 async def create_project(request: CreateProjectRequest):
     """
@@ -161,6 +179,7 @@ async def create_project(request: CreateProjectRequest):
             (results_path / subfolder).mkdir(exist_ok=True)
 
         logger.info(f"✅ Project created successfully: {project_path}")
+        start_project_watcher(project_path)
 
         return {
             "success": True,
@@ -214,6 +233,7 @@ async def load_project(request: LoadProjectRequest):
                 "path": root_path,
                 "lastOpened": datetime.now().isoformat()
             }
+            start_project_watcher(root_path)
             return {
                 "success": True,
                 "message": "Project loaded successfully.",
@@ -332,3 +352,14 @@ async def get_load_profiles(projectPath: str = Query(..., description="Project r
             status_code=500,
             detail="An error occurred while fetching load profiles."
         )
+
+
+@router.get("/watch-status")
+async def get_watch_status():
+    """
+    Status of the project file watchers.
+
+    Returns:
+        dict: Success status and per-project watcher statistics
+    """
+    return {"success": True, "watchers": get_watcher_stats()}
@@ -8,7 +8,7 @@ These endpoints provide granular data for each PyPSA component type.
 Expected by frontend: SingleNetworkView.jsx
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import logging
@@ -18,9 +18,14 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent / "models"))
 
 from network_cache import load_network_cached
+from json_responses import FastJSONRoute
+from conditional_requests import FileETag, project_files
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Conditional GET: ETag from the network file
+network_etag = Depends(FileETag(project_files("results/pypsa_optimization/{scenarioName}/{networkFile}")))
 
 
 # =============================================================================
@@ -51,7 +56,7 @@ def safe_int(value) -> Optional[int]:
 # NETWORK OVERVIEW
 # =============================================================================
 
-@router.get("/pypsa/overview")
+@router.get("/pypsa/overview", dependencies=[network_etag])
 async def get_network_overview(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -121,7 +126,7 @@ async def get_network_overview(
 # BUSES
 # =============================================================================
 
-@router.get("/pypsa/buses")
+@router.get("/pypsa/buses", dependencies=[network_etag])
 async def get_buses(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -200,7 +205,7 @@ async def get_buses(
 # CARRIERS
 # =============================================================================
 
-@router.get("/pypsa/carriers")
+@router.get("/pypsa/carriers", dependencies=[network_etag])
 async def get_carriers(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -282,7 +287,7 @@ async def get_carriers(
 # GENERATORS
 # =============================================================================
 
-@router.get("/pypsa/generators")
+@router.get("/pypsa/generators", dependencies=[network_etag])
 async def get_generators(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -369,7 +374,7 @@ async def get_generators(
 # LOADS
 # =============================================================================
 
-@router.get("/pypsa/loads")
+@router.get("/pypsa/loads", dependencies=[network_etag])
 async def get_loads(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -421,7 +426,7 @@ async def get_loads(
 # Placeholder routes for remaining components
 # (Add full implementations as needed)
 
-@router.get("/pypsa/storage-units")
+@router.get("/pypsa/storage-units", dependencies=[network_etag])
 async def get_storage_units(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -431,7 +436,7 @@ async def get_storage_units(
     return {"success": True, "message": "Implementation in progress", "storage_units": []}
 
 
-@router.get("/pypsa/stores")
+@router.get("/pypsa/stores", dependencies=[network_etag])
 async def get_stores(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -441,7 +446,7 @@ async def get_stores(
     return {"success": True, "message": "Implementation in progress", "stores": []}
 
 
-@router.get("/pypsa/lines")
+@router.get("/pypsa/lines", dependencies=[network_etag])
 async def get_lines(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -451,7 +456,7 @@ async def get_lines(
     return {"success": True, "message": "Implementation in progress", "lines": []}
 
 
-@router.get("/pypsa/links")
+@router.get("/pypsa/links", dependencies=[network_etag])
 async def get_links(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -461,7 +466,7 @@ async def get_links(
     return {"success": True, "message": "Implementation in progress", "links": []}
 
 
-@router.get("/pypsa/transformers")
+@router.get("/pypsa/transformers", dependencies=[network_etag])
 async def get_transformers(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -471,7 +476,7 @@ async def get_transformers(
     return {"success": True, "message": "Implementation in progress", "transformers": []}
 
 
-@router.get("/pypsa/global-constraints")
+@router.get("/pypsa/global-constraints", dependencies=[network_etag])
 async def get_global_constraints(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
@@ -21,6 +21,11 @@ Performance Optimizations:
 - Memory profiling and monitoring
 - Efficient DataFrame serialization
 - Request deduplication
+- Analysis results invalidated by the project watcher when a network file
+  is written; the newest network of a scenario is precomputed once its
+  folder has been quiet for a minute
+- Blocking work in bounded execution pools (network_io / analytics threads,
+  full analyses in the analytics process pool), keeping the event loop free
 
 Endpoints:
 - GET /project/pypsa/scenarios - List available PyPSA scenarios
@@ -42,14 +47,12 @@ Endpoints:
 - POST /project/pypsa/invalidate-cache - Invalidate cache
 """
 
-from fastapi import APIRouter, HTTPException, Query, Body, Response
+from fastapi import APIRouter, HTTPException, Query, Body, Response, Depends
 from fastapi.responses import JSONResponse
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import logging
-import json
 import re
-import gzip
 from datetime import datetime
 
 # Import modules
@@ -58,7 +61,8 @@ sys.path.append(str(Path(__file__).parent.parent / "models"))
 
 from pypsa_comprehensive_analysis import (
     NetworkInspector,
-    PyPSAComprehensiveAnalyzer
+    PyPSAComprehensiveAnalyzer,
+    analyze_network_file
 )
 from dynamic_network_inspector import DynamicNetworkInspector
 from network_cache import (
@@ -67,9 +71,23 @@ from network_cache import (
     invalidate_network_cache
 )
 from multi_year_analyzer import MultiYearPyPSAAnalyzer
+from execution_pools import PoolSaturatedError, get_execution_pools, offload, run_in_pool
+from json_responses import FastJSONRoute, dumps
+from conditional_requests import FileETag, project_files
+from file_fingerprints import FingerprintCache
+from project_watcher import on_change
+from downsampling import downsample_frame
+from response_compression import compress_body
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Conditional GET: ETag from the network file
+network_etag = Depends(FileETag(project_files("results/pypsa_optimization/{scenarioName}/{networkFile}")))
+# Conditional GET: ETag from the scenario folder
+scenario_etag = Depends(FileETag(project_files("results/pypsa_optimization/{scenarioName}")))
+# Conditional GET: ETag from the optimization results folder
+scenarios_etag = Depends(FileETag(project_files("results/pypsa_optimization")))
 
 
 # =============================================================================
@@ -143,10 +161,8 @@ def serialize_dataframe_efficiently(df, orient: str = 'records', max_rows: Optio
     """
     Efficiently serialize DataFrame to JSON-compatible format.
 
-    Features:
-    - Handles NaN/Inf values
-    - Optional row limiting for large datasets
-    - Memory-efficient serialization
+    NaN/Inf values are left in place: the response serializer writes them
+    as null, so no scrubbing copies of the frame are needed.
 
     Args:
         df: pandas DataFrame
@@ -164,25 +180,24 @@ def serialize_dataframe_efficiently(df, orient: str = 'records', max_rows: Optio
         df = df.head(max_rows)
         logger.warning(f"DataFrame truncated to {max_rows} rows")
 
-    # Replace inf and nan with None for JSON serialization
-    df = df.replace([float('inf'), float('-inf')], None)
-    df = df.where(df.notna(), None)
-
     return df.to_dict(orient)
 
 
-def compress_response(data: dict) -> bytes:
+def compress_response(data: dict, encoding: str = 'gzip') -> bytes:
     """
-    Compress response data with gzip.
+    Serialize and compress response data.
+
+    Responses are compressed by CompressionMiddleware already; use this
+    for payloads written to disk or sent outside the HTTP response path.
 
     Args:
-        data: Data dictionary to compress
+        data: Data dictionary to compress (numpy/pandas values allowed)
+        encoding: 'gzip' or 'br'
 
     Returns:
-        bytes: Compressed data
+        bytes: Compressed JSON
     """
-    json_str = json.dumps(data)
-    return gzip.compress(json_str.encode('utf-8'))
+    return compress_body(dumps(data), encoding)
 
 
 # =============================================================================
@@ -222,15 +237,21 @@ def find_network_files(project_path: str, scenario_name: str) -> List[Dict[str,
     return sorted(network_files, key=lambda x: x['name'])
 
 
-def load_and_analyze_network(network_path: str, include_large_timeseries: bool = False) -> Dict[str, Any]:
+# Full analysis results per network file, valid while the file is unchanged
+_analysis_results = FingerprintCache("network_analysis", max_entries=8)
+
+
+async def load_and_analyze_network(network_path: str, include_large_timeseries: bool = False) -> Dict[str, Any]:
     """
-    Load network and run comprehensive analysis with caching.
+    Load network and run comprehensive analysis in the analytics process pool.
 
     Features:
-    - Network file caching for 10-100x performance improvement
+    - Runs in a separate worker process, so a long analysis never blocks
+      the event loop (or other requests) of the API process
+    - Network file caching inside each worker process
     - Memory-efficient analysis with optional timeseries exclusion
+    - Results reused while the network file keeps its fingerprint
     - Comprehensive error handling and logging
-    - Progress tracking for long-running analyses
 
     Args:
         network_path: Path to network file
@@ -244,23 +265,17 @@ def load_and_analyze_network(network_path: str, include_large_timeseries: bool =
         Exception: For analysis errors
     """
     try:
+        cache_key = (str(Path(network_path).resolve()), include_large_timeseries)
+        cached = _analysis_results.get(cache_key, [network_path])
+        if cached is not None:
+            logger.info(f"Reusing analysis results for unchanged network: {network_path}")
+            return {**cached, 'metadata': {**cached['metadata'], 'cached': True}}
+
+        fingerprints = _analysis_results.fingerprints([network_path])
         start_time = datetime.now()
         logger.info(f"Starting network analysis: {network_path}")
 
-        # Load network with caching (10-100x faster on cache hits)
-        network = load_network_cached(network_path)
-
-        if network is None:
-            raise ValueError("Failed to load network")
-
-        logger.info(f"Network loaded successfully. Snapshots: {len(network.snapshots)}")
-
-        # Create analyzer
-        analyzer = PyPSAComprehensiveAnalyzer(network)
-
-        # Run all analyses
-        logger.info("Running comprehensive analysis...")
-        results = analyzer.run_all_analyses()
+        results = await run_in_pool("analytics_process", analyze_network_file, network_path)
 
         # Remove large timeseries if not requested (memory optimization)
         if not include_large_timeseries:
@@ -276,11 +291,14 @@ def load_and_analyze_network(network_path: str, include_large_timeseries: bool =
             'include_timeseries': include_large_timeseries
         }
 
+        _analysis_results.put(cache_key, [network_path], results, fingerprints=fingerprints)
         return results
 
     except FileNotFoundError as e:
         logger.error(f"Network file not found: {e}")
         raise HTTPException(status_code=404, detail=f"Network file not found: {network_path}")
+    except PoolSaturatedError:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing network: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
@@ -331,6 +349,55 @@ def _remove_large_timeseries(results: Dict[str, Any]) -> Dict[str, Any]:
     return results
 
 
+def _network_file_changed(project_path: Path, network_path: Path):
+    """Project watcher rule: forget the loaded network and its analysis results."""
+    invalidate_network_cache(str(network_path))
+    for include_timeseries in (False, True):
+        _analysis_results.invalidate((str(network_path.resolve()), include_timeseries))
+
+
+def _precompute_network_analysis(project_path: Path, scenario_path: Path):
+    """
+    Project watcher rule: analyze the newest network of a scenario folder
+    ahead of the first /pypsa/analyze request (summary form, no large
+    timeseries).
+
+    Runs once the folder has been quiet for NETWORK_PRECOMPUTE_DELAY
+    seconds, so a run writing several networks (e.g. one per year) leads
+    to a single analysis instead of one per file.
+    """
+    if scenario_path.is_file():
+        network_path = scenario_path
+    else:
+        networks = [path for path in scenario_path.rglob("*.nc")
+                    if not any(part.startswith(".") for part in path.relative_to(scenario_path).parts)]
+        if not networks:
+            return
+        network_path = max(networks, key=lambda path: path.stat().st_mtime_ns)
+    network_path = str(network_path)
+    fingerprints = _analysis_results.fingerprints([network_path])
+    start_time = datetime.now()
+    future = get_execution_pools().get("analytics_process").submit(analyze_network_file, network_path)
+    results = _remove_large_timeseries(future.result())
+    results['metadata'] = {
+        'analysis_time_seconds': (datetime.now() - start_time).total_seconds(),
+        'timestamp': datetime.now().isoformat(),
+        'include_timeseries': False,
+        'precomputed': True
+    }
+    _analysis_results.put((str(Path(network_path).resolve()), False), [network_path], results,
+                          fingerprints=fingerprints)
+
+
+# Quiet time of a scenario folder before its newest network is analyzed
+NETWORK_PRECOMPUTE_DELAY = 60.0
+
+on_change("pypsa_network", "results/pypsa_optimization/**/*.nc", invalidate=_network_file_changed)
+on_change("pypsa_network_analysis", "results/pypsa_optimization/**/*.nc",
+          precompute=_precompute_network_analysis, scope_parts=3,
+          precompute_delay=NETWORK_PRECOMPUTE_DELAY)
+
+
 def extract_year_from_filename(filename: str) -> Optional[int]:
     """
     Extract year from network filename.
@@ -413,7 +480,7 @@ def is_multi_year_scenario(network_files: List[Dict[str, str]]) -> Dict[str, Any
 # API ENDPOINTS
 # =============================================================================
 
-@router.get("/pypsa/scenarios")
+@router.get("/pypsa/scenarios", dependencies=[scenarios_etag])
 async def list_pypsa_scenarios(
     projectPath: str = Query(..., description="Project root path")
 ):
@@ -460,7 +527,7 @@ async def list_pypsa_scenarios(
         raise HTTPException(status_code=500, detail=f"Failed to list scenarios: {str(error)}")
 
 
-@router.get("/pypsa/networks")
+@router.get("/pypsa/networks", dependencies=[scenario_etag])
 async def list_network_files(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name")
@@ -489,7 +556,7 @@ async def list_network_files(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/multi-year-info")
+@router.get("/pypsa/multi-year-info", dependencies=[scenario_etag])
 async def get_multi_year_info(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name")
@@ -562,8 +629,9 @@ async def get_multi_year_info(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/availability")
-async def get_network_availability(
+@router.get("/pypsa/availability", dependencies=[network_etag])
+@offload("network_io")
+def get_network_availability(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -621,8 +689,9 @@ async def get_network_availability(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/availability/summary")
-async def get_network_availability_summary(
+@router.get("/pypsa/availability/summary", dependencies=[network_etag])
+@offload("network_io")
+def get_network_availability_summary(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -679,7 +748,8 @@ async def get_cache_statistics():
 
         return {
             "success": True,
-            "cache_stats": stats
+            "cache_stats": stats,
+            "analysis_cache_stats": _analysis_results.get_stats()
         }
 
     except Exception as error:
@@ -707,9 +777,12 @@ async def invalidate_cache(
     try:
         if clear_all:
             invalidate_network_cache()
+            _analysis_results.invalidate()
             message = "Entire cache cleared"
         elif filepath:
             invalidate_network_cache(filepath)
+            for include_timeseries in (False, True):
+                _analysis_results.invalidate((str(Path(filepath).resolve()), include_timeseries))
             message = f"Cache invalidated for: {filepath}"
         else:
             raise HTTPException(status_code=400, detail="Either filepath or clear_all must be specified")
@@ -726,7 +799,7 @@ async def invalidate_cache(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/analyze")
+@router.get("/pypsa/analyze", dependencies=[network_etag])
 async def analyze_network(
     response: Response,
     projectPath: str = Query(..., description="Project root path"),
@@ -785,10 +858,9 @@ async def analyze_network(
 
         # Load and analyze with memory optimization
         logger.info(f"Analyzing network: {network_path} (include_timeseries={includeTimeseries})")
-        results = load_and_analyze_network(str(network_path), include_large_timeseries=includeTimeseries)
+        results = await load_and_analyze_network(str(network_path), include_large_timeseries=includeTimeseries)
 
-        # Set cache headers for client-side caching (5 minutes)
-        response.headers["Cache-Control"] = "public, max-age=300"
+        # Caching headers come from the ETag dependency (revalidate on every use)
         response.headers["X-Analysis-Time"] = str(results.get('metadata', {}).get('analysis_time_seconds', 0))
 
         return {
@@ -798,15 +870,16 @@ async def analyze_network(
             "results": results
         }
 
-    except HTTPException:
+    except (HTTPException, PoolSaturatedError):
         raise
     except Exception as error:
         logger.error(f"Error analyzing network: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(error)}")
 
 
-@router.get("/pypsa/total-capacities")
-async def get_total_capacities(
+@router.get("/pypsa/total-capacities", dependencies=[network_etag])
+@offload("analytics")
+def get_total_capacities(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -842,8 +915,9 @@ async def get_total_capacities(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/energy-mix")
-async def get_energy_mix(
+@router.get("/pypsa/energy-mix", dependencies=[network_etag])
+@offload("analytics")
+def get_energy_mix(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -870,8 +944,9 @@ async def get_energy_mix(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/utilization")
-async def get_utilization(
+@router.get("/pypsa/utilization", dependencies=[network_etag])
+@offload("analytics")
+def get_utilization(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -898,8 +973,9 @@ async def get_utilization(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/transmission-flows")
-async def get_transmission_flows(
+@router.get("/pypsa/transmission-flows", dependencies=[network_etag])
+@offload("analytics")
+def get_transmission_flows(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -931,8 +1007,9 @@ async def get_transmission_flows(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/zonal-capacities")
-async def get_zonal_capacities(
+@router.get("/pypsa/zonal-capacities", dependencies=[network_etag])
+@offload("analytics")
+def get_zonal_capacities(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -964,8 +1041,9 @@ async def get_zonal_capacities(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/costs")
-async def get_costs(
+@router.get("/pypsa/costs", dependencies=[network_etag])
+@offload("analytics")
+def get_costs(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -992,13 +1070,21 @@ async def get_costs(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/prices")
-async def get_energy_prices(
+@router.get("/pypsa/prices", dependencies=[network_etag])
+@offload("analytics")
+def get_energy_prices(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
-    networkFile: str = Query(...)
+    networkFile: str = Query(...),
+    maxPoints: Optional[int] = Query(None, ge=3, description="Include the price time series, downsampled to this many snapshots")
 ):
-    """Get energy prices (marginal prices) at all buses."""
+    """
+    Get energy prices (marginal prices) at all buses.
+
+    The full price time series is too large to return; with maxPoints it is
+    included, reduced to the snapshots on the envelope of the highest and
+    lowest bus price.
+    """
     try:
         network_path = Path(projectPath) / "results" / "pypsa_optimization" / scenarioName / networkFile
 
@@ -1017,6 +1103,11 @@ async def get_energy_prices(
                 # For timeseries, just include summary stats
                 if hasattr(value, 'describe'):
                     prices_json[f'{key}_summary'] = value.describe().to_dict()
+                if maxPoints and hasattr(value, 'columns'):
+                    sampled = downsample_frame(value, maxPoints, method='range')
+                    records = sampled.copy()
+                    records.insert(0, 'timestamp', [str(t) for t in sampled.index])
+                    prices_json[key] = records.to_dict('records')
             elif hasattr(value, 'to_dict'):
                 prices_json[key] = value.to_dict('records')
             else:
@@ -1032,8 +1123,9 @@ async def get_energy_prices(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/storage-output")
-async def get_storage_output(
+@router.get("/pypsa/storage-output", dependencies=[network_etag])
+@offload("analytics")
+def get_storage_output(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -1081,8 +1173,9 @@ async def get_storage_output(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/plant-operation")
-async def get_plant_operation(
+@router.get("/pypsa/plant-operation", dependencies=[network_etag])
+@offload("analytics")
+def get_plant_operation(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -1109,8 +1202,9 @@ async def get_plant_operation(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/daily-demand-supply")
-async def get_daily_demand_supply(
+@router.get("/pypsa/daily-demand-supply", dependencies=[network_etag])
+@offload("analytics")
+def get_daily_demand_supply(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -1137,8 +1231,9 @@ async def get_daily_demand_supply(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/zonal-daily-demand-supply")
-async def get_zonal_daily_demand_supply(
+@router.get("/pypsa/zonal-daily-demand-supply", dependencies=[network_etag])
+@offload("analytics")
+def get_zonal_daily_demand_supply(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -1170,8 +1265,9 @@ async def get_zonal_daily_demand_supply(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/emissions")
-async def get_emissions_analysis(
+@router.get("/pypsa/emissions", dependencies=[network_etag])
+@offload("analytics")
+def get_emissions_analysis(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -1210,8 +1306,9 @@ async def get_emissions_analysis(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/network-info")
-async def get_network_info(
+@router.get("/pypsa/network-info", dependencies=[network_etag])
+@offload("network_io")
+def get_network_info(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -1240,8 +1337,9 @@ async def get_network_info(
 # MULTI-YEAR ANALYSIS ENDPOINTS
 # =============================================================================
 
-@router.get("/pypsa/multi-year/capacity-evolution")
-async def get_capacity_evolution(
+@router.get("/pypsa/multi-year/capacity-evolution", dependencies=[scenario_etag])
+@offload("analytics")
+def get_capacity_evolution(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     carrier: Optional[str] = Query(None, description="Filter by specific carrier")
@@ -1315,8 +1413,9 @@ async def get_capacity_evolution(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/multi-year/energy-mix-evolution")
-async def get_energy_mix_evolution(
+@router.get("/pypsa/multi-year/energy-mix-evolution", dependencies=[scenario_etag])
+@offload("analytics")
+def get_energy_mix_evolution(
     projectPath: str = Query(...),
     scenarioName: str = Query(...)
 ):
@@ -1354,8 +1453,9 @@ async def get_energy_mix_evolution(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/multi-year/cuf-evolution")
-async def get_cuf_evolution(
+@router.get("/pypsa/multi-year/cuf-evolution", dependencies=[scenario_etag])
+@offload("analytics")
+def get_cuf_evolution(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     technology: Optional[str] = Query(None, description="Filter by technology/carrier")
@@ -1401,8 +1501,9 @@ async def get_cuf_evolution(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/multi-year/emissions-evolution")
-async def get_emissions_evolution(
+@router.get("/pypsa/multi-year/emissions-evolution", dependencies=[scenario_etag])
+@offload("analytics")
+def get_emissions_evolution(
     projectPath: str = Query(...),
     scenarioName: str = Query(...)
 ):
@@ -1440,8 +1541,9 @@ async def get_emissions_evolution(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/multi-year/storage-evolution")
-async def get_storage_evolution(
+@router.get("/pypsa/multi-year/storage-evolution", dependencies=[scenario_etag])
+@offload("analytics")
+def get_storage_evolution(
     projectPath: str = Query(...),
     scenarioName: str = Query(...)
 ):
@@ -1479,8 +1581,9 @@ async def get_storage_evolution(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/multi-year/cost-evolution")
-async def get_cost_evolution(
+@router.get("/pypsa/multi-year/cost-evolution", dependencies=[scenario_etag])
+@offload("analytics")
+def get_cost_evolution(
     projectPath: str = Query(...),
     scenarioName: str = Query(...)
 ):
@@ -1519,8 +1622,9 @@ async def get_cost_evolution(
 
 from ..models.pypsa_single_network_analyzer import PyPSASingleNetworkAnalyzer
 
-@router.get("/pypsa/overview")
-async def get_overview(
+@router.get("/pypsa/overview", dependencies=[network_etag])
+@offload("analytics")
+def get_overview(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1557,8 +1661,9 @@ async def get_overview(
         logger.error(f"Error getting network overview: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get network overview: {str(error)}")
 
-@router.get("/pypsa/buses")
-async def get_buses(
+@router.get("/pypsa/buses", dependencies=[network_etag])
+@offload("analytics")
+def get_buses(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1595,8 +1700,9 @@ async def get_buses(
         logger.error(f"Error getting bus data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get bus data: {str(error)}")
 
-@router.get("/pypsa/carriers")
-async def get_carriers(
+@router.get("/pypsa/carriers", dependencies=[network_etag])
+@offload("analytics")
+def get_carriers(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1633,8 +1739,9 @@ async def get_carriers(
         logger.error(f"Error getting carrier data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get carrier data:. {str(error)}")
 
-@router.get("/pypsa/generators")
-async def get_generators(
+@router.get("/pypsa/generators", dependencies=[network_etag])
+@offload("analytics")
+def get_generators(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1671,8 +1778,9 @@ async def get_generators(
         logger.error(f"Error getting generator data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get generator data: {str(error)}")
 
-@router.get("/pypsa/loads")
-async def get_loads(
+@router.get("/pypsa/loads", dependencies=[network_etag])
+@offload("analytics")
+def get_loads(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1709,8 +1817,9 @@ async def get_loads(
         logger.error(f"Error getting load data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get load data: {str(error)}")
 
-@router.get("/pypsa/storage-units")
-async def get_storage_units(
+@router.get("/pypsa/storage-units", dependencies=[network_etag])
+@offload("analytics")
+def get_storage_units(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1747,8 +1856,9 @@ async def get_storage_units(
         logger.error(f"Error getting storage unit data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get storage unit data: {str(error)}")
 
-@router.get("/pypsa/stores")
-async def get_stores(
+@router.get("/pypsa/stores", dependencies=[network_etag])
+@offload("analytics")
+def get_stores(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1785,8 +1895,9 @@ async def get_stores(
         logger.error(f"Error getting store data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get store data: {str(error)}")
 
-@router.get("/pypsa/links")
-async def get_links(
+@router.get("/pypsa/links", dependencies=[network_etag])
+@offload("analytics")
+def get_links(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1823,8 +1934,9 @@ async def get_links(
         logger.error(f"Error getting link data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get link data: {str(error)}")
 
-@router.get("/pypsa/lines")
-async def get_lines(
+@router.get("/pypsa/lines", dependencies=[network_etag])
+@offload("analytics")
+def get_lines(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1861,8 +1973,9 @@ async def get_lines(
         logger.error(f"Error getting line data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get line data: {str(error)}")
 
-@router.get("/pypsa/transformers")
-async def get_transformers(
+@router.get("/pypsa/transformers", dependencies=[network_etag])
+@offload("analytics")
+def get_transformers(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1899,8 +2012,9 @@ async def get_transformers(
         logger.error(f"Error getting transformer data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get transformer data: {str(error)}")
 
-@router.get("/pypsa/global-constraints")
-async def get_global_constraints(
+@router.get("/pypsa/global-constraints", dependencies=[network_etag])
+@offload("analytics")
+def get_global_constraints(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1937,8 +2051,9 @@ async def get_global_constraints(
         logger.error(f"Error getting global constraint data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get global constraint data: {str(error)}")
 
-@router.get("/pypsa/capacity-factors")
-async def get_capacity_factors(
+@router.get("/pypsa/capacity-factors", dependencies=[network_etag])
+@offload("analytics")
+def get_capacity_factors(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -1975,8 +2090,9 @@ async def get_capacity_factors(
         logger.error(f"Error getting capacity factor data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get capacity factor data: {str(error)}")
 
-@router.get("/pypsa/renewable-share")
-async def get_renewable_share(
+@router.get("/pypsa/renewable-share", dependencies=[network_etag])
+@offload("analytics")
+def get_renewable_share(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -2013,8 +2129,9 @@ async def get_renewable_share(
         logger.error(f"Error getting renewable share data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get renewable share data: {str(error)}")
 
-@router.get("/pypsa/system-costs")
-async def get_system_costs(
+@router.get("/pypsa/system-costs", dependencies=[network_etag])
+@offload("analytics")
+def get_system_costs(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -2051,8 +2168,9 @@ async def get_system_costs(
         logger.error(f"Error getting system costs data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get system costs data: {str(error)}")
 
-@router.get("/pypsa/emissions-tracking")
-async def get_emissions_tracking(
+@router.get("/pypsa/emissions-tracking", dependencies=[network_etag])
+@offload("analytics")
+def get_emissions_tracking(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -2089,8 +2207,9 @@ async def get_emissions_tracking(
         logger.error(f"Error getting emissions tracking data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get emissions tracking data: {str(error)}")
 
-@router.get("/pypsa/reserve-margins")
-async def get_reserve_margins(
+@router.get("/pypsa/reserve-margins", dependencies=[network_etag])
+@offload("analytics")
+def get_reserve_margins(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
     networkFile: str = Query(..., description="Network file name (.nc)")
@@ -2127,14 +2246,19 @@ async def get_reserve_margins(
         logger.error(f"Error getting reserve margin data: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to get reserve margin data: {str(error)}")
 
-@router.get("/pypsa/dispatch-analysis")
-async def get_dispatch_analysis(
+@router.get("/pypsa/dispatch-analysis", dependencies=[network_etag])
+@offload("analytics")
+def get_dispatch_analysis(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario name"),
-    networkFile: str = Query(..., description="Network file name (.nc)")
+    networkFile: str = Query(..., description="Network file name (.nc)"),
+    maxPoints: Optional[int] = Query(None, ge=3, description="Downsample to at most this many snapshots")
 ):
     """
     Get time series data for dispatch analysis.
+
+    With maxPoints, snapshots are reduced to a shared min/max envelope of
+    generation, load and storage so stacked areas stay aligned.
     """
     try:
         # Validate inputs
@@ -2152,7 +2276,7 @@ async def get_dispatch_analysis(
 
         # Create analyzer and get dispatch analysis data
         analyzer = PyPSASingleNetworkAnalyzer(network)
-        dispatch_analysis_data = analyzer.get_dispatch_analysis()
+        dispatch_analysis_data = analyzer.get_dispatch_analysis(max_points=maxPoints)
 
         return {
             "success": True,
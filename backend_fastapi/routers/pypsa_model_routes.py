@@ -9,9 +9,14 @@ import sys
 import json
 import logging
 import datetime
+import threading
 import traceback
+import contextlib
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 
@@ -21,6 +26,20 @@ import pypsa
 import numpy_financial as npf
 from tqdm import tqdm
 
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute, dumps
+from job_scheduler import JobCancelled
+from pypsa_input_snapshot import InputSheets, load_input_sheets
+from availability_profiles import AvailabilityProfiles
+from snapshot_clustering import (
+    ClusteringResult, cluster_year, prepare_linked_stores, linked_storage_constraints, record_solve_time
+)
+from highs_log import HighsLogTail
+from solver_tuning import (
+    BENCHMARK_FILENAME, SOLVER_PROFILES, available_cores, benchmark_network, choose_solver_options,
+    load_pinned_options, model_stats, peak_memory_mb, reset_peak_memory
+)
+
 
 # ============================================================================
 # CONFIGURATION AND DATA CLASSES
@@ -32,6 +51,12 @@ class ModelType(Enum):
     MULTI_YEAR = "multi_year"
 
 
+class MultiYearMode(Enum):
+    """Investment horizon of multi-year models"""
+    PERFECT_FORESIGHT = "perfect_foresight"
+    MYOPIC = "myopic"
+
+
 class SnapshotCondition(Enum):
     """Snapshot selection methods"""
     ALL_SNAPSHOTS = "All Snapshots"
@@ -52,11 +77,23 @@ class ModelConfig:
     weightings: float
     capital_weighting: float
     solver_threads: int = 64
+    solver_settings: str = "auto"         # 'auto', 'pinned' (best of the last benchmark) or a profile name
     enable_clustering: bool = False
+    clustering_period: str = "day"        # 'day' or 'week'
+    clustering_periods: int = 12          # representative periods per year, peaks included
+    clustering_method: str = "kmedoids"   # 'kmedoids' or 'hierarchical'
+    clustering_keep_peaks: int = 1        # highest-peak periods kept as their own cluster
+    clustering_link_storage: bool = True  # storage chronology through linked typical periods
+    max_parallel_years: int = 0           # single-year model over several years: worker processes (0 = auto)
+    warm_start_dispatch: bool = True      # dispatch stage reuses the investment model and its basis
+    multi_year_mode: str = "perfect_foresight"  # 'perfect_foresight' or 'myopic'
+    myopic_horizon: int = 1               # investment periods optimized together per myopic window
+    myopic_overlap: int = 0               # periods of a window re-optimized by the next window
     enable_monthly_constraints: bool = False
     enable_battery_cycle: bool = False
     enable_committable: bool = False
     ens_limit: float = 0.0005
+    progress_snapshot: bool = True        # also persist the latest progress to Logs/<scenario>_progress.json
 
     @classmethod
     def from_json(cls, json_path: str) -> 'ModelConfig':
@@ -97,11 +134,22 @@ class ModelProgress:
 # ============================================================================
 
 class ProgressLogger:
-    """Custom logger with progress tracking for frontend integration"""
+    """
+    Custom logger with progress tracking for frontend integration.
+
+    Progress updates and solver iteration events go to ``on_progress`` as
+    they happen (dicts with 'kind' = 'progress' or 'solver'); the latest
+    progress update is also persisted to the progress file when
+    ``persist_progress`` is set.
+    """
 
-    def __init__(self, log_dir: str, scenario_name: str):
+    def __init__(self, log_dir: str, scenario_name: str,
+                 on_progress: Optional[Callable[[Dict], None]] = None,
+                 persist_progress: bool = True):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.on_progress = on_progress
+        self.persist_progress = persist_progress
 
         self.scenario_name = scenario_name
         self.progress_file = self.log_dir / f"{scenario_name}_progress.json"
@@ -156,13 +204,40 @@ class ProgressLogger:
             details=details
         )
 
-        # Write to progress file for frontend
-        with open(self.progress_file, 'w') as f:
-            json.dump(progress_obj.to_dict(), f, indent=2)
+        if self.persist_progress:
+            self._write_snapshot(progress_obj.to_dict())
+        self._publish({'kind': 'progress', **progress_obj.to_dict()})
 
         # Log the message
         self.logger.info(f"[{stage}] {message} ({progress:.1f}%)")
 
+    def solver_event(self, stage: str, event: Dict):
+        """Publish a solver iteration/status event (not persisted)"""
+        self._publish({**event, 'kind': 'solver', 'solver_event': event.get('kind'), 'stage': stage,
+                       'timestamp': datetime.datetime.now().isoformat()})
+        if event.get('kind') != 'iteration':
+            self.logger.debug(f"[{stage}] solver {event.get('kind')}: "
+                              f"{event.get('status', event.get('objective'))}")
+
+    def _publish(self, event: Dict):
+        """Hand an event to the progress listener; listener errors never stop the run"""
+        if self.on_progress is None:
+            return
+        try:
+            self.on_progress(event)
+        except Exception as e:
+            self.logger.debug(f"Progress listener failed: {e}")
+
+    def _write_snapshot(self, progress: Dict):
+        """Replace the progress file atomically (readers never see a partial file)"""
+        tmp_file = self.progress_file.with_suffix('.json.tmp')
+        try:
+            with open(tmp_file, 'w') as f:
+                json.dump(progress, f, default=str)
+            os.replace(tmp_file, self.progress_file)
+        except OSError as e:
+            self.logger.debug(f"Could not write progress snapshot: {e}")
+
     def info(self, message: str):
         """Log info message"""
         self.logger.info(message)
@@ -188,6 +263,15 @@ class ProgressLogger:
 # DATA LOADING AND VALIDATION
 # ============================================================================
 
+REQUIRED_SHEETS = [
+    'Generators', 'Buses', 'Links', 'New_Generators', 'New_Storage',
+    'Demand', 'P_max_pu', 'P_min_pu',
+    'Lifetime', 'FOM', 'Capital_cost', 'wacc', 'Fuel_cost', 'Startupcost', 'CO2',
+    'Pipe_Line_Generators_p_max', 'Pipe_Line_Generators_p_min', 'Pipe_Line_Storage_p_min',
+    'Settings',
+]
+OPTIONAL_SHEETS = ['Custom days']
+
 class DataLoader:
     """Handles loading and validation of input data"""
 
@@ -221,14 +305,27 @@ class DataLoader:
         self.pipeline_gen_max = None
         self.pipeline_storage = None
 
+        # Optional sheets
+        self.custom_days = None
+
+        # All loaded sheets by name
+        self.sheets: Dict[str, pd.DataFrame] = {}
+
+        # Parsed availability profiles (on first use)
+        self._availability: Optional[Dict[str, AvailabilityProfiles]] = None
+
     def load_all_data(self) -> bool:
-        """Load all required data sheets"""
+        """Load all required data sheets (one workbook pass, or the input snapshot)"""
         try:
             self.logger.update_progress(
                 "Data Loading", "Reading Excel file", 5.0,
                 "Loading input data from Excel file"
             )
 
+            parsed = load_input_sheets(self.input_file, REQUIRED_SHEETS, OPTIONAL_SHEETS)
+            self._log_sheet_timings(parsed)
+            self.sheets = parsed.frames
+
             # Component data
             self.generators_base = self._read_sheet('Generators')
             self.buses = self._read_sheet('Buses')
@@ -273,10 +370,14 @@ class DataLoader:
             # Settings
             self.settings = self._read_sheet('Settings')
 
+            # Snapshot selection input (only some workbooks have it)
+            self.custom_days = self.sheets.get('Custom days')
+
             self.logger.update_progress(
                 "Data Loading", "All data loaded", 40.0,
                 "Successfully loaded all input data",
-                details=self._get_data_summary()
+                details={**self._get_data_summary(), 'input_source': parsed.source,
+                         'load_seconds': round(parsed.total_seconds, 3)}
             )
 
             return True
@@ -286,15 +387,38 @@ class DataLoader:
             self.logger.error(traceback.format_exc())
             return False
 
+    def _log_sheet_timings(self, parsed: InputSheets):
+        """Write per-sheet load timings to the model log"""
+        source = "input snapshot" if parsed.source == 'snapshot' else "workbook (single pass)"
+        self.logger.info(f"Input data loaded from {source} in {parsed.total_seconds:.2f}s "
+                         f"(sha256 {parsed.sha256[:12]})")
+        for name, seconds in parsed.timings.items():
+            rows = f", {len(parsed.frames[name])} rows" if name in parsed.frames else ""
+            self.logger.info(f"  {name:<30s} {seconds * 1000:9.1f} ms{rows}")
+
     def _read_sheet(self, sheet_name: str) -> pd.DataFrame:
-        """Read a sheet with error handling"""
-        try:
-            df = pd.read_excel(self.input_file, sheet_name=sheet_name)
-            self.logger.debug(f"Loaded sheet '{sheet_name}': {len(df)} rows")
-            return df
-        except Exception as e:
-            self.logger.error(f"Failed to read sheet '{sheet_name}': {str(e)}")
-            raise
+        """Get a sheet from the loaded workbook pass"""
+        if sheet_name not in self.sheets:
+            self.logger.error(f"Failed to read sheet '{sheet_name}': not in input workbook")
+            raise KeyError(f"Sheet '{sheet_name}' not found in {Path(self.input_file).name}")
+        df = self.sheets[sheet_name]
+        self.logger.debug(f"Loaded sheet '{sheet_name}': {len(df)} rows")
+        return df
+
+    def get_custom_days(self) -> pd.DataFrame:
+        """'Custom days' sheet, required by the critical days snapshot condition"""
+        if self.custom_days is None:
+            raise KeyError(f"Sheet 'Custom days' not found in {Path(self.input_file).name}")
+        return self.custom_days.copy()
+
+    def get_availability_profiles(self) -> Dict[str, AvailabilityProfiles]:
+        """P_max_pu/P_min_pu sheets parsed once per run, shared by clustering and network building"""
+        if self._availability is None:
+            self._availability = {
+                'p_max_pu': AvailabilityProfiles(self.p_max_pu, default=1.0, label='P_max_pu'),
+                'p_min_pu': AvailabilityProfiles(self.p_min_pu, default=0.0, label='P_min_pu'),
+            }
+        return self._availability
 
     def _get_data_summary(self) -> Dict:
         """Get summary of loaded data"""
@@ -336,6 +460,21 @@ def calculate_annualized_capital_cost(
     return round(total_cost / capital_weighting)
 
 
+def annualized_capital_costs(
+    capital_cost: np.ndarray,
+    wacc: np.ndarray,
+    lifetime: np.ndarray,
+    fom: np.ndarray,
+    capital_weighting: float = 1
+) -> np.ndarray:
+    """Vectorized calculate_annualized_capital_cost for arrays of components"""
+    capital_cost, wacc, lifetime, fom = (np.asarray(a, dtype=float) for a in (capital_cost, wacc, lifetime, fom))
+    free = (capital_cost == 0) | (lifetime == 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annualized = np.abs(npf.pmt(wacc, np.where(free, 1, lifetime), capital_cost, fv=0, when='end'))
+    return np.where(free, 0.0, np.round((annualized + fom) / capital_weighting))
+
+
 def extract_tables_by_markers(df: pd.DataFrame, marker: str) -> Dict[str, pd.DataFrame]:
     """Extract multiple tables from a sheet based on markers"""
     markers = []
@@ -402,7 +541,8 @@ class SnapshotGenerator:
 
         return selected_snapshots, date_range
 
-    def generate_multi_year_snapshots(self, leap_policy: str = "drop_feb29") -> pd.DataFrame:
+    def generate_multi_year_snapshots(self, leap_policy: str = "drop_feb29",
+                                      apply_condition: bool = True) -> pd.DataFrame:
         """Generate snapshots for multi-year model with leap year handling"""
         year_frames = []
 
@@ -437,7 +577,7 @@ class SnapshotGenerator:
         # Apply snapshot condition
         condition = self.config.snapshot_condition
 
-        if condition == "All Snapshots":
+        if condition == "All Snapshots" or not apply_condition:
             return df
         elif condition == "Critical days":
             return self._filter_critical_days_multi_year(df)
@@ -446,6 +586,53 @@ class SnapshotGenerator:
         else:
             return df
 
+    def cluster_single_year(self, year: int) -> ClusteringResult:
+        """Representative periods of a financial year (clustering mode)"""
+        date_range = pd.date_range(
+            start=f'{year-1}-04-01',
+            end=f'{year}-03-31 23:59:00',
+            freq='h',
+            inclusive='left'
+        )
+        demand = self.data.demand[year].iloc[:len(date_range)].to_numpy(dtype=float)
+        return self._cluster(year, date_range[:len(demand)], demand)
+
+    def cluster_multi_year(self, snapshots_df: pd.DataFrame) -> Tuple[pd.DataFrame, List[ClusteringResult]]:
+        """Representative periods of every investment period (clustering mode)"""
+        timestamps = pd.to_datetime(snapshots_df['snapshots'])
+        periods = timestamps.dt.year.where(timestamps.dt.month < 4, timestamps.dt.year + 1)
+
+        frames, results = [], []
+        for year in self.config.years:
+            year_df = snapshots_df[periods == year].reset_index(drop=True)
+            result = self._cluster(year, pd.DatetimeIndex(year_df['snapshots']),
+                                   year_df['demand'].to_numpy(dtype=float))
+            frames.append(year_df.iloc[result.positions])
+            results.append(result)
+
+        return pd.concat(frames, ignore_index=True), results
+
+    def _cluster(self, year: int, timestamps: pd.DatetimeIndex, demand: np.ndarray) -> ClusteringResult:
+        """Cluster one year on demand and the P_max_pu profiles of the modelled technologies"""
+        technologies = pd.concat([
+            self.data.generators_base['TECHNOLOGY'], self.data.new_generators['TECHNOLOGY']
+        ]).dropna().unique()
+        _, availability = self.data.get_availability_profiles()['p_max_pu'].select(timestamps, technologies)
+
+        result = cluster_year(
+            timestamps, np.nan_to_num(demand), availability,
+            n_clusters=self.config.clustering_periods,
+            period=self.config.clustering_period,
+            method=self.config.clustering_method,
+            keep_peak_periods=self.config.clustering_keep_peaks
+        )
+        self.logger.info(
+            f"Year {year}: {len(result.sequence)} {self.config.clustering_period}s clustered into "
+            f"{result.n_clusters} representatives ({len(result.snapshots)} of {len(timestamps)} snapshots, "
+            f"{result.method}, {result.seconds:.2f}s); aggregation error {result.error}"
+        )
+        return result
+
     def _resample_snapshots(self, date_range: pd.DatetimeIndex, freq_hours: float) -> pd.DatetimeIndex:
         """Resample snapshots to specified frequency"""
         df = date_range.to_frame(name='value', index=False)
@@ -457,7 +644,7 @@ class SnapshotGenerator:
     def _select_critical_days(self, year: int, date_range: pd.DatetimeIndex,
                              weightings: float) -> pd.DatetimeIndex:
         """Select critical days based on custom days sheet"""
-        custom_days_df = self.data._read_sheet('Custom days')
+        custom_days_df = self.data.get_custom_days()
         custom_days_df['Year'] = custom_days_df['Month'].apply(
             lambda x: year - 1 if x >= 4 else year
         )
@@ -508,7 +695,7 @@ class SnapshotGenerator:
 
     def _filter_critical_days_multi_year(self, df: pd.DataFrame) -> pd.DataFrame:
         """Filter critical days for multi-year model"""
-        custom_days = self.data._read_sheet('Custom days')
+        custom_days = self.data.get_custom_days()
         rows = []
 
         for fy in self.config.years:
@@ -569,18 +756,50 @@ class NetworkBuilder:
         self.config = config
         self.data = data_loader
         self.logger = logger
-        self.settings_tables = extract_tables_by_markers(data_loader.settings, '~')
+        # Built on first use: the builder is created before the input data is loaded
+        self._settings_tables = None
+        self._profiles: Optional[Dict[str, AvailabilityProfiles]] = None
+        # Technology of every generator added so far (for carrying built capacity forward)
+        self.generator_technologies: Dict[str, str] = {}
+
+    @property
+    def settings_tables(self) -> Dict[str, pd.DataFrame]:
+        """Marker tables of the Settings sheet"""
+        if self._settings_tables is None:
+            self._settings_tables = extract_tables_by_markers(self.data.settings, '~')
+        return self._settings_tables
+
+    def prepare_timeseries(self, snapshots) -> Dict[str, AvailabilityProfiles]:
+        """
+        Parse the P_max_pu/P_min_pu sheets (once per run) and align them to
+        a snapshot set; every generator group of the build shares the result.
+        """
+        start = datetime.datetime.now()
+        if self._profiles is None:
+            self._profiles = self.data.get_availability_profiles()
+        for profiles in self._profiles.values():
+            profiles.matrix(snapshots)
+        self.logger.debug(
+            f"Availability profiles aligned to {len(snapshots)} snapshots in "
+            f"{(datetime.datetime.now() - start).total_seconds():.3f}s "
+            f"({len(self._profiles['p_max_pu'])} P_max_pu, {len(self._profiles['p_min_pu'])} P_min_pu technologies)"
+        )
+        return self._profiles
 
     def build_single_year_network(self, year: int, snapshots: pd.DatetimeIndex,
-                                   generators_df: pd.DataFrame) -> pypsa.Network:
-        """Build network for single year"""
+                                   generators_df: pd.DataFrame,
+                                   clustering: Optional[ClusteringResult] = None) -> pypsa.Network:
+        """Build network for single year (on representative periods when clustering is given)"""
         network = pypsa.Network()
         network.name = f'{self.config.scenario_name}_{year}'
         network.set_snapshots(snapshots)
-        network.snapshot_weightings = pd.Series(
-            self.config.weightings,
-            index=network.snapshots
-        )
+        if clustering is not None:
+            self._set_cluster_weightings(network, clustering.snapshot_weights)
+        else:
+            network.snapshot_weightings = pd.Series(
+                self.config.weightings,
+                index=network.snapshots
+            )
 
         self.logger.update_progress(
             "Network Building", f"Year {year} - Adding components", 50.0,
@@ -591,7 +810,10 @@ class NetworkBuilder:
         self._add_buses(network)
 
         # Add load
-        self._add_load(network, year, snapshots)
+        self._add_load(network, year, snapshots, clustering.positions if clustering is not None else None)
+
+        # Availability profiles for all generator groups
+        self.prepare_timeseries(snapshots)
 
         # Add generators
         self._add_existing_generators(network, generators_df, year, snapshots)
@@ -619,10 +841,24 @@ class NetworkBuilder:
 
         return network
 
-    def build_multi_year_network(self, snapshots_df: pd.DataFrame) -> pypsa.Network:
-        """Build network for multi-year model"""
+    def build_multi_year_network(self, snapshots_df: pd.DataFrame,
+                                 clustering: Optional[List[ClusteringResult]] = None,
+                                 years: Optional[List[int]] = None,
+                                 carried: Optional[Dict[str, pd.DataFrame]] = None,
+                                 name: Optional[str] = None) -> pypsa.Network:
+        """
+        Build network for multi-year model.
+
+        Args:
+            snapshots_df: Snapshots and demand of the modelled periods
+            clustering: Representative periods of each modelled year, if clustered
+            years: Investment periods of this network (a myopic window); all years by default
+            carried: Capacity built in earlier myopic windows, by component class
+            name: Network (and exported file) name; the scenario name by default
+        """
+        years = sorted(years or self.config.years)
         network = pypsa.Network()
-        network.name = self.config.scenario_name
+        network.name = name or self.config.scenario_name
 
         snapshots = pd.to_datetime(snapshots_df['snapshots'])
 
@@ -632,18 +868,23 @@ class NetworkBuilder:
             snapshots
         ], names=['period', 'timestep'])
 
-        network.investment_periods = self.config.years
-        network.snapshot_weightings = pd.Series(
-            self.config.weightings,
-            index=network.snapshots
-        )
+        network.investment_periods = years
+        if clustering is not None:
+            self._set_cluster_weightings(
+                network, np.concatenate([result.snapshot_weights for result in clustering])
+            )
+        else:
+            network.snapshot_weightings = pd.Series(
+                self.config.weightings,
+                index=network.snapshots
+            )
 
         # Set investment period weightings
         network.investment_period_weightings["years"] = 1
 
         self.logger.update_progress(
             "Network Building", "Multi-year - Adding components", 50.0,
-            f"Building multi-year network for periods {self.config.years}"
+            f"Building multi-year network for periods {years}"
         )
 
         # Add buses
@@ -660,19 +901,19 @@ class NetworkBuilder:
             generators['p_nom_extendable'] = False
         generators.loc[generators['carrier'] == 'Market', 'p_nom_extendable'] = True
 
-        # Prepare combined time series
-        P_max_pu_combined, P_min_pu_combined = self._prepare_multi_year_timeseries(snapshots_df)
+        # Availability profiles for all periods, aligned once
+        self.prepare_timeseries(network.snapshots.get_level_values('timestep'))
 
-        self._add_existing_generators_multi_year(
-            network, generators, base_year, P_max_pu_combined, P_min_pu_combined
-        )
+        # Capacity built in earlier myopic windows takes precedence over same-named candidates
+        if carried:
+            self._add_carried_components(network, carried)
+
+        self._add_existing_generators_multi_year(network, generators, base_year)
 
         # Add new components for each period
-        for year in self.config.years:
+        for year in years:
             self.logger.debug(f"Adding components for investment period {year}")
-            self._add_new_generators_multi_year(
-                network, year, P_max_pu_combined, P_min_pu_combined
-            )
+            self._add_new_generators_multi_year(network, year)
             self._add_storage(network, year)
 
         # Add links and carriers
@@ -697,218 +938,297 @@ class NetworkBuilder:
 
         self.logger.update_progress(
             "Network Building", "Multi-year - Complete", 55.0,
-            f"Network built: {len(network.generators)} generators across {len(self.config.years)} periods"
+            f"Network built: {len(network.generators)} generators across {len(years)} periods"
         )
 
         return network
 
+    # ------------------------------------------------------------------
+    # Cost vectors (joins on TECHNOLOGY instead of per-row mask lookups)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _technology_values(table: pd.DataFrame, column, technologies: pd.Series, what: str) -> np.ndarray:
+        """Values of a per-technology table column for each component (first match wins)"""
+        values = table.drop_duplicates('TECHNOLOGY').set_index('TECHNOLOGY')[column]
+        missing = technologies[~technologies.isin(values.index)]
+        if len(missing):
+            raise KeyError(f"No {what} ({column}) for technologies: {sorted(set(map(str, missing)))}")
+        return technologies.map(values).to_numpy(dtype=float)
+
+    def _marginal_costs(self, components: pd.DataFrame, year: int) -> np.ndarray:
+        """Marginal cost of each component: fuel cost / efficiency (Market rows keep their own)"""
+        market = (components['carrier'] == 'Market').to_numpy()
+        costs = np.zeros(len(components))
+        if market.any():
+            costs[market] = components.loc[market, 'marginal_cost'].to_numpy(dtype=float)
+        if (~market).any():
+            others = components.loc[~market]
+            fuel_cost = self._technology_values(self.data.fuel_cost, year, others['TECHNOLOGY'], "fuel cost")
+            efficiency = others['efficiency'].to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                costs[~market] = np.where(efficiency > 0, fuel_cost / efficiency, 0.0)
+        return costs
+
+    def _capital_costs(self, components: pd.DataFrame, year: int) -> np.ndarray:
+        """Annualized capital cost (incl. FOM) of each component"""
+        technologies = components['TECHNOLOGY']
+        costs = annualized_capital_costs(
+            self._technology_values(self.data.capital_cost, year, technologies, "capital cost"),
+            self._technology_values(self.data.wacc, 'wacc', technologies, "WACC"),
+            self._technology_values(self.data.lifetime, 'years', technologies, "lifetime"),
+            self._technology_values(self.data.fom, year, technologies, "FOM"),
+            self.config.capital_weighting
+        )
+        undefined = np.isnan(costs)
+        if undefined.any():
+            raise ValueError(f"Undefined capital cost for technologies: "
+                             f"{sorted(set(map(str, technologies[undefined])))}")
+        return costs
+
+    # ------------------------------------------------------------------
+    # Bulk insertion
+    # ------------------------------------------------------------------
+
+    def _import_components(self, network: pypsa.Network, class_name: str, frame: pd.DataFrame,
+                           series: Optional[Dict[str, pd.DataFrame]] = None):
+        """
+        Add one component type in a single bulk import.
+
+        Args:
+            frame: Static attributes, one row per component (index = names)
+            series: Time-varying attributes, snapshots x component names
+        """
+        frame.index = frame.index.astype(str)
+        skipped = frame.index.duplicated() | frame.index.isin(network.df(class_name).index)
+        if skipped.any():
+            self.logger.debug(f"Skipping {int(skipped.sum())} {class_name} entries that already exist: "
+                              f"{list(frame.index[skipped][:10])}")
+            frame = frame[~skipped]
+        if len(frame) == 0:
+            return
+
+        network.import_components_from_dataframe(frame, class_name)
+        for attr, matrix in (series or {}).items():
+            matrix = matrix.loc[:, ~matrix.columns.duplicated() & matrix.columns.isin(frame.index)]
+            if matrix.shape[1]:
+                network.import_series_from_dataframe(matrix, class_name, attr)
+        self.logger.debug(f"Added {len(frame)} {class_name} components")
+
+    def _profile_matrix(self, attr: str, technologies: pd.Series, names: pd.Index,
+                        network: pypsa.Network) -> pd.DataFrame:
+        """
+        Per-unit profiles (snapshots x components) for components whose
+        technology has a profile; the others keep the static default.
+        """
+        snapshots = network.snapshots
+        timestamps = snapshots.get_level_values('timestep') if isinstance(snapshots, pd.MultiIndex) else snapshots
+        if self._profiles is None:
+            self.prepare_timeseries(timestamps)
+        has_profile, values = self._profiles[attr].select(timestamps, technologies)
+        return pd.DataFrame(values, index=snapshots, columns=names[has_profile])
+
+    def _add_carried_components(self, network: pypsa.Network, carried: Dict[str, pd.DataFrame]):
+        """Add capacity built in earlier myopic windows as fixed assets"""
+        for class_name, frame in carried.items():
+            series = None
+            if class_name == 'Generator':
+                technologies = frame['TECHNOLOGY']
+                frame = frame.drop(columns='TECHNOLOGY')
+                series = {
+                    'p_max_pu': self._profile_matrix('p_max_pu', technologies, frame.index, network),
+                    'p_min_pu': self._profile_matrix('p_min_pu', technologies, frame.index, network),
+                }
+                self.generator_technologies.update(zip(frame.index, technologies))
+            self._import_components(network, class_name, frame.copy(), series)
+
     def _add_buses(self, network: pypsa.Network):
         """Add buses to network"""
-        for bus_name in self.data.buses['name']:
-            network.add("Bus", bus_name)
-
-    def _add_load(self, network: pypsa.Network, year: int, snapshots: pd.DatetimeIndex):
-        """Add load to network"""
+        self._import_components(network, "Bus", pd.DataFrame(index=pd.Index(self.data.buses['name'])))
+
+    @staticmethod
+    def _set_cluster_weightings(network: pypsa.Network, weights: np.ndarray):
+        """
+        Representative snapshots count once per period they stand for in the
+        objective and generator totals; storage still moves hour by hour.
+        """
+        network.snapshot_weightings = pd.DataFrame({
+            'objective': weights,
+            'stores': 1.0,
+            'generators': weights,
+        }, index=network.snapshots)
+
+    def _add_load(self, network: pypsa.Network, year: int, snapshots: pd.DatetimeIndex,
+                  positions: Optional[np.ndarray] = None):
+        """Add load to network (positions: hours of the year behind clustered snapshots)"""
         demand_load = pd.DataFrame()
         demand_load['snapshot'] = snapshots
         demand_load = demand_load.set_index('snapshot')
-        demand_load['load'] = self.data.demand[year][:len(snapshots)].to_list()
+        if positions is not None:
+            demand_load['load'] = self.data.demand[year].to_numpy()[positions]
+        else:
+            demand_load['load'] = self.data.demand[year][:len(snapshots)].to_list()
         network.add("Load", "main_load", bus='Main_Bus', p_set=demand_load['load'])
 
-    def _get_marginal_cost(self, row: pd.Series, year: int) -> float:
-        """Get marginal cost for a generator"""
-        if row['carrier'] == 'Market':
-            return row['marginal_cost']
-
-        fuel_cost = self.data.fuel_cost.loc[self.data.fuel_cost['TECHNOLOGY'] == row['TECHNOLOGY'], year].iloc[0]
-        efficiency = row['efficiency']
-
-        if efficiency > 0:
-            return fuel_cost / efficiency
-        return 0
-
-    def _get_capital_cost(self, row: pd.Series, year: int) -> float:
-        """Get annualized capital cost for a generator"""
-        tech = row['TECHNOLOGY']
-        wacc = self.data.wacc.loc[self.data.wacc['TECHNOLOGY'] == tech, 'wacc'].iloc[0]
-        lifetime = self.data.lifetime.loc[self.data.lifetime['TECHNOLOGY'] == tech, 'years'].iloc[0]
-        capital_cost = self.data.capital_cost.loc[self.data.capital_cost['TECHNOLOGY'] == tech, year].iloc[0]
-        fom = self.data.fom.loc[self.data.fom['TECHNOLOGY'] == tech, year].iloc[0]
-
-        return calculate_annualized_capital_cost(
-            capital_cost, wacc, lifetime, fom, self.config.capital_weighting
-        )
-
     def _add_existing_generators(self, network: pypsa.Network, generators_df: pd.DataFrame,
                                  year: int, snapshots: pd.DatetimeIndex):
         """Add existing generators for single year"""
-        p_max_pu = self.data.p_max_pu.set_index('name').T
-        p_max_pu.index = pd.to_datetime(p_max_pu.index)
-        p_max_pu_reindexed = p_max_pu.reindex(snapshots, method='ffill')
-
-        p_min_pu = self.data.p_min_pu.set_index('name').T
-        p_min_pu.index = pd.to_datetime(p_min_pu.index)
-        p_min_pu_reindexed = p_min_pu.reindex(snapshots, method='ffill')
-
-        for index, row in generators_df.iterrows():
-            if row['TECHNOLOGY'] in p_max_pu_reindexed.columns:
-                p_max_pu_series = p_max_pu_reindexed[row['TECHNOLOGY']]
-            else:
-                p_max_pu_series = 1.0
-
-            if row['TECHNOLOGY'] in p_min_pu_reindexed.columns:
-                p_min_pu_series = p_min_pu_reindexed[row['TECHNOLOGY']]
-            else:
-                p_min_pu_series = 0.0
-
-            network.add(
-                "Generator",
-                name=row['name'],
-                bus=row['bus'],
-                p_nom=row['p_nom'],
-                p_nom_extendable=row.get('p_nom_extendable', False),
-                carrier=row['carrier'],
-                marginal_cost=self._get_marginal_cost(row, year),
-                capital_cost=self._get_capital_cost(row, year),
-                build_year=row['build_year'],
-                lifetime=row['lifetime'],
-                p_max_pu=p_max_pu_series,
-                p_min_pu=p_min_pu_series,
-                committable=self.config.enable_committable,
-            )
+        names = pd.Index(generators_df['name'].astype(str))
+        technologies = generators_df['TECHNOLOGY']
+        frame = pd.DataFrame({
+            'bus': generators_df['bus'].to_numpy(),
+            'p_nom': generators_df['p_nom'].to_numpy(),
+            'p_nom_extendable': (generators_df['p_nom_extendable'].to_numpy()
+                                 if 'p_nom_extendable' in generators_df else False),
+            'carrier': generators_df['carrier'].to_numpy(),
+            'marginal_cost': self._marginal_costs(generators_df, year),
+            'capital_cost': self._capital_costs(generators_df, year),
+            'build_year': generators_df['build_year'].to_numpy(),
+            'lifetime': generators_df['lifetime'].to_numpy(),
+            'committable': self.config.enable_committable,
+        }, index=names)
+
+        series = {
+            'p_max_pu': self._profile_matrix('p_max_pu', technologies, names, network),
+            'p_min_pu': self._profile_matrix('p_min_pu', technologies, names, network),
+        }
+        self._import_components(network, "Generator", frame, series)
 
     def _add_new_generators(self, network: pypsa.Network, year: int, snapshots: pd.DatetimeIndex):
         """Add new generators for single year"""
-        p_max_pu = self.data.p_max_pu.set_index('name').T
-        p_max_pu.index = pd.to_datetime(p_max_pu.index)
-        p_max_pu_reindexed = p_max_pu.reindex(snapshots, method='ffill')
-
-        for index, row in self.data.new_generators.iterrows():
-            if row['TECHNOLOGY'] in p_max_pu_reindexed.columns:
-                p_max_pu_series = p_max_pu_reindexed[row['TECHNOLOGY']]
-            else:
-                p_max_pu_series = 1.0
-
-            network.add(
-                "Generator",
-                name=row['name'],
-                bus=row['bus'],
-                p_nom_extendable=True,
-                carrier=row['carrier'],
-                marginal_cost=self._get_marginal_cost(row, year),
-                capital_cost=self._get_capital_cost(row, year),
-                build_year=row['build_year'],
-                lifetime=row['lifetime'],
-                p_max_pu=p_max_pu_series,
-            )
+        new_generators = self.data.new_generators
+        names = pd.Index(new_generators['name'].astype(str))
+        frame = pd.DataFrame({
+            'bus': new_generators['bus'].to_numpy(),
+            'p_nom_extendable': True,
+            'carrier': new_generators['carrier'].to_numpy(),
+            'marginal_cost': self._marginal_costs(new_generators, year),
+            'capital_cost': self._capital_costs(new_generators, year),
+            'build_year': new_generators['build_year'].to_numpy(),
+            'lifetime': new_generators['lifetime'].to_numpy(),
+        }, index=names)
+
+        series = {
+            'p_max_pu': self._profile_matrix('p_max_pu', new_generators['TECHNOLOGY'], names, network),
+        }
+        self._import_components(network, "Generator", frame, series)
 
     def _add_existing_generators_multi_year(self, network: pypsa.Network,
                                            generators_df: pd.DataFrame,
-                                           base_year: int,
-                                           P_max_pu: pd.DataFrame,
-                                           P_min_pu: pd.DataFrame):
+                                           base_year: int):
         """Add existing generators for multi-year model"""
-        for index, row in generators_df.iterrows():
-            network.add(
-                "Generator",
-                name=row['name'],
-                bus=row['bus'],
-                p_nom=row['p_nom'],
-                p_nom_extendable=row.get('p_nom_extendable', False),
-                carrier=row['carrier'],
-                marginal_cost=self._get_marginal_cost(row, base_year),
-                capital_cost=0, # No capital cost for existing generators
-                build_year=base_year,
-                lifetime=row['lifetime'],
-                p_max_pu=P_max_pu[row['TECHNOLOGY']] if row['TECHNOLOGY'] in P_max_pu else 1.0,
-                p_min_pu=P_min_pu[row['TECHNOLOGY']] if row['TECHNOLOGY'] in P_min_pu else 0.0,
-            )
+        names = pd.Index(generators_df['name'].astype(str))
+        technologies = generators_df['TECHNOLOGY']
+        frame = pd.DataFrame({
+            'bus': generators_df['bus'].to_numpy(),
+            'p_nom': generators_df['p_nom'].to_numpy(),
+            'p_nom_extendable': (generators_df['p_nom_extendable'].to_numpy()
+                                 if 'p_nom_extendable' in generators_df else False),
+            'carrier': generators_df['carrier'].to_numpy(),
+            'marginal_cost': self._marginal_costs(generators_df, base_year),
+            'capital_cost': 0.0,  # No capital cost for existing generators
+            'build_year': base_year,
+            'lifetime': generators_df['lifetime'].to_numpy(),
+        }, index=names)
+        self.generator_technologies.update(zip(names, technologies))
+
+        series = {
+            'p_max_pu': self._profile_matrix('p_max_pu', technologies, names, network),
+            'p_min_pu': self._profile_matrix('p_min_pu', technologies, names, network),
+        }
+        self._import_components(network, "Generator", frame, series)
 
-    def _add_new_generators_multi_year(self, network: pypsa.Network, year: int,
-                                       P_max_pu: pd.DataFrame, P_min_pu: pd.DataFrame):
+    def _add_new_generators_multi_year(self, network: pypsa.Network, year: int):
         """Add new generators for specific investment period"""
-        for index, row in self.data.new_generators.iterrows():
-            if row['build_year'] == year:
-                network.add(
-                    "Generator",
-                    name=f"{row['name']}_{year}",
-                    bus=row['bus'],
-                    p_nom_extendable=True,
-                    carrier=row['carrier'],
-                    marginal_cost=self._get_marginal_cost(row, year),
-                    capital_cost=self._get_capital_cost(row, year),
-                    build_year=year,
-                    lifetime=row['lifetime'],
-                    p_max_pu=P_max_pu[row['TECHNOLOGY']] if row['TECHNOLOGY'] in P_max_pu else 1.0,
-                    p_min_pu=P_min_pu[row['TECHNOLOGY']] if row['TECHNOLOGY'] in P_min_pu else 0.0,
-                )
+        new_generators = self.data.new_generators[self.data.new_generators['build_year'] == year]
+        if new_generators.empty:
+            return
+        names = pd.Index(new_generators['name'].astype(str) + f"_{year}")
+        technologies = new_generators['TECHNOLOGY']
+        frame = pd.DataFrame({
+            'bus': new_generators['bus'].to_numpy(),
+            'p_nom_extendable': True,
+            'carrier': new_generators['carrier'].to_numpy(),
+            'marginal_cost': self._marginal_costs(new_generators, year),
+            'capital_cost': self._capital_costs(new_generators, year),
+            'build_year': year,
+            'lifetime': new_generators['lifetime'].to_numpy(),
+        }, index=names)
+        self.generator_technologies.update(zip(names, technologies))
+
+        series = {
+            'p_max_pu': self._profile_matrix('p_max_pu', technologies, names, network),
+            'p_min_pu': self._profile_matrix('p_min_pu', technologies, names, network),
+        }
+        self._import_components(network, "Generator", frame, series)
 
     def _add_storage(self, network: pypsa.Network, year: int):
         """Add storage components"""
-        for index, row in self.data.new_storage.iterrows():
-            network.add(
-                "Store",
-                name=row['name'],
-                bus=row['bus'],
-                e_nom_extendable=True,
-                carrier=row['carrier'],
-                capital_cost=self._get_capital_cost(row, year),
-                build_year=row['build_year'],
-                lifetime=row['lifetime'],
-                e_cyclic=self.config.enable_battery_cycle,
-            )
+        new_storage = self.data.new_storage
+        frame = pd.DataFrame({
+            'bus': new_storage['bus'].to_numpy(),
+            'e_nom_extendable': True,
+            'carrier': new_storage['carrier'].to_numpy(),
+            'capital_cost': self._capital_costs(new_storage, year),
+            'build_year': new_storage['build_year'].to_numpy(),
+            'lifetime': new_storage['lifetime'].to_numpy(),
+            'e_cyclic': self.config.enable_battery_cycle,
+        }, index=pd.Index(new_storage['name'].astype(str)))
+        self._import_components(network, "Store", frame)
 
     def _add_links(self, network: pypsa.Network):
         """Add links between buses"""
-        for index, row in self.data.links.iterrows():
-            network.add(
-                "Link",
-                name=row['name'],
-                bus0=row['bus0'],
-                bus1=row['bus1'],
-                p_nom=row['p_nom'],
-                p_nom_extendable=row.get('p_nom_extendable', False),
-                carrier=row['carrier'],
-                marginal_cost=row['marginal_cost'],
-                capital_cost=row['capital_cost'],
-                build_year=row['build_year'],
-                lifetime=row['lifetime'],
-            )
+        links = self.data.links
+        frame = pd.DataFrame({
+            'bus0': links['bus0'].to_numpy(),
+            'bus1': links['bus1'].to_numpy(),
+            'p_nom': links['p_nom'].to_numpy(),
+            'p_nom_extendable': links['p_nom_extendable'].to_numpy() if 'p_nom_extendable' in links else False,
+            'carrier': links['carrier'].to_numpy(),
+            'marginal_cost': links['marginal_cost'].to_numpy(),
+            'capital_cost': links['capital_cost'].to_numpy(),
+            'build_year': links['build_year'].to_numpy(),
+            'lifetime': links['lifetime'].to_numpy(),
+        }, index=pd.Index(links['name'].astype(str)))
+        self._import_components(network, "Link", frame)
 
     def _add_carriers(self, network: pypsa.Network):
         """Add carriers with CO2 emissions"""
-        for idx, carrier in self.data.co2.iterrows():
-            network.add('Carrier',
-                name=carrier['TECHNOLOGY'],
-                co2_emissions=carrier.get('tonnes/MWh', 0),
-                color=carrier.get('color', 'gray')
-            )
-
-    def _prepare_multi_year_timeseries(self, snapshots_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Prepare combined time series for multi-year model"""
-        p_max_pu = self.data.p_max_pu.set_index('name').T
-        p_max_pu.index = pd.to_datetime(p_max_pu.index)
-
-        p_min_pu = self.data.p_min_pu.set_index('name').T
-        p_min_pu.index = pd.to_datetime(p_min_pu.index)
-
-        p_max_pu_combined = pd.DataFrame(index=snapshots_df['snapshots'], columns=p_max_pu.columns)
-        p_min_pu_combined = pd.DataFrame(index=snapshots_df['snapshots'], columns=p_min_pu.columns)
-
-        for year in self.config.years:
-            year_snapshots = snapshots_df[snapshots_df['snapshots'].dt.year == year]['snapshots']
-            p_max_pu_reindexed = p_max_pu.reindex(year_snapshots, method='ffill')
-            p_min_pu_reindexed = p_min_pu.reindex(year_snapshots, method='ffill')
-            p_max_pu_combined.update(p_max_pu_reindexed)
-            p_min_pu_combined.update(p_min_pu_reindexed)
-
-        return p_max_pu_combined.fillna(1.0), p_min_pu_combined.fillna(0.0)
+        co2 = self.data.co2
+        frame = pd.DataFrame({
+            'co2_emissions': co2['tonnes/MWh'].to_numpy() if 'tonnes/MWh' in co2 else 0,
+            'color': co2['color'].to_numpy() if 'color' in co2 else 'gray',
+        }, index=pd.Index(co2['TECHNOLOGY'].astype(str)))
+        self._import_components(network, "Carrier", frame)
 
 
 # ============================================================================
 # OPTIMIZATION ENGINE
 # ============================================================================
 
+# Capacity variables of the linopy model and the network attribute behind each
+CAPACITY_VARIABLES = {
+    'Generator': ('generators', 'p_nom'),
+    'Link': ('links', 'p_nom'),
+    'Store': ('stores', 'e_nom'),
+    'StorageUnit': ('storage_units', 'p_nom'),
+    'Line': ('lines', 's_nom'),
+}
+
+# Static attributes kept when built capacity is carried into the next myopic window
+CARRIED_ATTRIBUTES = {
+    'Generator': ['bus', 'carrier', 'marginal_cost', 'build_year', 'lifetime'],
+    'Store': ['bus', 'carrier', 'build_year', 'lifetime', 'e_cyclic'],
+    'Link': ['bus0', 'bus1', 'carrier', 'marginal_cost', 'build_year', 'lifetime'],
+}
+
+# Slack units rebuilt by every network instead of being carried forward
+SLACK_GENERATORS = ['Market_backup']
+# Carriers the input re-adds to every window as extendable at no capital cost
+# (market imports); carrying their dispatch peak would cap them in later windows
+REBUILT_CARRIERS = ['Market']
+
+
 class OptimizationEngine:
     """Handles model optimization with proper solver configuration"""
 
@@ -916,17 +1236,141 @@ class OptimizationEngine:
         self.config = config
         self.logger = logger
 
+        # Options every solve gets; algorithm, threads and presolve are chosen per solve
         self.solver_options = {
             'log_file': logger.get_solver_log_path(),
-            'threads': config.solver_threads,
-            'solver': 'simplex',
-            'parallel': 'on',
-            'presolve': 'on',
             'log_to_console': True
         }
+        self.max_threads = max(1, min(config.solver_threads, available_cores()))
+        self.pinned_options = self._load_pinned_options()
+        # Model build and solver wall times of the last optimize_* call, by stage
+        self.build_seconds: Dict[str, float] = {}
+        self.solve_seconds: Dict[str, float] = {}
+
+    def _load_pinned_options(self) -> Optional[Dict]:
+        """Fixed solver settings from the config (a benchmark's best or a named profile)"""
+        settings = self.config.solver_settings
+        if settings == 'auto':
+            return None
+        if settings in SOLVER_PROFILES:
+            return dict(SOLVER_PROFILES[settings])
+        if settings == 'pinned':
+            benchmark_file = Path(self.config.project_folder) / "Logs" / BENCHMARK_FILENAME
+            options = load_pinned_options(benchmark_file)
+            if options is None:
+                self.logger.warning(f"No usable solver benchmark at {benchmark_file}, "
+                                    "choosing solver settings adaptively")
+            return options
+        self.logger.warning(f"Unknown solver_settings '{settings}', choosing solver settings adaptively")
+        return None
+
+    def _choose_options(self, network: pypsa.Network, stage: str, solve_kwargs: Dict) -> Dict:
+        """HiGHS settings of one solve: pinned ones, or chosen from the built model's size"""
+        if self.pinned_options is not None:
+            options = dict(self.pinned_options)
+            origin = f"solver_settings={self.config.solver_settings}"
+        else:
+            stats = model_stats(network)
+            options = choose_solver_options(stats, self.max_threads,
+                                            needs_basis='basis_fn' in solve_kwargs,
+                                            warm_start='warmstart_fn' in solve_kwargs)
+            origin = (f"{stats.variables} variables, {stats.constraints} constraints"
+                      f"{' (estimated)' if stats.estimated else ''}")
+        options['threads'] = max(1, min(int(options.get('threads', self.max_threads)), self.max_threads))
+        self.logger.info(f"{stage} solver settings ({origin}): "
+                         + ", ".join(f"{key}={value}" for key, value in options.items()))
+        return {**self.solver_options, **options}
+
+    def _build(self, network: pypsa.Network, stage: str, extra_functionality=None):
+        """Build the linopy model of a network (plus extra constraints) and time it"""
+        start = datetime.datetime.now()
+        network.optimize.create_model()
+        if extra_functionality is not None:
+            extra_functionality(network, network.snapshots)
+        self.build_seconds[stage] = (datetime.datetime.now() - start).total_seconds()
+
+    def _solve_built(self, network: pypsa.Network, stage: str, **solve_kwargs):
+        """Solve the network's current model with HiGHS and time it"""
+        solver_options = self._choose_options(network, stage, solve_kwargs)
+        # Iteration progress from the HiGHS log, only when someone listens
+        if self.logger.on_progress is not None:
+            log_tail = HighsLogTail(solver_options['log_file'],
+                                    lambda event: self.logger.solver_event(stage, event))
+        else:
+            log_tail = contextlib.nullcontext()
+        start = datetime.datetime.now()
+        with log_tail:
+            status, condition = network.optimize.solve_model(
+                solver_name='highs',
+                solver_options=solver_options,
+                **solve_kwargs
+            )
+        self.solve_seconds[stage] = (datetime.datetime.now() - start).total_seconds()
+        self.logger.info(f"{stage}: model build {self.build_seconds.get(stage, 0.0):.1f}s, "
+                         f"solve {self.solve_seconds[stage]:.1f}s "
+                         f"({len(network.snapshots)} snapshots, {status}/{condition})")
+        if status != 'ok':
+            raise RuntimeError(f"{stage} solve ended with status '{status}' ({condition})")
+
+    def _solve(self, network: pypsa.Network, stage: str, extra_functionality=None, **solve_kwargs):
+        """Build and solve a fresh model"""
+        self._build(network, stage, extra_functionality)
+        self._solve_built(network, stage, **solve_kwargs)
+
+    def _fix_capacities_in_model(self, network: pypsa.Network) -> int:
+        """Pin every capacity variable of the built model to its optimal value (bounds only)"""
+        fixed = 0
+        for component, (_, attr) in CAPACITY_VARIABLES.items():
+            try:
+                variable = network.model.variables[f"{component}-{attr}"]
+            except KeyError:
+                continue
+            solution = variable.solution
+            variable.lower = solution
+            variable.upper = solution
+            fixed += solution.size
+        return fixed
+
+    def _fix_capacities_in_network(self, network: pypsa.Network):
+        """Pin extendable capacities through their min/max limits (the model keeps its structure)"""
+        for list_name, attr in CAPACITY_VARIABLES.values():
+            df = getattr(network, list_name)
+            if len(df) == 0 or f'{attr}_opt' not in df:
+                continue
+            extendable = df[f'{attr}_extendable'].astype(bool)
+            df.loc[extendable, f'{attr}_min'] = df.loc[extendable, f'{attr}_opt']
+            df.loc[extendable, f'{attr}_max'] = df.loc[extendable, f'{attr}_opt']
+
+    def _redispatch(self, network: pypsa.Network, extra_functionality, basis_file: Path):
+        """
+        Dispatch stage with the investment capacities fixed, warm-started
+        from the investment solution's basis.
+
+        Without committable units only variable bounds change, so the
+        investment model is reused as built. Pinned unit commitment limits
+        change coefficients; the model is then rebuilt with the same
+        structure (capacities fixed through their limits) so the basis
+        still applies.
+        """
+        warm_start = {'warmstart_fn': str(basis_file)} if basis_file.exists() else {}
+        if not warm_start:
+            self.logger.warning("No basis from the investment stage, dispatch starts cold")
+
+        if network.generators['committable'].astype(bool).any():
+            self._fix_capacities_in_network(network)
+            self._solve(network, "Dispatch", extra_functionality, **warm_start)
+        else:
+            start = datetime.datetime.now()
+            fixed = self._fix_capacities_in_model(network)
+            self.build_seconds["Dispatch"] = (datetime.datetime.now() - start).total_seconds()
+            self.logger.debug(f"Dispatch reuses the investment model ({fixed} capacity variables fixed)")
+            self._solve_built(network, "Dispatch", **warm_start)
 
-    def optimize_single_year(self, network: pypsa.Network, year: int) -> bool:
+    def optimize_single_year(self, network: pypsa.Network, year: int, extra_functionality=None) -> bool:
         """Optimize single year model"""
+        self.build_seconds, self.solve_seconds = {}, {}
+        basis_file = self.logger.log_dir / f"{self.logger.scenario_name}_investment.bas"
+        warm = self.config.warm_start_dispatch
         try:
             self.logger.update_progress(
                 "Optimization", f"Year {year} - Investment", 60.0,
@@ -934,10 +1378,9 @@ class OptimizationEngine:
             )
 
             # First optimization - investment
-            network.optimize(
-                solver_name='highs',
-                solver_options=self.solver_options
-            )
+            basis_file.unlink(missing_ok=True)
+            self._solve(network, "Investment", extra_functionality,
+                        **({'basis_fn': str(basis_file)} if warm else {}))
 
             # Update capacities
             network.generators.loc[
@@ -956,14 +1399,15 @@ class OptimizationEngine:
             )
 
             # Second optimization - dispatch
-            network.optimize(
-                solver_name='highs',
-                solver_options=self.solver_options
-            )
+            if warm:
+                self._redispatch(network, extra_functionality, basis_file)
+            else:
+                self._solve(network, "Dispatch", extra_functionality)
 
             self.logger.update_progress(
                 "Optimization", f"Year {year} - Complete", 85.0,
-                f"Optimization for year {year} completed successfully"
+                f"Optimization for year {year} completed successfully",
+                details={'build_seconds': self.build_seconds, 'solve_seconds': self.solve_seconds}
             )
 
             return True
@@ -973,22 +1417,25 @@ class OptimizationEngine:
             self.logger.error(traceback.format_exc())
             return False
 
-    def optimize_multi_year(self, network: pypsa.Network) -> bool:
-        """Optimize multi-year model"""
+        finally:
+            basis_file.unlink(missing_ok=True)
+
+    def optimize_multi_year(self, network: pypsa.Network, extra_functionality=None,
+                            label: str = "Multi-year", progress: Tuple[float, float] = (60.0, 85.0)) -> bool:
+        """Optimize multi-year model (label/progress: a myopic window's share of the run)"""
+        self.build_seconds, self.solve_seconds = {}, {}
         try:
             self.logger.update_progress(
-                "Optimization", "Multi-year - Investment", 60.0,
-                "Running multi-year investment optimization"
+                "Optimization", f"{label} - Investment", progress[0],
+                f"Running {label.lower()} investment optimization"
             )
 
-            network.optimize(
-                solver_name='highs',
-                solver_options=self.solver_options
-            )
+            self._solve(network, "Investment", extra_functionality)
 
             self.logger.update_progress(
-                "Optimization", "Multi-year - Complete", 85.0,
-                "Multi-year optimization completed successfully"
+                "Optimization", f"{label} - Complete", progress[1],
+                f"{label} optimization completed successfully",
+                details={'build_seconds': self.build_seconds, 'solve_seconds': self.solve_seconds}
             )
 
             return True
@@ -1011,15 +1458,19 @@ class ResultsExporter:
         self.output_dir = Path(config.project_folder) / "results" / "pypsa_optimization" / config.scenario_name
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def export_results(self, network: pypsa.Network, year: Optional[int] = None):
-        """Export results to Excel and CSV"""
+    def export_results(self, network: pypsa.Network, year: Optional[int] = None,
+                       suffix: Optional[str] = None):
+        """Export results to Excel and CSV (file suffix: the year, or an explicit suffix)"""
         try:
             self.logger.update_progress(
                 "Exporting Results", "Preparing data", 90.0,
                 "Preparing results for export"
             )
 
-            file_suffix = f"_{year}" if year else ""
+            if suffix:
+                file_suffix = f"_{suffix}"
+            else:
+                file_suffix = f"_{year}" if year else ""
             excel_path = self.output_dir / f"Pypsa_results{file_suffix}.xlsx"
 
             with pd.ExcelWriter(excel_path) as writer:
@@ -1057,73 +1508,536 @@ class ResultsExporter:
 class PyPSAModel:
     """Orchestrates the entire PyPSA modeling process"""
 
-    def __init__(self, config: ModelConfig):
+    def __init__(self, config: ModelConfig, cancel_event: Optional[threading.Event] = None,
+                 log_name: Optional[str] = None, on_progress: Optional[Callable[[Dict], None]] = None):
         self.config = config
+        self.cancel_event = cancel_event
         log_dir = Path(config.project_folder) / "Logs"
-        self.logger = ProgressLogger(str(log_dir), config.scenario_name)
+        self.logger = ProgressLogger(str(log_dir), log_name or config.scenario_name, on_progress,
+                                     persist_progress=config.progress_snapshot)
         self.data_loader = DataLoader(config, self.logger)
         self.snapshot_generator = SnapshotGenerator(config, self.data_loader, self.logger)
         self.network_builder = NetworkBuilder(config, self.data_loader, self.logger)
         self.optimizer = OptimizationEngine(config, self.logger)
         self.exporter = ResultsExporter(config, self.logger)
 
-    def run(self):
-        """Run the full modeling process"""
+    def _check_cancelled(self):
+        """Stop between stages when the scheduler requested cancellation"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise JobCancelled(f"Model run for {self.config.scenario_name} was cancelled")
+
+    def run(self) -> bool:
+        """Run the full modeling process. Returns True on success."""
         try:
             self.logger.update_progress("Initialization", "Starting", 0.0, "Starting PyPSA model run")
 
             if not self.data_loader.load_all_data():
                 raise RuntimeError("Data loading failed")
+            self._check_cancelled()
 
             if self.config.model_type == ModelType.SINGLE_YEAR.value:
-                self._run_single_year()
+                if len(self._single_years()) > 1:
+                    self._run_single_years_parallel()
+                else:
+                    self._run_single_year()
             elif self.config.model_type == ModelType.MULTI_YEAR.value:
                 self._run_multi_year()
             else:
                 raise ValueError(f"Unknown model type: {self.config.model_type}")
 
             self.logger.update_progress("Completion", "Finished", 100.0, "Model run completed successfully!")
+            return True
+
+        except JobCancelled as e:
+            self.logger.warning(str(e))
+            self.logger.update_progress("Cancelled", "Cancelled", 99.0, "Model run was cancelled")
+            raise
 
         except Exception as e:
             self.logger.error(f"Model run failed: {str(e)}")
             self.logger.error(traceback.format_exc())
             self.logger.update_progress("Error", "Failed", 99.0, f"Error: {str(e)}")
+            return False
+
+    def _single_years(self) -> List[int]:
+        """Years of a single-year model run: `years` when it lists several, else the base year"""
+        years = sorted({int(year) for year in (self.config.years or [])})
+        return years if len(years) > 1 else [self.config.base_year]
+
+    def _parallel_workers(self, n_years: int) -> int:
+        """Concurrent year solves: bounded by the years, the solver threads and the CPUs"""
+        workers = min(n_years, max(1, self.config.solver_threads), os.cpu_count() or 1)
+        if self.config.max_parallel_years > 0:
+            workers = min(workers, self.config.max_parallel_years)
+        return max(1, workers)
+
+    def _run_single_years_parallel(self):
+        """
+        Run independent single-year optimizations for several years, each in
+        its own worker process, with the solver threads split between them.
+
+        The input data was loaded (and its snapshot written) by this process,
+        so the workers read the snapshot instead of parsing the workbook.
+        Every year exports its own results; progress of all years is merged
+        into this run's progress file.
+        """
+        years = self._single_years()
+        workers = self._parallel_workers(len(years))
+        threads = max(1, self.config.solver_threads // workers)
+        self.logger.info(f"Starting single-year models for {years}: {workers} worker processes, "
+                         f"{threads} solver threads each")
+
+        year_progress = {year: {'stage': 'Queued', 'step': 'Waiting', 'progress': 0.0, 'message': ''}
+                         for year in years}
+        outcomes: Dict[int, Dict] = {}
+        config_data = {**self.config.to_dict(), 'solver_threads': threads}
+
+        # spawn: never fork a process that is running threads
+        context = multiprocessing.get_context('spawn')
+        with context.Manager() as manager:
+            progress_queue = manager.Queue()
+            worker_cancel = manager.Event()
+
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = {
+                    executor.submit(run_single_year_worker, config_data, year, progress_queue, worker_cancel): year
+                    for year in years
+                }
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=0.25)
+                    if self.cancel_event is not None and self.cancel_event.is_set() and not worker_cancel.is_set():
+                        # Running years stop at their next stage boundary
+                        worker_cancel.set()
+                        for future in pending:
+                            future.cancel()
+
+                    for future in done:
+                        year = futures[future]
+                        if future.cancelled():
+                            outcomes[year] = {'year': year, 'success': False, 'error': 'cancelled'}
+                        elif future.exception() is not None:
+                            outcomes[year] = {'year': year, 'success': False, 'error': str(future.exception())}
+                        else:
+                            outcomes[year] = future.result()
+                        self.logger.info(f"Year {year} finished: "
+                                         f"{'ok' if outcomes[year]['success'] else outcomes[year].get('error', 'failed')}")
+
+                    self._merge_year_progress(progress_queue, year_progress, outcomes, workers, threads)
+
+        self._check_cancelled()
+        failed = sorted(year for year, outcome in outcomes.items() if not outcome['success'])
+        if failed:
+            raise RuntimeError(f"Single-year optimization failed for {failed}, see the per-year model logs")
+
+    def _merge_year_progress(self, progress_queue, year_progress: Dict[int, Dict], outcomes: Dict[int, Dict],
+                             workers: int, threads: int):
+        """Fold queued per-year progress events into one progress update (solver events pass through)"""
+        changed = False
+        while True:
+            try:
+                year, progress = progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if progress.get('kind') == 'solver':
+                self.logger.solver_event(f"Year {year} - {progress['stage']}",
+                                         {**progress, 'kind': progress['solver_event'], 'year': year})
+                continue
+            year_progress[year] = {key: progress[key] for key in ('stage', 'step', 'progress', 'message')}
+            changed = True
+        for year, outcome in outcomes.items():
+            if not outcome['success'] and year_progress[year]['stage'] != 'Failed':
+                year_progress[year] = {'stage': 'Failed', 'step': 'Failed', 'progress': 100.0,
+                                       'message': outcome.get('error', '')}
+                changed = True
+        if not changed:
+            return
+
+        overall = sum(progress['progress'] for progress in year_progress.values()) / len(year_progress)
+        finished = sum(1 for progress in year_progress.values() if progress['progress'] >= 100.0)
+        self.logger.update_progress(
+            "Optimization", f"{finished}/{len(year_progress)} years complete", 40.0 + 0.58 * overall,
+            f"Solving {len(year_progress)} years with {workers} workers ({threads} threads each)",
+            details={'years': {str(year): progress for year, progress in year_progress.items()},
+                     'workers': workers, 'threads_per_solve': threads}
+        )
 
     def _run_single_year(self):
         """Run single-year optimization"""
         year = self.config.base_year
         self.logger.info(f"Starting single-year model for {year}")
 
-        snapshots, date_range = self.snapshot_generator.generate_single_year_snapshots(year)
+        clustering = None
+        if self.config.enable_clustering:
+            clustering = self.snapshot_generator.cluster_single_year(year)
+            snapshots = clustering.snapshots
+        else:
+            snapshots, date_range = self.snapshot_generator.generate_single_year_snapshots(year)
 
+        reset_peak_memory()
         network = self.network_builder.build_single_year_network(
-            year, snapshots, self.data.generators_base
+            year, snapshots, self.data_loader.generators_base, clustering
         )
+        self._check_cancelled()
 
-        if self.optimizer.optimize_single_year(network, year):
+        extra_functionality = self._link_storage(network, [clustering]) if clustering is not None else None
+        if self.optimizer.optimize_single_year(network, year, extra_functionality):
+            self._check_cancelled()
+            self._report_solve(network, [clustering] if clustering is not None else None, year)
             self.exporter.export_results(network, year)
 
     def _run_multi_year(self):
         """Run multi-year optimization"""
         self.logger.info(f"Starting multi-year model for periods {self.config.years}")
 
-        snapshots_df = self.snapshot_generator.generate_multi_year_snapshots()
+        clustering = None
+        if self.config.enable_clustering:
+            # Cluster the full hourly years; the snapshot condition does not apply
+            snapshots_df, clustering = self.snapshot_generator.cluster_multi_year(
+                self.snapshot_generator.generate_multi_year_snapshots(apply_condition=False)
+            )
+        else:
+            snapshots_df = self.snapshot_generator.generate_multi_year_snapshots()
+
+        if self.config.multi_year_mode == MultiYearMode.MYOPIC.value:
+            self._run_multi_year_myopic(snapshots_df, clustering)
+            return
+        if self.config.multi_year_mode != MultiYearMode.PERFECT_FORESIGHT.value:
+            raise ValueError(f"Unknown multi-year mode: {self.config.multi_year_mode}")
+
+        reset_peak_memory()
+        network = self.network_builder.build_multi_year_network(snapshots_df, clustering)
+        self._check_cancelled()
+
+        extra_functionality = self._link_storage(network, clustering) if clustering is not None else None
+        if self.optimizer.optimize_multi_year(network, extra_functionality):
+            self._check_cancelled()
+            self._report_solve(network, clustering)
+            self.exporter.export_results(network)
+
+    def _myopic_windows(self) -> List[Tuple[List[int], List[int]]]:
+        """
+        (window periods, committed periods) of each myopic step.
+
+        A window optimizes `myopic_horizon` periods together; the first
+        horizon - overlap of them are committed and the next window starts
+        after them. The last window commits everything it covers.
+        """
+        years = sorted(self.config.years)
+        horizon = max(1, self.config.myopic_horizon)
+        step = max(1, horizon - max(0, self.config.myopic_overlap))
+
+        windows, first = [], 0
+        while first < len(years):
+            window = years[first:first + horizon]
+            if first + horizon >= len(years):
+                windows.append((window, window))
+                break
+            windows.append((window, years[first:first + step]))
+            first += step
+        return windows
+
+    def _run_multi_year_myopic(self, snapshots_df: pd.DataFrame,
+                               clustering: Optional[List[ClusteringResult]]):
+        """
+        Rolling-horizon multi-year run: solve the periods window by window,
+        carrying capacity built in committed periods into the next windows
+        as existing assets (with their build year and lifetime).
+        """
+        timestamps = pd.to_datetime(snapshots_df['snapshots'])
+        periods = timestamps.dt.year.where(timestamps.dt.month < 4, timestamps.dt.year + 1)
+        clustered_years = dict(zip(self.config.years, clustering)) if clustering is not None else None
+
+        windows = self._myopic_windows()
+        self.logger.info(f"Myopic run over {sorted(self.config.years)} in {len(windows)} windows: "
+                         f"{[window for window, _ in windows]}")
+
+        carried: Dict[str, pd.DataFrame] = {}
+        window_stats, period_summaries = [], []
+        for number, (window, committed) in enumerate(windows):
+            self._check_cancelled()
+            label = f"Window {number + 1}/{len(windows)} ({window[0]}-{window[-1]})"
+            progress = (55.0 + 40.0 * number / len(windows), 55.0 + 40.0 * (number + 1) / len(windows))
+
+            reset_peak_memory()
+            window_df = (snapshots_df[periods.isin(window).to_numpy()]
+                         .sort_values('snapshots', kind='stable').reset_index(drop=True))
+            window_clustering = [clustered_years[year] for year in window] if clustered_years else None
+            # Window files are named by window, not year: a window holds several
+            # periods, some re-optimized by the next window
+            window_name = f"window{number + 1}"
+            network = self.network_builder.build_multi_year_network(
+                window_df, window_clustering, years=window, carried=carried,
+                name=f"{self.config.scenario_name}_{window_name}"
+            )
+            extra_functionality = (self._link_storage(network, window_clustering)
+                                   if window_clustering is not None else None)
+
+            if not self.optimizer.optimize_multi_year(network, extra_functionality, label, progress):
+                raise RuntimeError(f"Myopic optimization failed in {label.lower()}")
+            self._check_cancelled()
+
+            window_stats.append({
+                'window': number + 1,
+                'periods': '-'.join(str(year) for year in window),
+                'committed': '-'.join(str(year) for year in committed),
+                'network_file': f"{network.name}.nc",
+                'snapshots': len(network.snapshots),
+                'generators': len(network.generators),
+                'objective': float(network.objective),
+                'build_seconds': round(sum(self.optimizer.build_seconds.values()), 3),
+                'solve_seconds': round(sum(self.optimizer.solve_seconds.values()), 3),
+                'peak_memory_mb': round(peak_memory_mb() or 0.0, 1) or None,
+            })
+            self.logger.info(f"{label}: {window_stats[-1]}")
+            period_summaries.extend(self._committed_period_summary(network, committed))
+
+            carried = self._carry_capacities(network, committed, carried, windows)
+            self.exporter.export_results(network, suffix=window_name)
+
+        self._write_myopic_summary(window_stats, period_summaries)
+
+    def _carry_capacities(self, network: pypsa.Network, committed: List[int],
+                          carried: Dict[str, pd.DataFrame],
+                          windows: List[Tuple[List[int], List[int]]]) -> Dict[str, pd.DataFrame]:
+        """Capacity built up to the last committed period, as fixed assets for the next windows"""
+        last_committed = max(committed)
+        later = [window for window, _ in windows if window[0] > last_committed]
+        next_start = later[0][0] if later else None
+
+        result = {}
+        for class_name, (list_name, attr) in CAPACITY_VARIABLES.items():
+            columns = CARRIED_ATTRIBUTES.get(class_name)
+            df = getattr(network, list_name)
+            if columns is None or len(df) == 0:
+                continue
+            built = df[df[f'{attr}_extendable'].astype(bool)
+                       & (df['build_year'] <= last_committed)
+                       & (df[f'{attr}_opt'] > 0)
+                       & ~df.index.isin(SLACK_GENERATORS)
+                       & ~df['carrier'].isin(REBUILT_CARRIERS)]
+            frame = built[[column for column in columns if column in built]].copy()
+            frame[attr] = built[f'{attr}_opt']
+            frame[f'{attr}_extendable'] = False
+            frame['capital_cost'] = 0.0  # sunk once built
+            if class_name == 'Generator':
+                frame['TECHNOLOGY'] = [self.network_builder.generator_technologies.get(name, built.at[name, 'carrier'])
+                                       for name in frame.index]
+
+            if class_name in carried:
+                frame = pd.concat([carried[class_name], frame])
+            if next_start is not None:
+                # Assets retired before the next window add nothing
+                frame = frame[frame['build_year'] + frame['lifetime'] > next_start]
+            if len(frame):
+                result[class_name] = frame
+                self.logger.debug(f"Carrying {len(frame)} {class_name} assets forward "
+                                  f"({frame[attr].sum():.1f} total {attr})")
+        return result
+
+    def _committed_period_summary(self, network: pypsa.Network, committed: List[int]) -> List[Dict]:
+        """Capacity and generation by carrier for the committed periods of a window"""
+        generators = network.generators
+        weightings = network.snapshot_weightings['generators']
+        rows = []
+        for year in committed:
+            active = ((generators['build_year'] <= year)
+                      & (generators['build_year'] + generators['lifetime'] > year))
+            built = generators['build_year'] == year
+            generation = (network.generators_t.p.loc[year].mul(weightings.loc[year], axis=0).sum()
+                          if len(network.generators_t.p) else pd.Series(0.0, index=generators.index))
+            for carrier in sorted(generators['carrier'].dropna().unique()):
+                of_carrier = generators['carrier'] == carrier
+                rows.append({
+                    'period': year,
+                    'carrier': carrier,
+                    'capacity_mw': float(generators.loc[active & of_carrier, 'p_nom_opt'].sum()),
+                    'new_capacity_mw': float(generators.loc[built & of_carrier
+                                                            & generators['p_nom_extendable'].astype(bool),
+                                                            'p_nom_opt'].sum()),
+                    'generation_mwh': float(generation.reindex(generators.index[of_carrier]).sum()),
+                })
+        return rows
+
+    def _write_myopic_summary(self, window_stats: List[Dict], period_summaries: List[Dict]):
+        """Stitch the committed periods of all windows into one summary workbook"""
+        windows = pd.DataFrame(window_stats)
+        periods = pd.DataFrame(period_summaries)
+        summary_path = self.exporter.output_dir / "Pypsa_results_myopic_summary.xlsx"
+        with pd.ExcelWriter(summary_path) as writer:
+            windows.to_excel(writer, sheet_name='windows', index=False)
+            if not periods.empty:
+                for value, sheet_name in (('capacity_mw', 'capacity_by_carrier'),
+                                          ('new_capacity_mw', 'new_capacity_by_carrier'),
+                                          ('generation_mwh', 'generation_by_carrier')):
+                    periods.pivot_table(index='period', columns='carrier', values=value,
+                                        aggfunc='sum').to_excel(writer, sheet_name=sheet_name)
+
+        peaks = [stats['peak_memory_mb'] for stats in window_stats if stats['peak_memory_mb'] is not None]
+        resolution = self._resolution_mode(None)
+        mode = 'myopic' if resolution == 'full' else f"myopic_{resolution}"
+        key = f"{self.config.model_type}:{'-'.join(str(y) for y in sorted(self.config.years))}"
+        try:
+            solve = record_solve_time(self.logger.log_dir, key, mode, windows['solve_seconds'].sum(),
+                                      int(windows['snapshots'].sum()), max(peaks) if peaks else None)
+        except OSError as e:
+            self.logger.warning(f"Could not record solve time: {e}")
+            solve = {'seconds': float(windows['solve_seconds'].sum())}
+
+        if 'solve_time_reduction_pct' in solve:
+            comparison = (f"solve {solve['solve_time_reduction_pct']:.1f}% faster"
+                          + (f", peak memory {solve['peak_memory_reduction_pct']:.1f}% lower"
+                             if 'peak_memory_reduction_pct' in solve else "")
+                          + f" than the perfect-foresight run ({solve['full_run']['seconds']:.1f}s)")
+        else:
+            comparison = "no full perfect-foresight run of these periods on record to compare with"
+        self.logger.update_progress(
+            "Optimization", "Myopic summary", 96.0,
+            f"Myopic run: {len(window_stats)} windows, {solve['seconds']:.1f}s solving, {comparison}",
+            details={'summary': str(summary_path), 'solve': solve, 'windows': window_stats}
+        )
+
+    def _link_storage(self, network: pypsa.Network, clustering: List[ClusteringResult]):
+        """Linked typical period constraints for the stores of a clustered network"""
+        if not self.config.clustering_link_storage:
+            self.logger.info("Storage linking disabled: stores only see their representative periods")
+            return None
+
+        multi_period = isinstance(network.snapshots, pd.MultiIndex)
+        stores = prepare_linked_stores(network, multi_period=multi_period)
+        blocks, offset = [], 0
+        for result in clustering:
+            blocks.append((offset, result))
+            offset += len(result.snapshots)
+        self.logger.info(f"Linking {len(stores)} stores across "
+                         f"{sum(len(result.sequence) for result in clustering)} periods")
+        return linked_storage_constraints(blocks, stores, cyclic=self.config.enable_battery_cycle)
+
+    def _resolution_mode(self, clustering) -> str:
+        """'clustered', 'full' (all hourly snapshots) or 'reduced' (other snapshot selections)"""
+        if clustering is not None or self.config.enable_clustering:
+            return 'clustered'
+        if (self.config.snapshot_condition == SnapshotCondition.ALL_SNAPSHOTS.value
+                and self.config.weightings == 1):
+            return 'full'
+        return 'reduced'
+
+    def _report_solve(self, network: pypsa.Network, clustering: Optional[List[ClusteringResult]],
+                      year: Optional[int] = None):
+        """Record the solve time and write the aggregation report of clustered runs"""
+        mode = self._resolution_mode(clustering)
+        years = [year] if year is not None else list(self.config.years)
+        key = f"{self.config.model_type}:{'-'.join(str(y) for y in sorted(years))}"
+        try:
+            solve = record_solve_time(self.logger.log_dir, key, mode,
+                                      sum(self.optimizer.solve_seconds.values()), len(network.snapshots),
+                                      peak_memory_mb())
+        except OSError as e:
+            self.logger.warning(f"Could not record solve time: {e}")
+            solve = {'seconds': round(sum(self.optimizer.solve_seconds.values()), 3)}
+        solve['stages'] = {stage: round(seconds, 3) for stage, seconds in self.optimizer.solve_seconds.items()}
+
+        if clustering is None:
+            return
+
+        if 'solve_time_reduction_pct' in solve:
+            comparison = (f"{solve['solve_time_reduction_pct']:.1f}% faster than the full run "
+                          f"({solve['full_run']['seconds']:.1f}s)")
+        else:
+            comparison = "no full-resolution run of this model on record to compare with"
+        report = {
+            'scenario': self.config.scenario_name,
+            'storage_linked': self.config.clustering_link_storage,
+            'solve': solve,
+            'years': {str(y): result.summary() for y, result in zip(years, clustering)},
+        }
+        suffix = f"_{year}" if year is not None else ""
+        report_path = self.exporter.output_dir / f"clustering{suffix}.json"
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
 
-        network = self.network_builder.build_multi_year_network(snapshots_df)
+        self.logger.update_progress(
+            "Optimization", "Clustering report", 88.0,
+            f"Clustered solve took {solve['seconds']:.1f}s, {comparison}",
+            details={'clustering_report': str(report_path), 'solve': solve}
+        )
+
+def run_single_year_worker(config_data: Dict, year: int, progress_queue, cancel_event) -> Dict:
+    """
+    Build, solve and export one year of a parallel single-year run.
+
+    Runs in a worker process: the year gets its own model and progress log
+    ({scenario}_{year}_model.log) and its progress events are put on
+    ``progress_queue`` as (year, progress) tuples.
+    """
+    config = ModelConfig(**{**config_data, 'base_year': year, 'years': [year]})
+    start = datetime.datetime.now()
+    model = PyPSAModel(
+        config, cancel_event=cancel_event, log_name=f"{config.scenario_name}_{year}",
+        on_progress=lambda progress: progress_queue.put((year, progress))
+    )
+    success = model.run()
+    return {
+        'year': year,
+        'success': success,
+        'seconds': round((datetime.datetime.now() - start).total_seconds(), 1),
+        'error': None if success else f"see {model.logger.log_file.name}",
+    }
 
-        if self.optimizer.optimize_multi_year(network):
-            self.exporter.export_results(network)
 
 # ============================================================================
 # COMMAND-LINE INTERFACE
 # ============================================================================
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a PyPSA model, or benchmark solver settings on a network")
+    parser.add_argument('config', nargs='?', help="path to the model config JSON")
+    parser.add_argument('--benchmark-solver', metavar='NETWORK',
+                        help="solve a network (.nc) under a matrix of solver settings")
+    parser.add_argument('--profiles', default=','.join(SOLVER_PROFILES),
+                        help="comma-separated solver profiles to benchmark (default: all)")
+    parser.add_argument('--threads', default=None,
+                        help="comma-separated thread counts to benchmark (default: 1, 4 and all cores)")
+    parser.add_argument('--output', default=None,
+                        help="benchmark record (default: the project's Logs/solver_benchmark.json)")
+    args = parser.parse_args()
+
+    if args.benchmark_solver:
+        if not os.path.exists(args.benchmark_solver):
+            print(f"Error: Network file not found at {args.benchmark_solver}")
+            sys.exit(1)
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+        try:
+            record = benchmark_network(
+                args.benchmark_solver,
+                profiles=[name.strip() for name in args.profiles.split(',') if name.strip()],
+                threads=[int(count) for count in args.threads.split(',')] if args.threads else None,
+                output_file=args.output,
+            )
+        except Exception as e:
+            print(f"Benchmark failed: {e}")
+            traceback.print_exc()
+            sys.exit(1)
+
+        print(f"{'profile':<18}{'threads':>8}{'build s':>10}{'solve s':>10}{'peak MB':>10}  status")
+        for run in record['runs']:
+            print(f"{run['profile']:<18}{run['threads']:>8}{run['build_seconds'] or 0:>10.1f}"
+                  f"{run['solve_seconds'] or 0:>10.1f}{run['peak_memory_mb'] or 0:>10.0f}  {run['status']}")
+        best = record['best']
+        if best is None:
+            print("No setting solved the network")
+            sys.exit(1)
+        print(f"Best: {best['profile']} with {best['options']['threads']} thread(s); "
+              f"set solver_settings to 'pinned' to use it")
+        sys.exit(0)
+
+    if not args.config:
         print("Usage: python pypsa_model_main.py <path_to_config.json>")
         sys.exit(1)
 
-    config_path = sys.argv[1]
+    config_path = args.config
     if not os.path.exists(config_path):
         print(f"Error: Config file not found at {config_path}")
         sys.exit(1)
@@ -1131,7 +2045,8 @@ if __name__ == '__main__':
     try:
         config = ModelConfig.from_json(config_path)
         model = PyPSAModel(config)
-        model.run()
+        if not model.run():
+            sys.exit(1)
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
         traceback.print_exc()
@@ -1142,33 +2057,44 @@ from fastapi.responses import StreamingResponse
 import asyncio
 import json
 
-router = APIRouter()
+from job_scheduler import get_job_scheduler, Job
 
-# Global queue for SSE events
-model_event_queue: asyncio.Queue = None
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get("/project/pypsa-model-progress")
-async def pypsa_model_progress():
+async def pypsa_model_progress(
+    jobId: Optional[str] = Query(None, description="Model job id (default: the latest model job)")
+):
     """
     Server-Sent Events endpoint for real-time model progress.
+
+    Args:
+        jobId: Job id returned by POST /project/run-pypsa-model; the most
+            recently submitted model job when omitted
+
+    Event Types:
+    - queued: Job is waiting for resources (includes queuePosition)
+    - started: Job was admitted by the scheduler
+    - progress: Model progress update ('progress' fields, 'log' as JSON text)
+    - solver: HiGHS iteration/status event of the running solve
+    - end: Model run completed/failed/cancelled
     """
-    global model_event_queue
+    job = get_job_scheduler().find(jobId, "pypsa_model")
+    if job is None or job.events is None:
+        raise HTTPException(status_code=404, detail="Model job not found")
 
     async def event_generator():
-        """Generate SSE events from the queue"""
+        """Generate SSE events from the job's queue"""
         try:
-            if model_event_queue is None:
-                raise HTTPException(status_code=500, detail="Event queue not initialized")
-
             while True:
                 try:
                     event = await asyncio.wait_for(
-                        model_event_queue.get(),
+                        job.events.get(),
                         timeout=15.0
                     )
                     event_type = event.get('type', 'progress')
                     yield f"event: {event_type}\n"
-                    yield f"data: {json.dumps(event)}\n\n"
+                    yield f"data: {dumps(event).decode('utf-8')}\n\n"
                     if event_type == 'end':
                         break
                 except asyncio.TimeoutError:
@@ -1194,10 +2120,10 @@ async def run_pypsa_model(
 ):
     """
     Run the PyPSA model asynchronously.
-    """
-    global model_event_queue
-    model_event_queue = asyncio.Queue()
 
+    The run is submitted to the shared job scheduler as a batch 'pypsa_model'
+    job; solver threads are capped to the class CPU budget.
+    """
     try:
         # This is a placeholder for where the config would be loaded from
         # For now, we'll create a dummy config
@@ -1213,64 +2139,76 @@ async def run_pypsa_model(
             capital_weighting=1.0
         )
 
-        # Start Python process in background
-        asyncio.create_task(run_model_process(config, model_event_queue))
+        job = await run_model_process(config)
 
-        return {"success": True, "message": "Model run started."}
+        return {
+            "success": True,
+            "message": "Model run started." if job.state == "running" else "Model run queued.",
+            "jobId": job.id
+        }
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-async def run_model_process(config: ModelConfig, event_queue: asyncio.Queue):
+async def run_model_process(config: ModelConfig) -> Job:
     """
-    Run the PyPSA model and send progress updates.
+    Submit the PyPSA model to the job scheduler and stream its progress
+    to the job's event queue.
+
+    Args:
+        config: Model configuration (solver_threads is capped to the job's CPU reservation)
+
+    Returns:
+        Job: The scheduled job
     """
-    try:
-        model = PyPSAModel(config)
+    scheduler = get_job_scheduler()
+
+    # Never ask the solver for more threads than the scheduler will reserve
+    config.solver_threads = max(1, min(config.solver_threads, scheduler.cpu_budget('pypsa_model')))
+
+    def run_model(job: Job):
+        def on_model_event(event: dict):
+            # Called from the model thread as progress happens
+            event = dict(event)
+            kind = event.pop('kind', 'progress')
+            if kind == 'solver':
+                job.publish({"type": "solver", **event})
+            else:
+                job.publish({"type": "progress", "progress": event, "log": json.dumps(event, indent=2)})
 
-        # In a real scenario, the model.run() would be asynchronous and yield progress
-        # For this example, we'll simulate progress by reading the log file
-
-        async def run_and_monitor():
-            # Run the model in a separate thread
-            model_thread = asyncio.to_thread(model.run)
-
-            # Monitor the log file for changes
-            log_file = Path(config.project_folder) / "Logs" / f"{config.scenario_name}_progress.json"
-            last_log_content = ""
-
-            while not model_thread.done():
-                if log_file.exists():
-                    with open(log_file, "r") as f:
-                        current_log_content = f.read()
-
-                    if current_log_content != last_log_content:
-                        await event_queue.put({
-                            "type": "progress",
-                            "log": current_log_content
-                        })
-                        last_log_content = current_log_content
-
-                await asyncio.sleep(1)
-
-            # Final log check
-            if log_file.exists():
-                with open(log_file, "r") as f:
-                    await event_queue.put({
-                        "type": "progress",
-                        "log": f.read()
-                    })
-
-            await event_queue.put({
-                "type": "end",
-                "status": "completed"
-            })
+        model = PyPSAModel(config, cancel_event=job.cancel_event, on_progress=on_model_event)
+        if not model.run():
+            raise RuntimeError(f"Model run for {config.scenario_name} failed, see model log")
+
+    job = scheduler.submit(
+        "pypsa_model",
+        run_model,
+        name=f"pypsa:{config.scenario_name}",
+        cpus=config.solver_threads
+    )
+
+    asyncio.create_task(monitor_model_progress(job))
+    return job
+
+
+async def monitor_model_progress(job: Job):
+    """
+    Send the final status once the job is done.
+
+    Progress itself is pushed by the model as it happens; every event it
+    published before finishing is already queued ahead of this one.
+    """
+    try:
+        await asyncio.to_thread(job.done_event.wait)
 
-        await run_and_monitor()
+        final_event = {"type": "end", "status": job.state, "jobId": job.id}
+        if job.error:
+            final_event["error"] = job.error
+        await job.events.put(final_event)
 
     except Exception as e:
-        await event_queue.put({
+        await job.events.put({
             "type": "end",
             "status": "failed",
             "error": str(e)
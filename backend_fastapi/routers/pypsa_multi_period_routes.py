@@ -9,7 +9,7 @@ API endpoints for handling:
 - Multi-file year-by-year analysis
 """
 
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, HTTPException, Query, Body, Depends
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import logging
@@ -26,17 +26,26 @@ from pypsa_multi_period_utils import (
     process_multi_file_networks
 )
 from network_cache import load_network_cached
+from execution_pools import offload
+from json_responses import FastJSONRoute
+from conditional_requests import FileETag, project_files
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Conditional GET: ETag from the network file
+network_etag = Depends(FileETag(project_files("results/pypsa_optimization/{scenarioName}/{networkFile}")))
+# Conditional GET: ETag from the scenario folder
+scenario_etag = Depends(FileETag(project_files("results/pypsa_optimization/{scenarioName}")))
 
 
 # =============================================================================
 # NETWORK DETECTION & METADATA
 # =============================================================================
 
-@router.get("/pypsa/detect-network-type")
-async def detect_network_type(
+@router.get("/pypsa/detect-network-type", dependencies=[scenario_etag])
+@offload("network_io")
+def detect_network_type(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario folder name")
 ):
@@ -148,8 +157,9 @@ async def detect_network_type(
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/list-periods")
-async def list_periods(
+@router.get("/pypsa/list-periods", dependencies=[network_etag])
+@offload("network_io")
+def list_periods(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario folder name"),
     networkFile: str = Query(..., description="Network filename")
@@ -196,7 +206,8 @@ async def list_periods(
 # =============================================================================
 
 @router.post("/pypsa/extract-periods")
-async def extract_periods(
+@offload("network_io")
+def extract_periods(
     projectPath: str = Body(..., description="Project root path"),
     scenarioName: str = Body(..., description="Scenario folder name"),
     networkFile: str = Body(..., description="Network filename"),
@@ -249,7 +260,8 @@ async def extract_periods(
 # =============================================================================
 
 @router.post("/pypsa/analyze-multi-file")
-async def analyze_multi_file(
+@offload("analytics")
+def analyze_multi_file(
     projectPath: str = Body(..., description="Project root path"),
     scenarioName: str = Body(..., description="Scenario folder name"),
     networkFiles: List[str] = Body(..., description="List of network filenames to analyze")
@@ -311,8 +323,9 @@ async def analyze_multi_file(
 # PERIOD-SPECIFIC ANALYSIS
 # =============================================================================
 
-@router.get("/pypsa/period-analysis")
-async def period_analysis(
+@router.get("/pypsa/period-analysis", dependencies=[network_etag])
+@offload("analytics")
+def period_analysis(
     projectPath: str = Query(..., description="Project root path"),
     scenarioName: str = Query(..., description="Scenario folder name"),
     networkFile: str = Query(..., description="Network filename"),
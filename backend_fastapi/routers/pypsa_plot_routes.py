@@ -18,7 +18,7 @@ Endpoints:
 - GET /project/pypsa/plot/availability - Get available plot types for network
 """
 
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, HTTPException, Query, Body, Depends
 from fastapi.responses import HTMLResponse, FileResponse
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -34,9 +34,15 @@ sys.path.append(str(Path(__file__).parent.parent / "models"))
 from complete_pypsa_visualizer import CompletePyPSAVisualizer
 from pypsa_comprehensive_analysis import PyPSAComprehensiveAnalyzer
 from network_cache import load_network_cached
+from execution_pools import offload
+from json_responses import FastJSONRoute
+from conditional_requests import FileETag, project_files
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Conditional GET: ETag from the network file
+network_etag = Depends(FileETag(project_files("results/pypsa_optimization/{scenarioName}/{networkFile}")))
 
 
 # =============================================================================
@@ -56,6 +62,7 @@ class PlotFilters(BaseModel):
     buses: Optional[List[str]] = Field(None, description="Specific buses for price plots")
     by_zone: bool = Field(False, description="Group by zone/region")
     stacked: bool = Field(True, description="Stack areas in dispatch plot")
+    max_points: Optional[int] = Field(None, ge=3, description="Downsample time series traces to at most this many points")
 
 
 class PlotRequest(BaseModel):
@@ -96,7 +103,8 @@ class NetworkPlotRequest(BaseModel):
 # =============================================================================
 
 @router.post("/pypsa/plot/generate")
-async def generate_plot(request: PlotRequest):
+@offload("analytics")
+def generate_plot(request: PlotRequest):
     """
     Generate interactive PyPSA visualization plot.
 
@@ -203,8 +211,9 @@ async def generate_plot_from_project(request: NetworkPlotRequest):
         raise HTTPException(status_code=500, detail=str(error))
 
 
-@router.get("/pypsa/plot/availability")
-async def get_plot_availability(
+@router.get("/pypsa/plot/availability", dependencies=[network_etag])
+@offload("network_io")
+def get_plot_availability(
     projectPath: str = Query(...),
     scenarioName: str = Query(...),
     networkFile: str = Query(...)
@@ -315,7 +324,8 @@ def _generate_plot_by_type(visualizer: CompletePyPSAVisualizer, plot_type: str,
             end_date=filters.end_date,
             carriers=filters.carriers,
             resolution=filters.resolution,
-            stacked=filters.stacked
+            stacked=filters.stacked,
+            max_points=filters.max_points
         )
 
     elif plot_type == "capacity":
@@ -24,14 +24,25 @@ Endpoints:
 - GET /project/optimization-sheet-data - Get data from a specific sheet (with pagination)
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends
 from pathlib import Path
 from typing import Optional
 import openpyxl
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from conditional_requests import FileETag, project_files
+from execution_pools import offload
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Conditional GET: ETag from the optimization results folder
+folders_etag = Depends(FileETag(project_files("results/pypsa_optimization")))
+# Conditional GET: ETag from the Pypsa_results.xlsx workbook
+results_workbook_etag = Depends(FileETag(project_files("results/pypsa_optimization/{folderName}/Pypsa_results.xlsx")))
 
 
 # =============================================================================
@@ -65,7 +76,7 @@ def validate_path_components(path: str, component_name: str) -> str:
     return path.strip()
 
 
-@router.get("/optimization-folders")
+@router.get("/optimization-folders", dependencies=[folders_etag])
 async def get_optimization_folders(projectPath: str = Query(..., description="Project root path")):
     """
     List all subfolders in the pypsa_optimization directory.
@@ -100,8 +111,9 @@ async def get_optimization_folders(projectPath: str = Query(..., description="Pr
         )
 
 
-@router.get("/optimization-sheets")
-async def get_optimization_sheets(
+@router.get("/optimization-sheets", dependencies=[results_workbook_etag])
+@offload("excel_io")
+def get_optimization_sheets(
     projectPath: str = Query(..., description="Project root path"),
     folderName: str = Query(..., description="Optimization folder name")
 ):
@@ -146,8 +158,9 @@ async def get_optimization_sheets(
         )
 
 
-@router.get("/optimization-sheet-data")
-async def get_optimization_sheet_data(
+@router.get("/optimization-sheet-data", dependencies=[results_workbook_etag])
+@offload("excel_io")
+def get_optimization_sheet_data(
     projectPath: str = Query(..., description="Project root path"),
     folderName: str = Query(..., description="Optimization folder name"),
     sheetName: str = Query(..., description="Sheet name to read"),
@@ -17,7 +17,7 @@ Endpoints:
 - POST /project/save-consolidated - Save consolidated results to Excel
 """
 
-from fastapi import APIRouter, HTTPException, Query, Path as PathParam
+from fastapi import APIRouter, HTTPException, Query, Path as PathParam, Depends
 from pydantic import BaseModel, Field
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -25,9 +25,23 @@ import openpyxl
 from openpyxl.utils import get_column_letter
 import json
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from conditional_requests import FileETag, project_files
+from scenario_results_index import consolidate, get_scenario_results_cache
+from project_catalog import get_project_catalog, refresh_scenario_safely
+from input_workbook_cache import get_input_workbook
+from execution_pools import offload, run_in_pool
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Conditional GET: ETag from the demand forecast results folder
+scenarios_etag = Depends(FileETag(project_files("results/demand_forecasts")))
+# Conditional GET: ETag from the scenario folder and the input workbook
+scenario_etag = Depends(FileETag(project_files("results/demand_forecasts/{scenarioName}", "inputs/input_demand_file.xlsx")))
 
 
 class TDLossPoint(BaseModel):
@@ -78,47 +92,34 @@ def read_solar_share_data(project_path: str) -> Dict[str, float]:
             logger.warning(f"[read_solar_share_data] Excel file not found at: {file_path}")
             return {}
 
-        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        # Parsed once per file version; the marker position comes from its index
+        workbook = get_input_workbook(project_path)
 
         # Find 'main' sheet (case-insensitive)
-        main_sheet = None
-        for sheet_name in workbook.sheetnames:
-            if sheet_name.lower() == 'main':
-                main_sheet = workbook[sheet_name]
-                break
+        main_sheet = workbook.find_sheet('main')
 
         if not main_sheet:
             logger.warning("[read_solar_share_data] Sheet 'main' not found")
-            workbook.close()
             return {}
 
         # Find ~Solar_share marker
-        marker_row = None
-        marker_col = None
-        for row_idx, row in enumerate(main_sheet.iter_rows(values_only=True), start=1):
-            for col_idx, cell_value in enumerate(row, start=1):
-                if (isinstance(cell_value, str) and
-                    cell_value.strip().lower() == '~solar_share'):
-                    marker_row = row_idx
-                    marker_col = col_idx
-                    break
-            if marker_row:
-                break
-
-        if not marker_row:
+        marker = workbook.find_marker('~solar_share', main_sheet)
+
+        if not marker:
             logger.info("[read_solar_share_data] Marker '~Solar_share' not found, returning empty dict")
-            workbook.close()
             return {}
+        marker_row = marker[0]
+        max_column = workbook.max_column(main_sheet)
 
         # Read header row (should be 1 or 2 rows below marker)
         # Try row immediately after marker
         headers_row = marker_row + 1
-        headers = [main_sheet.cell(row=headers_row, column=col).value for col in range(1, main_sheet.max_column + 1)]
+        headers = [workbook.cell(main_sheet, headers_row, col) for col in range(1, max_column + 1)]
 
         # If first row after marker is blank, try next row
         if not any(headers):
             headers_row = marker_row + 2
-            headers = [main_sheet.cell(row=headers_row, column=col).value for col in range(1, main_sheet.max_column + 1)]
+            headers = [workbook.cell(main_sheet, headers_row, col) for col in range(1, max_column + 1)]
 
         # Find Sector and Percentage_share columns
         sector_col = None
@@ -134,14 +135,13 @@ def read_solar_share_data(project_path: str) -> Dict[str, float]:
 
         if not sector_col or not percentage_col:
             logger.warning(f"[read_solar_share_data] Required columns not found. Sector col: {sector_col}, Percentage col: {percentage_col}")
-            workbook.close()
             return {}
 
         # Read data rows
         solar_shares = {}
-        for row_idx in range(headers_row + 1, main_sheet.max_row + 1):
-            sector_name = main_sheet.cell(row=row_idx, column=sector_col).value
-            percentage_value = main_sheet.cell(row=row_idx, column=percentage_col).value
+        for row_idx in range(headers_row + 1, workbook.max_row(main_sheet) + 1):
+            sector_name = workbook.cell(main_sheet, row_idx, sector_col)
+            percentage_value = workbook.cell(main_sheet, row_idx, percentage_col)
 
             if not sector_name or sector_name == '':
                 break  # Stop at first empty sector
@@ -153,7 +153,6 @@ def read_solar_share_data(project_path: str) -> Dict[str, float]:
                 logger.warning(f"[read_solar_share_data] Invalid percentage value for sector {sector_name}: {percentage_value}")
                 solar_shares[str(sector_name).strip()] = 0.0
 
-        workbook.close()
         logger.info(f"[read_solar_share_data] Successfully loaded solar shares for {len(solar_shares)} sectors")
         return solar_shares
 
@@ -162,72 +161,7 @@ def read_solar_share_data(project_path: str) -> Dict[str, float]:
         return {}
 
 
-def is_solar_sector(sector_name: str) -> bool:
-    """
-    Check if a sector name contains 'solar' or 'Solar'.
-
-    Args:
-        sector_name: Name of the sector
-
-    Returns:
-        True if sector is a solar generation sector
-    """
-    return 'solar' in sector_name.lower()
-
-
-def calculate_td_loss_percentage(target_year: int, loss_points: List[TDLossPoint]) -> float:
-    """
-    Calculate T&D loss percentage for a given year using linear interpolation.
-
-    Args:
-        target_year: Year to calculate loss for
-        loss_points: List of T&D loss data points
-
-    Returns:
-        Loss percentage as decimal (e.g., 0.10 for 10%)
-    """
-    DEFAULT_LOSS = 0.10  # 10%
-
-    if not loss_points or len(loss_points) == 0:
-        return DEFAULT_LOSS
-
-    # Filter and sort points
-    sorted_points = sorted(
-        [p for p in loss_points if isinstance(p.year, (int, float)) and isinstance(p.loss, (int, float))],
-        key=lambda p: p.year
-    )
-
-    if len(sorted_points) == 0:
-        return DEFAULT_LOSS
-    if len(sorted_points) == 1:
-        return sorted_points[0].loss / 100
-
-    first_point = sorted_points[0]
-    last_point = sorted_points[-1]
-
-    # Extrapolation
-    if target_year <= first_point.year:
-        return first_point.loss / 100
-    if target_year >= last_point.year:
-        return last_point.loss / 100
-
-    # Interpolation
-    for i in range(len(sorted_points) - 1):
-        p1 = sorted_points[i]
-        p2 = sorted_points[i + 1]
-
-        if target_year >= p1.year and target_year <= p2.year:
-            if p2.year - p1.year == 0:
-                return p1.loss / 100
-
-            # Linear interpolation
-            interpolated_loss = p1.loss + (target_year - p1.year) * (p2.loss - p1.loss) / (p2.year - p1.year)
-            return interpolated_loss / 100
-
-    return DEFAULT_LOSS
-
-
-@router.get("/scenarios")
+@router.get("/scenarios", dependencies=[scenarios_etag])
 async def list_scenarios(projectPath: str = Query(..., description="Project root path")):
     """
     List all demand forecast scenario folders.
@@ -241,23 +175,16 @@ async def list_scenarios(projectPath: str = Query(..., description="Project root
     if not projectPath:
         raise HTTPException(status_code=400, detail="Missing projectPath")
 
-    scenario_base_path = Path(projectPath) / "results" / "demand_forecasts"
-
-    if not scenario_base_path.exists():
-        return {"scenarios": []}
-
     try:
-        scenarios = [
-            item.name for item in scenario_base_path.iterdir()
-            if item.is_dir()
-        ]
+        # Indexed lookup in the project catalog (no directory walk)
+        scenarios = await run_in_pool("excel_io", get_project_catalog(projectPath).list_scenarios)
         return {"scenarios": scenarios}
     except Exception as e:
         logger.error(f"Error reading scenario folders: {e}")
         raise HTTPException(status_code=500, detail="Failed to read scenario folders")
 
 
-@router.get("/scenarios/{scenarioName}/meta")
+@router.get("/scenarios/{scenarioName}/meta", dependencies=[scenario_etag])
 async def get_scenario_meta(
     scenarioName: str = PathParam(..., description="Scenario name"),
     projectPath: str = Query(..., description="Project root path")
@@ -276,14 +203,10 @@ async def get_scenario_meta(
         raise HTTPException(status_code=400, detail="Project path and scenario name are required.")
 
     try:
-        meta_file_path = (
-            Path(projectPath) / "results" / "demand_forecasts" / scenarioName / "scenario_meta.json"
-        )
+        entry = await run_in_pool("excel_io", get_project_catalog(projectPath).lookup_scenario, scenarioName)
 
-        if meta_file_path.exists():
-            with open(meta_file_path, 'r') as f:
-                meta_data = json.load(f)
-            return {"success": True, "meta": meta_data}
+        if entry and entry["meta"] is not None:
+            return {"success": True, "meta": entry["meta"]}
         else:
             raise HTTPException(status_code=404, detail="Scenario metadata not found.")
 
@@ -294,7 +217,7 @@ async def get_scenario_meta(
         raise HTTPException(status_code=500, detail="Failed to read scenario metadata.")
 
 
-@router.get("/scenarios/{scenarioName}/sectors")
+@router.get("/scenarios/{scenarioName}/sectors", dependencies=[scenario_etag])
 async def get_scenario_sectors(
     scenarioName: str = PathParam(..., description="Scenario name"),
     projectPath: str = Query(..., description="Project root path")
@@ -313,12 +236,15 @@ async def get_scenario_sectors(
         raise HTTPException(status_code=400, detail="Project path and scenario name are required.")
 
     try:
-        scenario_path = Path(projectPath) / "results" / "demand_forecasts" / scenarioName
+        catalog = get_project_catalog(projectPath)
+        entry = await run_in_pool("excel_io", catalog.lookup_scenario, scenarioName)
 
-        if not scenario_path.exists():
+        if entry is None:
             raise HTTPException(status_code=404, detail="Scenario folder not found.")
 
-        files = [f.stem for f in scenario_path.glob("*.xlsx")]
+        files = await run_in_pool("excel_io", catalog.get_sectors, scenarioName)
+        if entry["hasConsolidated"]:
+            files.append("Consolidated_Results")
         return {"success": True, "sectors": files}
 
     except HTTPException:
@@ -328,7 +254,7 @@ async def get_scenario_sectors(
         raise HTTPException(status_code=500, detail="Failed to fetch sectors.")
 
 
-@router.get("/scenarios/{scenarioName}/models")
+@router.get("/scenarios/{scenarioName}/models", dependencies=[scenario_etag])
 async def get_scenario_models(
     scenarioName: str = PathParam(..., description="Scenario name"),
     projectPath: str = Query(..., description="Project root path")
@@ -336,7 +262,8 @@ async def get_scenario_models(
     """
     Get available forecasting models for each sector.
 
-    Reads the 'Results' sheet headers from each sector Excel file.
+    Served from the project catalog, which records the 'Results' sheet
+    headers of each sector Excel file when it changes.
 
     Args:
         scenarioName: Name of the scenario
@@ -349,35 +276,14 @@ async def get_scenario_models(
         raise HTTPException(status_code=400, detail="Project path and scenario name are required.")
 
     try:
-        scenario_path = Path(projectPath) / "results" / "demand_forecasts" / scenarioName
+        catalog = get_project_catalog(projectPath)
+        entry = await run_in_pool("excel_io", catalog.lookup_scenario, scenarioName)
 
-        if not scenario_path.exists():
+        if entry is None:
             raise HTTPException(status_code=404, detail="Scenario folder not found.")
 
-        models_by_sector = {}
-
-        for file in scenario_path.glob("*.xlsx"):
-            sector_name = file.stem
-            if sector_name == 'Consolidated_Results':
-                continue
-
-            try:
-                workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
-                if 'Results' in workbook.sheetnames:
-                    sheet = workbook['Results']
-                    headers = [cell.value for cell in next(sheet.iter_rows(min_row=1, max_row=1))]
-                    # Exclude 'Year' and 'Time Series' columns
-                    models = [
-                        h for h in headers
-                        if h and h.lower() not in ['year', 'time series']
-                    ]
-                    models_by_sector[sector_name] = models
-                else:
-                    models_by_sector[sector_name] = []
-                workbook.close()
-            except Exception as e:
-                logger.error(f"Error reading {file}: {e}")
-                models_by_sector[sector_name] = []
+        # Results sheet headers are recorded in the catalog when sector files are written
+        models_by_sector = await run_in_pool("excel_io", catalog.get_models, scenarioName)
 
         return {"success": True, "models": models_by_sector}
 
@@ -393,8 +299,9 @@ from fastapi import HTTPException
 # PathParam and Query typed-deps assumed imported as in your original file
 # logger assumed to be available in module scope
 
-@router.get("/scenarios/{scenarioName}/sectors/{sectorName}")
-async def get_sector_data(
+@router.get("/scenarios/{scenarioName}/sectors/{sectorName}", dependencies=[scenario_etag])
+@offload("excel_io")
+def get_sector_data(
     scenarioName: str = PathParam(..., description="Scenario name"),
     sectorName: str = PathParam(..., description="Sector name"),
     projectPath: str = Query(..., description="Project root path"),
@@ -559,7 +466,7 @@ async def get_sector_data(
         logger.error(f"Error processing sector data for {scenarioName}/{sectorName}: {error}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to process sector data.")
 
-@router.get("/scenarios/{scenarioName}/td-losses")
+@router.get("/scenarios/{scenarioName}/td-losses", dependencies=[scenario_etag])
 async def get_td_losses(
     scenarioName: str = PathParam(..., description="Scenario name"),
     projectPath: str = Query(..., description="Project root path")
@@ -595,7 +502,8 @@ async def get_td_losses(
 
 
 @router.post("/scenarios/{scenarioName}/td-losses")
-async def save_td_losses(
+@offload("excel_io")
+def save_td_losses(
     scenarioName: str = PathParam(..., description="Scenario name"),
     request: TDLossSaveRequest = None
 ):
@@ -624,6 +532,11 @@ async def save_td_losses(
         with open(file_path, 'w') as f:
             json.dump(loss_points_data, f, indent=2)
 
+        try:
+            get_project_catalog(request.projectPath).set_td_losses(scenarioName, loss_points_data)
+        except Exception as e:
+            logger.error(f"Failed to update project catalog: {e}")
+
         return {"success": True, "message": "T&D losses saved successfully."}
 
     except Exception as error:
@@ -631,7 +544,7 @@ async def save_td_losses(
         raise HTTPException(status_code=500, detail="Failed to save T&D loss data.")
 
 
-@router.get("/scenarios/{scenarioName}/consolidated/exists")
+@router.get("/scenarios/{scenarioName}/consolidated/exists", dependencies=[scenario_etag])
 async def check_consolidated_exists(
     scenarioName: str = PathParam(..., description="Scenario name"),
     projectPath: str = Query(..., description="Project root path")
@@ -662,7 +575,8 @@ async def check_consolidated_exists(
 
 
 @router.post("/scenarios/{scenarioName}/consolidated")
-async def generate_consolidated(
+@offload("excel_io")
+def generate_consolidated(
     scenarioName: str = PathParam(..., description="Scenario name"),
     request: ConsolidatedRequest = None
 ):
@@ -689,57 +603,8 @@ async def generate_consolidated(
 
         model_selections = request.selections or {}
 
-        # Get all Excel files except Consolidated_Results
-        excel_files = [
-            f for f in scenario_path.glob("*.xlsx")
-            if f.stem != 'Consolidated_Results'
-        ]
-        sectors = [f.stem for f in excel_files]
-
-        # Create year range
-        years = list(range(request.startYear, request.endYear + 1))
-
-        # Initialize consolidated data
-        consolidated_data = []
-        data_map = {}
-        for year in years:
-            row_data = {"Year": year}
-            for sector in sectors:
-                row_data[sector] = None
-            consolidated_data.append(row_data)
-            data_map[year] = row_data
-
-        # Read data from each sector
-        for sector in sectors:
-            selected_model = model_selections.get(sector)
-            if not selected_model:
-                continue
-
-            file_path = scenario_path / f"{sector}.xlsx"
-            if not file_path.exists():
-                continue
-
-            try:
-                workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-                if 'Results' not in workbook.sheetnames:
-                    workbook.close()
-                    continue
-
-                sheet = workbook['Results']
-                headers = [cell.value for cell in next(sheet.iter_rows(min_row=1, max_row=1))]
-                for row in sheet.iter_rows(min_row=2, values_only=True):
-                    row_dict = dict(zip(headers, row))
-                    year = row_dict.get('Year')
-                    if year and int(year) in data_map:
-                        value = row_dict.get(selected_model)
-                        if value is not None:
-                            data_map[int(year)][sector] = value
-
-                workbook.close()
-
-            except Exception as e:
-                logger.error(f"Error reading sector {sector}: {e}")
-                continue
+        # Sector results are read once per workbook version and kept in memory
+        index = get_scenario_results_cache().get(scenario_path)
 
         # Load solar share data for net demand calculation
         solar_shares = {}
@@ -760,80 +625,16 @@ async def generate_consolidated(
             except Exception as e:
                 logger.error(f"Could not parse td_losses.json: {e}")
 
-        # Calculate totals based on demand type
-        for row in consolidated_data:
-            year = row['Year']
-
-            # Apply solar sector abs() transformation
-            for sector in sectors:
-                if row[sector] is not None and is_solar_sector(sector):
-                    row[sector] = abs(float(row[sector]))
-
-            if demand_type == "gross":
-                # GROSS DEMAND: Original behavior
-                gross_total = sum(
-                    float(row[sector]) if row[sector] is not None else 0
-                    for sector in sectors
-                )
-
-                td_percentage = calculate_td_loss_percentage(year, td_loss_points)
-                td_losses = gross_total * (td_percentage / (1 - td_percentage))
-                final_total = gross_total + td_losses
-
-                row['Gross Total'] = gross_total
-                row['T&D Loss (%)'] = td_percentage
-                row['T&D Losses'] = td_losses
-                row['Total'] = final_total
-
-            elif demand_type == "net":
-                # NET DEMAND: Subtract solar generation from each sector
-                net_total = 0
-
-                for sector in sectors:
-                    if row[sector] is not None:
-                        sector_value = float(row[sector])
-
-                        # For non-solar sectors, subtract their solar share
-                        if not is_solar_sector(sector):
-                            solar_share_pct = solar_shares.get(sector, 0.0)
-                            net_value = sector_value - (sector_value * solar_share_pct / 100.0)
-                            row[sector] = net_value
-                            net_total += net_value
-                        else:
-                            # For solar sectors, keep the absolute value
-                            row[sector] = abs(sector_value)
-                            net_total += abs(sector_value)
-
-                row['Total'] = net_total
-
-            elif demand_type == "onGrid":
-                # ON GRID DEMAND: Net demand + T&D losses
-                net_total = 0
-
-                for sector in sectors:
-                    if row[sector] is not None:
-                        sector_value = float(row[sector])
-
-                        # For non-solar sectors, subtract their solar share
-                        if not is_solar_sector(sector):
-                            solar_share_pct = solar_shares.get(sector, 0.0)
-                            net_value = sector_value - (sector_value * solar_share_pct / 100.0)
-                            row[sector] = net_value
-                            net_total += net_value
-                        else:
-                            # For solar sectors, keep the absolute value
-                            row[sector] = abs(sector_value)
-                            net_total += abs(sector_value)
-
-                # Apply T&D losses to net demand
-                td_percentage = calculate_td_loss_percentage(year, td_loss_points)
-                td_losses = net_total * (td_percentage / (1 - td_percentage))
-                final_total = net_total + td_losses
-
-                row['Net Total'] = net_total
-                row['T&D Loss (%)'] = td_percentage
-                row['T&D Losses'] = td_losses
-                row['Total'] = final_total
+        # Calculate sector values and totals based on demand type
+        consolidated_data = consolidate(
+            index,
+            model_selections,
+            request.startYear,
+            request.endYear,
+            demand_type=demand_type,
+            solar_shares=solar_shares,
+            td_loss_points=[(point.year, point.loss) for point in td_loss_points]
+        )
 
         return {"success": True, "data": consolidated_data}
 
@@ -845,7 +646,8 @@ async def generate_consolidated(
 
 
 @router.post("/save-consolidated")
-async def save_consolidated(request: SaveConsolidatedRequest):
+@offload("excel_io")
+def save_consolidated(request: SaveConsolidatedRequest):
     """
     Save consolidated results to Excel file.
 
@@ -896,6 +698,8 @@ async def save_consolidated(request: SaveConsolidatedRequest):
 
         logger.info(f"✅ Consolidated results saved to: {output_file_path}")
 
+        refresh_scenario_safely(request.projectPath, request.scenarioName)
+
         return {
             "success": True,
             "message": "File saved successfully!",
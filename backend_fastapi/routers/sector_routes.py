@@ -10,11 +10,16 @@ Endpoints:
 
 from fastapi import APIRouter, HTTPException, Query
 from pathlib import Path
-import openpyxl
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from input_workbook_cache import get_input_workbook
+from execution_pools import run_in_pool
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 @router.get("/sectors")
@@ -49,37 +54,25 @@ async def get_sectors(projectPath: str = Query(..., description="Project root pa
                 detail=f"Excel file not found at path: {file_path}"
             )
 
-        # Load workbook
-        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        sheet_name = workbook.sheetnames[0]
-        worksheet = workbook[sheet_name]
-
-        # Convert to list of rows
-        rows = list(worksheet.iter_rows(values_only=True))
+        # Parsed once per file version; markers are indexed while parsing
+        workbook = await run_in_pool("excel_io", get_input_workbook, projectPath)
+        sheet_name = workbook.sheet_names[0]
+        rows = workbook.rows(sheet_name)
 
         sectors = []
-        start_index = -1
 
         # Find the marker '~consumption_sectors' (case-insensitive)
-        for i, row in enumerate(rows):
-            for cell_value in row:
-                if (isinstance(cell_value, str) and
-                    cell_value.strip().lower() == '~consumption_sectors'):
-                    start_index = i + 2  # Start reading 2 rows below the marker
-                    break
-            if start_index != -1:
-                break
-
-        # Extract sectors starting from the marker
-        if start_index != -1:
+        marker = workbook.find_marker('~consumption_sectors', sheet_name)
+
+        # Extract sectors starting 2 rows below the marker
+        if marker is not None:
+            start_index = marker[0] + 1
             for i in range(start_index, len(rows)):
-                cell = rows[i][0]  # First column
+                cell = rows[i][0] if rows[i] else None  # First column
                 if not cell or str(cell).strip() == '':
                     continue
                 sectors.append(str(cell).strip())
 
-        workbook.close()
-
         return {"sectors": sectors}
 
     except HTTPException:
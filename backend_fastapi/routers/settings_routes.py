@@ -15,9 +15,13 @@ from pathlib import Path
 from typing import Dict, Any
 import json
 import logging
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 
 class SaveColorsRequest(BaseModel):
@@ -4,38 +4,121 @@ Time Series Data Routes
 
 Handles hourly load profile time series data extraction with filtering.
 
+Profiles are read through the load profile store, which keeps a columnar
+copy of each profile partitioned by fiscal year, so filters only touch the
+partitions they need.
+
 Endpoints:
 - GET /project/full-load-profile - Get hourly load data filtered by fiscal year/month/season
+- GET /project/load-profile-query - Columnar profile query with filters and aggregations
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends
 from pathlib import Path
-from typing import Optional
-import openpyxl
-from openpyxl.utils import datetime as excel_datetime
+from typing import List, Optional
 import logging
+import sys
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "models"))
+from json_responses import FastJSONRoute
+from conditional_requests import FileETag, project_files
+from load_profile_store import (
+    AGGREGATIONS,
+    DEFAULT_VALUE_COLUMN,
+    SEASON_MONTHS,
+    aggregate,
+    get_load_profile_store,
+    to_json_columns,
+)
+from execution_pools import run_in_pool
+from downsampling import downsample_columns
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
+
+# Conditional GET: ETag from the load profile workbook
+profile_etag = Depends(FileETag(project_files("results/load_profiles/{profileName}.xlsx")))
+
+
+def parse_fiscal_year(fiscal_year: str) -> int:
+    """
+    Parse a fiscal year string such as 'FY2025' (or '2025').
+
+    Raises:
+        HTTPException: 400 on invalid format
+    """
+    try:
+        return int(fiscal_year.strip().upper().replace('FY', ''))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid fiscal year format.")
+
+
+def resolve_months(month: Optional[int], season: Optional[str]) -> List[int]:
+    """
+    Months selected by a month or season filter (empty list means all).
+
+    Raises:
+        HTTPException: 400 on invalid month or season
+    """
+    if month:
+        if not (1 <= month <= 12):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid month. Must be a number between 1 and 12."
+            )
+        return [month]
+    if season:
+        if season not in SEASON_MONTHS:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid season. Must be one of: Monsoon, Post-monsoon, Winter, Summer."
+            )
+        return SEASON_MONTHS[season]
+    return []
 
 
-@router.get("/full-load-profile")
+def parse_date_bound(value: Optional[str], end: bool = False) -> Optional[np.datetime64]:
+    """
+    Parse an ISO date/datetime bound; a date-only end bound includes the whole day.
+
+    Raises:
+        HTTPException: 400 on invalid dates
+    """
+    if not value:
+        return None
+    try:
+        if len(value.strip()) <= 10:
+            day = np.datetime64(value.strip(), 'D')
+            return (day + np.timedelta64(1, 'D') if end else day).astype('datetime64[s]')
+        return np.datetime64(value.strip().replace(' ', 'T'), 's')
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {value}")
+
+
+@router.get("/full-load-profile", dependencies=[profile_etag])
 async def get_full_load_profile(
     projectPath: str = Query(..., description="Project root path"),
     profileName: str = Query(..., description="Profile name"),
     fiscalYear: str = Query(..., description="Fiscal year (e.g., FY2025)"),
     month: Optional[int] = Query(None, description="Month number (1-12)"),
-    season: Optional[str] = Query(None, description="Season name")
+    season: Optional[str] = Query(None, description="Season name"),
+    maxPoints: Optional[int] = Query(None, ge=3, description="Downsample to at most this many points (LTTB)")
 ):
     """
     Get full hourly load profile data with optional filtering by month or season.
 
+    With maxPoints, the rows are reduced with largest-triangle-three-buckets
+    on the demand column, which keeps peaks and troughs visible.
+
     Args:
         projectPath: Project root directory
         profileName: Name of the profile (without .xlsx)
         fiscalYear: Fiscal year string (e.g., 'FY2025')
         month: Optional month filter (1-12)
         season: Optional season filter (Monsoon, Post-monsoon, Winter, Summer)
+        maxPoints: Optional maximum number of rows to return
 
     Returns:
         dict: Filtered hourly load profile data
@@ -46,36 +129,8 @@ async def get_full_load_profile(
             detail="Project path, profile name, and fiscal year are required."
         )
 
-    # Parse fiscal year
-    try:
-        year_to_filter = int(fiscalYear.replace('FY', ''))
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid fiscal year format.")
-
-    # Define season-to-month mapping
-    season_months = {
-        'Monsoon': [7, 8, 9],
-        'Post-monsoon': [10, 11],
-        'Winter': [12, 1, 2],
-        'Summer': [3, 4, 5, 6]
-    }
-
-    # Validate and prepare month filter
-    months_to_filter = []
-    if month:
-        if not (1 <= month <= 12):
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid month. Must be a number between 1 and 12."
-            )
-        months_to_filter = [month]
-    elif season:
-        if season not in season_months:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid season. Must be one of: Monsoon, Post-monsoon, Winter, Summer."
-            )
-        months_to_filter = season_months[season]
+    year_to_filter = parse_fiscal_year(fiscalYear)
+    months_to_filter = resolve_months(month, season)
 
     file_path = Path(projectPath) / "results" / "load_profiles" / f"{profileName}.xlsx"
 
@@ -86,59 +141,130 @@ async def get_full_load_profile(
                 detail=f"Profile file not found: {profileName}.xlsx"
             )
 
-        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
-        sheet_name = 'Load_Profile'
-
-        if sheet_name not in workbook.sheetnames:
-            workbook.close()
-            raise HTTPException(status_code=404, detail=f"Sheet '{sheet_name}' not found.")
-
-        worksheet = workbook[sheet_name]
-
-        # Read all data
-        headers = [cell.value for cell in next(worksheet.iter_rows(min_row=1, max_row=1))]
-        all_data = []
-        for row in worksheet.iter_rows(min_row=2, values_only=True):
-            row_dict = dict(zip(headers, row))
-            all_data.append(row_dict)
-
-        workbook.close()
-
-        # Filter data by fiscal year
-        filtered_data = [
-            row for row in all_data
-            if row.get('Fiscal_Year') == year_to_filter
-        ]
-
-        # Filter by month(s) if specified
-        if months_to_filter:
-            filtered_data = [
-                row for row in filtered_data
-                if row.get('Month') in months_to_filter
-            ]
-
-        # Format DateTime field
-        for row in filtered_data:
-            excel_date_serial = row.get('DateTime')
-            if excel_date_serial and isinstance(excel_date_serial, (int, float)):
-                # Convert Excel serial number to datetime
-                try:
-                    from datetime import datetime, timedelta
-                    # Excel epoch starts at 1899-12-30
-                    excel_epoch = datetime(1899, 12, 30)
-                    python_date = excel_epoch + timedelta(days=excel_date_serial)
-                    row['DateTime'] = python_date.strftime("%Y-%m-%d %H:%M:%S")
-                except:
-                    # If conversion fails, keep original value
-                    pass
-
-        return {"success": True, "data": filtered_data}
+        def read_rows():
+            store = get_load_profile_store(projectPath, profileName)
+            result = store.scan(fiscal_years=[year_to_filter], months=months_to_filter or None)
+            total = len(next(iter(result["data"].values()), []))
+            data = downsample_columns(result["data"], maxPoints, DEFAULT_VALUE_COLUMN, x_column='DateTime')
+            return result["columns"], data, total
+
+        columns, data, total_points = await run_in_pool("excel_io", read_rows)
+
+        # Row objects, as the chart components expect
+        values = to_json_columns(data)
+        filtered_data = [dict(zip(columns, row)) for row in zip(*(values[c] for c in columns))]
+
+        response = {"success": True, "data": filtered_data}
+        if maxPoints:
+            response["totalPoints"] = total_points
+            response["downsampled"] = len(filtered_data) < total_points
+        return response
 
     except HTTPException:
         raise
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    except KeyError as error:
+        raise HTTPException(status_code=404, detail=str(error).strip("'\""))
     except Exception as error:
         logger.error(f"❌ Error reading full load profile for '{profileName}': {error}")
         raise HTTPException(
             status_code=500,
             detail="An error occurred while reading the profile file."
         )
+
+
+@router.get("/load-profile-query", dependencies=[profile_etag])
+async def query_load_profile(
+    projectPath: str = Query(..., description="Project root path"),
+    profileName: str = Query(..., description="Profile name"),
+    fiscalYears: Optional[str] = Query(None, description="Comma-separated fiscal years (e.g., FY2025,FY2026)"),
+    month: Optional[int] = Query(None, description="Month number (1-12)"),
+    season: Optional[str] = Query(None, description="Season name"),
+    startDate: Optional[str] = Query(None, description="Start date/datetime (ISO, inclusive)"),
+    endDate: Optional[str] = Query(None, description="End date/datetime (ISO, inclusive for dates)"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return"),
+    aggregation: Optional[str] = Query(None, description="daily_peak, hourly_mean_by_month or load_duration_curve"),
+    valueColumn: str = Query(DEFAULT_VALUE_COLUMN, description="Demand column used by aggregations")
+):
+    """
+    Query a load profile with filters pushed down to the profile store.
+
+    Fiscal year, month/season and date range filters prune the fiscal-year
+    partitions before any data is read. Results are returned as columnar
+    arrays, optionally aggregated on the server.
+
+    Args:
+        projectPath: Project root directory
+        profileName: Name of the profile (without .xlsx)
+        fiscalYears: Optional fiscal years to read
+        month: Optional month filter (1-12)
+        season: Optional season filter
+        startDate: Optional range start
+        endDate: Optional range end
+        columns: Optional columns to return (raw queries)
+        aggregation: Optional server-side aggregation
+        valueColumn: Demand column used by aggregations
+
+    Returns:
+        dict: Column names, column arrays, row count and fiscal years read
+
+    Raises:
+        HTTPException: 400 on invalid filters, 404 if the profile is missing, 500 on error
+    """
+    if not projectPath or not profileName:
+        raise HTTPException(status_code=400, detail="Project path and profile name are required.")
+    if aggregation and aggregation not in AGGREGATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid aggregation. Must be one of: {', '.join(AGGREGATIONS)}."
+        )
+
+    fiscal_years = None
+    if fiscalYears:
+        fiscal_years = [parse_fiscal_year(fy) for fy in fiscalYears.split(',') if fy.strip()]
+    months_to_filter = resolve_months(month, season)
+    start = parse_date_bound(startDate)
+    end = parse_date_bound(endDate, end=True)
+
+    requested_columns = [c.strip() for c in columns.split(',') if c.strip()] if columns else None
+    if aggregation:
+        requested_columns = ['DateTime', valueColumn] if aggregation != 'load_duration_curve' else [valueColumn]
+
+    file_path = Path(projectPath) / "results" / "load_profiles" / f"{profileName}.xlsx"
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail=f"Profile file not found: {profileName}.xlsx")
+
+    def run_query():
+        store = get_load_profile_store(projectPath, profileName)
+        result = store.scan(
+            fiscal_years=fiscal_years,
+            months=months_to_filter or None,
+            start=start,
+            end=end,
+            columns=requested_columns
+        )
+        output = aggregate(result["data"], aggregation, valueColumn) if aggregation else result
+        return output, result["partitions_read"]
+
+    try:
+        output, partitions_read = await run_in_pool("excel_io", run_query)
+        data = to_json_columns(output["data"])
+        rows = len(data[output["columns"][0]]) if output["columns"] else 0
+
+        return {
+            "success": True,
+            "columns": output["columns"],
+            "data": data,
+            "rows": rows,
+            "aggregation": aggregation,
+            "fiscalYearsRead": [f"FY{fy}" for fy in partitions_read]
+        }
+
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    except KeyError as error:
+        raise HTTPException(status_code=404, detail=str(error).strip("'\""))
+    except Exception as error:
+        logger.error(f"❌ Error querying load profile '{profileName}': {error}")
+        raise HTTPException(status_code=500, detail="An error occurred while querying the profile.")